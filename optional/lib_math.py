@@ -58,6 +58,8 @@ class Math:
     def build_func(
         self,
         origin,  # type: dict[str, Callable[..., int | bool | float | str]]
+        returns=None,  # type: dict[str, tuple[type, ...]] | None
+        pure=None,  # type: list[str] | None
     ):  # type: (...) -> None
         """
         build_func 构建 math 模块的内置函数，
@@ -66,6 +68,18 @@ class Math:
         Args:
             origin (dict[str, Callable[..., int | bool | float | str]]):
                 用于存放所有内置函数的字典
+            returns (dict[str, tuple[type, ...]] | None, optional):
+                如果给出，则向其中写入那些返回值类型确定的内置函数的返回值类型，
+                以便通过 BuiltInFunction 声明它们。
+                返回值可能为 int 或 float 的函数 (例如 math.abs) 不会被写入。
+                默认值为 None
+            pure (list[str] | None, optional):
+                如果给出，则向其中写入那些参数均不为指针，
+                且不分配指针的内置函数的名称，
+                以便通过 BuiltInFunction 将它们标记为纯函数。
+                纯函数只保证结果可被缓存，它们仍可能因参数错误而抛出错误，
+                因此这些名称不应作为 CodeCompiler 的 total_funcs 使用。
+                默认值为 None
         """
         funcs = {}  # type: dict[str, Callable[..., int | bool | float | str]]
 
@@ -129,3 +143,25 @@ class Math:
 
         for key, value in funcs.items():
             origin[key] = value
+
+        if returns is not None:
+            returns["math.format"] = (str,)
+            returns["math.isinf"] = (bool,)
+            returns["math.isnan"] = (bool,)
+            returns["math.frexp"] = (int,)
+            returns["math.modf"] = (int,)
+            for name in (
+                "acos", "acosh", "asin", "asinh", "atan", "atan2", "atanh",
+                "cos", "cosh", "degrees", "e", "erf", "erfc", "exp", "expm1",
+                "fabs", "fmod", "fsum", "gamma", "hypot", "ldexp", "lgamma",
+                "log", "log10", "log1p", "pi", "pow", "radians", "sin", "sinh",
+                "sqrt", "tan", "tanh",
+            ):
+                returns["math." + name] = (float,)
+
+        # These may still raise (e.g. math.format('x', 1)),
+        # so they are memoisable but not total
+        if pure is not None:
+            for key in funcs:
+                if key not in ("math.frexp", "math.modf", "math.fsum"):
+                    pure.append(key)
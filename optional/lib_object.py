@@ -45,12 +45,14 @@ class BaseManager:
     _random = random.Random()  # type: random.Random
     _mapping = {}  # type: dict[int, Any]
     _pinned = set()  # type: set[int]
+    _allocations = 0  # type: int
 
     def __init__(self):  # type: () -> None
         """初始化并返回一个新的基本管理器"""
         self._random = random.Random()
         self._mapping = {}
         self._pinned = set()
+        self._allocations = 0
 
     def _make_ptr(self):  # type: () -> int
         """
@@ -91,8 +93,20 @@ class BaseManager:
         """
         ptr = self._make_ptr()
         self._mapping[ptr] = obj
+        self._allocations += 1
         return ptr
 
+    def allocations(self):  # type: () -> int
+        """
+        allocations 返回通过 ref 分配的指针的总数。
+        它可被传递给 BuiltInFunction，
+        以便自动排除那些分配了指针的纯函数
+
+        Returns:
+            int: 目前为止分配的指针的总数
+        """
+        return self._allocations
+
     def can_deref(self, ptr):  # type: (int) -> bool
         """
         can_deref 检查 ptr 指向的对象是否可以被玩家解引用。
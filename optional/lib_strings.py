@@ -223,6 +223,8 @@ class Strings:
     def build_func(
         self,
         origin,  # type: dict[str, Callable[..., int | bool | float | str]]
+        returns=None,  # type: dict[str, tuple[type, ...]] | None
+        pure=None,  # type: list[str] | None
     ):  # type: (...) -> None
         """
         build_func 构建 strings 模块的内置函数，
@@ -231,6 +233,18 @@ class Strings:
         Args:
             origin (dict[str, Callable[..., int | bool | float | str]]):
                 用于存放所有内置函数的字典
+            returns (dict[str, tuple[type, ...]] | None, optional):
+                如果给出，则向其中写入那些返回值类型确定的内置函数的返回值类型，
+                以便通过 BuiltInFunction 声明它们。
+                返回 str 的函数在 Python 2 中可能返回 unicode，因此不会被写入。
+                默认值为 None
+            pure (list[str] | None, optional):
+                如果给出，则向其中写入那些参数均不为指针，
+                且不分配指针的内置函数的名称，
+                以便通过 BuiltInFunction 将它们标记为纯函数。
+                纯函数只保证结果可被缓存，它们仍可能因参数错误而抛出错误，
+                因此这些名称不应作为 CodeCompiler 的 total_funcs 使用。
+                默认值为 None
         """
         funcs = {}  # type: dict[str, Callable[..., int | bool | float | str]]
 
@@ -315,3 +329,21 @@ class Strings:
 
         for key, value in funcs.items():
             origin[key] = value
+
+        if returns is not None:
+            for name in ("length", "ord", "find", "rfind", "index", "rindex", "split", "rsplit"):
+                returns["strings." + name] = (int,)
+            for name in (
+                "startswith", "endswith", "equalfold", "isalnum", "isalpha",
+                "isdigit", "islower", "isspace", "istitle", "isupper",
+            ):
+                returns["strings." + name] = (bool,)
+
+        # These may still raise (e.g. strings.upper(1)),
+        # so they are memoisable but not total
+        if pure is not None:
+            for key in funcs:
+                if key not in (
+                    "strings.cast", "strings.join", "strings.split", "strings.rsplit"
+                ):
+                    pure.append(key)
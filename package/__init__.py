@@ -2,6 +2,15 @@ from .parser.parse import CodeParser
 from .runner.compile import CodeCompiler
 from .runner.external import GameInteract, BuiltInFunction
 from .runner.runner import CodeRunner
+from .runner.closure import ClosureRunner
+from .runner.optimize import CodeOptimizer
+from .runner.verify import CodeVerifier
+from .runner.link import CodeLinker
+from .runner.cache import CachedRunner, PurityAnalyzer
+from .runner.fold import ConstantFolder
+from .runner.infer import TypeInferrer
+from .runner.regcompile import RegisterCompiler
+from .runner.regrunner import RegisterRunner
 
 """
 Form Python Ast & Package
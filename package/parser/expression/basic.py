@@ -3,7 +3,7 @@ from __future__ import division
 
 TYPE_CHECKING = False
 if TYPE_CHECKING:
-    from typing import Any
+    from typing import Any, Iterator
     from .combine import ExpressionCombine
 
 from .define import (
@@ -21,6 +21,7 @@ from .define import (
     ELEMENT_ID_COMMAND,
     ELEMENT_ID_FUNC,
 )
+from ..steps import run_steps
 from ..token.sentence import SentenceReader
 from ..token.token import (
     TOKEN_ID_WORD,
@@ -129,19 +130,43 @@ class ExpressionLiteral(ExpressionElement):
         Returns:
             ExpressionLiteral: 返回 ExpressionLiteral 本身
         """
+        run_steps(self.parse_steps(reader, layer))
+        return self
+
+    def parse_steps(
+        self, reader, layer=0
+    ):  # type: (SentenceReader, int) -> Iterator[Iterator[Any]]
+        """
+        parse_steps 是 parse 的生成器形式。
+        它产出解析被括号所包围的复杂表达式的子步骤，
+        因此应通过 run_steps 或其他生成器执行
+
+        Args:
+            reader (SentenceReader): 底层 Token 流
+            layer (int, optional):
+                当前解析的层数。
+                应只在处理括号时自增。
+                默认值为 0
+
+        Raises:
+            Exception: 当解析出现错误时抛出
+
+        Returns:
+            Iterator[Iterator[Any]]: 解析被括号所包围的复杂表达式的生成器
+        """
         from .combine import ExpressionCombine
 
         token = reader.must_read()
         if token.token_id != TOKEN_ID_LEFT_BRACKET:
             raise Exception('parse: Syntax error; expected="(", token={}'.format(token))
 
-        val = ExpressionCombine().parse(reader, layer + 1, CONTEXT_PARSE_SUB_EXPR)
+        val = ExpressionCombine()
+        yield val.parse_steps(reader, layer + 1, CONTEXT_PARSE_SUB_EXPR)
         sub = reader.unread().must_read()
         if sub.token_id != TOKEN_ID_RIGHT_BRACKET:
             raise Exception('parse: Syntax error; expected=")", token={}'.format(token))
 
         self.element_payload = val
-        return self
 
 
 class ExpressionReference(ExpressionElement):
@@ -199,6 +224,24 @@ class ExpressionReference(ExpressionElement):
         Returns:
             ExpressionReference: 返回 ExpressionReference 本身
         """
+        run_steps(self.parse_steps(reader))
+        return self
+
+    def parse_steps(self, reader):  # type: (SentenceReader) -> Iterator[Iterator[Any]]
+        """
+        parse_steps 是 parse 的生成器形式。
+        它产出解析被引用对象的复杂表达式的子步骤，
+        因此应通过 run_steps 或其他生成器执行
+
+        Args:
+            reader (SentenceReader): 底层 Token 流
+
+        Raises:
+            Exception: 当解析出现错误时抛出
+
+        Returns:
+            Iterator[Iterator[Any]]: 解析该引用表达式元素的负载的生成器
+        """
         from .combine import ExpressionCombine
 
         token = reader.must_read()
@@ -224,13 +267,11 @@ class ExpressionReference(ExpressionElement):
         token = reader.must_read()
         if token.token_id != TOKEN_ID_COMMA:
             raise Exception('parse: Syntax error; expected=",", token={}'.format(token))
-        self.element_payload.append(
-            ExpressionCombine().parse(reader, 1, CONTEXT_PARSE_BARRIER)
-        )
+        index = ExpressionCombine()
+        yield index.parse_steps(reader, 1, CONTEXT_PARSE_BARRIER)
+        self.element_payload.append(index)
         _ = reader.unread()
 
-        return self
-
 
 class ExpressionSelector(ExpressionElement):
     """
@@ -271,19 +312,34 @@ class ExpressionSelector(ExpressionElement):
         Returns:
             ExpressionSelector: 返回 ExpressionSelector 本身
         """
+        run_steps(self.parse_steps(reader))
+        return self
+
+    def parse_steps(self, reader):  # type: (SentenceReader) -> Iterator[Iterator[Any]]
+        """
+        parse_steps 是 parse 的生成器形式。
+        它产出解析目标选择器的复杂表达式的子步骤，
+        因此应通过 run_steps 或其他生成器执行
+
+        Args:
+            reader (SentenceReader): 底层 Token 流
+
+        Raises:
+            Exception: 当解析出现错误时抛出
+
+        Returns:
+            Iterator[Iterator[Any]]: 解析目标选择器的复杂表达式的生成器
+        """
         from .combine import ExpressionCombine
 
         token = reader.must_read()
         if token.token_id != TOKEN_ID_COMMA:
             raise Exception('parse: Syntax error; expected=",", token={}'.format(token))
 
-        self.element_payload = ExpressionCombine().parse(
-            reader, 1, CONTEXT_PARSE_BARRIER
-        )
+        self.element_payload = ExpressionCombine()
+        yield self.element_payload.parse_steps(reader, 1, CONTEXT_PARSE_BARRIER)
         _ = reader.unread()
 
-        return self
-
 
 class ExpressionScore(ExpressionElement):
     """
@@ -323,6 +379,24 @@ class ExpressionScore(ExpressionElement):
         Returns:
             ExpressionScore: 返回 ExpressionScore 本身
         """
+        run_steps(self.parse_steps(reader))
+        return self
+
+    def parse_steps(self, reader):  # type: (SentenceReader) -> Iterator[Iterator[Any]]
+        """
+        parse_steps 是 parse 的生成器形式。
+        它产出解析两个复杂表达式的子步骤，
+        因此应通过 run_steps 或其他生成器执行
+
+        Args:
+            reader (SentenceReader): 底层 Token 流
+
+        Raises:
+            Exception: 当解析出现错误时抛出
+
+        Returns:
+            Iterator[Iterator[Any]]: 解析该记分板分数表达式元素的负载的生成器
+        """
         from .combine import ExpressionCombine
 
         self.element_payload = []
@@ -334,11 +408,10 @@ class ExpressionScore(ExpressionElement):
                         index, token
                     )
                 )
-            self.element_payload.append(
-                ExpressionCombine().parse(reader, 1, CONTEXT_PARSE_BARRIER)
-            )
+            expression = ExpressionCombine()
+            yield expression.parse_steps(reader, 1, CONTEXT_PARSE_BARRIER)
+            self.element_payload.append(expression)
             _ = reader.unread()
-        return self
 
 
 class ExpressionCommand(ExpressionElement):
@@ -378,19 +451,34 @@ class ExpressionCommand(ExpressionElement):
         Returns:
             ExpressionCommand: 返回 ExpressionCommand 本身
         """
+        run_steps(self.parse_steps(reader))
+        return self
+
+    def parse_steps(self, reader):  # type: (SentenceReader) -> Iterator[Iterator[Any]]
+        """
+        parse_steps 是 parse 的生成器形式。
+        它产出解析命令的复杂表达式的子步骤，
+        因此应通过 run_steps 或其他生成器执行
+
+        Args:
+            reader (SentenceReader): 底层 Token 流
+
+        Raises:
+            Exception: 当解析出现错误时抛出
+
+        Returns:
+            Iterator[Iterator[Any]]: 解析命令的复杂表达式的生成器
+        """
         from .combine import ExpressionCombine
 
         token = reader.must_read()
         if token.token_id != TOKEN_ID_COMMA:
             raise Exception('parse: Syntax error; expected=",", token={}'.format(token))
 
-        self.element_payload = ExpressionCombine().parse(
-            reader, 1, CONTEXT_PARSE_BARRIER
-        )
+        self.element_payload = ExpressionCombine()
+        yield self.element_payload.parse_steps(reader, 1, CONTEXT_PARSE_BARRIER)
         _ = reader.unread()
 
-        return self
-
 
 class ExpressionFunction(ExpressionElement):
     """
@@ -430,6 +518,24 @@ class ExpressionFunction(ExpressionElement):
         Returns:
             ExpressionFunction: 返回 ExpressionFunction 本身
         """
+        run_steps(self.parse_steps(reader))
+        return self
+
+    def parse_steps(self, reader):  # type: (SentenceReader) -> Iterator[Iterator[Any]]
+        """
+        parse_steps 是 parse 的生成器形式。
+        它产出解析函数名和参数列表的子步骤，
+        因此应通过 run_steps 或其他生成器执行
+
+        Args:
+            reader (SentenceReader): 底层 Token 流
+
+        Raises:
+            Exception: 当解析出现错误时抛出
+
+        Returns:
+            Iterator[Iterator[Any]]: 解析函数名和参数列表的生成器
+        """
         from .combine import ExpressionCombine
 
         self.element_payload = []  # type: list[Any]
@@ -463,11 +569,10 @@ class ExpressionFunction(ExpressionElement):
         if token.token_id != TOKEN_ID_RIGHT_BRACKET:
             _ = reader.unread()
             while True:
-                arguments.append(
-                    ExpressionCombine().parse(reader, 1, CONTEXT_PARSE_ARGUMENT)
-                )
+                argument = ExpressionCombine()
+                yield argument.parse_steps(reader, 1, CONTEXT_PARSE_ARGUMENT)
+                arguments.append(argument)
                 if reader.unread().must_read().token_id == TOKEN_ID_RIGHT_BRACKET:
                     break
 
         self.element_payload.append(arguments)
-        return self
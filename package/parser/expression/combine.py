@@ -3,7 +3,7 @@ from __future__ import division
 
 TYPE_CHECKING = False
 if TYPE_CHECKING:
-    from typing import Any
+    from typing import Any, Iterator
 
 import json
 from .define import (
@@ -69,6 +69,7 @@ from .compute import (
     ExpressionDivide,
 )
 from ..reader.any_reader import AnyReader
+from ..steps import run_steps
 from ..token.sentence import SentenceReader
 from ..token.token import (
     Token,
@@ -118,6 +119,33 @@ from ..token.token import (
 ORD_ZERO = ord("0")
 ORD_NINE = ord("9")
 
+# Operators ordered from the lowest precedence to the highest.
+# Every operator has a level of its own, and consecutive uses
+# of the same operator are flattened into a single element
+OPERATOR_LEVELS = [
+    (ELEMENT_ID_OR, ExpressionOr),
+    (ELEMENT_ID_AND, ExpressionAnd),
+    (ELEMENT_ID_INVERSE, ExpressionInverse),
+    (ELEMENT_ID_IN, ExpressionIn),
+    (ELEMENT_ID_NOT_EQUAL, ExpressionNotEqual),
+    (ELEMENT_ID_EQUAL, ExpressionEqual),
+    (ELEMENT_ID_LESS_EQUAL, ExpressionLessEqual),
+    (ELEMENT_ID_GREATER_EQUAL, ExpressionGreaterEqual),
+    (ELEMENT_ID_LESS_THAN, ExpressionLessThan),
+    (ELEMENT_ID_GREATER_THAN, ExpressionGreaterThan),
+    (ELEMENT_ID_ADD, ExpressionAdd),
+    (ELEMENT_ID_REMOVE, ExpressionRemove),
+    (ELEMENT_ID_TIMES, ExpressionTimes),
+    (ELEMENT_ID_DIVIDE, ExpressionDivide),
+]  # type: list[tuple[int, type[ExpressionOperator]]]
+
+OPERATOR_ID_TO_LEVEL = {}  # type: dict[int, int]
+for level, (element_id, _) in enumerate(OPERATOR_LEVELS):
+    OPERATOR_ID_TO_LEVEL[element_id] = level
+LEVEL_INVERSE = OPERATOR_ID_TO_LEVEL[ELEMENT_ID_INVERSE]
+LEVEL_ADD = OPERATOR_ID_TO_LEVEL[ELEMENT_ID_ADD]
+LEVEL_REMOVE = OPERATOR_ID_TO_LEVEL[ELEMENT_ID_REMOVE]
+
 
 class ExpressionCombine(ExpressionElement):
     """
@@ -296,11 +324,17 @@ class ExpressionCombine(ExpressionElement):
             "try_parse_compare: Syntax error; token={}, sub={}".format(token, sub)
         )
 
-    def try_parse_barrier(self, reader, token):  # type: (SentenceReader, Token) -> None
+    def try_parse_barrier(
+        self, reader, token
+    ):  # type: (SentenceReader, Token) -> Iterator[Iterator[Any]]
         """
         try_parse_barrier 试图根据 reader
         和 token 来解析一个 `{...}` 表达式。
 
+        try_parse_barrier 是一个生成器，
+        它产出解析 `{...}` 表达式的负载的子步骤，
+        并应通过 run_steps 或其他生成器执行。
+
         下面列出了被允许的 `{...}` 表达式。
         ```
             {ref, ... (type), ... (expression)}
@@ -326,21 +360,23 @@ class ExpressionCombine(ExpressionElement):
 
         sub = reader.must_read()
         if sub.token_id == TOKEN_ID_KEY_WORD_REF:
-            self.element_payload.append(ExpressionReference().parse(reader))
+            element = ExpressionReference()  # type: ExpressionElement
         elif sub.token_id == TOKEN_ID_KEY_WORD_SELECTOR:
-            self.element_payload.append(ExpressionSelector().parse(reader))
+            element = ExpressionSelector()
         elif sub.token_id == TOKEN_ID_KEY_WORD_SCORE:
-            self.element_payload.append(ExpressionScore().parse(reader))
+            element = ExpressionScore()
         elif sub.token_id == TOKEN_ID_KEY_WORD_COMMAND:
-            self.element_payload.append(ExpressionCommand().parse(reader))
+            element = ExpressionCommand()
         elif sub.token_id == TOKEN_ID_KEY_WORD_FUNC:
-            self.element_payload.append(ExpressionFunction().parse(reader))
+            element = ExpressionFunction()
         else:
             raise Exception(
                 "try_parse_barrier: Syntax error: Barrier only accept ref/selector/score/command/func; sub={}".format(
                     sub
                 )
             )
+        yield element.parse_steps(reader)  # type: ignore
+        self.element_payload.append(element)
 
         end = reader.must_read()
         if end.token_id != TOKEN_ID_RIGHT_BARRIER:
@@ -376,7 +412,7 @@ class ExpressionCombine(ExpressionElement):
 
     def parse_to_elements(
         self, reader, layer=0, context=CONTEXT_PARSE_ASSIGN
-    ):  # type: (SentenceReader, int, int) -> None
+    ):  # type: (SentenceReader, int, int) -> Iterator[Iterator[Any]]
         """
         parse_to_elements 从 reader 指示的底层流中不断地读取字符，
         直到底层流被耗尽，或读取到相应的终止符。
@@ -387,6 +423,12 @@ class ExpressionCombine(ExpressionElement):
         这意味着 parse_to_elements 的实际作用是将相应的 Token 流
         转换为 ExpressionElement 列表。
 
+        parse_to_elements 是一个生成器。
+        对于括号、强制类型转换和 `{...}` 表达式中的子表达式，
+        它不会递归地解析，而是产出解析它们的子步骤。
+        因此，它应通过 run_steps 或其他生成器执行，
+        且嵌套的深度不受 Python 递归深度的限制。
+
         下面列出了所有的终止符。应注意的是，终止符仅终止表达式的读取，
         这意味着 reader 所指示的底层流仍可以被继续使用。
         ```
@@ -415,61 +457,62 @@ class ExpressionCombine(ExpressionElement):
                 则抛出相应的错误
         """
         while True:
-            token = reader.must_read()
-            if token.token_id == TOKEN_ID_WORD:
+            token_id = reader.must_read_id()
+            if token_id == TOKEN_ID_WORD:
+                token = reader.token()
                 if self.try_parse_float(token):
                     continue
                 if self.try_parse_int(token):
                     continue
                 if self.try_parse_var(token):
                     continue
-            if token.token_id == TOKEN_ID_ASSIGN:
-                self.try_parse_equal(token, reader.must_read())
+            if token_id == TOKEN_ID_ASSIGN:
+                self.try_parse_equal(reader.token(), reader.must_read())
                 continue
-            if token.token_id == TOKEN_ID_LEFT_ANGLE_BRACKET:
-                self.try_parse_compare(reader, token, reader.must_read())
+            if token_id == TOKEN_ID_LEFT_ANGLE_BRACKET:
+                self.try_parse_compare(reader, reader.token(), reader.must_read())
                 continue
-            if token.token_id == TOKEN_ID_RIGHT_ANGLE_BRACKET:
-                self.try_parse_compare(reader, token, reader.must_read())
+            if token_id == TOKEN_ID_RIGHT_ANGLE_BRACKET:
+                self.try_parse_compare(reader, reader.token(), reader.must_read())
                 continue
-            if token.token_id == TOKEN_ID_LEFT_BARRIER:
-                self.try_parse_barrier(reader, token)
+            if token_id == TOKEN_ID_LEFT_BARRIER:
+                yield self.try_parse_barrier(reader, reader.token())
                 continue
-            if token.token_id == TOKEN_ID_RIGHT_BARRIER:
+            if token_id == TOKEN_ID_RIGHT_BARRIER:
                 if context & CONTEXT_PARSE_BARRIER == 0:
                     raise Exception(
                         'parse_to_elements: Syntax error: "}" can only been used under barrier expression'
                     )
                 break
-            if token.token_id == TOKEN_ID_COLON:
+            if token_id == TOKEN_ID_COLON:
                 if context & CONTEXT_PARSE_IF == 0 and context & CONTEXT_PARSE_FOR == 0:
                     raise Exception(
                         'parse_to_elements: Syntax error: ":" can only been used under if condition or for loop'
                     )
                 break
-            if token.token_id == TOKEN_ID_PLUS:
+            if token_id == TOKEN_ID_PLUS:
                 self.element_payload.append(ExpressionNormal(ELEMENT_ID_ADD))
                 continue
-            if token.token_id == TOKEN_ID_MINUS:
+            if token_id == TOKEN_ID_MINUS:
                 self.element_payload.append(ExpressionNormal(ELEMENT_ID_REMOVE))
                 continue
-            if token.token_id == TOKEN_ID_ASTERISK:
+            if token_id == TOKEN_ID_ASTERISK:
                 self.element_payload.append(ExpressionNormal(ELEMENT_ID_TIMES))
                 continue
-            if token.token_id == TOKEN_ID_SLASH:
+            if token_id == TOKEN_ID_SLASH:
                 self.element_payload.append(ExpressionNormal(ELEMENT_ID_DIVIDE))
                 continue
-            if token.token_id == TOKEN_ID_SINGLE_QUOTE:
+            if token_id == TOKEN_ID_SINGLE_QUOTE:
                 self.element_payload.append(
-                    ExpressionLiteral(ELEMENT_ID_STR, token.token_payload)
+                    ExpressionLiteral(ELEMENT_ID_STR, reader.payload())
                 )
                 continue
-            if token.token_id == TOKEN_ID_LEFT_BRACKET:
-                self.element_payload.append(
-                    ExpressionCombine().parse(reader, layer + 1, CONTEXT_PARSE_SUB_EXPR)
-                )
+            if token_id == TOKEN_ID_LEFT_BRACKET:
+                sub_expr = ExpressionCombine()
+                yield sub_expr.parse_steps(reader, layer + 1, CONTEXT_PARSE_SUB_EXPR)
+                self.element_payload.append(sub_expr)
                 continue
-            if token.token_id == TOKEN_ID_RIGHT_BRACKET:
+            if token_id == TOKEN_ID_RIGHT_BRACKET:
                 if (
                     context & CONTEXT_PARSE_SUB_EXPR == 0
                     and context & CONTEXT_PARSE_ARGUMENT == 0
@@ -482,7 +525,7 @@ class ExpressionCombine(ExpressionElement):
                         "parse_to_elements: Syntax error: Bracket closed incorrectly"
                     )
                 break
-            if token.token_id == TOKEN_ID_COMMA:
+            if token_id == TOKEN_ID_COMMA:
                 if (
                     context & CONTEXT_PARSE_ARGUMENT == 0
                     and context & CONTEXT_PARSE_BARRIER == 0
@@ -491,107 +534,107 @@ class ExpressionCombine(ExpressionElement):
                         'parse_to_elements: Syntax error: "," only accepted under function argument or barrier expression'
                     )
                 break
-            if token.token_id == TOKEN_ID_EXCLAMATION:
-                self.try_parse_not_equal(token, reader.must_read())
+            if token_id == TOKEN_ID_EXCLAMATION:
+                self.try_parse_not_equal(reader.token(), reader.must_read())
                 continue
-            if token.token_id == TOKEN_ID_SEPSEPARATE:
+            if token_id == TOKEN_ID_SEPSEPARATE:
                 if context & CONTEXT_PARSE_ASSIGN == 0:
                     raise Exception(
                         "parse_to_elements: Syntax error: Incomplete expression in the end of a line"
                     )
                 break
-            if token.token_id == TOKEN_ID_KEY_WORD_INT:
-                self.element_payload.append(
-                    ExpressionLiteral(ELEMENT_ID_INT, 0).parse(reader, layer + 1)
-                )
+            if token_id == TOKEN_ID_KEY_WORD_INT:
+                literal = ExpressionLiteral(ELEMENT_ID_INT, 0)
+                yield literal.parse_steps(reader, layer + 1)
+                self.element_payload.append(literal)
                 continue
-            if token.token_id == TOKEN_ID_KEY_WORD_BOOL:
-                self.element_payload.append(
-                    ExpressionLiteral(ELEMENT_ID_BOOL, False).parse(reader, layer + 1)
-                )
+            if token_id == TOKEN_ID_KEY_WORD_BOOL:
+                literal = ExpressionLiteral(ELEMENT_ID_BOOL, False)
+                yield literal.parse_steps(reader, layer + 1)
+                self.element_payload.append(literal)
                 continue
-            if token.token_id == TOKEN_ID_KEY_WORD_STR:
-                self.element_payload.append(
-                    ExpressionLiteral(ELEMENT_ID_STR, "").parse(reader, layer + 1)
-                )
+            if token_id == TOKEN_ID_KEY_WORD_STR:
+                literal = ExpressionLiteral(ELEMENT_ID_STR, "")
+                yield literal.parse_steps(reader, layer + 1)
+                self.element_payload.append(literal)
                 continue
-            if token.token_id == TOKEN_ID_KEY_WORD_FLOAT:
-                self.element_payload.append(
-                    ExpressionLiteral(ELEMENT_ID_FLOAT, 0.0).parse(reader, layer + 1)
-                )
+            if token_id == TOKEN_ID_KEY_WORD_FLOAT:
+                literal = ExpressionLiteral(ELEMENT_ID_FLOAT, 0.0)
+                yield literal.parse_steps(reader, layer + 1)
+                self.element_payload.append(literal)
                 continue
-            if token.token_id == TOKEN_ID_KEY_WORD_REF:
+            if token_id == TOKEN_ID_KEY_WORD_REF:
                 raise Exception(
                     'parse_to_elements: Syntax error: "ref" should inside in a barrier'
                 )
-            if token.token_id == TOKEN_ID_KEY_WORD_SELECTOR:
+            if token_id == TOKEN_ID_KEY_WORD_SELECTOR:
                 raise Exception(
                     'parse_to_elements: Syntax error: "selector" should inside in a barrier'
                 )
-            if token.token_id == TOKEN_ID_KEY_WORD_SCORE:
+            if token_id == TOKEN_ID_KEY_WORD_SCORE:
                 raise Exception(
                     'parse_to_elements: Syntax error: "score" should inside in a barrier'
                 )
-            if token.token_id == TOKEN_ID_KEY_WORD_COMMAND:
+            if token_id == TOKEN_ID_KEY_WORD_COMMAND:
                 raise Exception(
                     'parse_to_elements: Syntax error: "command" should inside in a barrier'
                 )
-            if token.token_id == TOKEN_ID_KEY_WORD_FUNC:
+            if token_id == TOKEN_ID_KEY_WORD_FUNC:
                 raise Exception(
                     'parse_to_elements: Syntax error: "func" should inside in a barrier'
                 )
-            if token.token_id == TOKEN_ID_KEY_WORD_RETURN:
+            if token_id == TOKEN_ID_KEY_WORD_RETURN:
                 raise Exception(
                     'parse_to_elements: Syntax error: "return" cannot be used in expression'
                 )
-            if token.token_id == TOKEN_ID_KEY_WORD_IF:
+            if token_id == TOKEN_ID_KEY_WORD_IF:
                 raise Exception(
                     'parse_to_elements: Syntax error: "if" cannot be used in expression'
                 )
-            if token.token_id == TOKEN_ID_KEY_WORD_ELSE:
+            if token_id == TOKEN_ID_KEY_WORD_ELSE:
                 raise Exception(
                     'parse_to_elements: Syntax error: "else" cannot be used in expression'
                 )
-            if token.token_id == TOKEN_ID_KEY_WORD_ELIF:
+            if token_id == TOKEN_ID_KEY_WORD_ELIF:
                 raise Exception(
                     'parse_to_elements: Syntax error: "elif" cannot be used in expression'
                 )
-            if token.token_id == TOKEN_ID_KEY_WORD_FI:
+            if token_id == TOKEN_ID_KEY_WORD_FI:
                 raise Exception(
                     'parse_to_elements: Syntax error: "fi" cannot be used in expression'
                 )
-            if token.token_id == TOKEN_ID_KEY_WORD_FOR:
+            if token_id == TOKEN_ID_KEY_WORD_FOR:
                 raise Exception(
                     'parse_to_elements: Syntax error: "for" cannot be used in expression'
                 )
-            if token.token_id == TOKEN_ID_KEY_WORD_CONTINUE:
+            if token_id == TOKEN_ID_KEY_WORD_CONTINUE:
                 raise Exception(
                     'parse_to_elements: Syntax error: "continue" cannot be used in expression'
                 )
-            if token.token_id == TOKEN_ID_KEY_WORD_BREAK:
+            if token_id == TOKEN_ID_KEY_WORD_BREAK:
                 raise Exception(
                     'parse_to_elements: Syntax error: "break" cannot be used in expression'
                 )
-            if token.token_id == TOKEN_ID_KEY_WORD_ROF:
+            if token_id == TOKEN_ID_KEY_WORD_ROF:
                 raise Exception(
                     'parse_to_elements: Syntax error: "rof" cannot be used in expression'
                 )
-            if token.token_id == TOKEN_ID_KEY_WORD_AND:
+            if token_id == TOKEN_ID_KEY_WORD_AND:
                 self.element_payload.append(ExpressionNormal(ELEMENT_ID_AND))
                 continue
-            if token.token_id == TOKEN_ID_KEY_WORD_OR:
+            if token_id == TOKEN_ID_KEY_WORD_OR:
                 self.element_payload.append(ExpressionNormal(ELEMENT_ID_OR))
                 continue
-            if token.token_id == TOKEN_ID_KEY_WORD_NOT:
+            if token_id == TOKEN_ID_KEY_WORD_NOT:
                 self.element_payload.append(ExpressionNormal(ELEMENT_ID_INVERSE))
                 continue
-            if token.token_id == TOKEN_ID_KEY_WORD_IN:
+            if token_id == TOKEN_ID_KEY_WORD_IN:
                 self.element_payload.append(ExpressionNormal(ELEMENT_ID_IN))
                 continue
-            if token.token_id == TOKEN_ID_KEY_WORD_TRUE:
+            if token_id == TOKEN_ID_KEY_WORD_TRUE:
                 self.element_payload.append(ExpressionLiteral(ELEMENT_ID_BOOL, True))
                 continue
-            if token.token_id == TOKEN_ID_KEY_WORD_FALSE:
+            if token_id == TOKEN_ID_KEY_WORD_FALSE:
                 self.element_payload.append(ExpressionLiteral(ELEMENT_ID_BOOL, False))
                 continue
 
@@ -624,122 +667,119 @@ class ExpressionCombine(ExpressionElement):
             return True
         return False
 
-    def compact_operator(
-        self, element_id, element_cls
-    ):  # type: (int, type[ExpressionOperator]) -> None
+    def climb(self, reader, min_level):  # type: (AnyReader, int) -> ExpressionElement
         """
-        compact_operator 紧缩 ID 为 element_id 的表达式元素。
-        应确保 element_id 所指示的表达式元素是一个运算符。
-
-        记 element_id 指示的运算符为 T。那么具体来说，
-        compact_operator 将连续的 T 及其中涉及的变量
-        紧缩到 element_cls 所指示的单个表达式元素中。
+        climb 以优先级爬升的方式，从 reader 读取一个由表达式元素构成的子表达式。
+        子表达式中只包含优先级不低于 min_level 的运算符。
 
-        下面给出了一些紧缩示例。
+        连续使用的同一运算符会被紧缩到单个表达式元素中。
+        下面给出了一些示例。
         ```
-            6*8/2/4*2*3: [6, *, 8, /, 2, /, 4, *, 2, *, 3] => [6, *, Divide(8, 2, 4), *, 2, *, 3]
-            4+10-7-3+2+1: [4, +, 10, -, 7, -, 3, +, 2, +, 1] => [4, +, Remove(10, 7, 3), +, 2, +, 1]
+            6*8/2/4*2*3: [6, *, 8, /, 2, /, 4, *, 2, *, 3] => Times(6, Divide(8, 2, 4), 2, 3)
+            4+10-7-3+2+1: [4, +, 10, -, 7, -, 3, +, 2, +, 1] => Add(4, Remove(10, 7, 3), 2, 1)
+            not a and not b: [not, a, and, not, b] => And(Inverse(a), Inverse(b))
         ```
 
-        大多数运算符都可以通过该方式完成紧缩。
-        例如上面给出的两个例子的完成形式如下。
-        ```
-            6*8/2/4*2*3: [Times(6, Divide(8, 2, 4), 2, 3)]
-            4+10-7-3+2+1: [Add(4, Remove(10, 7, 3), 2, 1)]
-        ```
+        如果加号或减号的左侧没有变量，则认为其左侧是整数 0。
+        例如，-a*b 将被解析为 Remove(0, Times(a, b))
 
         Args:
-            element_id (int):
-                欲被紧缩的运算符所对应的表达式元素 ID
-            element_cls (type[ExpressionOperator]):
-                在紧缩时所使用的，对应 element_id 的表达式元素类
+            reader (AnyReader):
+                由表达式元素构成的阅读器
+            min_level (int):
+                子表达式中允许出现的最低的运算符优先级，
+                也即运算符在 OPERATOR_LEVELS 中的下标
 
         Raises:
-            Exception: 当紧缩发生错误时抛出
-        """
-        reader = AnyReader(self.element_payload)  # type: AnyReader
-        self.element_payload = []  # type: list[ExpressionElement]
+            Exception: 当解析发生错误时抛出
 
-        while True:
-            sub_elements = []  # type: list[ExpressionElement]
+        Returns:
+            ExpressionElement: 解析所得的表达式元素
+        """
+        contents = reader.contents()  # type: list[ExpressionElement]
+
+        # Prefix operators, that is "not" and unary "+" or "-"
+        element_id = -1
+        if reader.pointer() < len(contents):
+            element_id = contents[reader.pointer()].element_id
+        if element_id == ELEMENT_ID_INVERSE and min_level <= LEVEL_INVERSE:
+            _ = reader.read()
+            left = ExpressionInverse([self.climb(reader, LEVEL_INVERSE + 1)])
+        elif (element_id == ELEMENT_ID_REMOVE and min_level <= LEVEL_REMOVE) or (
+            element_id == ELEMENT_ID_ADD and min_level <= LEVEL_ADD
+        ):
+            left = ExpressionLiteral(ELEMENT_ID_INT, 0)
+        else:
+            left = reader.must_read()
+            if not self.is_variable(left):
+                raise Exception("compact_operator: Syntax error; unexpected={}".format(left))
 
-            element = reader.read()  # type: ExpressionElement | None
-            if element is None:
+        while reader.pointer() < len(contents):
+            element_id = contents[reader.pointer()].element_id
+            if element_id == ELEMENT_ID_INVERSE:
                 break
-            if element.element_id != element_id:
-                self.element_payload.append(element)
-                continue
-            self.element_payload = self.element_payload[:-1]
-
-            if element_id == ELEMENT_ID_ADD or element_id == ELEMENT_ID_REMOVE:
-                if reader.pointer() > 1:
-                    operator = (
-                        reader.unread().unread().must_read()
-                    )  # type: ExpressionElement
-                    if not self.is_variable(operator):
-                        reader.contents().insert(
-                            reader.pointer(), ExpressionLiteral(ELEMENT_ID_INT, 0)
-                        )
-                        _ = reader.must_read()
-                        _ = reader.must_read()
-                        self.element_payload.append(operator)
-                    else:
-                        _ = reader.must_read()
-                else:
-                    reader.contents().insert(0, ExpressionLiteral(ELEMENT_ID_INT, 0))
-                    _ = reader.must_read()
-
-            while True:
-                _ = reader.unread().unread()  # type: Any
-                var_a = reader.must_read()  # type: ExpressionElement
-                _ = reader.must_read()  # type: Any
-                var_b = reader.must_read()  # type: ExpressionElement
-
-                if not self.is_variable(var_a):
-                    raise Exception(
-                        "compact_operator: Syntax error; unexpected={}".format(var_a)
-                    )
-                if not self.is_variable(var_b):
-                    raise Exception(
-                        "compact_operator: Syntax error; unexpected={}".format(var_b)
-                    )
-                if len(sub_elements) == 0:
-                    sub_elements.append(var_a)
-                sub_elements.append(var_b)
-
-                next_op = reader.read()  # type: ExpressionElement | None
-                if next_op is None or next_op.element_id != element_id:
-                    if len(sub_elements) > 0:
-                        self.element_payload.append(element_cls(sub_elements))
-                    if next_op is not None:
-                        reader.unread()
-                    break
-
-    def compact_inverse(self):  # type: () -> None
+            level = OPERATOR_ID_TO_LEVEL.get(element_id, -1)
+            if level < min_level:
+                break
+
+            sub_elements = [left]
+            while (
+                reader.pointer() < len(contents)
+                and contents[reader.pointer()].element_id == element_id
+            ):
+                _ = reader.read()
+                sub_elements.append(self.climb(reader, level + 1))
+            left = OPERATOR_LEVELS[level][1](sub_elements)
+
+        return left
+
+    def compact(self):  # type: () -> None
         """
-        compact_inverse 紧缩取反运算符。
+        compact 将 element_payload 中的所有表达式元素
+        按照运算符的优先级紧缩为单个表达式元素
 
-        它将 element_payload 中所有的取反运算符，
-        以及其后紧跟的表达式元素紧缩到单个对象中。
+        Raises:
+            Exception: 当紧缩发生错误时抛出
+        """
+        if len(self.element_payload) > 0:
+            reader = AnyReader(self.element_payload)  # type: AnyReader
+            element = self.climb(reader, 0)
+            if reader.pointer() == len(self.element_payload):
+                self.element_payload = [element]
+                return
+
+        self.element_payload = []
+        raise Exception(
+            "parse: Syntax error: Invalid expression (failed to compact the expression)"
+        )
 
-        下面给出了一些示例。
-        ```
-            not a and not b: [not, a, and, not, b] => [Inverse(a), and, Inverse(b)]
-            not a * b: [not, a, *, b] => [Inverse(a), *, b]
-            a + not b: [a, +, not, b] => [a, +, Inverse(b)]
-        ```
+    def parse_steps(
+        self, reader, layer=0, context=CONTEXT_PARSE_ASSIGN
+    ):  # type: (SentenceReader, int, int) -> Iterator[Iterator[Any]]
         """
-        reader = AnyReader(self.element_payload)  # type: AnyReader
-        self.element_payload = []  # type: list[ExpressionElement]
+        parse_steps 是 parse 的生成器形式。
+        它产出 parse_to_elements 作为子步骤，
+        并在其执行完毕后紧缩所得的表达式元素
 
-        while True:
-            element = reader.read()  # type: ExpressionElement | None
-            if element is None:
-                break
-            if element.element_id == ELEMENT_ID_INVERSE:
-                self.element_payload.append(ExpressionInverse([reader.must_read()]))
-            else:
-                self.element_payload.append(element)
+        Args:
+            reader (SentenceReader):
+                底层 Token 流
+            layer (int, optional):
+                当前解析的层数。
+                应只在处理括号时自增。
+                默认值为 0
+            context (int, optional):
+                指示当前解析的上下文，是一个比特掩码。
+                默认值为 CONTEXT_PARSE_ASSIGN
+
+        Raises:
+            Exception: 当解析发生错误时抛出
+
+        Returns:
+            Iterator[Iterator[Any]]: 解析该复杂表达式的生成器
+        """
+        yield self.parse_to_elements(reader, layer, context)
+        self.compact()
 
     def parse(
         self, reader, layer=0, context=CONTEXT_PARSE_ASSIGN
@@ -767,28 +807,6 @@ class ExpressionCombine(ExpressionElement):
         Returns:
             ExpressionCombine: 对应的复杂表达式
         """
-        self.parse_to_elements(reader, layer, context)
-
-        self.compact_operator(ELEMENT_ID_DIVIDE, ExpressionDivide)
-        self.compact_operator(ELEMENT_ID_TIMES, ExpressionTimes)
-        self.compact_operator(ELEMENT_ID_REMOVE, ExpressionRemove)
-        self.compact_operator(ELEMENT_ID_ADD, ExpressionAdd)
-
-        self.compact_operator(ELEMENT_ID_GREATER_THAN, ExpressionGreaterThan)
-        self.compact_operator(ELEMENT_ID_LESS_THAN, ExpressionLessThan)
-        self.compact_operator(ELEMENT_ID_GREATER_EQUAL, ExpressionGreaterEqual)
-        self.compact_operator(ELEMENT_ID_LESS_EQUAL, ExpressionLessEqual)
-        self.compact_operator(ELEMENT_ID_EQUAL, ExpressionEqual)
-        self.compact_operator(ELEMENT_ID_NOT_EQUAL, ExpressionNotEqual)
-
-        self.compact_operator(ELEMENT_ID_IN, ExpressionIn)
-        self.compact_inverse()
-        self.compact_operator(ELEMENT_ID_AND, ExpressionAnd)
-        self.compact_operator(ELEMENT_ID_OR, ExpressionOr)
-
-        if len(self.element_payload) != 1:
-            self.element_payload = []
-            raise Exception(
-                "parse: Syntax error: Invalid expression (failed to compact the expression)"
-            )
+        run_steps(self.parse_to_elements(reader, layer, context))
+        self.compact()
         return self
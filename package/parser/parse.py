@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 from __future__ import division
 
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Iterator
+
 from .expression.combine import ExpressionCombine
 from .expression.define import (
     CONTEXT_PARSE_ASSIGN,
@@ -8,9 +12,11 @@ from .expression.define import (
     CONTEXT_PARSE_FOR,
 )
 from .reader.string_reader import StringReader
+from .steps import NO_STEPS, run_steps
 from .token.sentence import Sentence, SentenceReader
 from .token.token import (
     Token,
+    TOKEN_ID_EOF,
     TOKEN_ID_WORD,
     TOKEN_ID_ASSIGN,
     TOKEN_ID_COLON,
@@ -47,6 +53,16 @@ except Exception:
 ORD_ZERO, ORD_NINE = ord("0"), ord("9")
 DEFAULT_EMPTY_EXCEPTION = Exception()
 
+# Statements that can be recognised by their first token alone.
+# None of these keywords can start an expression
+STATEMENT_TOKEN_IDS = (
+    TOKEN_ID_KEY_WORD_IF,
+    TOKEN_ID_KEY_WORD_FOR,
+    TOKEN_ID_KEY_WORD_RETURN,
+    TOKEN_ID_KEY_WORD_CONTINUE,
+    TOKEN_ID_KEY_WORD_BREAK,
+)
+
 
 class CodeParser:
     """
@@ -169,7 +185,7 @@ class CodeParser:
             ptr2 += 1
 
         return self._format_problem_normal(
-            contents[ptr1].ori_start_ptr, contents[ptr2 - 1].ori_end_ptr
+            contents.start(ptr1), contents.end(ptr2 - 1)
         )
 
     def _fast_normal_panic(self, ptr1, ptr2, err):  # type: (int, int, str) -> None
@@ -241,8 +257,8 @@ class CodeParser:
         if ptr1 == ptr2:
             ptr2 += 1
 
-        ptr1 = contents[ptr1].ori_start_ptr
-        ptr2 = contents[ptr2 - 1].ori_end_ptr
+        ptr1 = contents.start(ptr1)
+        ptr2 = contents.end(ptr2 - 1)
         code = self.code[ptr1:ptr2]
 
         while code.endswith("|"):
@@ -269,8 +285,7 @@ class CodeParser:
                 如果 _validate_next_token 失败，
                 则抛出 err 所指示的错误
         """
-        token = self.reader.read()
-        if token is None or token.token_id != token_id:
+        if self.reader.read_id() != token_id:
             self._fast_sentence_panic(ptr, self.reader.pointer(), err)
             raise Exception("unreachable")
 
@@ -329,10 +344,10 @@ class CodeParser:
             Exception:
                 当检查失时应抛出的错误
         """
-        token = self.reader.read()
-        if token is None:
+        token_id = self.reader.read_id()
+        if token_id == TOKEN_ID_EOF:
             return
-        if token.token_id != TOKEN_ID_SEPSEPARATE:
+        if token_id != TOKEN_ID_SEPSEPARATE:
             self._fast_sentence_panic(
                 ptr,
                 self.reader.pointer(),
@@ -464,6 +479,41 @@ class CodeParser:
             self._get_line_code(ptr, self.reader.pointer()),
         )
 
+    def _parse_statement(self, ptr):  # type: (int) -> OpcodeBase | None
+        """
+        _parse_statement 从底层流阅读一个 Token，
+        并根据它解析赋值、条件、循环、返回、continue 或 break 语句
+
+        Args:
+            ptr (int):
+                当需要抛出错误时，
+                用于突出问题源代码的起始位置
+
+        Returns:
+            OpcodeBase | None:
+                解析所得的操作语句。
+                对于条件语句和循环语句，只有其头部被解析，
+                剩余部分应通过 _parse_block_steps 解析。
+                如果读到的 Token 不能作为这些语句的开头，
+                或底层流已被耗尽，则返回 None
+        """
+        token_id = self.reader.read_id()
+
+        if token_id == TOKEN_ID_WORD:
+            return self._parse_assign(ptr, self.reader.token())
+        if token_id == TOKEN_ID_KEY_WORD_IF:
+            return self._parse_condition(ptr)
+        if token_id == TOKEN_ID_KEY_WORD_FOR:
+            return self._parse_for_loop(ptr)
+        if token_id == TOKEN_ID_KEY_WORD_RETURN:
+            return self._parse_return(ptr)
+        if token_id == TOKEN_ID_KEY_WORD_CONTINUE:
+            return OpcodeContinue(self._get_line_code(ptr, self.reader.pointer()))
+        if token_id == TOKEN_ID_KEY_WORD_BREAK:
+            return OpcodeBreak(self._get_line_code(ptr, self.reader.pointer()))
+
+        return None
+
     def _parse_code(
         self, ptr
     ):  # type: (int) -> tuple[OpcodeBase | None, tuple[Token, int, int, Exception] | None]
@@ -474,6 +524,8 @@ class CodeParser:
         _parse_code 将返回一个元组。
         通常情况下，元组的第一个元素即为解析所得的操作语句。
         并且，在这一情况下，元组的第二个元素为 None。
+        如果该操作语句是条件语句或循环语句，
+        则调用者还应通过 _parse_block_steps 解析其剩余部分。
 
         如果底层流已经被耗尽，
         则返回的元组的第一个元素和第二个元素均为 None。
@@ -492,7 +544,12 @@ class CodeParser:
         ```
             self._fast_sentence_panic(S1, S2, S3)
         ```
-        其中，S1、S2 和 S3 是元组第二个元素的后三个元素
+        其中，S1、S2 和 S3 是元组第二个元素的后三个元素。
+        如果 T 是行分隔符，则 S3 没有意义，调用者应直接跳过该空行
+
+        语句的种类通过预读至多三个 Token 来确定。
+        只有不能被预测的代码行才会先被尝试解析为表达式，
+        并在失败后重新按语句解析
 
         Args:
             ptr (int):
@@ -503,46 +560,51 @@ class CodeParser:
             tuple[OpcodeBase | None, tuple[Token, int, int, Exception] | None]:
                 相应的元组
         """
-        expr_start_ptr = self.reader.pointer()
+        reader = self.reader
+        expr_start_ptr = reader.pointer()
+        token_id = reader.peek_id()
+
+        if token_id == TOKEN_ID_EOF:
+            return None, None
+        if token_id == TOKEN_ID_SEPSEPARATE:
+            _ = reader.read_id()
+            return None, (
+                reader.token(),
+                expr_start_ptr,
+                reader.pointer(),
+                DEFAULT_EMPTY_EXCEPTION,
+            )
+        # A word followed by a single "=" can only be an assignment,
+        # while "==" still starts an equality expression
+        if token_id in STATEMENT_TOKEN_IDS or (
+            token_id == TOKEN_ID_WORD
+            and reader.peek_id(1) == TOKEN_ID_ASSIGN
+            and reader.peek_id(2) != TOKEN_ID_ASSIGN
+        ):
+            return self._parse_statement(expr_start_ptr), None
+
         expr_end_ptr = expr_start_ptr
         expr_parse_err = DEFAULT_EMPTY_EXCEPTION
         try:
             return (
                 OpcodeExpression(
                     self._parse_expression(CONTEXT_PARSE_ASSIGN, False, True),
-                    self._get_line_code(expr_start_ptr, self.reader.pointer()),
+                    self._get_line_code(expr_start_ptr, reader.pointer()),
                 ),
                 None,
             )
         except Exception as e:
-            expr_end_ptr, expr_parse_err = self.reader.pointer(), e
-            self.reader.set_pointer(expr_start_ptr)
+            expr_end_ptr, expr_parse_err = reader.pointer(), e
+            reader.set_pointer(expr_start_ptr)
 
-        ptr = self.reader.pointer()
-        token = self.reader.read()
-        if token is None:
-            return None, None
-
-        if token.token_id == TOKEN_ID_WORD:
-            return self._parse_assign(ptr, token), None
-        if token.token_id == TOKEN_ID_KEY_WORD_IF:
-            return self._parse_condition(ptr), None
-        if token.token_id == TOKEN_ID_KEY_WORD_FOR:
-            return self._parse_for_loop(ptr), None
-        if token.token_id == TOKEN_ID_KEY_WORD_RETURN:
-            return self._parse_return(ptr), None
-        if token.token_id == TOKEN_ID_KEY_WORD_CONTINUE:
-            code = self._get_line_code(ptr, self.reader.pointer())
-            return OpcodeContinue(code), None
-        if token.token_id == TOKEN_ID_KEY_WORD_BREAK:
-            code = self._get_line_code(ptr, self.reader.pointer())
-            return OpcodeBreak(code), None
-
-        return None, (token, expr_start_ptr, expr_end_ptr, expr_parse_err)
+        opcode = self._parse_statement(expr_start_ptr)
+        if opcode is not None:
+            return opcode, None
+        return None, (reader.token(), expr_start_ptr, expr_end_ptr, expr_parse_err)
 
     def _parse_condition(self, ptr):  # type: (int) -> OpcodeCondition
         """
-        _parse_condition 从底层流解析一个条件代码块。
+        _parse_condition 从底层流解析一个条件代码块的第一个条件。
 
         下面是一个条件代码块的示例。
         ```
@@ -555,6 +617,10 @@ class CodeParser:
             fi
         ```
 
+        条件代码块中的语句以及后续的 elif、else 和 fi
+        并不由 _parse_condition 解析，
+        而是由 _parse_condition_steps 解析
+
         Args:
             ptr (int):
                 当需要抛出错误时，
@@ -566,24 +632,54 @@ class CodeParser:
 
         Returns:
             OpcodeCondition:
-                解析所得的条件代码块
+                解析所得的条件代码块。
+                它只包含一个条件，且该条件旗下的代码块为空
         """
-        should_end = False
-        conditions = [
-            ConditionCodeBlock(
-                self._parse_expression(CONTEXT_PARSE_IF, True, False),
-                self._get_line_code(ptr, self.reader.pointer()),
-                [],
-            )
-        ]
+        opcode = OpcodeCondition(
+            [
+                ConditionCodeBlock(
+                    self._parse_expression(CONTEXT_PARSE_IF, True, False),
+                    self._get_line_code(ptr, self.reader.pointer()),
+                    [],
+                )
+            ]
+        )
         self._validate_next_line(ptr, False)
+        return opcode
+
+    def _parse_condition_steps(
+        self, opcode
+    ):  # type: (OpcodeCondition) -> Iterator[Iterator[Any]]
+        """
+        _parse_condition_steps 从底层流解析 opcode 的剩余部分，
+        直到读取到 fi 为止。
+
+        _parse_condition_steps 是一个生成器。
+        它产出解析嵌套的条件代码块或循环代码块的子步骤，
+        因此应通过 run_steps 或其他生成器执行
+
+        Args:
+            opcode (OpcodeCondition):
+                由 _parse_condition 解析所得的条件代码块
+
+        Raises:
+            Exception:
+                当解析出现错误时抛出
+
+        Returns:
+            Iterator[Iterator[Any]]:
+                解析该条件代码块的生成器
+        """
+        should_end = False
+        conditions = opcode.opcode_payload
 
         while True:
             sub_ptr = self.reader.pointer()
-            opcode, further = self._parse_code(sub_ptr)
+            sub_opcode, further = self._parse_code(sub_ptr)
 
-            if opcode is not None:
-                conditions[-1].code_block.append(opcode)
+            if sub_opcode is not None:
+                conditions[-1].code_block.append(sub_opcode)
+                yield self._parse_block_steps(sub_opcode)
                 self._validate_next_line(sub_ptr, False)
                 continue
             if further is None:
@@ -635,11 +731,9 @@ class CodeParser:
 
             self._validate_next_line(sub_ptr, False)
 
-        return OpcodeCondition(conditions)
-
     def _parse_for_loop(self, ptr):  # type: (int) -> OpcodeForLoop
         """
-        _parse_for_loop 从底层流解析一个循环代码块。
+        _parse_for_loop 从底层流解析一个循环代码块的头部。
 
         下面是一个循环代码块的示例。
         ```
@@ -652,6 +746,10 @@ class CodeParser:
             rof
         ```
 
+        循环体中的语句以及最后的 rof
+        并不由 _parse_for_loop 解析，
+        而是由 _parse_for_loop_steps 解析
+
         Args:
             ptr (int):
                 当需要抛出错误时，
@@ -663,7 +761,8 @@ class CodeParser:
 
         Returns:
             OpcodeForLoop:
-                解析所得的循环代码块
+                解析所得的循环代码块。
+                它的循环体为空
         """
         variable = self._parse_variable(ptr)
         self._validate_next_token(
@@ -676,13 +775,48 @@ class CodeParser:
         end_expr_ptr = self.reader.pointer()
         self._validate_next_line(ptr, False)
 
-        code_block = []  # type: list[OpcodeBase]
+        return OpcodeForLoop(
+            ForLoopCodeBlock(
+                variable,
+                repeat_times,
+                self._get_line_code(ptr, end_expr_ptr),
+                [],
+            )
+        )
+
+    def _parse_for_loop_steps(
+        self, opcode
+    ):  # type: (OpcodeForLoop) -> Iterator[Iterator[Any]]
+        """
+        _parse_for_loop_steps 从底层流解析 opcode 的循环体，
+        直到读取到 rof 为止。
+
+        _parse_for_loop_steps 是一个生成器。
+        它产出解析嵌套的条件代码块或循环代码块的子步骤，
+        因此应通过 run_steps 或其他生成器执行
+
+        Args:
+            opcode (OpcodeForLoop):
+                由 _parse_for_loop 解析所得的循环代码块
+
+        Raises:
+            Exception:
+                当解析出现错误时抛出
+
+        Returns:
+            Iterator[Iterator[Any]]:
+                解析该循环代码块的生成器
+        """
+        assert opcode.opcode_payload is not None
+        code_block = opcode.opcode_payload.code_block
+
         while True:
             sub_ptr = self.reader.pointer()
-            opcode, further = self._parse_code(sub_ptr)
+            sub_opcode, further = self._parse_code(sub_ptr)
 
-            if opcode is not None:
-                code_block.append(opcode)
+            if sub_opcode is not None:
+                code_block.append(sub_opcode)
+                yield self._parse_block_steps(sub_opcode)
                 self._validate_next_line(sub_ptr, False)
                 continue
             if further is None:
@@ -700,14 +834,27 @@ class CodeParser:
                 self._fast_sentence_panic(further[1], further[2], str(further[3]))
                 raise Exception("unreachable")
 
-        return OpcodeForLoop(
-            ForLoopCodeBlock(
-                variable,
-                repeat_times,
-                self._get_line_code(ptr, end_expr_ptr),
-                code_block,
-            )
-        )
+    def _parse_block_steps(self, opcode):  # type: (OpcodeBase) -> Iterator[Iterator[Any]]
+        """
+        _parse_block_steps 返回解析 opcode 剩余部分的生成器。
+
+        条件代码块和循环代码块在 _parse_code 返回时只解析了头部，
+        而其余的操作语句在 _parse_code 返回时就已解析完毕
+
+        Args:
+            opcode (OpcodeBase):
+                由 _parse_code 解析所得的操作语句
+
+        Returns:
+            Iterator[Iterator[Any]]:
+                解析该操作语句剩余部分的生成器。
+                如果没有需要解析的剩余部分，则返回空的生成器
+        """
+        if isinstance(opcode, OpcodeCondition):
+            return self._parse_condition_steps(opcode)
+        if isinstance(opcode, OpcodeForLoop):
+            return self._parse_for_loop_steps(opcode)
+        return NO_STEPS
 
     def parse(self):  # type: () -> CodeParser
         """
@@ -715,7 +862,10 @@ class CodeParser:
         并将其编译为抽象语法树表示。
 
         如果解析没有出现错误，则底层流最终应会被耗尽。
-        并且，解析结果将被置于本实例的 code_block 中
+        并且，解析结果将被置于本实例的 code_block 中。
+
+        嵌套的代码块通过 run_steps 以显式栈解析，
+        因此嵌套的深度不受 Python 递归深度的限制
 
         Raises:
             Exception:
@@ -731,6 +881,7 @@ class CodeParser:
 
             if opcode is not None:
                 self.code_block.append(opcode)
+                run_steps(self._parse_block_steps(opcode))
                 self._validate_next_line(ptr, False)
                 continue
             if further is None:
@@ -1,6 +1,40 @@
 # -*- coding: utf-8 -*-
 from __future__ import division
 
+import re
+
+SPACE_PATTERN = re.compile(r"[ \t]*")
+STRING_CHUNK_PATTERN = re.compile(r"[^'\\]*")
+ESCAPE_CACHE_LIMIT = 256
+
+_escape_cache = {}  # type: dict[str, str]
+
+
+def decode_escape(sub):  # type: (str) -> str
+    """
+    decode_escape 解码由反斜杠和其后的一个字符所构成的转义符。
+    成功解码的结果将被缓存，因此重复出现的转义符只需要被解码一次
+
+    Args:
+        sub (str): 待解码的转义符
+
+    Raises:
+        Exception:
+            如果该转义符不合法，
+            则抛出相应的错误
+
+    Returns:
+        str: 解码所得的字符串
+    """
+    result = _escape_cache.get(sub)
+    if result is None:
+        result = str(
+            sub.encode(encoding="utf-8").decode(encoding="unicode_escape")
+        )
+        if len(_escape_cache) < ESCAPE_CACHE_LIMIT:
+            _escape_cache[sub] = result
+    return result
+
 
 class StringReader:
     """StringReader 是字符串流式阅读器"""
@@ -104,13 +138,7 @@ class StringReader:
         在形式上，jump_space 的作用相当于跳过空白字符，
         以便下次阅读时能读取到具有实际意义的字符。
         """
-        while True:
-            char = self.read(1)
-            if char == " " or char == "\t":
-                continue
-            if char != "":
-                _ = self.unread(1)
-            break
+        self._pointer = SPACE_PATTERN.match(self._buffer, self._pointer).end()  # type: ignore
 
     def parse_string(self):  # type: () -> str
         """
@@ -130,17 +158,29 @@ class StringReader:
                 解析所得的，由单引号包裹的字符串。
                 确保所有转义符已得到正确处理
         """
+        buffer = self._buffer
+        ptr = self._pointer
+
+        # Fast path for strings without any escape character
+        end = buffer.find("'", ptr)
+        if end >= 0 and buffer.find("\\", ptr, end) < 0:
+            self._pointer = end + 1
+            # Empty strings stay as the native str literal, even for unicode
+            # buffers on Python 2, so the token payload keeps the same type
+            return buffer[ptr:end] if end > ptr else ""
+
         result = ""
         while True:
-            char = self.read(1)
-            if char == "":
+            chunk_end = STRING_CHUNK_PATTERN.match(buffer, ptr).end()  # type: ignore
+            if chunk_end > ptr:
+                result += buffer[ptr:chunk_end]
+            ptr = chunk_end
+            if ptr >= len(buffer):
+                self._pointer = len(buffer)
                 raise Exception("parse_string: Unexpected EOF")
-            if char == "\\":
-                sub = char + self.read(1)
-                sub = sub.encode(encoding="utf-8").decode(encoding="unicode_escape")
-                result += str(sub)
-                continue
-            if char == "'":
-                break
-            result += char
-        return result
+            if buffer[ptr] == "'":
+                self._pointer = ptr + 1
+                return result
+            self._pointer = min(ptr + 2, len(buffer))
+            result += decode_escape(buffer[ptr : ptr + 2])
+            ptr = self._pointer
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Iterator
+
+# An exhausted iterator, which stands for the steps that
+# have nothing left to do. It is shared since it never changes
+NO_STEPS = iter(())  # type: Iterator[Any]
+
+
+def run_steps(steps):  # type: (Iterator[Any]) -> None
+    """
+    run_steps 以显式栈执行 steps 及其产出的所有子步骤。
+
+    steps 是一个生成器，它在需要处理嵌套的子结构时，
+    不会递归地调用自身，而是产出处理该子结构的生成器。
+    run_steps 会先将产出的生成器执行完毕，
+    然后再继续执行产出它的生成器。
+
+    因此，无论子结构嵌套多深，
+    执行过程中 Python 的调用栈深度都保持不变
+
+    Args:
+        steps (Iterator[Any]):
+            欲被执行的生成器。
+            它产出的每个值都应是一个新的生成器
+    """
+    stack = [steps]  # type: list[Iterator[Any]]
+    _push = stack.append
+    _pop = stack.pop
+
+    while stack:
+        sub = next(stack[-1], None)
+        if sub is None:
+            _pop()
+        else:
+            _push(sub)
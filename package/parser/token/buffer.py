@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+from array import array
+from .token import Token
+
+
+class TokenBuffer:
+    """
+    TokenBuffer 是紧凑的 Token 储存。
+
+    它不为每个 Token 创建一个 Token 实例，
+    而是将 Token 的 ID、负载索引以及源代码起止位置
+    分别保存在四个并行的 array('i') 中。
+
+    所有的负载字符串都被驻留到同一个列表中，
+    因此相同的变量名或字符串在缓冲区中只保存一份。
+
+    通过下标访问 TokenBuffer 时，
+    将按需构造一个轻量的 Token 视图
+    """
+
+    _ids = array("i")  # type: array[int]
+    _payloads = array("i")  # type: array[int]
+    _starts = array("i")  # type: array[int]
+    _ends = array("i")  # type: array[int]
+    _strings = [""]  # type: list[str]
+    _string_index = {}  # type: dict[str, int]
+
+    def __init__(self, tokens=[]):  # type: (list[Token]) -> None
+        """初始化并返回一个新的 TokenBuffer
+
+        Args:
+            tokens (list[Token], optional):
+                用于初始化缓冲区的 Token 列表。
+                默认值为空列表
+        """
+        self._ids = array("i")
+        self._payloads = array("i")
+        self._starts = array("i")
+        self._ends = array("i")
+        self._strings = [""]
+        self._string_index = {"": 0}
+        for i in tokens:
+            self.append(i.token_id, i.token_payload, i.ori_start_ptr, i.ori_end_ptr)
+
+    def __len__(self):  # type: () -> int
+        """返回缓冲区中 Token 的数量
+
+        Returns:
+            int: 缓冲区中 Token 的数量
+        """
+        return len(self._ids)
+
+    def __getitem__(self, index):  # type: (int) -> Token
+        """
+        返回缓冲区中第 index 个 Token 的视图。
+        该视图是新构造的 Token，修改它不会影响缓冲区
+
+        Args:
+            index (int): Token 的下标
+
+        Raises:
+            IndexError:
+                如果下标超出范围，
+                则抛出相应的错误
+
+        Returns:
+            Token: 第 index 个 Token 的视图
+        """
+        return Token(
+            self._ids[index],
+            self._strings[self._payloads[index]],
+            self._starts[index],
+            self._ends[index],
+        )
+
+    def __repr__(self):  # type: () -> str
+        """返回 TokenBuffer 的字符串表示
+
+        Returns:
+            str: TokenBuffer 的字符串表示
+        """
+        return "TokenBuffer(tokens={}, strings={})".format(
+            len(self._ids), len(self._strings)
+        )
+
+    def append(
+        self, token_id, token_payload, ori_start_ptr, ori_end_ptr
+    ):  # type: (int, str, int, int) -> None
+        """append 向缓冲区的末尾追加一个 Token
+
+        Args:
+            token_id (int): 该 Token 的 ID
+            token_payload (str): 该 Token 的负载
+            ori_start_ptr (int): 该 Token 对应的源代码的起始位置
+            ori_end_ptr (int): 该 Token 对应的源代码的终止位置
+        """
+        index = self._string_index.get(token_payload)
+        # On Python 2, str and unicode payloads with the same
+        # content share a key, but must not share an entry
+        if index is None or type(self._strings[index]) != type(token_payload):
+            index = len(self._strings)
+            self._strings.append(token_payload)
+            self._string_index[token_payload] = index
+        self._ids.append(token_id)
+        self._payloads.append(index)
+        self._starts.append(ori_start_ptr)
+        self._ends.append(ori_end_ptr)
+
+    def token_id(self, index):  # type: (int) -> int
+        """token_id 返回第 index 个 Token 的 ID
+
+        Args:
+            index (int): Token 的下标
+
+        Returns:
+            int: 该 Token 的 ID
+        """
+        return self._ids[index]
+
+    def payload(self, index):  # type: (int) -> str
+        """payload 返回第 index 个 Token 的负载
+
+        Args:
+            index (int): Token 的下标
+
+        Returns:
+            str: 该 Token 的负载
+        """
+        return self._strings[self._payloads[index]]
+
+    def start(self, index):  # type: (int) -> int
+        """start 返回第 index 个 Token 对应的源代码的起始位置
+
+        Args:
+            index (int): Token 的下标
+
+        Returns:
+            int: 该 Token 对应的源代码的起始位置
+        """
+        return self._starts[index]
+
+    def end(self, index):  # type: (int) -> int
+        """end 返回第 index 个 Token 对应的源代码的终止位置
+
+        Args:
+            index (int): Token 的下标
+
+        Returns:
+            int: 该 Token 对应的源代码的终止位置
+        """
+        return self._ends[index]
@@ -1,16 +1,28 @@
 # -*- coding: utf-8 -*-
 from __future__ import division
 
+import re
 from ..reader.any_reader import AnyReader
 from ..reader.string_reader import StringReader
+from .buffer import TokenBuffer
 from .token import (
     Token,
     CHAR_TO_TOKEN_ID,
     KEY_WORD_TO_TOKEN_ID,
+    TOKEN_ID_EOF,
     TOKEN_ID_WORD,
     TOKEN_ID_SINGLE_QUOTE,
 )
 
+# Matches the leading spaces and then a whole Token.
+# Group 1 is the opening single quote of a string,
+# group 2 is a single character Token and group 3 is a word
+TOKEN_PATTERN = re.compile(
+    r"[ \t]*(?:(')|([{0}])|([^ \t'{0}]+))".format(
+        "".join(re.escape(i) for i in sorted(CHAR_TO_TOKEN_ID) if i != "'")
+    )
+)
+
 
 class Sentence:
     """
@@ -19,7 +31,7 @@ class Sentence:
     """
 
     reader = StringReader("")  # type: StringReader
-    tokens = []  # type: list[Token]
+    tokens = TokenBuffer()  # type: TokenBuffer
 
     def __init__(self, reader):  # type: (StringReader) -> None
         """初始化并返回一个新的词法分词器
@@ -29,13 +41,67 @@ class Sentence:
                 用于读取源代码的底层流
         """
         self.reader = reader
-        self.tokens = []
+        self.tokens = TokenBuffer()
+
+    def _scan(self, limit):  # type: (int) -> tuple[int, int, Exception | None, int]
+        """
+        _scan 直接在底层流的整个缓冲区上匹配 TOKEN_PATTERN，
+        从而一次读取一个完整的 Token，而不是逐个字符地阅读。
+        所得的 Token 被追加到当前实例的 tokens 缓冲区中
+
+        Args:
+            limit (int):
+                最多读取的 Token 数量。
+                如果为负数，则读取到底层流被耗尽为止
+
+        Returns:
+            tuple[int, int, Exception | None, int]:
+                前三个元素的含义与 parse_all 的返回值相同，
+                第四个元素表示本次读取到的 Token 数量
+        """
+        reader = self.reader
+        buffer = reader.buffer()
+        append = self.tokens.append
+        match = TOKEN_PATTERN.match
+        count = 0
+
+        ptr = reader.pointer()
+        while count != limit:
+            found = match(buffer, ptr)
+            if found is None:
+                reader.set_pointer(len(buffer))
+                return ptr, len(buffer), None, count
+
+            kind = found.lastindex
+            start, end = found.start(kind), found.end()  # type: ignore
+            if kind == 1:
+                reader.set_pointer(end)
+                try:
+                    payload = reader.parse_string()
+                except Exception as e:
+                    return ptr, reader.pointer(), e, count
+                end = reader.pointer()
+                append(TOKEN_ID_SINGLE_QUOTE, payload, start, end)
+            elif kind == 2:
+                append(CHAR_TO_TOKEN_ID[found.group(2)], "", start, end)
+            else:
+                word = found.group(3)
+                if word in KEY_WORD_TO_TOKEN_ID:
+                    append(KEY_WORD_TO_TOKEN_ID[word], "", start, end)
+                else:
+                    append(TOKEN_ID_WORD, word, start, end)
+
+            count += 1
+            ptr = end
+
+        reader.set_pointer(ptr)
+        return ptr, ptr, None, count
 
     def parse_all(self):  # type: () -> tuple[int, int, Exception | None]
         """
-        parse_all 通过不断地调用 parse_next 直到底层流被耗尽。
-        最终，parse_next 读取到了所有的 Token，分词工作被完成。
-        应注意的是，分词结果被保存到当前实例的 tokens 列表中
+        parse_all 不断地解析 Token 直到底层流被耗尽。
+        最终，所有的 Token 都被读取，分词工作被完成。
+        应注意的是，分词结果被保存到当前实例的 tokens 缓冲区中
 
         Returns:
             tuple[int, int, Exception | None]:
@@ -43,117 +109,158 @@ class Sentence:
                 元组的第二个元素表示分词结束（或发生错误时）时底层流的指针位置。
                 另外，如果分词过程中发生错误，则该元组的第三个元素将有值
         """
-        ptr = self.reader.pointer()
-
-        while True:
-            ptr = self.reader.pointer()
-            try:
-                if not self.parse_next():
-                    break
-            except Exception as e:
-                return ptr, self.reader.pointer(), e
-
-        return ptr, self.reader.pointer(), None
+        ptr1, ptr2, err, _ = self._scan(-1)
+        return ptr1, ptr2, err
 
     def parse_next(self):  # type: () -> bool
         """
         parse_next 从底层流解析一个 Token，
-        并将其追加到当前实例的 tokens 列表中
+        并将其追加到当前实例的 tokens 缓冲区中
+
+        Raises:
+            Exception:
+                如果解析过程中发生错误，
+                则抛出相应的错误
 
         Returns:
             bool:
                 指示解析是否成功。
                 如果返回假，则说明底层流已被耗尽
         """
-        self.reader.jump_space()
-        ptr = self.reader.pointer()
-        word = self.reader.read(1)
-
-        if word == "":
-            return False
-        if word == "'":
-            self.tokens.append(
-                Token(
-                    TOKEN_ID_SINGLE_QUOTE,
-                    self.reader.parse_string(),
-                    ptr,
-                    self.reader.pointer(),
-                )
-            )
-            return True
-        if word in CHAR_TO_TOKEN_ID:
-            self.tokens.append(
-                Token(
-                    CHAR_TO_TOKEN_ID[word],
-                    "",
-                    ptr,
-                    self.reader.pointer(),
-                )
-            )
-            return True
-
-        while True:
-            char = self.reader.read(1)
-            if char == "":
-                break
-            if char == " " or char == "\t" or char in CHAR_TO_TOKEN_ID:
-                _ = self.reader.unread(1)
-                break
-            word += char
-
-        if word in KEY_WORD_TO_TOKEN_ID:
-            self.tokens.append(
-                Token(
-                    KEY_WORD_TO_TOKEN_ID[word],
-                    "",
-                    ptr,
-                    self.reader.pointer(),
-                )
-            )
-        else:
-            self.tokens.append(
-                Token(
-                    TOKEN_ID_WORD,
-                    word,
-                    ptr,
-                    self.reader.pointer(),
-                )
-            )
-        return True
+        _, _, err, count = self._scan(1)
+        if err is not None:
+            raise err
+        return count > 0
 
 
 class SentenceReader(AnyReader):
     """
     SentenceReader 是多个 Token 组成的流式阅读器。
-    它应当通过 Sentence 的分词结果来进行初始化
+    它应当通过 Sentence 的分词结果来进行初始化。
+
+    除了逐个读取 Token 的 read 系列方法外，
+    它还提供了直接访问底层 TokenBuffer 的游标接口，
+    即 peek_id、read_id、must_read_id、token 和 payload，
+    从而避免在只需要 Token ID 或负载时构造 Token 视图
     """
 
-    _contents = []  # type: list[Token]
+    _contents = TokenBuffer()  # type: TokenBuffer
     _pointer = 0  # type: int
 
-    def __init__(self, tokens=[], pointer=0):  # type: (list[Token], int) -> None
+    def __init__(
+        self, tokens=[], pointer=0
+    ):  # type: (TokenBuffer | list[Token], int) -> None
         """初始化并返回一个新的 SentenceReader
 
         Args:
-            tokens (list[Token], optional):
-                词法分词器的分词结果列表。
+            tokens (TokenBuffer | list[Token], optional):
+                词法分词器的分词结果。
+                如果给出的是 Token 列表，则它将被转换为 TokenBuffer。
                 默认值为空列表
             pointer (int, optional):
                 该阅读器的指针初始位置。
                 默认值为 0
         """
-        self._contents = tokens if len(tokens) > 0 else []
+        if isinstance(tokens, TokenBuffer):
+            self._contents = tokens
+        else:
+            self._contents = TokenBuffer(tokens)
         self._pointer = min(max(0, pointer), len(tokens) - 1)
 
-    def contents(self):  # type: () -> list[Token]
+    def contents(self):  # type: () -> TokenBuffer
         """contents 返回阅读器的底层负载
 
         Returns:
-            list[Token]:
+            TokenBuffer:
                 阅读器的底层负载
         """
         return self._contents
 
+    def peek_id(self, offset=0):  # type: (int) -> int
+        """
+        peek_id 返回阅读指针后第 offset 个 Token 的 ID，
+        但不移动阅读指针
+
+        Args:
+            offset (int, optional):
+                相对于阅读指针的偏移量。
+                默认值为 0
+
+        Returns:
+            int:
+                该 Token 的 ID。
+                如果该位置超出了流的范围，则返回 TOKEN_ID_EOF
+        """
+        ptr = self._pointer + offset
+        if ptr < 0 or ptr >= len(self._contents):
+            return TOKEN_ID_EOF
+        return self._contents.token_id(ptr)
+
+    def read_id(self):  # type: () -> int
+        """
+        read_id 从当前流中阅读一个 Token，
+        并只返回它的 ID
+
+        Returns:
+            int:
+                读到的 Token 的 ID。
+                如果流已被耗尽，则返回 TOKEN_ID_EOF，
+                并且阅读指针不会被移动
+        """
+        ptr = self._pointer
+        if ptr >= len(self._contents):
+            return TOKEN_ID_EOF
+        self._pointer = ptr + 1
+        return self._contents.token_id(ptr)
+
+    def must_read_id(self):  # type: () -> int
+        """
+        must_read_id 从当前流中阅读一个 Token，并只返回它的 ID。
+        与 must_read 相同，如果流已被耗尽，则抛出相应的错误
+
+        Raises:
+            Exception:
+                如果流已被耗尽，
+                则抛出相应的错误
+
+        Returns:
+            int: 读到的 Token 的 ID
+        """
+        token_id = self.read_id()
+        if token_id == TOKEN_ID_EOF:
+            raise Exception("must_read: Unexpected EOF")
+        return token_id
+
+    def token(self, offset=-1):  # type: (int) -> Token
+        """
+        token 返回阅读指针后第 offset 个 Token 的视图。
+        默认情况下，它返回上一次读到的 Token
+
+        Args:
+            offset (int, optional):
+                相对于阅读指针的偏移量。
+                默认值为 -1
+
+        Returns:
+            Token: 该 Token 的视图
+        """
+        return self._contents[self._pointer + offset]
+
+    def payload(self, offset=-1):  # type: (int) -> str
+        """
+        payload 返回阅读指针后第 offset 个 Token 的负载。
+        默认情况下，它返回上一次读到的 Token 的负载
+
+        Args:
+            offset (int, optional):
+                相对于阅读指针的偏移量。
+                默认值为 -1
+
+        Returns:
+            str: 该 Token 的负载
+        """
+        return self._contents.payload(self._pointer + offset)
+
     def read(self):  # type: () -> Token | None
         """read 从当前流中阅读一个 Token
 
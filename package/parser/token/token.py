@@ -3,6 +3,7 @@ from __future__ import division
 
 import json
 
+TOKEN_ID_EOF = -1
 TOKEN_ID_WORD = 0
 TOKEN_ID_ASSIGN = 1
 TOKEN_ID_LEFT_ANGLE_BRACKET = 2
@@ -97,6 +98,7 @@ for key, value in CHAR_TO_TOKEN_ID.items():
     TOKEN_ID_TO_NAME[value] = key
 for key, value in KEY_WORD_TO_TOKEN_ID.items():
     TOKEN_ID_TO_NAME[value] = key
+TOKEN_ID_TO_NAME[TOKEN_ID_EOF] = "EOF"
 TOKEN_ID_TO_NAME[TOKEN_ID_WORD] = "word"
 TOKEN_ID_TO_NAME[TOKEN_ID_SEPSEPARATE] = "|"
 
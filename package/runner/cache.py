@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
+import sys
+from collections import OrderedDict
+from .compile import CompileResult
+from .external import GameInteract, BuiltInFunction, cache_key
+from .runner import CodeRunner, EMPTY_COMPILE_RESULT
+from .link import CAST_FUNC_NAMES
+from .optimize import jump_offsets
+from .verify import CodeVerifier, VerifyException
+from .define import (
+    BYTECODE_LOAD_CONST,
+    BYTECODE_HANDLE_FUNC,
+    BYTECODE_HANDLE_INTERACT,
+    BYTECODE_HANDLE_LINKED_FUNC,
+    INTERACT_TYPE_REF,
+    RUNNER_ENGINE_SWITCH,
+    instruction_length,
+)
+
+try:
+    range = xrange  # type: ignore
+except Exception:
+    pass
+
+EMPTY_VARIABLES = {}
+EMPTY_GAME_INTERACT = GameInteract()
+EMPTY_BUILTIN_FUNCTION = BuiltInFunction()
+
+
+class PurityResult:
+    """
+    PurityResult 是 PurityAnalyzer 对编译结果进行纯度分析的结果
+    """
+
+    pure = False  # type: bool
+    reason = ""  # type: str
+    inputs = []  # type: list[str]
+    refs = []  # type: list[int]
+    func_names = []  # type: list[str]
+
+    def __init__(
+        self,
+        pure,  # type: bool
+        reason,  # type: str
+        inputs,  # type: list[str]
+        refs,  # type: list[int]
+        func_names,  # type: list[str]
+    ):  # type: (...) -> None
+        """初始化并返回一个新的 PurityResult
+
+        Args:
+            pure (bool):
+                代码的运行结果是否只取决于其输入
+            reason (str):
+                代码不纯的原因。
+                如果代码是纯的，则为空字符串
+            inputs (list[str]):
+                可能在赋值前被读取的变量的名称，
+                即代码所读取的 var_maps 中的变量
+            refs (list[int]):
+                代码所读取的 ref 的索引
+            func_names (list[str]):
+                代码所调用的内建函数的名称
+        """
+        self.pure = pure
+        self.reason = reason
+        self.inputs = inputs
+        self.refs = refs
+        self.func_names = func_names
+
+
+class PurityAnalyzer:
+    """
+    PurityAnalyzer 对编译结果进行静态的纯度分析。
+
+    如果代码只读取 var_maps、以常量为索引的 ref，
+    并且只调用类型转换函数和被标记为纯函数的静态内建函数，
+    那么代码的运行结果只取决于这些输入，也就可以被缓存。
+
+    任何 command、score 或 selector 的调用，
+    以及以非常量为索引的 ref 都会使代码被认为是不纯的。
+    注意，诸如 -1 的索引在未经 ConstantFolder 折叠时并不是常量
+    """
+
+    _compiled = CompileResult([], [], None)  # type: ignore
+    _builtins = EMPTY_BUILTIN_FUNCTION  # type: BuiltInFunction
+
+    def __init__(
+        self, compiled, builtins=EMPTY_BUILTIN_FUNCTION
+    ):  # type: (CompileResult, BuiltInFunction) -> None
+        """初始化并返回一个新的 PurityAnalyzer
+
+        Args:
+            compiled (CompileResult):
+                CodeCompiler 或 CodeLinker 的编译结果
+            builtins (BuiltInFunction, optional):
+                运行代码时所使用的内建函数。
+                默认值为 EMPTY_BUILTIN_FUNCTION
+        """
+        self._compiled = compiled
+        self._builtins = builtins
+
+    def _impure(self, reason):  # type: (str) -> PurityResult
+        """_impure 返回指示代码不纯的分析结果
+
+        Args:
+            reason (str): 代码不纯的原因
+
+        Returns:
+            PurityResult: 相应的分析结果
+        """
+        return PurityResult(False, reason, [], [], [])
+
+    def analyze(self):  # type: () -> PurityResult
+        """analyze 分析编译结果的纯度
+
+        Returns:
+            PurityResult: 纯度分析的结果
+        """
+        byte_code = self._compiled.byte_code
+        builtins = self._builtins
+
+        try:
+            inputs = CodeVerifier(self._compiled).verify()
+        except VerifyException as e:
+            return self._impure(str(e))
+
+        targets = set()  # type: set[Any]
+        pc = 0
+        while pc < len(byte_code):
+            for offset in jump_offsets(byte_code[pc]):  # type: ignore
+                targets.add(byte_code[pc + offset])
+            pc += instruction_length(byte_code, pc)
+
+        refs = set()  # type: set[int]
+        func_names = set()  # type: set[str]
+        prev_pc = -1
+        pc = 0
+        while pc < len(byte_code):
+            op = byte_code[pc]
+
+            if op == BYTECODE_HANDLE_INTERACT:
+                if byte_code[pc + 1] != INTERACT_TYPE_REF:
+                    return self._impure("Interact with the game at pc={}".format(pc))
+                # The index must be the constant loaded just before on every path
+                index = None  # type: Any
+                if prev_pc >= 0 and byte_code[prev_pc] == BYTECODE_LOAD_CONST:
+                    index = byte_code[prev_pc + 1]
+                if (
+                    pc in targets
+                    or isinstance(index, bool)
+                    or not isinstance(index, int)
+                ):
+                    return self._impure("Non-constant ref index at pc={}".format(pc))
+                refs.add(index)
+
+            if op in (BYTECODE_HANDLE_FUNC, BYTECODE_HANDLE_LINKED_FUNC):
+                name = byte_code[pc + 2]  # type: Any
+                if op == BYTECODE_HANDLE_LINKED_FUNC:
+                    name = name.name
+                if name not in CAST_FUNC_NAMES and (
+                    name not in builtins.static or name not in builtins.pure
+                ):
+                    return self._impure(
+                        "Call impure func {} at pc={}".format(name, pc)
+                    )
+                func_names.add(name)
+
+            prev_pc = pc
+            pc += instruction_length(byte_code, pc)
+
+        var_mapping = self._compiled.var_mapping
+        return PurityResult(
+            True,
+            "",
+            sorted([var_mapping.name_by_index(i) for i in inputs]),  # type: ignore
+            sorted(refs),
+            sorted(func_names),
+        )
+
+
+class CachedRunner:
+    """
+    CachedRunner 在 CodeRunner 之前放置了一个运行结果的缓存。
+
+    对于经 PurityAnalyzer 证明为纯的代码，
+    运行结果以代码实际读取的输入 (var_maps 中的变量以及 ref 的响应) 为键
+    被缓存在一个有内存上限的 LRU 缓存中，
+    输入相同的后续运行将直接返回缓存的结果而不再运行代码。
+
+    ref 被认为是对表单响应的查询，没有副作用。
+    在查询缓存前，CachedRunner 会以代码所读取的每个索引调用一次 ref，
+    缓存未命中时，代码将直接使用这些响应而不再调用 ref。
+
+    运行出错时不会缓存任何结果，
+    因此错误总是通过实际运行代码而被抛出
+    """
+
+    _runner = CodeRunner(EMPTY_COMPILE_RESULT)  # type: CodeRunner
+    _builtins = EMPTY_BUILTIN_FUNCTION  # type: BuiltInFunction
+    _purity = PurityResult(False, "", [], [], [])  # type: PurityResult
+    _max_memory = 0  # type: int
+    _cache = OrderedDict()  # type: OrderedDict[tuple, tuple[Any, int]]
+    _memory = 0  # type: int
+    _hits = 0  # type: int
+    _misses = 0  # type: int
+
+    def __init__(
+        self,
+        compiled,  # type: CompileResult
+        engine=RUNNER_ENGINE_SWITCH,  # type: int
+        verify=False,  # type: bool
+        builtins=EMPTY_BUILTIN_FUNCTION,  # type: BuiltInFunction
+        max_memory=1048576,  # type: int
+    ):  # type: (...) -> None
+        """初始化并返回一个新的 CachedRunner
+
+        Args:
+            compiled (CompileResult):
+                CodeCompiler 或 CodeLinker 的编译结果
+            engine (int, optional):
+                运行字节码时所使用的执行引擎。
+                详见 CodeRunner 的注释，本处不再赘述。
+                默认值为 RUNNER_ENGINE_SWITCH
+            verify (bool, optional):
+                是否在加载时使用 CodeVerifier 校验字节码。
+                详见 CodeRunner 的注释，本处不再赘述。
+                默认值为 False
+            builtins (BuiltInFunction, optional):
+                运行代码时所使用的内建函数。
+                默认值为 EMPTY_BUILTIN_FUNCTION
+            max_memory (int, optional):
+                缓存所占用的内存的估计值的上限 (以字节为单位)。
+                超出上限时，最久未被使用的结果将被淘汰。
+                默认值为 1048576 (1 MiB)
+        """
+        self._runner = CodeRunner(compiled, engine, verify)
+        self._builtins = builtins
+        self._purity = PurityAnalyzer(compiled, builtins).analyze()
+        self._max_memory = max_memory
+        self._cache = OrderedDict()
+        self._memory = 0
+        self._hits = 0
+        self._misses = 0
+
+    def purity(self):  # type: () -> PurityResult
+        """purity 返回代码的纯度分析结果
+
+        Returns:
+            PurityResult: 纯度分析的结果
+        """
+        return self._purity
+
+    def cache_info(self):  # type: () -> tuple[int, int, int, int]
+        """cache_info 返回运行结果缓存的统计信息
+
+        Returns:
+            tuple[int, int, int, int]:
+                依次为缓存的命中次数、未命中次数、
+                目前缓存的结果数以及它们所占用的内存的估计值
+        """
+        return self._hits, self._misses, len(self._cache), self._memory
+
+    def clear_cache(self):  # type: () -> None
+        """clear_cache 清空运行结果的缓存，并重置统计信息"""
+        self._cache.clear()
+        self._memory = 0
+        self._hits = 0
+        self._misses = 0
+
+    def _memoize_ref(self, interact):  # type: (GameInteract) -> GameInteract
+        """
+        _memoize_ref 返回一个新的 GameInteract，
+        它的 ref 对每个索引至多调用一次 interact 的 ref。
+        ref 抛出的错误也会被记录，并在以同一索引再次调用时重新抛出
+
+        Args:
+            interact (GameInteract): 用于与 Minecraft 进行交互的接口
+
+        Returns:
+            GameInteract: 记录了 ref 的响应的交互接口
+        """
+        ref = interact.ref_func()
+        responses = {}  # type: dict[int, tuple[bool, Any]]
+
+        def memoized(index):  # type: (int) -> int | bool | float | str
+            if index not in responses:
+                try:
+                    responses[index] = (True, ref(index))
+                except Exception as e:
+                    responses[index] = (False, e)
+            ok, value = responses[index]
+            if not ok:
+                raise value
+            return value
+
+        return GameInteract(
+            interact.selector_func(),
+            interact.score_func(),
+            interact.command_func(),
+            memoized,
+        )
+
+    def _key(
+        self, require_return, var_maps, interact
+    ):  # type: (bool, dict[str, Any], GameInteract) -> tuple | None
+        """_key 返回由代码实际读取的输入所构成的缓存键
+
+        Args:
+            require_return (bool):
+                是否检查这些代码是否返回值
+            var_maps (dict[str, int | bool | float | str]):
+                运行代码前已经初始化的变量
+            interact (GameInteract):
+                用于与 Minecraft 进行交互的接口
+
+        Returns:
+            tuple | None:
+                缓存键。
+                如果 ref 抛出了错误或其响应无法作为键，则返回 None，
+                此时代码应直接运行，以便错误以通常的方式被抛出
+        """
+        purity = self._purity
+        values = [require_return]  # type: list[Any]
+        for name in purity.inputs:
+            values.append(var_maps.get(name))
+        try:
+            if len(purity.refs) > 0:
+                ref = interact.ref_func()
+                for index in purity.refs:
+                    values.append(ref(index))
+            key = cache_key(tuple(values))
+            hash(key)
+        except Exception:
+            return None
+        return key
+
+    def _store(self, key, result):  # type: (tuple, Any) -> None
+        """_store 缓存一次运行的结果，并淘汰超出内存上限的结果
+
+        Args:
+            key (tuple): 该次运行的输入
+            result (Any): 该次运行的结果
+        """
+        size = sys.getsizeof(key) + sys.getsizeof(result)
+        for i in key[0]:
+            size += sys.getsizeof(i)
+        if size > self._max_memory:
+            return
+
+        cache = self._cache
+        cache[key] = (result, size)
+        self._memory += size
+        while self._memory > self._max_memory:
+            _, (_, evicted) = cache.popitem(last=False)
+            self._memory -= evicted
+
+    def running(
+        self,
+        require_return=True,  # type: bool
+        var_maps=EMPTY_VARIABLES,  # type: dict[str, int | bool | float | str]
+        interact=EMPTY_GAME_INTERACT,  # type: GameInteract
+        builtins=None,  # type: BuiltInFunction | None
+        use_cache=True,  # type: bool
+    ):  # type: (...) -> int | bool | float | str | None
+        """
+        running 运行代码，
+        或在输入与先前的某次运行相同时直接返回该次运行的结果
+
+        Args:
+            require_return (bool, optional):
+                是否检查这些代码是否返回值。
+                如果为真且没有返回值，则抛出异常。
+                默认值为 True
+            var_maps (dict[str, int | bool | float | str], optional):
+                运行代码前已经初始化的变量。
+                默认值为 EMPTY_VARIABLES
+            interact (GameInteract, optional):
+                用于与 Minecraft 进行交互的接口。
+                默认值为 EMPTY_GAME_INTERACT
+            builtins (BuiltInFunction | None, optional):
+                运行代码时所使用的内建函数。
+                纯度分析是针对构造时给出的内建函数进行的，
+                因此若给出了其他的内建函数，则总是运行代码，且不缓存其结果。
+                默认值为 None，即使用构造时给出的内建函数
+            use_cache (bool, optional):
+                是否使用缓存。
+                若为假，则总是运行代码，且不缓存其结果。
+                默认值为 True
+
+        Returns:
+            int | bool | float | str | None:
+                运行代码时所得的返回值
+        """
+        if builtins is None:
+            builtins = self._builtins
+        purity = self._purity
+        if not use_cache or not purity.pure or builtins is not self._builtins:
+            return self._runner.running(require_return, var_maps, interact, builtins)
+
+        # Resolve every ref once, and replay the responses to the run on a miss
+        if len(purity.refs) > 0:
+            interact = self._memoize_ref(interact)
+        key = self._key(require_return, var_maps, interact)
+        if key is None:
+            return self._runner.running(require_return, var_maps, interact, builtins)
+
+        cache = self._cache
+        entry = cache.pop(key, None)
+        if entry is not None:
+            self._hits += 1
+            cache[key] = entry
+            return entry[0]
+
+        self._misses += 1
+        result = self._runner.running(require_return, var_maps, interact, builtins)
+        # A pure func may be unmarked during the run, e.g. if it allocates
+        pure = self._builtins.pure
+        for name in purity.func_names:
+            if name not in CAST_FUNC_NAMES and name not in pure:
+                purity.pure = False
+                purity.reason = "Func {} is no longer pure".format(name)
+                self.clear_cache()
+                return result
+
+        self._store(key, result)
+        return result
@@ -0,0 +1,1038 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable, Iterator
+
+import json
+import operator
+from .compile import CodeCompiler
+from .runner import CodeRunner, InternalException, fast_panic, bind_interact
+from .external import GameInteract, BuiltInFunction
+from .transpile import (
+    _call_func,
+    _interact_command,
+    _interact_score,
+    _interact_selector,
+    _interact_ref,
+)
+from .define import (
+    INTERACT_TYPE_COMMAND,
+    INTERACT_TYPE_SCORE,
+    INTERACT_TYPE_SELECTOR,
+    INTERACT_TYPE_REF,
+    REF_TYPE_INT,
+    REF_TYPE_BOOL,
+    REF_TYPE_FLOAT,
+    REF_TYPE_STR,
+    CHECK_POINT_TYPE_NORMAL,
+    CHECK_POINT_TYPE_CONDITION,
+    CHECK_POINT_TYPE_FOR_LOOP,
+    VariableMapping,
+    CheckPoint,
+)
+from ..parser.expression.define import (
+    ExpressionElement,
+    TYPE_ENUM_INT,
+    TYPE_ENUM_BOOL,
+    TYPE_ENUM_FLOAT,
+    ELEMENT_ID_VAR,
+    ELEMENT_ID_INT,
+    ELEMENT_ID_BOOL,
+    ELEMENT_ID_FLOAT,
+)
+from ..parser.expression.basic import (
+    ExpressionLiteral,
+    ExpressionReference,
+    ExpressionSelector,
+    ExpressionScore,
+    ExpressionCommand,
+    ExpressionFunction,
+)
+from ..parser.expression.compare import (
+    ExpressionLessThan,
+    ExpressionGreaterThan,
+    ExpressionLessEqual,
+    ExpressionGreaterEqual,
+    ExpressionEqual,
+    ExpressionNotEqual,
+    ExpressionAnd,
+    ExpressionOr,
+    ExpressionIn,
+    ExpressionInverse,
+)
+from ..parser.expression.compute import (
+    ExpressionAdd,
+    ExpressionRemove,
+    ExpressionTimes,
+    ExpressionDivide,
+)
+from ..parser.expression.combine import ExpressionCombine
+from ..parser.steps import run_steps
+from ..parser.define import (
+    OpcodeBase,
+    OpcodeAssign,
+    OpcodeCondition,
+    OpcodeForLoop,
+    OpcodeContinue,
+    OpcodeBreak,
+    OpcodeExpression,
+    OpcodeReturn,
+)
+
+try:
+    range = xrange  # type: ignore
+except Exception:
+    pass
+
+SLOT_INTERACT = 0
+SLOT_BUILTINS = 1
+SLOT_RESULT = 2
+SLOT_VARIABLES = 3
+
+STATUS_NORMAL = 0
+STATUS_BREAK = 1
+STATUS_CONTINUE = 2
+STATUS_RETURN = 3
+
+OPERAND_CONST = 0
+OPERAND_VAR = 1
+OPERAND_EXPR = 2
+
+# Every level of nesting is one more closure call at run time,
+# so more deeply nested code is left to the virtual machine
+CLOSURE_MAX_DEPTH = 100
+
+EMPTY_VARIABLES = {}
+EMPTY_GAME_INTERACT = GameInteract()
+EMPTY_BUILTIN_FUNCTION = BuiltInFunction()
+
+
+class ClosureRunner:
+    """
+    ClosureRunner 是该编程语言的另一种解释器。
+
+    它不使用字节码，而是将 AST 语法树的每个节点编译为一个 Python 闭包，
+    因此运行时没有字节码解码、栈操作和程序计数器的开销。
+
+    所有变量 (以及交互接口、内建函数和返回值) 都保存在一个预先分配的列表中，
+    每个闭包都只接受这个列表作为唯一的参数。
+
+    闭包在运行时相互调用，因此嵌套深度超过 CLOSURE_MAX_DEPTH 的代码
+    将回退到虚拟机运行，以免超出 Python 的递归深度限制
+    """
+
+    _ast = []  # type: list[OpcodeBase]
+    _map = VariableMapping()  # type: VariableMapping
+    _program = None  # type: Callable[[list], int] | None
+    _fallback = None  # type: CodeRunner | None
+
+    def __init__(self, code_block=[]):  # type: (list[OpcodeBase]) -> None
+        """初始化并返回一个新的 ClosureRunner
+
+        Args:
+            code_block (list[OpcodeBase], optional):
+                CodeParser 的编译结果
+                默认值为空列表
+        """
+        self._ast = code_block if len(code_block) > 0 else []
+        self._map = VariableMapping()
+        self._program = None
+        self._fallback = None
+
+        if self._depth() > CLOSURE_MAX_DEPTH:
+            self._fallback = CodeRunner(CodeCompiler(self._ast).compile())
+            return
+
+        program = []  # type: list[Callable[[list], int]]
+        run_steps(
+            self._code_block_list_steps(
+                self._ast, False, CHECK_POINT_TYPE_NORMAL, "", program
+            )
+        )
+        self._program = program[0]
+
+    def _depth(self):  # type: () -> int
+        """
+        _depth 返回语法树中语句和表达式元素嵌套的最大深度。
+        括号不会产生闭包，因此不计入深度
+
+        Returns:
+            int: 嵌套的最大深度
+        """
+        depth = 0
+        stack = [
+            (i, 1) for i in self._ast
+        ]  # type: list[tuple[OpcodeBase | ExpressionElement, int]]
+
+        while len(stack) > 0:
+            node, level = stack.pop()
+            depth = max(depth, level)
+            if isinstance(node, ExpressionCombine):
+                stack.append((node.element_payload[0], level))
+                continue
+
+            children = []  # type: list[Any]
+            if isinstance(node, OpcodeAssign):
+                children = [node.opcode_payload[1]]
+            elif isinstance(node, OpcodeCondition):
+                for i in node.opcode_payload:
+                    if i.condition is not None:
+                        children.append(i.condition)
+                    children.extend(i.code_block)
+            elif isinstance(node, OpcodeForLoop):
+                assert node.opcode_payload is not None
+                children = [node.opcode_payload.repeat_times]
+                children.extend(node.opcode_payload.code_block)
+            elif isinstance(node, (OpcodeExpression, OpcodeReturn)):
+                children = [node.opcode_payload]
+            elif isinstance(node, ExpressionLiteral):
+                if isinstance(node.element_payload, ExpressionCombine):
+                    children = [node.element_payload]
+            elif isinstance(node, ExpressionFunction):
+                children = list(node.element_payload[1])
+            elif isinstance(node, ExpressionReference):
+                children = [node.element_payload[1]]
+            elif isinstance(node, (ExpressionCommand, ExpressionSelector)):
+                children = [node.element_payload]
+            elif isinstance(node, ExpressionElement):
+                children = list(node.element_payload)  # type: ignore
+
+            stack.extend((i, level + 1) for i in children)
+
+        return depth
+
+    def _var_slot(self, varname):  # type: (str) -> int
+        """_var_slot 返回变量 varname 在变量列表中的位置
+
+        Args:
+            varname (str): 目标变量的名字
+
+        Returns:
+            int: 该变量在变量列表中的位置
+        """
+        return self._map.index_by_name(varname) + SLOT_VARIABLES  # type: ignore
+
+    def _unassigned(self, slot):  # type: (int) -> Callable[[], Any]
+        """
+        _unassigned 返回一个函数，
+        它用于抛出位于 slot 的变量未被赋值的错误
+
+        Args:
+            slot (int): 目标变量在变量列表中的位置
+
+        Returns:
+            Callable[[], Any]: 抛出该错误的函数
+        """
+        var_mapping = self._map
+
+        def unassigned():  # type: () -> Any
+            raise Exception(
+                "Variable {} used before assignment".format(
+                    json.dumps(
+                        var_mapping.name_by_index(slot - SLOT_VARIABLES),
+                        ensure_ascii=False,
+                    )
+                )
+            )
+
+        return unassigned
+
+    def _operand_steps(
+        self, element, result
+    ):  # type: (ExpressionElement, list[tuple[int, Any]]) -> Iterator[Iterator[Any]]
+        """
+        _operand_steps 将一个表达式元素编译为操作数，
+        并将其追加到 result 的末尾。
+        常量和变量不会被包装为闭包，以便上层节点内联它们
+
+        操作数由类型和负载组成。
+        对于 OPERAND_CONST，负载是常量本身；
+        对于 OPERAND_VAR，负载是变量的位置；
+        对于 OPERAND_EXPR，负载是计算该表达式的闭包
+
+        Args:
+            element (ExpressionElement): 待处理的表达式元素
+            result (list[tuple[int, Any]]): 用于储存操作数的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译该操作数的生成器
+        """
+        while isinstance(element, ExpressionCombine):
+            element = element.element_payload[0]
+        if isinstance(element, ExpressionLiteral):
+            if element.element_id == ELEMENT_ID_VAR:
+                result.append((OPERAND_VAR, self._var_slot(element.element_payload)))  # type: ignore
+                return
+            if not isinstance(element.element_payload, ExpressionCombine):
+                result.append((OPERAND_CONST, element.element_payload))
+                return
+        closures = []  # type: list[Callable[[list], Any]]
+        yield self._element_steps(element, closures)
+        result.append((OPERAND_EXPR, closures[0]))
+
+    def _closure_steps(
+        self, element, result
+    ):  # type: (ExpressionElement, list[Callable[[list], Any]]) -> Iterator[Iterator[Any]]
+        """
+        _closure_steps 将一个表达式元素编译为计算其值的闭包，
+        并将其追加到 result 的末尾
+
+        Args:
+            element (ExpressionElement): 待处理的表达式元素
+            result (list[Callable[[list], Any]]): 用于储存闭包的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译该闭包的生成器
+        """
+        operands = []  # type: list[tuple[int, Any]]
+        yield self._operand_steps(element, operands)
+        result.append(self._operand_closure(*operands[0]))
+
+    def _closures_steps(
+        self, elements, result
+    ):  # type: (list[ExpressionElement], list[Callable[[list], Any]]) -> Iterator[Iterator[Any]]
+        """
+        _closures_steps 依次将 elements 中的每个表达式元素编译为闭包，
+        并将它们追加到 result 的末尾
+
+        Args:
+            elements (list[ExpressionElement]): 待处理的表达式元素
+            result (list[Callable[[list], Any]]): 用于储存闭包的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译这些闭包的生成器
+        """
+        for i in elements:
+            yield self._closure_steps(i, result)
+
+    def _operand_closure(self, kind, payload):  # type: (int, Any) -> Callable[[list], Any]
+        """_operand_closure 返回计算操作数的值的闭包
+
+        Args:
+            kind (int): 操作数的类型
+            payload (Any): 操作数的负载
+
+        Returns:
+            Callable[[list], Any]: 计算该操作数的闭包
+        """
+        if kind == OPERAND_CONST:
+
+            def const(v):  # type: (list) -> Any
+                return payload
+
+            return const
+
+        if kind == OPERAND_VAR:
+            unassigned = self._unassigned(payload)
+
+            def var(v):  # type: (list) -> Any
+                value = v[payload]
+                if value is None:
+                    unassigned()
+                return value
+
+            return var
+
+        return payload
+
+    def _binary(
+        self,
+        left,  # type: tuple[int, Any]
+        right,  # type: tuple[int, Any]
+        op,  # type: Callable[[Any, Any], Any]
+        swap,  # type: bool
+    ):  # type: (...) -> Callable[[list], Any]
+        """
+        _binary 以编译所得的两个操作数构造一个二元运算。
+        左操作数总是先于右操作数被求值
+
+        Args:
+            left (tuple[int, Any]): 左操作数
+            right (tuple[int, Any]): 右操作数
+            op (Callable[[Any, Any], Any]): 运算符对应的函数
+            swap (bool):
+                是否以 op(right, left) 的方式进行运算。
+                这用于与虚拟机的比较运算保持一致
+
+        Returns:
+            Callable[[list], Any]: 计算该运算的闭包
+        """
+        left_kind, left_payload = left
+        right_kind, right_payload = right
+
+        if left_kind == OPERAND_VAR and right_kind == OPERAND_CONST:
+            unassigned = self._unassigned(left_payload)
+            if swap:
+
+                def var_const_swap(v):  # type: (list) -> Any
+                    a = v[left_payload]
+                    if a is None:
+                        unassigned()
+                    return op(right_payload, a)
+
+                return var_const_swap
+
+            def var_const(v):  # type: (list) -> Any
+                a = v[left_payload]
+                if a is None:
+                    unassigned()
+                return op(a, right_payload)
+
+            return var_const
+
+        if left_kind == OPERAND_VAR and right_kind == OPERAND_VAR:
+            left_unassigned = self._unassigned(left_payload)
+            right_unassigned = self._unassigned(right_payload)
+            if swap:
+
+                def var_var_swap(v):  # type: (list) -> Any
+                    a = v[left_payload]
+                    if a is None:
+                        left_unassigned()
+                    b = v[right_payload]
+                    if b is None:
+                        right_unassigned()
+                    return op(b, a)
+
+                return var_var_swap
+
+            def var_var(v):  # type: (list) -> Any
+                a = v[left_payload]
+                if a is None:
+                    left_unassigned()
+                b = v[right_payload]
+                if b is None:
+                    right_unassigned()
+                return op(a, b)
+
+            return var_var
+
+        left_closure = self._operand_closure(left_kind, left_payload)
+        right_closure = self._operand_closure(right_kind, right_payload)
+        if swap:
+
+            def expr_expr_swap(v):  # type: (list) -> Any
+                a = left_closure(v)
+                return op(right_closure(v), a)
+
+            return expr_expr_swap
+
+        def expr_expr(v):  # type: (list) -> Any
+            return op(left_closure(v), right_closure(v))
+
+        return expr_expr
+
+    def _compute_steps(
+        self, elements, op, inplace_op, result
+    ):  # type: (list[ExpressionElement], Callable[[Any, Any], Any], Callable[[Any, Any], Any], list[Callable[[list], Any]]) -> Iterator[Iterator[Any]]
+        """
+        _compute_steps 编译一个四则运算，
+        并将计算它的闭包追加到 result 的末尾。
+        与虚拟机相同，所有操作数都会在运算前被求值
+
+        Args:
+            elements (list[ExpressionElement]): 所有操作数
+            op (Callable[[Any, Any], Any]): 运算符对应的函数
+            inplace_op (Callable[[Any, Any], Any]):
+                运算符对应的原地运算函数。
+                与虚拟机相同，它被用于四个及以上操作数的运算
+            result (list[Callable[[list], Any]]): 用于储存闭包的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译该运算的生成器
+        """
+        if len(elements) == 2:
+            operands = []  # type: list[tuple[int, Any]]
+            yield self._operand_steps(elements[0], operands)
+            yield self._operand_steps(elements[1], operands)
+            result.append(self._binary(operands[0], operands[1], op, False))
+            return
+
+        closures = []  # type: list[Callable[[list], Any]]
+        yield self._closures_steps(elements, closures)
+        if len(closures) == 1:
+            result.append(closures[0])
+            return
+        result.append(self._compute(closures, inplace_op if len(closures) > 3 else op))
+
+    def _compute(
+        self, closures, op
+    ):  # type: (list[Callable[[list], Any]], Callable[[Any, Any], Any]) -> Callable[[list], Any]
+        """_compute 以所有操作数的闭包构造一个三个及以上操作数的四则运算
+
+        Args:
+            closures (list[Callable[[list], Any]]): 所有操作数的闭包
+            op (Callable[[Any, Any], Any]): 运算符对应的函数
+
+        Returns:
+            Callable[[list], Any]: 计算该运算的闭包
+        """
+
+        def compute(v):  # type: (list) -> Any
+            values = [i(v) for i in closures]
+            result = values[0]
+            for i in values[1:]:
+                result = op(result, i)
+            return result
+
+        return compute
+
+    def _logic(
+        self, closures, is_and
+    ):  # type: (list[Callable[[list], Any]], bool) -> Callable[[list], Any]
+        """_logic 以所有操作数的闭包构造一个具有短路行为的 and/or 运算
+
+        Args:
+            closures (list[Callable[[list], Any]]): 所有操作数的闭包
+            is_and (bool): 该运算是否是 and 运算
+
+        Returns:
+            Callable[[list], Any]: 计算该运算的闭包
+        """
+        if len(closures) == 1:
+            return closures[0]
+
+        if len(closures) == 2:
+            left, right = closures
+            if is_and:
+
+                def logic_and(v):  # type: (list) -> Any
+                    return left(v) and right(v)
+
+                return logic_and
+
+            def logic_or(v):  # type: (list) -> Any
+                return left(v) or right(v)
+
+            return logic_or
+
+        if is_and:
+
+            def chain_and(v):  # type: (list) -> Any
+                for i in closures:
+                    result = i(v)
+                    if not result:
+                        return result
+                return result
+
+            return chain_and
+
+        def chain_or(v):  # type: (list) -> Any
+            for i in closures:
+                result = i(v)
+                if result:
+                    return result
+            return result
+
+        return chain_or
+
+    def _element_steps(
+        self, element, result
+    ):  # type: (ExpressionElement, list[Callable[[list], Any]]) -> Iterator[Iterator[Any]]
+        """
+        _element_steps 将一个表达式元素编译为计算其值的闭包，
+        并将其追加到 result 的末尾。
+        它是一个生成器，产出编译各个子元素的子步骤
+
+        Args:
+            element (ExpressionElement): 待处理的表达式元素
+            result (list[Callable[[list], Any]]): 用于储存闭包的列表
+
+        Raises:
+            Exception:
+                如果给出的表达式元素未知，
+                则抛出相应的错误
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译该表达式元素的生成器
+        """
+        if isinstance(element, ExpressionCombine):
+            yield self._closure_steps(element.element_payload[0], result)
+            return
+
+        if isinstance(element, ExpressionLiteral):
+            if not isinstance(element.element_payload, ExpressionCombine):
+                yield self._closure_steps(element, result)
+                return
+            closures = []  # type: list[Callable[[list], Any]]
+            yield self._closure_steps(element.element_payload, closures)
+            inner = closures[0]
+            if element.element_id == ELEMENT_ID_INT:
+                cast = int  # type: Callable[[Any], Any]
+            elif element.element_id == ELEMENT_ID_BOOL:
+                cast = bool
+            elif element.element_id == ELEMENT_ID_FLOAT:
+                cast = float
+            else:
+                cast = str
+
+            def handle_cast(v):  # type: (list) -> Any
+                return cast(inner(v))
+
+            result.append(handle_cast)
+            return
+
+        if isinstance(element, ExpressionAdd):
+            yield self._compute_steps(
+                element.element_payload, operator.add, operator.iadd, result
+            )
+            return
+        if isinstance(element, ExpressionRemove):
+            yield self._compute_steps(
+                element.element_payload, operator.sub, operator.isub, result
+            )
+            return
+        if isinstance(element, ExpressionTimes):
+            yield self._compute_steps(
+                element.element_payload, operator.mul, operator.imul, result
+            )
+            return
+        if isinstance(element, ExpressionDivide):
+            yield self._compute_steps(
+                element.element_payload, operator.truediv, operator.itruediv, result
+            )
+            return
+
+        if isinstance(element, ExpressionEqual):
+            op = operator.eq
+        elif isinstance(element, ExpressionNotEqual):
+            op = operator.ne
+        elif isinstance(element, ExpressionLessThan):
+            op = operator.gt
+        elif isinstance(element, ExpressionGreaterThan):
+            op = operator.lt
+        elif isinstance(element, ExpressionLessEqual):
+            op = operator.ge
+        elif isinstance(element, ExpressionGreaterEqual):
+            op = operator.le
+        else:
+            op = None
+        if op is not None:
+            operands = []  # type: list[tuple[int, Any]]
+            yield self._operand_steps(element.element_payload[0], operands)
+            yield self._operand_steps(element.element_payload[1], operands)
+            result.append(self._binary(operands[0], operands[1], op, True))
+            return
+
+        closures = []  # type: list[Callable[[list], Any]]
+        if isinstance(element, (ExpressionAnd, ExpressionOr)):
+            yield self._closures_steps(element.element_payload, closures)
+            result.append(self._logic(closures, isinstance(element, ExpressionAnd)))
+            return
+
+        if isinstance(element, ExpressionInverse):
+            yield self._closure_steps(element.element_payload[0], closures)
+            inner = closures[0]
+
+            def logic_not(v):  # type: (list) -> Any
+                return not inner(v)
+
+            result.append(logic_not)
+            return
+        if isinstance(element, ExpressionIn):
+            yield self._closures_steps(element.element_payload[:2], closures)
+            left, right = closures
+
+            def logic_in(v):  # type: (list) -> Any
+                return left(v) in right(v)
+
+            result.append(logic_in)
+            return
+
+        if isinstance(element, ExpressionFunction):
+            func_name = element.element_payload[0]
+            yield self._closures_steps(element.element_payload[1], closures)
+            args = closures
+
+            def handle_func(v):  # type: (list) -> Any
+                return _call_func(v[SLOT_BUILTINS], func_name, *[i(v) for i in args])
+
+            result.append(handle_func)
+            return
+        if isinstance(element, ExpressionCommand):
+            assert element.element_payload is not None
+            yield self._closure_steps(element.element_payload, closures)
+            command = closures[0]
+
+            def handle_command(v):  # type: (list) -> Any
+                return _interact_command(
+                    v[SLOT_INTERACT][INTERACT_TYPE_COMMAND], command(v)
+                )
+
+            result.append(handle_command)
+            return
+        if isinstance(element, ExpressionSelector):
+            assert element.element_payload is not None
+            yield self._closure_steps(element.element_payload, closures)
+            selector = closures[0]
+
+            def handle_selector(v):  # type: (list) -> Any
+                return _interact_selector(
+                    v[SLOT_INTERACT][INTERACT_TYPE_SELECTOR], selector(v)
+                )
+
+            result.append(handle_selector)
+            return
+        if isinstance(element, ExpressionScore):
+            yield self._closures_steps(element.element_payload[:2], closures)
+            target, scoreboard = closures
+
+            def handle_score(v):  # type: (list) -> Any
+                return _interact_score(
+                    v[SLOT_INTERACT][INTERACT_TYPE_SCORE], target(v), scoreboard(v)
+                )
+
+            result.append(handle_score)
+            return
+        if isinstance(element, ExpressionReference):
+            yield self._closure_steps(element.element_payload[1], closures)
+            index = closures[0]
+            if element.element_payload[0] == TYPE_ENUM_INT:
+                ref_type = REF_TYPE_INT
+            elif element.element_payload[0] == TYPE_ENUM_BOOL:
+                ref_type = REF_TYPE_BOOL
+            elif element.element_payload[0] == TYPE_ENUM_FLOAT:
+                ref_type = REF_TYPE_FLOAT
+            else:
+                ref_type = REF_TYPE_STR
+
+            def handle_ref(v):  # type: (list) -> Any
+                return _interact_ref(v[SLOT_INTERACT][INTERACT_TYPE_REF], index(v), ref_type)
+
+            result.append(handle_ref)
+            return
+
+        raise Exception(
+            "ClosureRunner: Unknown expression element {}".format(element)
+        )
+
+    def _condition_steps(
+        self, code_block, in_loop, result
+    ):  # type: (OpcodeCondition, bool, list[Callable[[list], int]]) -> Iterator[Iterator[Any]]
+        """
+        _condition_steps 将给出的条件语句编译为闭包，
+        并将其追加到 result 的末尾
+
+        Args:
+            code_block (OpcodeCondition):
+                要编译的条件语句
+            in_loop (bool):
+                该条件语句是否位于循环体中
+            result (list[Callable[[list], int]]):
+                用于储存闭包的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译该条件语句的生成器
+        """
+        branches = (
+            []
+        )  # type: list[tuple[Callable[[list], Any] | None, Callable[[list], int], CheckPoint | None]]
+
+        for i in code_block.opcode_payload:
+            bodies = []  # type: list[Callable[[list], int]]
+            yield self._code_block_list_steps(
+                i.code_block, in_loop, CHECK_POINT_TYPE_CONDITION, i.state_line, bodies
+            )
+            if i.condition is None:
+                branches.append((None, bodies[0], None))
+                break
+            chk = CheckPoint(CHECK_POINT_TYPE_CONDITION, 0, 0, [i.state_line])
+            conditions = []  # type: list[Callable[[list], Any]]
+            yield self._closure_steps(i.condition, conditions)
+            branches.append((conditions[0], bodies[0], chk))
+
+        if len(branches) == 1 and branches[0][0] is not None:
+            condition, body, chk = branches[0]
+
+            def handle_if(v):  # type: (list) -> int
+                try:
+                    temp = condition(v)  # type: ignore
+                except InternalException:
+                    raise
+                except Exception as e:
+                    fast_panic(chk, str(e))  # type: ignore
+                    raise Exception("unreachable")
+                if temp:
+                    return body(v)
+                return STATUS_NORMAL
+
+            result.append(handle_if)
+            return
+
+        def handle_condition(v):  # type: (list) -> int
+            for condition, body, chk in branches:
+                if condition is None:
+                    return body(v)
+                try:
+                    temp = condition(v)
+                except InternalException:
+                    raise
+                except Exception as e:
+                    fast_panic(chk, str(e))  # type: ignore
+                    raise Exception("unreachable")
+                if temp:
+                    return body(v)
+            return STATUS_NORMAL
+
+        result.append(handle_condition)
+
+    def _for_loop_steps(
+        self, code_block, result
+    ):  # type: (OpcodeForLoop, list[Callable[[list], int]]) -> Iterator[Iterator[Any]]
+        """
+        _for_loop_steps 将给出的循环语句编译为闭包，
+        并将其追加到 result 的末尾
+
+        Args:
+            code_block (OpcodeForLoop):
+                要编译的循环语句
+            result (list[Callable[[list], int]]):
+                用于储存闭包的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译该循环语句的生成器
+        """
+        assert code_block.opcode_payload is not None
+        for_loop = code_block.opcode_payload
+        slot = self._var_slot(for_loop.variable)
+        chk = CheckPoint(CHECK_POINT_TYPE_FOR_LOOP, 0, 0, [for_loop.state_line])
+        closures = []  # type: list[Callable[[list], Any]]
+        yield self._closure_steps(for_loop.repeat_times, closures)
+        yield self._code_block_list_steps(
+            for_loop.code_block,
+            True,
+            CHECK_POINT_TYPE_FOR_LOOP,
+            for_loop.state_line,
+            closures,
+        )
+        repeat_times, body = closures
+
+        def handle_for_loop(v):  # type: (list) -> int
+            try:
+                temp = repeat_times(v)
+                if isinstance(temp, bool) or not isinstance(temp, int):
+                    raise Exception("The repeat times of for loop must be int")
+            except InternalException:
+                raise
+            except Exception as e:
+                fast_panic(chk, str(e))
+                raise Exception("unreachable")
+            for i in range(temp):
+                v[slot] = i
+                status = body(v)
+                if status:
+                    if status == STATUS_BREAK:
+                        break
+                    if status == STATUS_RETURN:
+                        return status
+            return STATUS_NORMAL
+
+        result.append(handle_for_loop)
+
+    def _code_block_steps(
+        self, code_block, in_loop, chk, result
+    ):  # type: (OpcodeBase, bool, CheckPoint, list[Callable[[list], int]]) -> Iterator[Iterator[Any]]
+        """
+        _code_block_steps 将给出的代码块编译为闭包，
+        并将其追加到 result 的末尾
+
+        Args:
+            code_block (OpcodeBase):
+                待处理的代码块
+            in_loop (bool):
+                该代码块是否位于循环体中
+            chk (CheckPoint):
+                该代码块出错时所使用的检查点。
+                它与 CodeCompiler 为同一行代码产生的检查点具有相同的类型和负载
+            result (list[Callable[[list], int]]):
+                用于储存闭包的列表
+
+        Raises:
+            Exception:
+                如果给出的代码块未知，
+                则抛出相应的错误
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译该代码块的生成器
+        """
+        if isinstance(code_block, OpcodeCondition):
+            yield self._condition_steps(code_block, in_loop, result)
+            return
+        if isinstance(code_block, OpcodeForLoop):
+            yield self._for_loop_steps(code_block, result)
+            return
+
+        if isinstance(code_block, (OpcodeContinue, OpcodeBreak)):
+            if not in_loop:
+                if isinstance(code_block, OpcodeContinue):
+                    err = "Continue statement only accepted under for loop code block"
+                else:
+                    err = "Break statement only accepted under for loop code block"
+
+                def handle_panic(v):  # type: (list) -> int
+                    fast_panic(chk, err)
+                    raise Exception("unreachable")
+
+                result.append(handle_panic)
+                return
+
+            status = (
+                STATUS_CONTINUE
+                if isinstance(code_block, OpcodeContinue)
+                else STATUS_BREAK
+            )
+
+            def handle_jump(v):  # type: (list) -> int
+                return status
+
+            result.append(handle_jump)
+            return
+
+        values = []  # type: list[Callable[[list], Any]]
+        if isinstance(code_block, OpcodeAssign):
+            slot = self._var_slot(code_block.opcode_payload[0])
+            yield self._closure_steps(code_block.opcode_payload[1], values)
+        elif isinstance(code_block, (OpcodeExpression, OpcodeReturn)):
+            slot = SLOT_RESULT
+            yield self._closure_steps(code_block.opcode_payload, values)  # type: ignore
+        else:
+            raise Exception("ClosureRunner: Unknown opcode {}".format(code_block))
+        value = values[0]
+
+        if isinstance(code_block, OpcodeReturn):
+
+            def handle_return(v):  # type: (list) -> int
+                try:
+                    v[SLOT_RESULT] = value(v)
+                except InternalException:
+                    raise
+                except Exception as e:
+                    fast_panic(chk, str(e))
+                return STATUS_RETURN
+
+            result.append(handle_return)
+            return
+
+        def handle_store(v):  # type: (list) -> int
+            try:
+                v[slot] = value(v)
+            except InternalException:
+                raise
+            except Exception as e:
+                fast_panic(chk, str(e))
+            return STATUS_NORMAL
+
+        result.append(handle_store)
+
+    def _code_block_list_steps(
+        self,
+        code_block_list,  # type: list[OpcodeBase]
+        in_loop,  # type: bool
+        parent_type,  # type: int
+        parent_line,  # type: str
+        result,  # type: list[Callable[[list], int]]
+    ):  # type: (...) -> Iterator[Iterator[Any]]
+        """
+        _code_block_list_steps 将一系列代码块编译为一个闭包，
+        并将其追加到 result 的末尾
+
+        Args:
+            code_block_list (list[OpcodeBase]):
+                待处理的代码块
+            in_loop (bool):
+                这些代码块是否位于循环体中
+            parent_type (int):
+                这些代码块的检查点类型。只可能为下列之一。
+                    - CHECK_POINT_TYPE_NORMAL: 它们不位于条件语句或循环语句中
+                    - CHECK_POINT_TYPE_CONDITION: 它们位于条件语句中
+                    - CHECK_POINT_TYPE_FOR_LOOP: 它们位于循环语句中
+            parent_line (str):
+                包含这些代码块的条件语句或循环语句的起始行。
+                对于 CHECK_POINT_TYPE_NORMAL，该参数被忽略
+            result (list[Callable[[list], int]]):
+                用于储存闭包的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译这些代码块的生成器
+        """
+        closures = []  # type: list[Callable[[list], int]]
+
+        for i in code_block_list:
+            if parent_type == CHECK_POINT_TYPE_NORMAL:
+                payload = [i.origin_line]
+            else:
+                payload = [parent_line, i.origin_line]
+            chk = CheckPoint(parent_type, 0, 0, payload)  # type: ignore
+            yield self._code_block_steps(i, in_loop, chk, closures)
+
+        if len(closures) == 0:
+
+            def empty(v):  # type: (list) -> int
+                return STATUS_NORMAL
+
+            result.append(empty)
+            return
+
+        if len(closures) == 1:
+            result.append(closures[0])
+            return
+
+        def sequence(v):  # type: (list) -> int
+            for i in closures:
+                status = i(v)
+                if status:
+                    return status
+            return STATUS_NORMAL
+
+        result.append(sequence)
+
+    def running(
+        self,
+        require_return=True,  # type: bool
+        var_maps=EMPTY_VARIABLES,  # type: dict[str, int | bool | float | str]
+        interact=EMPTY_GAME_INTERACT,  # type: GameInteract
+        builtins=EMPTY_BUILTIN_FUNCTION,  # type: BuiltInFunction
+    ):  # type: (...) -> int | bool | float | str | None
+        """
+        running 通过执行已编译的闭包来运行代码。
+        它与 CodeRunner.running 具有相同的参数、返回值和错误报告
+
+        Args:
+            require_return (bool, optional):
+                是否检查这些代码是否返回值。
+                如果为真且没有返回值，则抛出异常。
+                默认值为 True
+            var_maps (dict[str, int | bool | float | str], optional):
+                运行代码前已经初始化的变量。
+                默认值为 EMPTY_VARIABLES
+            interact (GameInteract, optional):
+                用于与 Minecraft 进行交互的接口。
+                默认值为 EMPTY_GAME_INTERACT
+            builtins (BuiltInFunction, optional):
+                外部函数提供者为用户定义的内建函数。
+                默认值为 EMPTY_BUILTIN_FUNCTION
+
+        Returns:
+            int | bool | float | str | None:
+                运行代码时所得的返回值
+        """
+        if self._fallback is not None:
+            return self._fallback.running(require_return, var_maps, interact, builtins)
+
+        variables = [bind_interact(interact), builtins, None] + [
+            None
+        ] * self._map.variables_count()  # type: list[Any]
+
+        for key, value in var_maps.items():
+            index = self._map.index_by_name(key, True)
+            if index is not None:
+                variables[index + SLOT_VARIABLES] = value
+
+        self._program(variables)  # type: ignore
+
+        result = variables[SLOT_RESULT]
+        if require_return and result is None:
+            raise Exception("Runtime Error: No return value after running the code")
+        return result
@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 from __future__ import division
 
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Iterator
+
 from .define import (
     BYTECODE_LOAD_CONST,
     BYTECODE_LOAD_VALUE,
@@ -20,6 +24,20 @@ from .define import (
     BYTECODE_STORE_RETURN_VAL,
     BYTECODE_PROGRAM_STOP_RUN,
     BYTECODE_INTERNAL_PANIC,
+    BYTECODE_INT_ADD,
+    BYTECODE_INT_REMOVE,
+    BYTECODE_INT_TIMES,
+    BYTECODE_STR_CONCAT,
+    BYTECODE_INT_EQUAL,
+    BYTECODE_INT_NOT_EQUAL,
+    BYTECODE_INT_LESS_THAN,
+    BYTECODE_INT_GREATER_THAN,
+    BYTECODE_INT_LESS_EQUAL,
+    BYTECODE_INT_GREATER_EQUAL,
+    BYTECODE_APPEND_VALUE,
+    BYTECODE_LOAD_BUFFER,
+    BYTECODE_FOR_PREPARE,
+    BYTECODE_FOR_RANGE,
     LOOP_CHECK_TYPE_DATA_TYPE,
     LOOP_CHECK_TYPE_POP_STACK,
     COMPUTE_TYPE_ADD,
@@ -93,6 +111,7 @@ from ..parser.expression.compute import (
     ExpressionDivide,
 )
 from ..parser.expression.combine import ExpressionCombine
+from ..parser.steps import NO_STEPS, run_steps
 from ..parser.define import (
     OpcodeBase,
     OpcodeAssign,
@@ -103,6 +122,20 @@ from ..parser.define import (
     OpcodeExpression,
     OpcodeReturn,
 )
+from .infer import TypeInferrer, INFER_EXACT_INT, INFER_INT_LIKE, INFER_NUMBER
+from .partial import PartialEvaluator
+
+SPECIALIZED_OPCODES = [
+    (ExpressionAdd, BYTECODE_INT_ADD),
+    (ExpressionRemove, BYTECODE_INT_REMOVE),
+    (ExpressionTimes, BYTECODE_INT_TIMES),
+    (ExpressionEqual, BYTECODE_INT_EQUAL),
+    (ExpressionNotEqual, BYTECODE_INT_NOT_EQUAL),
+    (ExpressionLessThan, BYTECODE_INT_LESS_THAN),
+    (ExpressionGreaterThan, BYTECODE_INT_GREATER_THAN),
+    (ExpressionLessEqual, BYTECODE_INT_LESS_EQUAL),
+    (ExpressionGreaterEqual, BYTECODE_INT_GREATER_EQUAL),
+]  # type: list[tuple[type, int]]
 
 
 class ForLoopEnv:
@@ -183,19 +216,80 @@ class CodeCompiler:
     _ans = []  # type: list[int | bool | float | str]
     _chk = []  # type: list[CheckPoint]
     _map = VariableMapping()  # type: VariableMapping
+    _specialize = False  # type: bool
+    _hoist = False  # type: bool
+    _total_funcs = set()  # type: set[str]
+    _pure_score = False  # type: bool
+    _accumulate = False  # type: bool
+    _range_loop = False  # type: bool
+    _types = None  # type: dict[int, int | None] | None
+    _hoisted = {}  # type: dict[int, int]
+    _buffered = set()  # type: set[str]
+    _contexts = {}  # type: dict[int, tuple[OpcodeBase, int, str]]
 
-    def __init__(self, code_block=[]):  # type: (list[OpcodeBase]) -> None
+    def __init__(
+        self,
+        code_block=[],  # type: list[OpcodeBase]
+        specialize=False,  # type: bool
+        hoist=False,  # type: bool
+        total_funcs=[],  # type: list[str]
+        pure_score=False,  # type: bool
+        accumulate=False,  # type: bool
+        range_loop=False,  # type: bool
+    ):  # type: (...) -> None
         """初始化并返回一个新的编译器
 
         Args:
             code_block (list[OpcodeBase], optional):
                 CodeParser 的编译结果
                 默认值为空列表
+            specialize (bool, optional):
+                是否根据 TypeInferrer 推导所得的类型，
+                为 int 的运算与比较以及 str 的拼接生成特化的字节码，
+                并省去循环次数已被证明为 int 的循环语句的类型检查。
+                默认值为 False
+            hoist (bool, optional):
+                是否将循环体中不依赖于循环内被赋值的变量，
+                且求值时不会出错、没有副作用的表达式提升到循环语句之前，
+                并将其求值结果储存在编译器生成的临时变量中。
+                默认值为 False
+            total_funcs (list[str], optional):
+                对任何参数都不会抛出错误的纯函数的名称。
+                它们没有副作用，且其结果只取决于参数，
+                因此只有它们的调用才可能被提升。
+                BuiltInFunction 的纯函数只保证结果可被缓存，
+                它们仍可能抛出错误，因此不应直接用作此参数。
+                默认值为空列表
+            pure_score (bool, optional):
+                是否认为 score 没有副作用且其结果在程序运行期间不变。
+                若为真，则参数均为 str 的 score 也可能被提升。
+                默认值为 False
+            accumulate (bool, optional):
+                是否将循环体中形如 x = x + ... 且 x 已被证明为 str 的赋值
+                编译为 APPEND_VALUE，从而使用列表缓冲区在线性时间内拼接字符串。
+                这些变量的读取将被编译为 LOAD_BUFFER，
+                它只在变量被读取时才合并缓冲区。
+                默认值为 False
+            range_loop (bool, optional):
+                是否将循环语句编译为 FOR_PREPARE 和 FOR_RANGE。
+                它们将循环次数的 range 迭代器保存在隐藏的变量中，
+                因此循环头部不再需要操作栈。
+                默认值为 False
         """
         self._ast = code_block if len(code_block) > 0 else []
         self._ans = []
         self._chk = []
         self._map = VariableMapping()
+        self._specialize = specialize
+        self._hoist = hoist
+        self._total_funcs = set(total_funcs)
+        self._pure_score = pure_score
+        self._accumulate = accumulate
+        self._range_loop = range_loop
+        self._types = None
+        self._hoisted = {}
+        self._buffered = set()
+        self._contexts = {}
 
     def _get_line_code(self, opcode):  # type: (OpcodeBase) -> str | None
         """_get_line_code 返回 opcode 对应的源代码行
@@ -221,22 +315,58 @@ class CodeCompiler:
         else:
             return None
 
+    def _add_check_point(
+        self, opcode, point_type, state_line, start_pc
+    ):  # type: (OpcodeBase, int, str, int) -> None
+        """
+        _add_check_point 为刚刚编译完成的 opcode 添加检查点。
+        条件语句和循环语句本身没有检查点。
+
+        如果 opcode 来自被 PartialEvaluator 内联的条件代码块或被展开的循环语句，
+        则检查点将沿用它在原有的语法树中所处的条件语句或循环语句
+
+        Args:
+            opcode (OpcodeBase): 刚刚被编译的操作码实例
+            point_type (int): 检查点的类型
+            state_line (str):
+                opcode 所处的条件语句或循环语句的源代码行。
+                point_type 为 CHECK_POINT_TYPE_NORMAL 时不被使用
+            start_pc (int): opcode 的字节码的起始位置
+        """
+        line_code = self._get_line_code(opcode)
+        if line_code is None:
+            return
+        context = self._contexts.get(id(opcode))
+        if context is not None and context[0] is opcode:
+            point_type, state_line = context[1], context[2]
+        payload = [line_code]
+        if point_type != CHECK_POINT_TYPE_NORMAL:
+            payload = [state_line, line_code]
+        self._chk.append(
+            CheckPoint(point_type, start_pc, len(self._ans) - 1, payload)
+        )
+
     def _handle_literal(self, element):  # type: (ExpressionLiteral) -> None
         """
         _handle_literal 将一个字面量表达式元素编译为字节码。
-        可以保证这些字节码执行完成后，栈的顶部是它的求值结果
+        可以保证这些字节码执行完成后，栈的顶部是它的求值结果。
+
+        对于强制类型转换，_handle_literal 只生成类型转换的字节码，
+        被转换的复杂表达式应已由调用者编译
 
         Args:
             element (ExpressionLiteral):
                 待处理的字面量表达式元素
         """
         if element.element_id == ELEMENT_ID_VAR:
-            self._ans.append(BYTECODE_LOAD_VALUE)
+            if element.element_payload in self._buffered:
+                self._ans.append(BYTECODE_LOAD_BUFFER)
+            else:
+                self._ans.append(BYTECODE_LOAD_VALUE)
             self._ans.append(self._map.index_by_name(element.element_payload))  # type: ignore
             return
 
         if isinstance(element.element_payload, ExpressionCombine):
-            self._handle_element(element.element_payload)
             if element.element_id == ELEMENT_ID_INT:
                 self._ans.append(BYTECODE_HANDLE_CAST)
                 self._ans.append(CAST_TYPE_INT)
@@ -254,25 +384,123 @@ class CodeCompiler:
         self._ans.append(BYTECODE_LOAD_CONST)
         self._ans.append(element.element_payload)
 
+    def _specialized_opcode(self, element):  # type: (ExpressionElement) -> int | None
+        """
+        _specialized_opcode 检查一个表达式元素是否可以被编译为特化的字节码
+
+        Args:
+            element (ExpressionElement):
+                待检查的表达式元素
+
+        Returns:
+            int | None:
+                如果可以，则返回用于计算它的特化字节码，
+                也即 int 的运算与比较，或 BYTECODE_STR_CONCAT；
+                否则返回 None
+        """
+        if not self._specialize or self._types is None:
+            return None
+        opcodes = [j for i, j in SPECIALIZED_OPCODES if isinstance(element, i)]
+        if len(opcodes) == 0 or len(element.element_payload) < 2:
+            return None
+        types = [self._types.get(id(i)) for i in element.element_payload]
+
+        if all(i in INFER_INT_LIKE for i in types):
+            return opcodes[0]
+        if isinstance(element, ExpressionAdd) and all(i == TYPE_ENUM_STR for i in types):
+            return BYTECODE_STR_CONCAT
+        return None
+
     def _handle_element(self, element):  # type: (ExpressionElement) -> None
         """
         _handle_element 将一个表达式元素编译为对应的字节码。
-        可以保证这些字节码执行完成后，栈的顶部是它的求值结果
+        可以保证这些字节码执行完成后，栈的顶部是它的求值结果。
+
+        表达式元素通过 run_steps 以显式栈编译，
+        因此嵌套的深度不受 Python 递归深度的限制
+
+        Args:
+            element (ExpressionElement):
+                待处理的表达式元素
+        """
+        run_steps(self._element_steps(element))
+
+    def _element_steps(
+        self, element
+    ):  # type: (ExpressionElement) -> Iterator[Iterator[Any]]
+        """
+        _element_steps 返回编译给出的表达式元素的子步骤。
+
+        变量和常量没有子元素，因此它们的字节码会被立即生成，
+        并且返回的子步骤为 NO_STEPS。
+        否则，返回的子步骤由 _compound_steps 给出
+
+        Args:
+            element (ExpressionElement):
+                待处理的表达式元素
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译该表达式元素的子步骤
+        """
+        # Compile the wrapped element directly, since
+        # the complex expression itself produces no byte code
+        while isinstance(element, ExpressionCombine):
+            element = element.element_payload[0]
+        if (
+            isinstance(element, ExpressionLiteral)
+            and not isinstance(element.element_payload, ExpressionCombine)
+            and id(element) not in self._hoisted
+        ):
+            self._handle_literal(element)
+            return NO_STEPS
+        return self._compound_steps(element)
+
+    def _compound_steps(
+        self, element
+    ):  # type: (ExpressionElement) -> Iterator[Iterator[Any]]
+        """
+        _compound_steps 是 _handle_element 的生成器形式。
+        它产出编译各个子元素的子步骤，
+        并在子元素的字节码之间和之后生成该表达式元素自身的字节码
 
         Args:
             element (ExpressionElement):
                 待处理的表达式元素
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译该表达式元素的生成器
         """
+        if id(element) in self._hoisted:
+            self._ans.append(BYTECODE_LOAD_VALUE)
+            self._ans.append(self._hoisted[id(element)])
+            return
+
+        opcode = self._specialized_opcode(element)
+        if opcode == BYTECODE_STR_CONCAT:
+            for i in element.element_payload:
+                yield self._element_steps(i)
+            self._ans.append(BYTECODE_STR_CONCAT)
+            self._ans.append(len(element.element_payload))
+            return
+        if opcode is not None:
+            # The int computation never fails, so it is done
+            # as soon as the operand is ready
+            yield self._element_steps(element.element_payload[0])
+            for i in element.element_payload[1:]:
+                yield self._element_steps(i)
+                self._ans.append(opcode)
+            return
+
         if isinstance(element, ExpressionLiteral):
+            if isinstance(element.element_payload, ExpressionCombine):
+                yield self._element_steps(element.element_payload)
             self._handle_literal(element)
-        elif isinstance(element, ExpressionCombine):
-            self._handle_element(element.element_payload[0])
         elif isinstance(
             element,
             (ExpressionAdd, ExpressionRemove, ExpressionTimes, ExpressionDivide),
         ):
             for i in element.element_payload:
-                self._handle_element(i)
+                yield self._element_steps(i)
             self._ans.append(BYTECODE_HANDLE_COMPUTE)
             self._ans.append(len(element.element_payload))
             if isinstance(element, ExpressionAdd):
@@ -295,8 +523,8 @@ class CodeCompiler:
                 ExpressionGreaterEqual,
             ),
         ):
-            self._handle_element(element.element_payload[0])
-            self._handle_element(element.element_payload[1])
+            yield self._element_steps(element.element_payload[0])
+            yield self._element_steps(element.element_payload[1])
             if isinstance(element, ExpressionEqual):
                 self._ans.append(BYTECODE_HANDLE_COMPARE)
                 self._ans.append(COMPARE_TYPE_EQUAL)
@@ -323,7 +551,7 @@ class CodeCompiler:
             self._ans.append(True)
             # Handle each logic
             for i in element.element_payload:
-                self._handle_element(i)
+                yield self._element_steps(i)
                 self._ans.append(BYTECODE_HANDLE_LOGIC_ANDOR)
                 self._ans.append(LOGIC_ANDOR_TYPE_AND)
                 self._ans.append(BYTECODE_FALSE_JUMP)
@@ -340,7 +568,7 @@ class CodeCompiler:
             self._ans.append(False)
             # Handle each logic
             for i in element.element_payload:
-                self._handle_element(i)
+                yield self._element_steps(i)
                 self._ans.append(BYTECODE_HANDLE_LOGIC_ANDOR)
                 self._ans.append(LOGIC_ANDOR_TYPE_OR)
                 self._ans.append(BYTECODE_TRUE_JUMP)
@@ -352,38 +580,38 @@ class CodeCompiler:
                 self._ans[i] = end_index
 
         elif isinstance(element, ExpressionInverse):
-            self._handle_element(element.element_payload[0])
+            yield self._element_steps(element.element_payload[0])
             self._ans.append(BYTECODE_HANDLE_LOGIC_INNOT)
             self._ans.append(LOGIC_INNOT_TYPE_NOT)
         elif isinstance(element, ExpressionIn):
-            self._handle_element(element.element_payload[0])
-            self._handle_element(element.element_payload[1])
+            yield self._element_steps(element.element_payload[0])
+            yield self._element_steps(element.element_payload[1])
             self._ans.append(BYTECODE_HANDLE_LOGIC_INNOT)
             self._ans.append(LOGIC_INNOT_TYPE_IN)
 
         elif isinstance(element, ExpressionFunction):
             for i in element.element_payload[1]:
-                self._handle_element(i)
+                yield self._element_steps(i)
             self._ans.append(BYTECODE_HANDLE_FUNC)
             self._ans.append(len(element.element_payload[1]))
             self._ans.append(element.element_payload[0])
         elif isinstance(element, ExpressionCommand):
             assert element.element_payload is not None
-            self._handle_element(element.element_payload)
+            yield self._element_steps(element.element_payload)
             self._ans.append(BYTECODE_HANDLE_INTERACT)
             self._ans.append(INTERACT_TYPE_COMMAND)
         elif isinstance(element, ExpressionSelector):
             assert element.element_payload is not None
-            self._handle_element(element.element_payload)
+            yield self._element_steps(element.element_payload)
             self._ans.append(BYTECODE_HANDLE_INTERACT)
             self._ans.append(INTERACT_TYPE_SELECTOR)
         elif isinstance(element, ExpressionScore):
-            self._handle_element(element.element_payload[0])
-            self._handle_element(element.element_payload[1])
+            yield self._element_steps(element.element_payload[0])
+            yield self._element_steps(element.element_payload[1])
             self._ans.append(BYTECODE_HANDLE_INTERACT)
             self._ans.append(INTERACT_TYPE_SCORE)
         elif isinstance(element, ExpressionReference):
-            self._handle_element(element.element_payload[1])
+            yield self._element_steps(element.element_payload[1])
             self._ans.append(BYTECODE_HANDLE_INTERACT)
             self._ans.append(INTERACT_TYPE_REF)
             if element.element_payload[0] == TYPE_ENUM_INT:
@@ -395,11 +623,101 @@ class CodeCompiler:
             elif element.element_payload[0] == TYPE_ENUM_STR:
                 self._ans.append(REF_TYPE_STR)
 
-    def _handle_condition(
+    def _handle_branch_leaf(self, element, jump_if):  # type: (ExpressionElement, bool) -> int
+        """
+        _handle_branch_leaf 求值给出的表达式元素，
+        并在其真值与 jump_if 相同时跳转
+
+        Args:
+            element (ExpressionElement):
+                待处理的表达式元素
+            jump_if (bool):
+                发生跳转时表达式元素的真值
+
+        Returns:
+            int: 跳转目标在字节码中的位置，它需要由调用者回填
+        """
+        self._handle_element(element)
+        self._ans.append(BYTECODE_TRUE_JUMP if jump_if else BYTECODE_FALSE_JUMP)
+        self._ans.append(0)
+        return len(self._ans) - 1
+
+    def _handle_branch(self, element, jump_if):  # type: (ExpressionElement, bool) -> list[int]
+        """
+        _handle_branch 将一个表达式元素作为跳转条件编译为字节码。
+        当它的真值与 jump_if 相同时跳转，否则继续向下执行。
+
+        与 _handle_element 不同，and/or/not 不会在栈上构造中间结果，
+        而是直接跳转到对应的分支。
+        这些字节码执行完成后 (无论是否跳转)，栈的状态保持不变
+
+        Args:
+            element (ExpressionElement):
+                待处理的表达式元素
+            jump_if (bool):
+                发生跳转时表达式元素的真值
+
+        Returns:
+            list[int]: 所有跳转目标在字节码中的位置，它们需要由调用者回填
+        """
+        jump_indexes = []  # type: list[int]
+        run_steps(self._branch_steps(element, jump_if, jump_indexes))
+        return jump_indexes
+
+    def _branch_steps(
+        self, element, jump_if, jump_indexes
+    ):  # type: (ExpressionElement, bool, list[int]) -> Iterator[Iterator[Any]]
+        """
+        _branch_steps 是 _handle_branch 的生成器形式。
+        它产出编译 and/or/not 的各个子元素的子步骤
+
+        Args:
+            element (ExpressionElement):
+                待处理的表达式元素
+            jump_if (bool):
+                发生跳转时表达式元素的真值
+            jump_indexes (list[int]):
+                用于储存所有需要由调用者回填的跳转目标的位置
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译该跳转条件的生成器
+        """
+        while isinstance(element, ExpressionCombine):
+            element = element.element_payload[0]
+
+        if id(element) in self._hoisted:
+            jump_indexes.append(self._handle_branch_leaf(element, jump_if))
+            return
+
+        if isinstance(element, ExpressionInverse):
+            yield self._branch_steps(element.element_payload[0], not jump_if, jump_indexes)
+            return
+
+        if isinstance(element, (ExpressionAnd, ExpressionOr)):
+            # The and chain is decided once a logic is false,
+            # and the or chain is decided once a logic is true
+            decide_if = isinstance(element, ExpressionOr)
+            jump_end_indexes = []  # type: list[int]
+            for i in element.element_payload[:-1]:
+                if decide_if == jump_if:
+                    yield self._branch_steps(i, decide_if, jump_indexes)
+                else:
+                    yield self._branch_steps(i, decide_if, jump_end_indexes)
+            yield self._branch_steps(element.element_payload[-1], jump_if, jump_indexes)
+            # Handle jump end
+            end_index = len(self._ans)
+            for i in jump_end_indexes:
+                self._ans[i] = end_index
+            return
+
+        jump_indexes.append(self._handle_branch_leaf(element, jump_if))
+
+    def _condition_steps(
         self, code_block, for_loop_env
-    ):  # type: (OpcodeCondition, ForLoopEnv | None) -> None
+    ):  # type: (OpcodeCondition, ForLoopEnv | None) -> Iterator[Iterator[Any]]
         """
-        _handle_condition 将给出的条件语句编译为字节码
+        _condition_steps 将给出的条件语句编译为字节码。
+        它是一个生成器，产出编译各个条件代码块中语句的子步骤
 
         Args:
             code_block (OpcodeCondition):
@@ -407,6 +725,9 @@ class CodeCompiler:
             for_loop_env (ForLoopEnv | None):
                 该条件语句所在循环语句的上下文环境。
                 若它不位于循环体中，请设置为 None
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译该条件语句的生成器
         """
         # Jump end for all branches
         jump_end_indexes = []
@@ -416,64 +737,293 @@ class CodeCompiler:
             if i.condition is None:
                 for j in i.code_block:
                     start_pc = len(self._ans)
-                    self._handle_code_block(j, for_loop_env)
-                    line_code = self._get_line_code(j)
-                    if line_code is not None:
-                        self._chk.append(
-                            CheckPoint(
-                                CHECK_POINT_TYPE_CONDITION,
-                                start_pc,
-                                len(self._ans) - 1,
-                                [i.state_line, line_code],
-                            )
-                        )
+                    yield self._code_block_steps(j, for_loop_env)
+                    self._add_check_point(
+                        j, CHECK_POINT_TYPE_CONDITION, i.state_line, start_pc
+                    )
                 break
 
             # Handle condition and jump false
             start_pc = len(self._ans)
-            self._handle_element(i.condition)
-            self._ans.append(BYTECODE_FALSE_JUMP)
-            self._ans.append(0)
-            false_jump = len(self._ans) - 1
+            false_jumps = []  # type: list[int]
+            yield self._branch_steps(i.condition, False, false_jumps)
             self._chk.append(
                 CheckPoint(
-                    CHECK_POINT_TYPE_CONDITION, start_pc, false_jump, [i.state_line]
+                    CHECK_POINT_TYPE_CONDITION,
+                    start_pc,
+                    len(self._ans) - 1,
+                    [i.state_line],
                 )
             )
 
             # Handle code block
             for j in i.code_block:
                 start_pc = len(self._ans)
-                self._handle_code_block(j, for_loop_env)
-                line_code = self._get_line_code(j)
-                if line_code is not None:
-                    self._chk.append(
-                        CheckPoint(
-                            CHECK_POINT_TYPE_CONDITION,
-                            start_pc,
-                            len(self._ans) - 1,
-                            [i.state_line, line_code],
-                        )
-                    )
+                yield self._code_block_steps(j, for_loop_env)
+                self._add_check_point(
+                    j, CHECK_POINT_TYPE_CONDITION, i.state_line, start_pc
+                )
 
             # Handle false jump and jump end
             self._ans.append(BYTECODE_DIRECT_JUMP)
             self._ans.append(0)
             jump_end_indexes.append(len(self._ans) - 1)
-            self._ans[false_jump] = len(self._ans)
+            for index in false_jumps:
+                self._ans[index] = len(self._ans)
 
         # Set the pc for all jump end
         end_index = len(self._ans)
         for index in jump_end_indexes:
             self._ans[index] = end_index
 
-    def _handle_for_loop(self, code_block):  # type: (OpcodeForLoop) -> None
+    def _assigned_names(self, code_block, names):  # type: (OpcodeBase, set[str]) -> None
+        """
+        _assigned_names 收集给出的代码块中所有被赋值的变量，
+        这包括循环语句的循环变量
+
+        Args:
+            code_block (OpcodeBase): 目标代码块
+            names (set[str]): 用于储存变量名的集合
+        """
+        stack = [code_block]  # type: list[OpcodeBase]
+        while len(stack) > 0:
+            code_block = stack.pop()
+            if isinstance(code_block, OpcodeAssign):
+                names.add(code_block.opcode_payload[0])
+            elif isinstance(code_block, OpcodeCondition):
+                for i in code_block.opcode_payload:
+                    stack.extend(i.code_block)
+            elif isinstance(code_block, OpcodeForLoop):
+                assert code_block.opcode_payload is not None
+                names.add(code_block.opcode_payload.variable)
+                stack.extend(code_block.opcode_payload.code_block)
+
+    def _is_invariant(self, element, assigned):  # type: (ExpressionElement, set[str]) -> bool
         """
-        _handle_for_loop 将给出的循环语句编译为字节码
+        _is_invariant 在给出的表达式元素的所有子元素都可以被提升的前提下，
+        检查该表达式元素自身是否可以被提升到循环语句之前。
+        这要求它不读取 assigned 中的变量，没有副作用，
+        并且根据推导所得的类型，它的求值不可能出错
+
+        Args:
+            element (ExpressionElement): 目标表达式元素
+            assigned (set[str]): 在循环中被赋值的变量
+
+        Returns:
+            bool: 该表达式元素是否可以被提升
+        """
+        assert self._types is not None
+        types = [self._types.get(id(i)) for i in self._element_children(element)]
+
+        if isinstance(element, ExpressionCombine):
+            return True
+        if isinstance(element, ExpressionLiteral):
+            if element.element_id == ELEMENT_ID_VAR:
+                # The variable of which type is known must be assigned
+                return (
+                    element.element_payload not in assigned
+                    and self._types.get(id(element)) is not None
+                )
+            if not isinstance(element.element_payload, ExpressionCombine):
+                return True
+            if element.element_id == ELEMENT_ID_INT:
+                return types[0] in INFER_INT_LIKE
+            if element.element_id == ELEMENT_ID_FLOAT:
+                return types[0] == TYPE_ENUM_FLOAT
+            return types[0] is not None
+
+        if isinstance(element, (ExpressionAdd, ExpressionRemove, ExpressionTimes)):
+            # The division may fail, and the int which mixes with the float
+            # or repeats the str may overflow
+            result = types[0]
+            for i in types[1:]:
+                if result in INFER_INT_LIKE and i in INFER_INT_LIKE:
+                    result = TYPE_ENUM_INT
+                elif result != i or result not in (TYPE_ENUM_FLOAT, TYPE_ENUM_STR):
+                    return False
+                elif result == TYPE_ENUM_STR and not isinstance(element, ExpressionAdd):
+                    return False
+            return True
+        if isinstance(element, (ExpressionEqual, ExpressionNotEqual)):
+            return None not in types
+        if isinstance(
+            element,
+            (
+                ExpressionLessThan,
+                ExpressionGreaterThan,
+                ExpressionLessEqual,
+                ExpressionGreaterEqual,
+            ),
+        ):
+            return all(i in INFER_NUMBER for i in types) or all(
+                i == TYPE_ENUM_STR for i in types
+            )
+        if isinstance(element, ExpressionIn):
+            return all(i == TYPE_ENUM_STR for i in types)
+        if isinstance(element, (ExpressionInverse, ExpressionAnd, ExpressionOr)):
+            return True
+
+        if isinstance(element, ExpressionFunction):
+            return element.element_payload[0] in self._total_funcs
+        if isinstance(element, ExpressionScore):
+            return self._pure_score and all(i == TYPE_ENUM_STR for i in types)
+        return False
+
+    def _element_children(self, element):  # type: (ExpressionElement) -> list[ExpressionElement]
+        """_element_children 返回给出的表达式元素的所有子元素
+
+        Args:
+            element (ExpressionElement): 目标表达式元素
+
+        Returns:
+            list[ExpressionElement]: 该表达式元素的所有子元素
+        """
+        if isinstance(element, ExpressionLiteral):
+            if isinstance(element.element_payload, ExpressionCombine):
+                return [element.element_payload]
+            return []
+        if isinstance(element, ExpressionFunction):
+            return list(element.element_payload[1])
+        if isinstance(element, ExpressionReference):
+            return [element.element_payload[1]]
+        if isinstance(element, (ExpressionCommand, ExpressionSelector)):
+            return [element.element_payload]  # type: ignore
+        return list(element.element_payload)  # type: ignore
+
+    def _invariant_elements(
+        self, element, assigned
+    ):  # type: (ExpressionElement, set[str]) -> set[int]
+        """
+        _invariant_elements 以显式栈后序遍历给出的表达式元素，
+        并返回它及其所有子元素中可以被提升的表达式元素
+
+        Args:
+            element (ExpressionElement): 目标表达式元素
+            assigned (set[str]): 在循环中被赋值的变量
+
+        Returns:
+            set[int]: 可以被提升的表达式元素的 id
+        """
+        result = set()  # type: set[int]
+        stack = [(element, False)]  # type: list[tuple[ExpressionElement, bool]]
+        while len(stack) > 0:
+            element, visited = stack.pop()
+            children = self._element_children(element)
+            if not visited:
+                stack.append((element, True))
+                stack.extend((i, False) for i in children)
+            elif all(id(i) in result for i in children) and self._is_invariant(
+                element, assigned
+            ):
+                result.add(id(element))
+        return result
+
+    def _collect_invariant(
+        self, element, assigned, result
+    ):  # type: (ExpressionElement, set[str], list[ExpressionElement]) -> None
+        """
+        _collect_invariant 按从左到右的顺序收集给出的表达式元素中，
+        所有可以被提升到循环语句之前的最大的子表达式
+
+        Args:
+            element (ExpressionElement): 目标表达式元素
+            assigned (set[str]): 在循环中被赋值的变量
+            result (list[ExpressionElement]): 用于储存收集结果的列表
+        """
+        invariant = self._invariant_elements(element, assigned)
+        stack = [element]  # type: list[ExpressionElement]
+        while len(stack) > 0:
+            element = stack.pop()
+            while isinstance(element, ExpressionCombine):
+                element = element.element_payload[0]
+            if id(element) in self._hoisted:
+                continue
+            children = self._element_children(element)
+            if id(element) in invariant:
+                # Loading a variable or a constant is already the cheapest
+                if len(children) > 0:
+                    result.append(element)
+                continue
+            stack.extend(reversed(children))
+
+    def _collect_code_block(
+        self, code_block, assigned, result
+    ):  # type: (OpcodeBase, set[str], list[ExpressionElement]) -> None
+        """
+        _collect_code_block 按代码的顺序收集给出的代码块中，
+        所有可以被提升到循环语句之前的最大的子表达式
+
+        Args:
+            code_block (OpcodeBase): 目标代码块
+            assigned (set[str]): 在循环中被赋值的变量
+            result (list[ExpressionElement]): 用于储存收集结果的列表
+        """
+        stack = [code_block]  # type: list[OpcodeBase | ExpressionElement]
+        while len(stack) > 0:
+            item = stack.pop()
+            if isinstance(item, ExpressionElement):
+                self._collect_invariant(item, assigned, result)
+                continue
+            items = []  # type: list[OpcodeBase | ExpressionElement]
+            if isinstance(item, OpcodeAssign):
+                items.append(item.opcode_payload[1])
+            elif isinstance(item, OpcodeCondition):
+                for i in item.opcode_payload:
+                    if i.condition is not None:
+                        items.append(i.condition)
+                    items.extend(i.code_block)
+            elif isinstance(item, OpcodeForLoop):
+                assert item.opcode_payload is not None
+                items.append(item.opcode_payload.repeat_times)
+                items.extend(item.opcode_payload.code_block)
+            elif isinstance(item, (OpcodeExpression, OpcodeReturn)):
+                items.append(item.opcode_payload)  # type: ignore
+            stack.extend(reversed(items))
+
+    def _hoist_invariant(self, code_block):  # type: (OpcodeForLoop) -> None
+        """
+        _hoist_invariant 求值给出的循环语句中所有可被提升的表达式，
+        并将结果储存到编译器生成的临时变量中。
+        此后，循环体将直接读取这些临时变量
+
+        由于被提升的表达式不会出错且没有副作用，
+        即便循环体一次也不执行，提前求值也不会改变程序的行为
+
+        Args:
+            code_block (OpcodeForLoop): 目标循环语句
+        """
+        if not self._hoist:
+            return
+        assert code_block.opcode_payload is not None
+        for_loop = code_block.opcode_payload
+        assigned = set([for_loop.variable])
+        for i in for_loop.code_block:
+            self._assigned_names(i, assigned)
+        invariant = []  # type: list[ExpressionElement]
+        for i in for_loop.code_block:
+            self._collect_code_block(i, assigned, invariant)
+
+        for i in invariant:
+            # The name of temporary variable can not be written in user code
+            varindex = self._map.index_by_name("$hoisted_{}".format(len(self._hoisted)))
+            self._handle_element(i)
+            self._ans.append(BYTECODE_STORE_VALUE)
+            self._ans.append(varindex)  # type: ignore
+            self._hoisted[id(i)] = varindex  # type: ignore
+
+    def _for_loop_steps(
+        self, code_block
+    ):  # type: (OpcodeForLoop) -> Iterator[Iterator[Any]]
+        """
+        _for_loop_steps 将给出的循环语句编译为字节码。
+        它是一个生成器，产出编译循环次数和循环体中语句的子步骤
 
         Args:
             code_block (OpcodeForLoop):
                 要编译为字节码的循环语句
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译该循环语句的生成器
         """
         # Prepare
         assert code_block.opcode_payload is not None
@@ -481,13 +1031,26 @@ class CodeCompiler:
         for_loop = code_block.opcode_payload
         varindex = self._map.index_by_name(for_loop.variable)
 
-        # Handle repeat times
+        # Handle loop invariant and repeat times
         start_pc = len(self._ans)
-        self._handle_element(for_loop.repeat_times)
-        self._ans.append(BYTECODE_LOOP_CHECK)
-        self._ans.append(LOOP_CHECK_TYPE_DATA_TYPE)
-        self._ans.append(BYTECODE_LOAD_CONST)
-        self._ans.append(0)
+        self._hoist_invariant(code_block)
+        yield self._element_steps(for_loop.repeat_times)
+        if self._range_loop:
+            # The name of hidden variable can not be written in user code
+            iterindex = self._map.index_by_name("$range_{}".format(start_pc))
+            self._ans.append(BYTECODE_FOR_PREPARE)
+            self._ans.append(iterindex)  # type: ignore
+        else:
+            if (
+                not self._specialize
+                or self._types is None
+                or not INFER_EXACT_INT
+                or self._types.get(id(for_loop.repeat_times)) != TYPE_ENUM_INT
+            ):
+                self._ans.append(BYTECODE_LOOP_CHECK)
+                self._ans.append(LOOP_CHECK_TYPE_DATA_TYPE)
+            self._ans.append(BYTECODE_LOAD_CONST)
+            self._ans.append(0)
         self._chk.append(
             CheckPoint(
                 CHECK_POINT_TYPE_FOR_LOOP,
@@ -500,7 +1063,11 @@ class CodeCompiler:
         # Handle continue loop or break loop
         continue_pc = len(self._ans)
         for_loop_env.continue_pc = continue_pc
-        self._ans.append(BYTECODE_LOOP_JUMP)
+        if self._range_loop:
+            self._ans.append(BYTECODE_FOR_RANGE)
+            self._ans.append(iterindex)  # type: ignore
+        else:
+            self._ans.append(BYTECODE_LOOP_JUMP)
         self._ans.append(varindex)  # type: ignore
         self._ans.append(0)
         for_loop_env.end_indexes.append(len(self._ans) - 1)
@@ -508,32 +1075,100 @@ class CodeCompiler:
         # Handle loop body
         for i in for_loop.code_block:
             start_pc = len(self._ans)
-            self._handle_code_block(i, for_loop_env)
-            line_code = self._get_line_code(i)
-            if line_code is not None:
-                self._chk.append(
-                    CheckPoint(
-                        CHECK_POINT_TYPE_FOR_LOOP,
-                        start_pc,
-                        len(self._ans) - 1,
-                        [for_loop.state_line, line_code],
-                    )
-                )
+            yield self._code_block_steps(i, for_loop_env)
+            self._add_check_point(
+                i, CHECK_POINT_TYPE_FOR_LOOP, for_loop.state_line, start_pc
+            )
         self._ans.append(BYTECODE_DIRECT_JUMP)
         self._ans.append(continue_pc)
 
         # Pop the repeat times and set the pc for all jump end
         end_index = len(self._ans)
-        self._ans.append(BYTECODE_LOOP_CHECK)
-        self._ans.append(LOOP_CHECK_TYPE_POP_STACK)
+        if not self._range_loop:
+            self._ans.append(BYTECODE_LOOP_CHECK)
+            self._ans.append(LOOP_CHECK_TYPE_POP_STACK)
         for index in for_loop_env.end_indexes:
             self._ans[index] = end_index
 
+    def _append_operands(self, code_block):  # type: (OpcodeAssign) -> list[ExpressionElement] | None
+        """
+        _append_operands 检查给出的赋值语句是否形如 x = x + ...，
+        并且 x 在此处已被证明为 str
+
+        Args:
+            code_block (OpcodeAssign): 目标赋值语句
+
+        Returns:
+            list[ExpressionElement] | None:
+                如果是，则返回被追加到 x 的所有操作数；
+                否则返回 None
+        """
+        if not self._accumulate or self._types is None:
+            return None
+        element = code_block.opcode_payload[1]
+        while isinstance(element, ExpressionCombine):
+            element = element.element_payload[0]
+        if not isinstance(element, ExpressionAdd):
+            return None
+        first = element.element_payload[0]
+        while isinstance(first, ExpressionCombine):
+            first = first.element_payload[0]
+        if (
+            not isinstance(first, ExpressionLiteral)
+            or first.element_id != ELEMENT_ID_VAR
+            or first.element_payload != code_block.opcode_payload[0]
+            or self._types.get(id(first)) != TYPE_ENUM_STR
+        ):
+            return None
+        return element.element_payload[1:]
+
+    def _collect_buffered(self, code_block, in_loop):  # type: (OpcodeBase, bool) -> None
+        """
+        _collect_buffered 收集给出的代码块中，
+        所有在循环体中被追加字符串的变量
+
+        Args:
+            code_block (OpcodeBase): 目标代码块
+            in_loop (bool): 该代码块是否位于循环体中
+        """
+        stack = [(code_block, in_loop)]  # type: list[tuple[OpcodeBase, bool]]
+        while len(stack) > 0:
+            code_block, in_loop = stack.pop()
+            if isinstance(code_block, OpcodeAssign):
+                if in_loop and self._append_operands(code_block) is not None:
+                    self._buffered.add(code_block.opcode_payload[0])
+            elif isinstance(code_block, OpcodeCondition):
+                for i in code_block.opcode_payload:
+                    for j in i.code_block:
+                        stack.append((j, in_loop))
+            elif isinstance(code_block, OpcodeForLoop):
+                assert code_block.opcode_payload is not None
+                for i in code_block.opcode_payload.code_block:
+                    stack.append((i, True))
+
     def _handle_code_block(
         self, code_block, for_loop_env
     ):  # type: (OpcodeBase, ForLoopEnv | None) -> None
         """
-        _handle_code_block 将给出的代码块编译为字节码
+        _handle_code_block 将给出的代码块编译为字节码。
+
+        嵌套的代码块和表达式元素通过 run_steps 以显式栈编译，
+        因此嵌套的深度不受 Python 递归深度的限制
+
+        Args:
+            code_block (OpcodeBase):
+                待处理的代码块
+            for_loop_env (ForLoopEnv | None):
+                该代码块所在循环语句的上下文环境。
+                若它不位于循环体中，请设置为 None
+        """
+        run_steps(self._code_block_steps(code_block, for_loop_env))
+
+    def _code_block_steps(
+        self, code_block, for_loop_env
+    ):  # type: (OpcodeBase, ForLoopEnv | None) -> Iterator[Iterator[Any]]
+        """
+        _code_block_steps 是 _handle_code_block 的生成器形式
 
         Args:
             code_block (OpcodeBase):
@@ -541,15 +1176,28 @@ class CodeCompiler:
             for_loop_env (ForLoopEnv | None):
                 该代码块所在循环语句的上下文环境。
                 若它不位于循环体中，请设置为 None
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译该代码块的生成器
         """
         if isinstance(code_block, OpcodeAssign):
-            self._handle_element(code_block.opcode_payload[1])
-            self._ans.append(BYTECODE_STORE_VALUE)
-            self._ans.append(self._map.index_by_name(code_block.opcode_payload[0]))  # type: ignore
+            operands = None
+            if for_loop_env is not None:
+                operands = self._append_operands(code_block)
+            if operands is None:
+                yield self._element_steps(code_block.opcode_payload[1])
+                self._ans.append(BYTECODE_STORE_VALUE)
+                self._ans.append(self._map.index_by_name(code_block.opcode_payload[0]))  # type: ignore
+            else:
+                for i in operands:
+                    yield self._element_steps(i)
+                self._ans.append(BYTECODE_APPEND_VALUE)
+                self._ans.append(self._map.index_by_name(code_block.opcode_payload[0]))  # type: ignore
+                self._ans.append(len(operands))
         elif isinstance(code_block, OpcodeCondition):
-            self._handle_condition(code_block, for_loop_env)
+            yield self._condition_steps(code_block, for_loop_env)
         elif isinstance(code_block, OpcodeForLoop):
-            self._handle_for_loop(code_block)
+            yield self._for_loop_steps(code_block)
         elif isinstance(code_block, OpcodeContinue):
             if for_loop_env is None:
                 self._ans.append(BYTECODE_INTERNAL_PANIC)
@@ -570,10 +1218,10 @@ class CodeCompiler:
                 self._ans.append(0)
                 for_loop_env.end_indexes.append(len(self._ans) - 1)
         elif isinstance(code_block, OpcodeExpression):
-            self._handle_element(code_block.opcode_payload)
+            yield self._element_steps(code_block.opcode_payload)
             self._ans.append(BYTECODE_STORE_RETURN_VAL)
         elif isinstance(code_block, OpcodeReturn):
-            self._handle_element(code_block.opcode_payload)
+            yield self._element_steps(code_block.opcode_payload)
             self._ans.append(BYTECODE_STORE_RETURN_VAL)
             self._ans.append(BYTECODE_PROGRAM_STOP_RUN)
 
@@ -587,20 +1235,51 @@ class CodeCompiler:
         self._ans = []
         self._chk = []
         self._map = VariableMapping()
+        self._types = None
+        self._hoisted = {}
+        self._buffered = set()
+        if self._specialize or self._hoist or self._accumulate:
+            self._types = TypeInferrer(self._ast).infer()
+        for i in self._ast:
+            self._collect_buffered(i, False)
 
         for i in self._ast:
             start_pc = len(self._ans)
             self._handle_code_block(i, None)
-            line_code = self._get_line_code(i)
-            if line_code is not None:
-                self._chk.append(
-                    CheckPoint(
-                        CHECK_POINT_TYPE_NORMAL,
-                        start_pc,
-                        len(self._ans) - 1,
-                        [line_code],
-                    )
-                )
+            self._add_check_point(i, CHECK_POINT_TYPE_NORMAL, "", start_pc)
 
         self._ans.append(BYTECODE_PROGRAM_STOP_RUN)
         return CompileResult(self._ans, self._chk, self._map)
+
+    def specialize(
+        self, known_vars
+    ):  # type: (dict[str, int | bool | float | str]) -> CompileResult
+        """
+        specialize 针对运行前就已经确定的变量，
+        通过 PartialEvaluator 对 AST 语法树进行部分求值，
+        并以与本编译器相同的选项编译部分求值所得的语法树。
+
+        编译结果只适用于 known_vars 中的变量取值都与给出的相同的运行，
+        因此通常应按这些取值对其进行缓存。
+        本编译器自身的 AST 语法树不会被修改
+
+        Args:
+            known_vars (dict[str, int | bool | float | str]):
+                运行前就已经确定的变量及其取值
+
+        Returns:
+            CompileResult: 编译所得结果
+        """
+        evaluator = PartialEvaluator(self._ast, known_vars)
+        compiler = CodeCompiler(
+            evaluator.evaluate(),
+            self._specialize,
+            self._hoist,
+            list(self._total_funcs),
+            self._pure_score,
+            self._accumulate,
+            self._range_loop,
+        )
+        # Keep the condition and for loop context of the inlined code
+        compiler._contexts = evaluator.contexts()
+        return compiler.compile()
@@ -20,6 +20,82 @@ BYTECODE_STORE_RETURN_VAL = 15  # (15)
 BYTECODE_PROGRAM_STOP_RUN = 16  # (16)
 BYTECODE_INTERNAL_PANIC = 17  # (17, ERROR)
 
+# Superinstructions and other opcodes which are only produced by CodeOptimizer
+BYTECODE_MOVE_VALUE = 18  # (18, SRC_INDEX, DST_INDEX)
+BYTECODE_STORE_CONST = 19  # (19, CONST, DST_INDEX)
+BYTECODE_VALUE_CONST_COMPUTE = 20  # (20, VAR_INDEX, CONST, (+, -, *, /))
+BYTECODE_VALUE_VALUE_COMPUTE = 21  # (21, VAR_INDEX, VAR_INDEX, (+, -, *, /))
+BYTECODE_VALUE_CONST_COMPUTE_STORE = 22  # (22, VAR_INDEX, CONST, (+, -, *, /), DST_INDEX)
+BYTECODE_VALUE_VALUE_COMPUTE_STORE = 23  # (23, VAR_INDEX, VAR_INDEX, (+, -, *, /), DST_INDEX)
+BYTECODE_VALUE_CONST_COMPARE = 24  # (24, VAR_INDEX, CONST, (==, !=, <, >, <=, >=))
+BYTECODE_VALUE_VALUE_COMPARE = 25  # (25, VAR_INDEX, VAR_INDEX, (==, !=, <, >, <=, >=))
+BYTECODE_COMPARE_FALSE_JUMP = 26  # (26, (==, !=, <, >, <=, >=), JUMP_TO)
+BYTECODE_FALSE_JUMP_OR_POP = 27  # (27, JUMP_TO); NOTE: Keep the value if jump
+BYTECODE_TRUE_JUMP_OR_POP = 28  # (28, JUMP_TO); NOTE: Keep the value if jump
+
+# Type specialised opcodes which are only produced by CodeCompiler with specialize.
+# The operands of INT_* are proven to be int (or bool),
+# and the operands of STR_CONCAT are proven to be str
+BYTECODE_INT_ADD = 29  # (29)
+BYTECODE_INT_REMOVE = 30  # (30)
+BYTECODE_INT_TIMES = 31  # (31)
+BYTECODE_STR_CONCAT = 32  # (32, POP_LEN)
+BYTECODE_INT_EQUAL = 33  # (33)
+BYTECODE_INT_NOT_EQUAL = 34  # (34)
+BYTECODE_INT_LESS_THAN = 35  # (35)
+BYTECODE_INT_GREATER_THAN = 36  # (36)
+BYTECODE_INT_LESS_EQUAL = 37  # (37)
+BYTECODE_INT_GREATER_EQUAL = 38  # (38)
+
+# String accumulation opcodes which are only produced by CodeCompiler with accumulate.
+# The variable appended by APPEND_VALUE may hold a list of str as its buffer,
+# so it is always read by LOAD_BUFFER, which joins the buffer on demand
+BYTECODE_APPEND_VALUE = 39  # (39, VAR_INDEX, POP_LEN)
+BYTECODE_LOAD_BUFFER = 40  # (40, VAR_INDEX)
+
+# Counted loop opcodes which are only produced by CodeCompiler with range_loop.
+# ITER_INDEX is a hidden variable which holds the range iterator of the loop,
+# so the loop header does not touch the stack
+BYTECODE_FOR_PREPARE = 41  # (41, ITER_INDEX)
+BYTECODE_FOR_RANGE = 42  # (42, ITER_INDEX, VAR_INDEX, JUMP_TO)
+
+# Linked function call which is only produced by CodeLinker.
+# FUNC_SLOT is a LinkedFunction which holds the function resolved at link time
+BYTECODE_HANDLE_LINKED_FUNC = 43  # (43, POP_LEN, FUNC_SLOT)
+
+# Register-based bytecode, which is only produced by RegisterCompiler.
+# REG is the index of a register, and the registers are
+# the variables, the constants and the temporaries in order
+REGISTER_MOVE = 0  # (0, DST_REG, SRC_REG)
+REGISTER_ADD = 1  # (1, DST_REG, REG, REG)
+REGISTER_REMOVE = 2  # (2, DST_REG, REG, REG)
+REGISTER_TIMES = 3  # (3, DST_REG, REG, REG)
+REGISTER_DIVIDE = 4  # (4, DST_REG, REG, REG)
+REGISTER_EQUAL = 5  # (5, DST_REG, REG, REG)
+REGISTER_NOT_EQUAL = 6  # (6, DST_REG, REG, REG)
+REGISTER_LESS_THAN = 7  # (7, DST_REG, REG, REG)
+REGISTER_GREATER_THAN = 8  # (8, DST_REG, REG, REG)
+REGISTER_LESS_EQUAL = 9  # (9, DST_REG, REG, REG)
+REGISTER_GREATER_EQUAL = 10  # (10, DST_REG, REG, REG)
+REGISTER_NOT = 11  # (11, DST_REG, REG)
+REGISTER_IN = 12  # (12, DST_REG, REG, REG)
+REGISTER_CAST = 13  # (13, DST_REG, REG, (int, bool, float, str))
+REGISTER_FUNC = 14  # (14, DST_REG, FIRST_REG, ARGS_LEN, FUNC_NAME)
+REGISTER_COMMAND = 15  # (15, DST_REG, REG)
+REGISTER_SCORE = 16  # (16, DST_REG, REG, REG)
+REGISTER_SELECTOR = 17  # (17, DST_REG, REG)
+REGISTER_REF = 18  # (18, DST_REG, REG, REF_TYPE)
+REGISTER_DIRECT_JUMP = 19  # (19, JUMP_TO)
+REGISTER_FALSE_JUMP = 20  # (20, REG, JUMP_TO)
+REGISTER_TRUE_JUMP = 21  # (21, REG, JUMP_TO)
+REGISTER_FOR_PREPARE = 22  # (22, LIMIT_REG, COUNTER_REG, REG)
+REGISTER_FOR_LOOP = 23  # (23, LIMIT_REG, COUNTER_REG, VAR_INDEX, JUMP_TO)
+REGISTER_STORE_RETURN_VAL = 24  # (24, REG)
+REGISTER_PROGRAM_STOP_RUN = 25  # (25)
+REGISTER_INTERNAL_PANIC = 26  # (26, ERROR)
+# Chains of four or more operands, which are folded in place as HANDLE_COMPUTE does
+REGISTER_COMPUTE_INPLACE = 27  # (27, DST_REG, REG, REG, (+, -, *, /))
+
 LOOP_CHECK_TYPE_DATA_TYPE = 0
 LOOP_CHECK_TYPE_POP_STACK = 1
 
@@ -60,6 +136,108 @@ CHECK_POINT_TYPE_NORMAL = 0
 CHECK_POINT_TYPE_CONDITION = 1
 CHECK_POINT_TYPE_FOR_LOOP = 2
 
+RUNNER_ENGINE_SWITCH = 0
+RUNNER_ENGINE_TABLE = 1
+RUNNER_ENGINE_TRANSPILE = 2
+
+BYTECODE_LENGTH = [
+    2,  # LOAD_CONST
+    2,  # LOAD_VALUE
+    2,  # STORE_VALUE
+    3,  # LOOP_JUMP
+    2,  # LOOP_CHECK
+    2,  # DIRECT_JUMP
+    2,  # FALSE_JUMP
+    2,  # TRUE_JUMP
+    3,  # HANDLE_COMPUTE
+    2,  # HANDLE_COMPARE
+    2,  # HANDLE_LOGIC_ANDOR
+    2,  # HANDLE_LOGIC_INNOT
+    2,  # HANDLE_CAST
+    3,  # HANDLE_FUNC
+    2,  # HANDLE_INTERACT; NOTE: The length of ref is 3
+    1,  # STORE_RETURN_VAL
+    1,  # PROGRAM_STOP_RUN
+    2,  # INTERNAL_PANIC
+    3,  # MOVE_VALUE
+    3,  # STORE_CONST
+    4,  # VALUE_CONST_COMPUTE
+    4,  # VALUE_VALUE_COMPUTE
+    5,  # VALUE_CONST_COMPUTE_STORE
+    5,  # VALUE_VALUE_COMPUTE_STORE
+    4,  # VALUE_CONST_COMPARE
+    4,  # VALUE_VALUE_COMPARE
+    3,  # COMPARE_FALSE_JUMP
+    2,  # FALSE_JUMP_OR_POP
+    2,  # TRUE_JUMP_OR_POP
+    1,  # INT_ADD
+    1,  # INT_REMOVE
+    1,  # INT_TIMES
+    2,  # STR_CONCAT
+    1,  # INT_EQUAL
+    1,  # INT_NOT_EQUAL
+    1,  # INT_LESS_THAN
+    1,  # INT_GREATER_THAN
+    1,  # INT_LESS_EQUAL
+    1,  # INT_GREATER_EQUAL
+    3,  # APPEND_VALUE
+    2,  # LOAD_BUFFER
+    2,  # FOR_PREPARE
+    4,  # FOR_RANGE
+    3,  # HANDLE_LINKED_FUNC
+]
+
+REGISTER_LENGTH = [
+    3,  # MOVE
+    4,  # ADD
+    4,  # REMOVE
+    4,  # TIMES
+    4,  # DIVIDE
+    4,  # EQUAL
+    4,  # NOT_EQUAL
+    4,  # LESS_THAN
+    4,  # GREATER_THAN
+    4,  # LESS_EQUAL
+    4,  # GREATER_EQUAL
+    3,  # NOT
+    4,  # IN
+    4,  # CAST
+    5,  # FUNC
+    3,  # COMMAND
+    4,  # SCORE
+    3,  # SELECTOR
+    4,  # REF
+    2,  # DIRECT_JUMP
+    3,  # FALSE_JUMP
+    3,  # TRUE_JUMP
+    4,  # FOR_PREPARE
+    5,  # FOR_LOOP
+    2,  # STORE_RETURN_VAL
+    1,  # PROGRAM_STOP_RUN
+    2,  # INTERNAL_PANIC
+    5,  # COMPUTE_INPLACE
+]
+
+
+def instruction_length(byte_code, pc):  # type: (list[int | bool | float | str], int) -> int
+    """
+    instruction_length 返回 byte_code 中，
+    起始于 pc 处的字节码指令所占用的长度
+
+    Args:
+        byte_code (list[int | bool | float | str]):
+            编译所得的字节码序列
+        pc (int):
+            目标指令的起始位置
+
+    Returns:
+        int: 该指令（含操作数）的长度
+    """
+    op = byte_code[pc]
+    if op == BYTECODE_HANDLE_INTERACT and byte_code[pc + 1] == INTERACT_TYPE_REF:
+        return 3
+    return BYTECODE_LENGTH[op]  # type: ignore
+
 
 class VariableMapping:
     """
@@ -6,6 +6,30 @@ if TYPE_CHECKING:
     from typing import Any, Callable
 
 import json
+import math
+from collections import OrderedDict
+
+
+def cache_key(values):  # type: (tuple) -> tuple
+    """
+    cache_key 返回以 values 为输入时的缓存键。
+
+    1、1.0 与 True 作为键时彼此相等，0.0 与 -0.0 也是如此，
+    因此键中还包含每个值的类型，以及浮点数零的符号
+
+    Args:
+        values (tuple): 所有的输入
+
+    Returns:
+        tuple: 缓存键。它的第一个元素总是 values
+    """
+    for i in values:
+        if i.__class__ is float and i == 0:
+            signs = tuple(
+                [math.copysign(1.0, j) if j.__class__ is float else 0.0 for j in values]
+            )
+            return (values, tuple(map(type, values)), signs)
+    return (values, tuple(map(type, values)))
 
 
 class GameInteract:
@@ -236,16 +260,32 @@ class BuiltInFunction:
     但对使用该语言的人则是内建函数。
 
     BuiltInFunction 保存了一系列外部函数，
-    以供用户通过本编程语言进行调用
+    以供用户通过本编程语言进行调用。
+
+    被标记为纯函数的静态内建函数的调用结果会被缓存在
+    一个有界的 LRU 缓存中，参数相同的后续调用将直接返回缓存的结果
     """
 
     static = {}  # type: dict[str, Callable[..., int | bool | float | str]]
     dynamic = {}  # type: dict[str, Callable[..., int | bool | float | str]]
+    returns = {}  # type: dict[str, tuple[type, ...]]
+    pure = set()  # type: set[str]
+
+    _cache_size = 0  # type: int
+    _cache = OrderedDict()  # type: OrderedDict[tuple, int | bool | float | str]
+    _memoized = {}  # type: dict[str, Callable[..., int | bool | float | str]]
+    _allocations = None  # type: Callable[[], int] | None
+    _hits = 0  # type: int
+    _misses = 0  # type: int
 
     def __init__(
         self,
         static={},  # type: dict[str, Callable[..., int | bool | float | str]]
         dynamic={},  # type: dict[str, Callable[..., int | bool | float | str]]
+        returns={},  # type: dict[str, type | tuple[type, ...]]
+        pure=[],  # type: list[str]
+        cache_size=256,  # type: int
+        allocations=None,  # type: Callable[[], int] | None
     ):  # type: (...) -> None
         """初始化并返回一个新的 BuiltInFunction
 
@@ -258,9 +298,166 @@ class BuiltInFunction:
                 要提供的动态内建函数。
                 任何不位于 static 中的函数，都应置于本字典中。
                 默认值为空字典
+            returns (dict[str, type | tuple[type, ...]], optional):
+                内建函数所声明的返回值类型。
+                详见本类中 declare 函数的注释，本处不再赘述。
+                默认值为空字典
+            pure (list[str], optional):
+                被标记为纯函数的内建函数的名称。
+                详见本类中 declare_pure 函数的注释，本处不再赘述。
+                默认值为空列表
+            cache_size (int, optional):
+                纯函数调用结果的 LRU 缓存最多保存的结果数。
+                若不为正数，则不缓存任何调用。
+                默认值为 256
+            allocations (Callable[[], int] | None, optional):
+                返回目前已分配的指针数的函数，
+                通常为 BaseManager.allocations。
+                若给出，则调用时分配了指针的纯函数将被自动取消纯函数标记，
+                并且其结果不会被缓存。
+                默认值为 None
         """
         self.static = static if len(static) > 0 else {}
         self.dynamic = dynamic if len(dynamic) > 0 else {}
+        self.returns = {}
+        for key, value in returns.items():
+            self.declare(key, value)
+        self.pure = set()
+        for i in pure:
+            self.declare_pure(i)
+        self._cache_size = cache_size
+        self._cache = OrderedDict()
+        self._memoized = {}
+        self._allocations = allocations
+        self._hits = 0
+        self._misses = 0
+
+    def declare(
+        self, func_name, return_type
+    ):  # type: (str, type | tuple[type, ...]) -> None
+        """
+        declare 声明名为 func_name 的内建函数的返回值类型。
+
+        返回值类型只能是 int、bool、float 和 str 中的一个或多个。
+        CodeLinker 会信任已经声明了返回值类型的静态内建函数，
+        从而在调用它们后不再检查返回值的类型。
+
+        因此，请确保函数的返回值总是符合其声明。
+        特别地，在 Python 2 中返回 unicode 或 long 的函数不应被声明为返回 str 或 int
+
+        Args:
+            func_name (str):
+                内建函数的名字
+            return_type (type | tuple[type, ...]):
+                该函数的返回值类型
+
+        Raises:
+            Exception:
+                如果给出的返回值类型不受支持，
+                则抛出相应的错误
+        """
+        if not isinstance(return_type, tuple):
+            return_type = (return_type,)
+        if len(return_type) == 0:
+            raise Exception(
+                "declare: The return type of func {} is empty".format(
+                    json.dumps(func_name, ensure_ascii=False)
+                )
+            )
+        for i in return_type:
+            if i not in (int, bool, float, str):
+                raise Exception(
+                    "declare: The return type of func {} must be int/bool/float/str, but got {}".format(
+                        json.dumps(func_name, ensure_ascii=False), i
+                    )
+                )
+        self.returns[func_name] = return_type
+
+    def declare_pure(self, func_name):  # type: (str) -> None
+        """
+        declare_pure 将名为 func_name 的内建函数标记为纯函数。
+
+        纯函数没有副作用，且其结果只取决于参数的类型与值。
+        只有静态内建函数的纯函数标记会生效，
+        它们的调用结果将被缓存，且缓存命中时不再调用该函数。
+
+        因此，接受指针作为参数的函数不应被标记为纯函数，
+        因为指针所指向的对象可能已被修改。
+        另外，通过 BaseManager.ref 分配了指针的函数不是纯函数，
+        如果构造时给出了 allocations，则它们会被自动取消标记
+
+        Args:
+            func_name (str):
+                内建函数的名字
+        """
+        self.pure.add(func_name)
+
+    def cache_info(self):  # type: () -> tuple[int, int, int]
+        """cache_info 返回纯函数调用结果缓存的统计信息
+
+        Returns:
+            tuple[int, int, int]:
+                依次为缓存的命中次数、未命中次数以及目前缓存的结果数
+        """
+        return self._hits, self._misses, len(self._cache)
+
+    def clear_cache(self):  # type: () -> None
+        """clear_cache 清空纯函数调用结果的缓存，并重置统计信息"""
+        self._cache.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def _memoize(
+        self, func_name
+    ):  # type: (str) -> Callable[..., int | bool | float | str]
+        """
+        _memoize 返回静态内建函数 func_name 带有缓存的版本。
+        同一函数所返回的总是同一个对象
+
+        Args:
+            func_name (str):
+                被标记为纯函数的静态内建函数的名字
+
+        Returns:
+            Callable[..., int | bool | float | str]:
+                带有缓存的 func_name
+        """
+        if func_name in self._memoized:
+            return self._memoized[func_name]
+
+        func = self.static[func_name]
+        cache = self._cache
+        pure = self.pure
+        allocations = self._allocations
+
+        def memoized(*args):  # type: (Any) -> int | bool | float | str
+            if func_name not in pure:
+                return func(*args)
+
+            key = (func_name, cache_key(args))
+            value = cache.pop(key, cache)
+            if value is not cache:
+                self._hits += 1
+                cache[key] = value
+                return value
+
+            self._misses += 1
+            if allocations is None:
+                value = func(*args)
+            else:
+                before = allocations()
+                value = func(*args)
+                if allocations() != before:
+                    pure.discard(func_name)
+                    return value
+
+            cache[key] = value
+            if len(cache) > self._cache_size:
+                cache.popitem(last=False)
+            return value
+
+        self._memoized[func_name] = memoized
+        return memoized
 
     def _int(self, value):  # type: (Any) -> int
         """_int 将 value 转换为整数
@@ -333,6 +530,8 @@ class BuiltInFunction:
             return self._str
 
         if func_name in self.static:
+            if func_name in self.pure and self._cache_size > 0:
+                return self._memoize(func_name)
             return self.static[func_name]
         if func_name in self.dynamic:
             return self.dynamic[func_name]
@@ -0,0 +1,494 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable, Iterator
+
+from ..parser.expression.define import (
+    ExpressionElement,
+    ELEMENT_ID_VAR,
+    ELEMENT_ID_INT,
+    ELEMENT_ID_BOOL,
+    ELEMENT_ID_FLOAT,
+    ELEMENT_ID_STR,
+)
+from ..parser.expression.basic import (
+    ExpressionLiteral,
+    ExpressionReference,
+    ExpressionSelector,
+    ExpressionScore,
+    ExpressionCommand,
+    ExpressionFunction,
+)
+from ..parser.expression.compare import (
+    ExpressionLessThan,
+    ExpressionGreaterThan,
+    ExpressionLessEqual,
+    ExpressionGreaterEqual,
+    ExpressionEqual,
+    ExpressionNotEqual,
+    ExpressionAnd,
+    ExpressionOr,
+    ExpressionIn,
+    ExpressionInverse,
+)
+from ..parser.expression.compute import (
+    ExpressionAdd,
+    ExpressionRemove,
+    ExpressionTimes,
+    ExpressionDivide,
+)
+from ..parser.expression.combine import ExpressionCombine
+from ..parser.steps import NO_STEPS, run_steps
+from ..parser.define import (
+    ConditionCodeBlock,
+    ForLoopCodeBlock,
+    OpcodeBase,
+    OpcodeAssign,
+    OpcodeCondition,
+    OpcodeForLoop,
+    OpcodeExpression,
+    OpcodeReturn,
+)
+
+# The longest string that could be produced at compile time,
+# so that something like '0'*100000000 is still computed at runtime
+FOLDING_STR_LIMIT = 4096
+
+# The operand order is the same as HANDLE_COMPUTE and HANDLE_COMPARE,
+# which means the right operand is always the left side of the comparison
+FOLDING_OPERATORS = [
+    (ExpressionAdd, lambda a, b: a + b),
+    (ExpressionRemove, lambda a, b: a - b),
+    (ExpressionTimes, lambda a, b: a * b),
+    (ExpressionDivide, lambda a, b: a / b),
+    (ExpressionEqual, lambda a, b: b == a),
+    (ExpressionNotEqual, lambda a, b: b != a),
+    (ExpressionLessThan, lambda a, b: b > a),
+    (ExpressionGreaterThan, lambda a, b: b < a),
+    (ExpressionLessEqual, lambda a, b: b >= a),
+    (ExpressionGreaterEqual, lambda a, b: b <= a),
+    (ExpressionIn, lambda a, b: a in b),
+]  # type: list[tuple[type, Callable[[Any, Any], Any]]]
+
+FOLDING_CASTS = {
+    ELEMENT_ID_INT: int,
+    ELEMENT_ID_BOOL: bool,
+    ELEMENT_ID_FLOAT: float,
+    ELEMENT_ID_STR: str,
+}  # type: dict[int, Callable[[Any], Any]]
+
+
+class ConstantFolder:
+    """
+    ConstantFolder 在 AST 语法树层面进行常量折叠。
+
+    完全由字面量组成的子表达式，例如 '0'*(5-2) 或 int(3.7)，
+    将在编译前以与虚拟机完全相同的 Python 语义被求值，
+    并被替换为单个字面量。
+
+    求值时抛出错误的子表达式将保持原样，
+    因此除零以及类型错误等仍会在运行时，
+    于原有的检查点处被报告。
+
+    语法树通过 run_steps 以显式栈遍历，
+    因此嵌套的深度不受 Python 递归深度的限制。
+
+    折叠的结果是一个新的语法树，原有的语法树不会被修改
+    """
+
+    _ast = []  # type: list[OpcodeBase]
+
+    def __init__(self, code_block=[]):  # type: (list[OpcodeBase]) -> None
+        """初始化并返回一个新的 ConstantFolder
+
+        Args:
+            code_block (list[OpcodeBase], optional):
+                CodeParser 的编译结果
+                默认值为空列表
+        """
+        self._ast = code_block if len(code_block) > 0 else []
+
+    def _is_constant(self, element):  # type: (ExpressionElement) -> bool
+        """_is_constant 检查 element 是否是常量字面量
+
+        Args:
+            element (ExpressionElement): 目标表达式元素
+
+        Returns:
+            bool: element 是否是常量字面量
+        """
+        return (
+            isinstance(element, ExpressionLiteral)
+            and element.element_id != ELEMENT_ID_VAR
+            and not isinstance(element.element_payload, ExpressionCombine)
+        )
+
+    def _literal(self, value):  # type: (Any) -> ExpressionLiteral | None
+        """
+        _literal 返回值为 value 的常量字面量。
+        如果 value 不能被表示为字面量，则返回 None
+
+        Args:
+            value (Any): 常量的值
+
+        Returns:
+            ExpressionLiteral | None: 对应的常量字面量
+        """
+        if type(value) == bool:
+            return ExpressionLiteral(ELEMENT_ID_BOOL, value)
+        if type(value) == int:
+            return ExpressionLiteral(ELEMENT_ID_INT, value)
+        if type(value) == float:
+            return ExpressionLiteral(ELEMENT_ID_FLOAT, value)
+        if type(value) == str and len(value) <= FOLDING_STR_LIMIT:
+            return ExpressionLiteral(ELEMENT_ID_STR, value)
+        return None
+
+    def _evaluate(
+        self, function, *args
+    ):  # type: (Callable[..., Any], Any) -> ExpressionLiteral | None
+        """
+        _evaluate 在编译期调用 function 并返回其结果所对应的字面量。
+        如果调用出错，或者结果不能被表示为字面量，则返回 None
+
+        Args:
+            function (Callable[..., Any]): 求值所用的函数
+            *args (Any): 调用 function 时所使用的参数
+
+        Returns:
+            ExpressionLiteral | None: 求值结果所对应的字面量
+        """
+        # Avoid building huge strings only to discard them
+        if len(args) == 2:
+            for i, j in (args, args[::-1]):
+                if isinstance(i, str) and isinstance(j, int):
+                    if len(i) * j > FOLDING_STR_LIMIT:
+                        return None
+        try:
+            return self._literal(function(*args))
+        except Exception:
+            return None
+
+    def _combine(self, element):  # type: (ExpressionElement) -> ExpressionCombine
+        """
+        _combine 返回包裹 element 的复杂表达式。
+        如果 element 已经是复杂表达式，则直接返回它
+
+        Args:
+            element (ExpressionElement): 目标表达式元素
+
+        Returns:
+            ExpressionCombine: 包裹 element 的复杂表达式
+        """
+        if isinstance(element, ExpressionCombine):
+            return element
+        return ExpressionCombine([element])
+
+    def _fold_logic(
+        self, element, payload
+    ):  # type: (ExpressionAnd | ExpressionOr, list[ExpressionElement]) -> ExpressionElement
+        """
+        _fold_logic 折叠 AND 或 OR 运算。
+
+        位于开头的常量将被消去，直到遇到一个能决定运算结果的常量为止，
+        因此 True and x 将被折叠为 x，而 0 and x 将被折叠为 0
+
+        Args:
+            element (ExpressionAnd | ExpressionOr): 原有的表达式元素
+            payload (list[ExpressionElement]): 已经被折叠的操作数
+
+        Returns:
+            ExpressionElement: 折叠所得的表达式元素
+        """
+        is_and = isinstance(element, ExpressionAnd)
+        while len(payload) > 1 and self._is_constant(payload[0]):
+            if bool(payload[0].element_payload) != is_and:
+                return payload[0]
+            payload = payload[1:]
+        if len(payload) == 1:
+            return payload[0]
+        return element.__class__(payload)
+
+    def _fold_element(self, element):  # type: (ExpressionElement) -> ExpressionElement
+        """
+        _fold_element 折叠给出的表达式元素。
+        如果 element 可以被完全折叠，则返回常量字面量
+
+        Args:
+            element (ExpressionElement): 待折叠的表达式元素
+
+        Returns:
+            ExpressionElement: 折叠所得的表达式元素
+        """
+        result = []  # type: list[ExpressionElement]
+        run_steps(self._element_steps(element, result))
+        return result[0]
+
+    def _element_steps(
+        self, element, result
+    ):  # type: (ExpressionElement, list[ExpressionElement]) -> Iterator[Iterator[Any]]
+        """
+        _element_steps 返回折叠给出的表达式元素的子步骤，
+        折叠所得的表达式元素将被追加到 result 的末尾。
+
+        没有子元素的表达式元素会被立即处理，
+        并且返回的子步骤为 NO_STEPS
+
+        Args:
+            element (ExpressionElement): 待折叠的表达式元素
+            result (list[ExpressionElement]): 用于储存折叠结果的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 折叠该表达式元素的子步骤
+        """
+        if isinstance(element, ExpressionLiteral) and not isinstance(
+            element.element_payload, ExpressionCombine
+        ):
+            result.append(element)
+            return NO_STEPS
+        return self._compound_steps(element, result)
+
+    def _payload_steps(
+        self, elements, result
+    ):  # type: (list[ExpressionElement], list[ExpressionElement]) -> Iterator[Iterator[Any]]
+        """
+        _payload_steps 依次折叠 elements 中的每个表达式元素，
+        并将折叠所得的表达式元素追加到 result 的末尾
+
+        Args:
+            elements (list[ExpressionElement]): 待折叠的表达式元素
+            result (list[ExpressionElement]): 用于储存折叠结果的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 折叠这些表达式元素的生成器
+        """
+        for i in elements:
+            yield self._element_steps(i, result)
+
+    def _compound_steps(
+        self, element, result
+    ):  # type: (ExpressionElement, list[ExpressionElement]) -> Iterator[Iterator[Any]]
+        """
+        _compound_steps 是 _fold_element 的生成器形式。
+        它产出折叠各个子元素的子步骤，
+        并在子元素被折叠后折叠该表达式元素自身
+
+        Args:
+            element (ExpressionElement): 待折叠的表达式元素
+            result (list[ExpressionElement]): 用于储存折叠结果的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 折叠该表达式元素的生成器
+        """
+        payload = []  # type: list[ExpressionElement]
+
+        if isinstance(element, ExpressionCombine):
+            yield self._element_steps(element.element_payload[0], payload)
+            inner = payload[0]
+            if self._is_constant(inner):
+                result.append(inner)
+            else:
+                result.append(ExpressionCombine([inner]))
+            return
+
+        if isinstance(element, ExpressionLiteral):
+            yield self._element_steps(element.element_payload, payload)  # type: ignore
+            inner = payload[0]
+            if self._is_constant(inner):
+                folded = self._evaluate(
+                    FOLDING_CASTS[element.element_id], inner.element_payload
+                )
+                if folded is not None:
+                    result.append(folded)
+                    return
+            result.append(ExpressionLiteral(element.element_id, self._combine(inner)))
+            return
+
+        if isinstance(
+            element,
+            (ExpressionAdd, ExpressionRemove, ExpressionTimes, ExpressionDivide),
+        ):
+            function = [j for i, j in FOLDING_OPERATORS if isinstance(element, i)][0]
+            yield self._payload_steps(element.element_payload, payload)
+            # The virtual machine computes the chains of four or more operands
+            # in place, which changes the error messages (e.g. "for -=").
+            # Such a chain is therefore kept with at least four operands,
+            # unless it is folded to a single constant
+            kept = payload
+            # Only the constants at the beginning could be folded,
+            # because the computation is done from left to right
+            while (
+                len(payload) > 1
+                and self._is_constant(payload[0])
+                and self._is_constant(payload[1])
+            ):
+                folded = self._evaluate(
+                    function, payload[0].element_payload, payload[1].element_payload
+                )
+                if folded is None:
+                    break
+                payload = [folded] + payload[2:]
+                if len(payload) > 3:
+                    kept = payload
+            if len(payload) == 1 and self._is_constant(payload[0]):
+                result.append(payload[0])
+            elif len(kept) > 3:
+                result.append(element.__class__(kept))
+            else:
+                result.append(element.__class__(payload))
+            return
+
+        if isinstance(
+            element,
+            (
+                ExpressionEqual,
+                ExpressionNotEqual,
+                ExpressionLessThan,
+                ExpressionGreaterThan,
+                ExpressionLessEqual,
+                ExpressionGreaterEqual,
+                ExpressionIn,
+            ),
+        ):
+            function = [j for i, j in FOLDING_OPERATORS if isinstance(element, i)][0]
+            yield self._payload_steps(element.element_payload, payload)
+            if self._is_constant(payload[0]) and self._is_constant(payload[1]):
+                folded = self._evaluate(
+                    function, payload[0].element_payload, payload[1].element_payload
+                )
+                if folded is not None:
+                    result.append(folded)
+                    return
+            result.append(element.__class__(payload))
+            return
+
+        if isinstance(element, (ExpressionAnd, ExpressionOr)):
+            yield self._payload_steps(element.element_payload, payload)
+            result.append(self._fold_logic(element, payload))
+            return
+
+        if isinstance(element, ExpressionInverse):
+            yield self._element_steps(element.element_payload[0], payload)
+            inner = payload[0]
+            if self._is_constant(inner):
+                result.append(self._literal(not inner.element_payload))  # type: ignore
+            else:
+                result.append(ExpressionInverse([inner]))
+            return
+
+        if isinstance(element, ExpressionFunction):
+            yield self._payload_steps(element.element_payload[1], payload)
+            result.append(
+                ExpressionFunction(
+                    [element.element_payload[0], [self._combine(i) for i in payload]]
+                )
+            )
+            return
+        if isinstance(element, (ExpressionCommand, ExpressionSelector)):
+            yield self._element_steps(element.element_payload, payload)  # type: ignore
+            result.append(element.__class__(self._combine(payload[0])))
+            return
+        if isinstance(element, ExpressionScore):
+            yield self._payload_steps(element.element_payload, payload)
+            result.append(ExpressionScore([self._combine(i) for i in payload]))
+            return
+        if isinstance(element, ExpressionReference):
+            yield self._element_steps(element.element_payload[1], payload)
+            result.append(
+                ExpressionReference(
+                    [element.element_payload[0], self._combine(payload[0])]
+                )
+            )
+            return
+
+        result.append(element)
+
+    def _fold_code_block(self, code_block):  # type: (OpcodeBase) -> OpcodeBase
+        """_fold_code_block 折叠给出的代码块中的所有表达式
+
+        Args:
+            code_block (OpcodeBase): 待处理的代码块
+
+        Returns:
+            OpcodeBase: 折叠所得的代码块
+        """
+        result = []  # type: list[OpcodeBase]
+        run_steps(self._code_block_steps(code_block, result))
+        return result[0]
+
+    def _code_block_steps(
+        self, code_block, result
+    ):  # type: (OpcodeBase, list[OpcodeBase]) -> Iterator[Iterator[Any]]
+        """
+        _code_block_steps 是 _fold_code_block 的生成器形式。
+        折叠所得的代码块将被追加到 result 的末尾
+
+        Args:
+            code_block (OpcodeBase): 待处理的代码块
+            result (list[OpcodeBase]): 用于储存折叠结果的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 折叠该代码块的生成器
+        """
+        payload = []  # type: list[ExpressionElement]
+
+        if isinstance(code_block, OpcodeAssign):
+            yield self._element_steps(code_block.opcode_payload[1], payload)
+            result.append(
+                OpcodeAssign(
+                    (code_block.opcode_payload[0], self._combine(payload[0])),
+                    code_block.origin_line,
+                )
+            )
+        elif isinstance(code_block, OpcodeCondition):
+            branches = []  # type: list[ConditionCodeBlock]
+            for i in code_block.opcode_payload:
+                condition = None  # type: ExpressionCombine | None
+                if i.condition is not None:
+                    yield self._element_steps(i.condition, payload)
+                    condition = self._combine(payload.pop())
+                body = []  # type: list[OpcodeBase]
+                for j in i.code_block:
+                    yield self._code_block_steps(j, body)
+                branches.append(ConditionCodeBlock(condition, i.state_line, body))
+            result.append(OpcodeCondition(branches))
+        elif isinstance(code_block, OpcodeForLoop):
+            assert code_block.opcode_payload is not None
+            for_loop = code_block.opcode_payload
+            yield self._element_steps(for_loop.repeat_times, payload)
+            body = []
+            for i in for_loop.code_block:
+                yield self._code_block_steps(i, body)
+            result.append(
+                OpcodeForLoop(
+                    ForLoopCodeBlock(
+                        for_loop.variable,
+                        self._combine(payload[0]),
+                        for_loop.state_line,
+                        body,
+                    )
+                )
+            )
+        elif isinstance(code_block, OpcodeExpression):
+            yield self._element_steps(code_block.opcode_payload, payload)
+            result.append(
+                OpcodeExpression(self._combine(payload[0]), code_block.origin_line)
+            )
+        elif isinstance(code_block, OpcodeReturn):
+            yield self._element_steps(code_block.opcode_payload, payload)
+            result.append(OpcodeReturn(self._combine(payload[0]), code_block.origin_line))
+        else:
+            result.append(code_block)
+
+    def fold(self):  # type: () -> list[OpcodeBase]
+        """
+        fold 对 AST 语法树进行常量折叠
+
+        Returns:
+            list[OpcodeBase]:
+                折叠所得的新的语法树。
+                它可以被 CodeCompiler 等直接编译
+        """
+        return [self._fold_code_block(i) for i in self._ast]
@@ -0,0 +1,457 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Iterator
+
+import sys
+from ..parser.steps import NO_STEPS, run_steps
+from ..parser.expression.define import (
+    ExpressionElement,
+    TYPE_ENUM_INT,
+    TYPE_ENUM_BOOL,
+    TYPE_ENUM_FLOAT,
+    TYPE_ENUM_STR,
+    ELEMENT_ID_VAR,
+    ELEMENT_ID_INT,
+    ELEMENT_ID_BOOL,
+    ELEMENT_ID_FLOAT,
+    ELEMENT_ID_STR,
+)
+from ..parser.expression.basic import (
+    ExpressionLiteral,
+    ExpressionReference,
+    ExpressionSelector,
+    ExpressionScore,
+    ExpressionCommand,
+    ExpressionFunction,
+)
+from ..parser.expression.compare import (
+    ExpressionLessThan,
+    ExpressionGreaterThan,
+    ExpressionLessEqual,
+    ExpressionGreaterEqual,
+    ExpressionEqual,
+    ExpressionNotEqual,
+    ExpressionAnd,
+    ExpressionOr,
+    ExpressionIn,
+    ExpressionInverse,
+)
+from ..parser.expression.compute import (
+    ExpressionAdd,
+    ExpressionRemove,
+    ExpressionTimes,
+    ExpressionDivide,
+)
+from ..parser.expression.combine import ExpressionCombine
+from ..parser.define import (
+    OpcodeBase,
+    OpcodeAssign,
+    OpcodeCondition,
+    OpcodeForLoop,
+    OpcodeContinue,
+    OpcodeBreak,
+    OpcodeExpression,
+    OpcodeReturn,
+)
+
+# Python 2 promotes the int which overflows to long, and long is rejected
+# by the for loop. So the int computed at runtime is only exact on Python 3
+INFER_EXACT_INT = isinstance(sys.maxsize + 1, int)
+
+INFER_INT_LIKE = (TYPE_ENUM_INT, TYPE_ENUM_BOOL)
+INFER_NUMBER = (TYPE_ENUM_INT, TYPE_ENUM_BOOL, TYPE_ENUM_FLOAT)
+
+INFER_CASTS = {
+    ELEMENT_ID_INT: TYPE_ENUM_INT,
+    ELEMENT_ID_BOOL: TYPE_ENUM_BOOL,
+    ELEMENT_ID_FLOAT: TYPE_ENUM_FLOAT,
+    ELEMENT_ID_STR: TYPE_ENUM_STR,
+}  # type: dict[int, int]
+
+
+def _join(a, b):  # type: (dict[str, int] | None, dict[str, int] | None) -> dict[str, int] | None
+    """
+    _join 合并两条执行路径上的变量类型。
+    None 表示不可达的执行路径
+
+    Args:
+        a (dict[str, int] | None): 第一条执行路径上的变量类型
+        b (dict[str, int] | None): 第二条执行路径上的变量类型
+
+    Returns:
+        dict[str, int] | None: 合并所得的变量类型
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return dict((key, value) for key, value in a.items() if b.get(key) == value)
+
+
+class TypeInferrer:
+    """
+    TypeInferrer 在 AST 语法树层面推导表达式的类型。
+
+    类型的来源包括字面量、类型转换、带有类型断言的 ref、
+    score 与 command (int) 以及 selector (str)。
+    变量的类型沿着控制流传播，并在分支与循环的汇合处合并，
+    因此只有在所有执行路径上都相同的类型才会被保留。
+
+    语法树通过 run_steps 以显式栈遍历，
+    因此嵌套的深度不受 Python 递归深度的限制。
+
+    推导的结果是从表达式元素的 id 到其类型 (TYPE_ENUM_*) 的映射。
+    无法确定类型的表达式元素，其类型为 None
+    """
+
+    _ast = []  # type: list[OpcodeBase]
+    _types = {}  # type: dict[int, int | None]
+
+    def __init__(self, code_block=[]):  # type: (list[OpcodeBase]) -> None
+        """初始化并返回一个新的 TypeInferrer
+
+        Args:
+            code_block (list[OpcodeBase], optional):
+                CodeParser 的编译结果
+                默认值为空列表
+        """
+        self._ast = code_block if len(code_block) > 0 else []
+        self._types = {}
+
+    def _record(self, element, result):  # type: (ExpressionElement, int | None) -> int | None
+        """
+        _record 记录 element 的类型。
+        循环体会被推导多次，因此每次的结果都将与此前的结果合并
+
+        Args:
+            element (ExpressionElement): 目标表达式元素
+            result (int | None): 本次推导所得的类型
+
+        Returns:
+            int | None: 本次推导所得的类型
+        """
+        key = id(element)
+        if key in self._types and self._types[key] != result:
+            self._types[key] = None
+        else:
+            self._types[key] = result
+        return result
+
+    def _literal_type(self, value):  # type: (Any) -> int | None
+        """_literal_type 返回常量 value 的类型
+
+        Args:
+            value (int | bool | float | str): 目标常量
+
+        Returns:
+            int | None: 该常量的类型
+        """
+        if isinstance(value, bool):
+            return TYPE_ENUM_BOOL
+        if isinstance(value, int):
+            return TYPE_ENUM_INT
+        if isinstance(value, float):
+            return TYPE_ENUM_FLOAT
+        if isinstance(value, str):
+            return TYPE_ENUM_STR
+        return None
+
+    def _compute_type(
+        self, element, left, right
+    ):  # type: (ExpressionElement, int | None, int | None) -> int | None
+        """_compute_type 返回两个操作数进行四则运算后所得结果的类型
+
+        Args:
+            element (ExpressionElement): 四则运算的表达式元素
+            left (int | None): 左操作数的类型
+            right (int | None): 右操作数的类型
+
+        Returns:
+            int | None: 运算结果的类型
+        """
+        if left in INFER_NUMBER and right in INFER_NUMBER:
+            if isinstance(element, ExpressionDivide):
+                return TYPE_ENUM_FLOAT
+            if left == TYPE_ENUM_FLOAT or right == TYPE_ENUM_FLOAT:
+                return TYPE_ENUM_FLOAT
+            return TYPE_ENUM_INT
+        if isinstance(element, ExpressionAdd):
+            if left == TYPE_ENUM_STR and right == TYPE_ENUM_STR:
+                return TYPE_ENUM_STR
+        if isinstance(element, ExpressionTimes):
+            if (left == TYPE_ENUM_STR and right in INFER_INT_LIKE) or (
+                left in INFER_INT_LIKE and right == TYPE_ENUM_STR
+            ):
+                return TYPE_ENUM_STR
+        return None
+
+    def _element_steps(
+        self, element, env, result
+    ):  # type: (ExpressionElement, dict[str, int], list[int | None]) -> Iterator[Iterator[Any]]
+        """
+        _element_steps 返回推导给出的表达式元素及其所有子元素的类型的子步骤。
+        变量和常量的类型被直接推导，因此不需要产生新的生成器
+
+        Args:
+            element (ExpressionElement): 待推导的表达式元素
+            env (dict[str, int]): 求值该表达式时已知的变量类型
+            result (list[int | None]): 用于储存该表达式元素的类型的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 推导该表达式元素的子步骤
+        """
+        if isinstance(element, ExpressionLiteral):
+            if element.element_id == ELEMENT_ID_VAR:
+                result.append(self._record(element, env.get(element.element_payload)))  # type: ignore
+                return NO_STEPS
+            if not isinstance(element.element_payload, ExpressionCombine):
+                result.append(
+                    self._record(element, self._literal_type(element.element_payload))
+                )
+                return NO_STEPS
+        return self._compound_steps(element, env, result)
+
+    def _payload_steps(
+        self, elements, env, result
+    ):  # type: (list[ExpressionElement], dict[str, int], list[int | None]) -> Iterator[Iterator[Any]]
+        """
+        _payload_steps 依次推导 elements 中的每个表达式元素，
+        并将它们的类型追加到 result 的末尾
+
+        Args:
+            elements (list[ExpressionElement]): 待推导的表达式元素
+            env (dict[str, int]): 求值这些表达式时已知的变量类型
+            result (list[int | None]): 用于储存这些表达式元素的类型的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 推导这些表达式元素的生成器
+        """
+        for i in elements:
+            yield self._element_steps(i, env, result)
+
+    def _compound_steps(
+        self, element, env, result
+    ):  # type: (ExpressionElement, dict[str, int], list[int | None]) -> Iterator[Iterator[Any]]
+        """
+        _compound_steps 产出推导各个子元素的类型的子步骤，
+        并在子元素被推导后推导该表达式元素自身的类型
+
+        Args:
+            element (ExpressionElement): 待推导的表达式元素
+            env (dict[str, int]): 求值该表达式时已知的变量类型
+            result (list[int | None]): 用于储存该表达式元素的类型的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 推导该表达式元素的生成器
+        """
+        payload = []  # type: list[int | None]
+
+        if isinstance(element, ExpressionCombine):
+            yield self._element_steps(element.element_payload[0], env, payload)
+            result.append(self._record(element, payload[0]))
+            return
+
+        if isinstance(element, ExpressionLiteral):
+            yield self._element_steps(element.element_payload, env, payload)  # type: ignore
+            result.append(self._record(element, INFER_CASTS[element.element_id]))
+            return
+
+        if isinstance(
+            element,
+            (ExpressionAdd, ExpressionRemove, ExpressionTimes, ExpressionDivide),
+        ):
+            yield self._payload_steps(element.element_payload, env, payload)
+            current = payload[0]
+            for i in payload[1:]:
+                current = self._compute_type(element, current, i)
+            result.append(self._record(element, current))
+            return
+
+        if isinstance(
+            element,
+            (
+                ExpressionEqual,
+                ExpressionNotEqual,
+                ExpressionLessThan,
+                ExpressionGreaterThan,
+                ExpressionLessEqual,
+                ExpressionGreaterEqual,
+                ExpressionIn,
+                ExpressionInverse,
+            ),
+        ):
+            yield self._payload_steps(element.element_payload, env, payload)
+            result.append(self._record(element, TYPE_ENUM_BOOL))
+            return
+
+        if isinstance(element, (ExpressionAnd, ExpressionOr)):
+            # The result is always one of the operands
+            yield self._payload_steps(element.element_payload, env, payload)
+            current = payload[0]
+            for i in payload[1:]:
+                if i != current:
+                    current = None
+            result.append(self._record(element, current))
+            return
+
+        if isinstance(element, ExpressionFunction):
+            yield self._payload_steps(element.element_payload[1], env, payload)
+            result.append(self._record(element, None))
+            return
+        if isinstance(element, ExpressionCommand):
+            yield self._element_steps(element.element_payload, env, payload)  # type: ignore
+            result.append(self._record(element, TYPE_ENUM_INT))
+            return
+        if isinstance(element, ExpressionSelector):
+            yield self._element_steps(element.element_payload, env, payload)  # type: ignore
+            result.append(self._record(element, TYPE_ENUM_STR))
+            return
+        if isinstance(element, ExpressionScore):
+            yield self._payload_steps(element.element_payload, env, payload)
+            result.append(self._record(element, TYPE_ENUM_INT))
+            return
+        if isinstance(element, ExpressionReference):
+            yield self._element_steps(element.element_payload[1], env, payload)
+            result.append(self._record(element, element.element_payload[0]))
+            return
+
+        result.append(self._record(element, None))
+
+    def _code_blocks_steps(
+        self, code_blocks, env, loop, result
+    ):  # type: (list[OpcodeBase], dict[str, int] | None, tuple[list, list] | None, list[dict[str, int] | None]) -> Iterator[Iterator[Any]]
+        """
+        _code_blocks_steps 依次推导给出的多个代码块，
+        并将它们全部执行完成后的变量类型追加到 result 的末尾
+
+        Args:
+            code_blocks (list[OpcodeBase]): 待推导的代码块
+            env (dict[str, int] | None): 进入这些代码块时的变量类型
+            loop (tuple[list, list] | None): 与 _code_block_steps 的同名参数相同
+            result (list[dict[str, int] | None]): 用于储存变量类型的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 推导这些代码块的生成器
+        """
+        current = [env]  # type: list[dict[str, int] | None]
+        for i in code_blocks:
+            yield self._code_block_steps(i, current[-1], loop, current)
+        result.append(current[-1])
+
+    def _code_block_steps(
+        self, code_block, env, loop, result
+    ):  # type: (OpcodeBase, dict[str, int] | None, tuple[list, list] | None, list[dict[str, int] | None]) -> Iterator[Iterator[Any]]
+        """
+        _code_block_steps 推导给出的代码块中所有表达式的类型，
+        并将该代码块执行完成后的变量类型追加到 result 的末尾
+
+        Args:
+            code_block (OpcodeBase):
+                待推导的代码块
+            env (dict[str, int] | None):
+                进入代码块时的变量类型。
+                None 表示该代码块不可达
+            loop (tuple[list, list] | None):
+                该代码块所在的循环语句在 continue 和 break 时的变量类型。
+                若它不位于循环体中，请设置为 None
+            result (list[dict[str, int] | None]):
+                用于储存代码块执行完成后的变量类型的列表。
+                如果代码块不会正常结束，则追加 None
+
+        Returns:
+            Iterator[Iterator[Any]]: 推导该代码块的生成器
+        """
+        # Unreachable code is still inferred, so that every element gets its type
+        current = env if env is not None else {}
+        types = []  # type: list[int | None]
+
+        if isinstance(code_block, OpcodeAssign):
+            yield self._element_steps(code_block.opcode_payload[1], current, types)
+            if env is None:
+                result.append(None)
+                return
+            env = dict(env)
+            if types[0] is None:
+                env.pop(code_block.opcode_payload[0], None)
+            else:
+                env[code_block.opcode_payload[0]] = types[0]
+            result.append(env)
+            return
+
+        if isinstance(code_block, OpcodeCondition):
+            joined = None
+            has_else = False
+            branches = []  # type: list[dict[str, int] | None]
+            for i in code_block.opcode_payload:
+                if i.condition is None:
+                    has_else = True
+                else:
+                    yield self._element_steps(i.condition, current, types)
+                yield self._code_blocks_steps(i.code_block, env, loop, branches)
+                joined = _join(joined, branches[-1])
+                if has_else:
+                    break
+            result.append(joined if has_else else _join(joined, env))
+            return
+
+        if isinstance(code_block, OpcodeForLoop):
+            assert code_block.opcode_payload is not None
+            for_loop = code_block.opcode_payload
+            yield self._element_steps(for_loop.repeat_times, current, types)
+            # Iterate until the types at the beginning of each round are stable
+            head = env
+            while True:
+                inner = ([], [])  # type: tuple[list, list]
+                body = dict(head) if head is not None else None
+                if body is not None:
+                    body[for_loop.variable] = TYPE_ENUM_INT
+                bodies = []  # type: list[dict[str, int] | None]
+                yield self._code_blocks_steps(for_loop.code_block, body, inner, bodies)
+                new_head = _join(env, bodies[0])
+                for i in inner[0]:
+                    new_head = _join(new_head, i)
+                if new_head == head:
+                    break
+                head = new_head
+            for i in inner[1]:
+                head = _join(head, i)
+            result.append(head)
+            return
+
+        if isinstance(code_block, OpcodeContinue):
+            if loop is not None and env is not None:
+                loop[0].append(env)
+            result.append(None)
+            return
+        if isinstance(code_block, OpcodeBreak):
+            if loop is not None and env is not None:
+                loop[1].append(env)
+            result.append(None)
+            return
+
+        if isinstance(code_block, OpcodeExpression):
+            yield self._element_steps(code_block.opcode_payload, current, types)
+            result.append(env)
+            return
+        if isinstance(code_block, OpcodeReturn):
+            yield self._element_steps(code_block.opcode_payload, current, types)
+            result.append(None)
+            return
+
+        result.append(env)
+
+    def infer(self):  # type: () -> dict[int, int | None]
+        """
+        infer 推导 AST 语法树中所有表达式元素的类型
+
+        Returns:
+            dict[int, int | None]:
+                从表达式元素的 id 到其类型的映射。
+                推导结果只在该语法树存活期间有效
+        """
+        self._types = {}
+        run_steps(self._code_blocks_steps(self._ast, {}, None, []))
+        return self._types
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+import json
+from .compile import CompileResult
+from .external import BuiltInFunction
+from .define import (
+    BYTECODE_HANDLE_FUNC,
+    BYTECODE_HANDLE_LINKED_FUNC,
+    instruction_length,
+)
+
+try:
+    range = xrange  # type: ignore
+except Exception:
+    pass
+
+CAST_FUNC_NAMES = ("int", "bool", "float", "str")
+
+
+class LinkException(Exception):
+    """
+    LinkException 指示严格模式下的链接失败，
+    即字节码调用了链接时不存在的内建函数
+    """
+
+    pass
+
+
+def contract_checker(
+    name,  # type: str
+    func,  # type: Callable[..., int | bool | float | str]
+    return_type,  # type: tuple[type, ...]
+):  # type: (...) -> Callable[..., int | bool | float | str]
+    """
+    contract_checker 包装 func，
+    使其在每次被调用后检查返回值是否符合所声明的返回值类型。
+    它被 CodeLinker 用于在调试模式下报告违反约定的内建函数
+
+    Args:
+        name (str): 内建函数的名字
+        func (Callable[..., int | bool | float | str]): 内建函数本身
+        return_type (tuple[type, ...]): 该函数所声明的返回值类型
+
+    Returns:
+        Callable[..., int | bool | float | str]: 包装后的函数
+    """
+
+    def checked(*args):  # type: (Any) -> Any
+        value = func(*args)
+        if not isinstance(value, return_type):
+            raise Exception(
+                "The return value from func {} violates its declared type {}, but got {}".format(
+                    name, "/".join([i.__name__ for i in return_type]), value
+                )
+            )
+        return value
+
+    return checked
+
+
+class LinkedFunction:
+    """
+    LinkedFunction 是 HANDLE_LINKED_FUNC 指令的 FUNC_SLOT 操作数，
+    它保存了链接时已经解析的内建函数。
+
+    类型转换函数和静态内建函数在链接时就被解析，并保存在 func 中。
+    由于动态内建函数可能随时改变，因此它们的 func 为 None，
+    并且每次调用时都通过 lookup 重新查找。
+
+    如果 trusted 为真，则 func 已经声明了其返回值类型，
+    执行引擎在调用它后不再检查返回值的类型
+    """
+
+    name = ""  # type: str
+    func = None  # type: Callable[..., int | bool | float | str] | None
+    trusted = False  # type: bool
+    _builtins = None  # type: BuiltInFunction | None
+
+    def __init__(
+        self,
+        name,  # type: str
+        builtins,  # type: BuiltInFunction
+        func,  # type: Callable[..., int | bool | float | str] | None
+        trusted=False,  # type: bool
+    ):  # type: (...) -> None
+        """初始化并返回一个新的 LinkedFunction
+
+        Args:
+            name (str):
+                被调用的函数的名字
+            builtins (BuiltInFunction):
+                链接时所使用的外部函数提供者
+            func (Callable[..., int | bool | float | str] | None):
+                链接时已经解析的函数。
+                对于动态内建函数以及未知的函数，它为 None
+            trusted (bool, optional):
+                是否信任 func 所声明的返回值类型。
+                默认值为 False
+        """
+        self.name = name
+        self.func = func
+        self.trusted = trusted
+        self._builtins = builtins
+
+    def __repr__(self):  # type: () -> str
+        """返回 LinkedFunction 的字符串表示
+
+        Returns:
+            str: 该 LinkedFunction 的字符串表示
+        """
+        return "LinkedFunction(name={}, static={}, trusted={})".format(
+            json.dumps(self.name, ensure_ascii=False), self.func is not None, self.trusted
+        )
+
+    def lookup(self):  # type: () -> Callable[..., int | bool | float | str]
+        """
+        lookup 在动态内建函数中查找该函数。
+        它只在 func 为 None 时被使用
+
+        Raises:
+            Exception:
+                如果目标函数不存在，
+                则抛出与 BuiltInFunction.get_func 相同的错误
+
+        Returns:
+            Callable[..., int | bool | float | str]:
+                该函数当前所对应的动态内建函数
+        """
+        dynamic = self._builtins.dynamic  # type: ignore
+        if self.name in dynamic:
+            return dynamic[self.name]
+        return self._builtins.get_func(self.name)  # type: ignore
+
+    def convert(self, value):  # type: (Any) -> int | bool | float | str
+        """
+        convert 检查不是 int/bool/float/str 的返回值。
+        与 HANDLE_FUNC 相同，unicode 被转换为 str，
+        而其他类型的值将导致运行时错误
+
+        Args:
+            value (Any): 该函数的返回值
+
+        Raises:
+            Exception:
+                如果返回值的类型不被支持，
+                则抛出相应的错误
+
+        Returns:
+            int | bool | float | str: 转换后的返回值
+        """
+        if isinstance(value, (int, bool, float, str)):
+            return value
+        try:
+            if isinstance(value, unicode):  # type: ignore
+                return str(value)
+        except Exception:
+            pass
+        raise Exception(
+            "The data type of return value from func {} must be int/bool/float/str, but got {}".format(
+                self.name, value
+            )
+        )
+
+
+class CodeLinker:
+    """
+    CodeLinker 将编译结果与给定的 BuiltInFunction 链接。
+
+    链接会将每个 HANDLE_FUNC 指令改写为 HANDLE_LINKED_FUNC，
+    从而使函数名只在链接时被解析一次，而不是在每次调用时解析。
+
+    链接所得的编译结果只能与链接时所给出的 BuiltInFunction 一起使用，
+    运行时所传入的 BuiltInFunction 不会影响已经链接的函数调用。
+
+    通过 BuiltInFunction.declare 声明了返回值类型的静态内建函数会被信任，
+    执行引擎在调用它们后不再检查返回值的类型
+    """
+
+    _compiled = CompileResult([], [], None)  # type: ignore
+    _builtins = None  # type: BuiltInFunction | None
+    _strict = False  # type: bool
+    _debug = False  # type: bool
+
+    def __init__(
+        self, compiled, builtins, strict=False, debug=False
+    ):  # type: (CompileResult, BuiltInFunction, bool, bool) -> None
+        """初始化并返回一个新的 CodeLinker
+
+        Args:
+            compiled (CompileResult):
+                CodeCompiler 的编译结果
+            builtins (BuiltInFunction):
+                外部函数提供者为用户定义的内建函数
+            strict (bool, optional):
+                是否在链接时报告未知的函数。
+                如果为假，那么未知的函数仍然在被调用时才抛出错误。
+                默认值为 False
+            debug (bool, optional):
+                是否在调试模式下链接。
+                调试模式不信任任何声明，而是在每次调用后检查
+                返回值是否符合所声明的类型，并报告违反约定的函数。
+                默认值为 False
+        """
+        self._compiled = compiled
+        self._builtins = builtins
+        self._strict = strict
+        self._debug = debug
+
+    def _resolve(self, name):  # type: (str) -> LinkedFunction
+        """_resolve 解析名为 name 的函数
+
+        Args:
+            name (str): 被调用的函数的名字
+
+        Raises:
+            LinkException:
+                如果处于严格模式且该函数不存在，
+                则抛出相应的错误
+
+        Returns:
+            LinkedFunction: 该函数对应的 FUNC_SLOT
+        """
+        builtins = self._builtins  # type: BuiltInFunction # type: ignore
+        if name in CAST_FUNC_NAMES or name in builtins.static:
+            func = builtins.get_func(name)
+            return_type = builtins.returns.get(name)
+            if return_type is None:
+                return LinkedFunction(name, builtins, func)
+            if self._debug:
+                return LinkedFunction(
+                    name, builtins, contract_checker(name, func, return_type)
+                )
+            return LinkedFunction(name, builtins, func, True)
+        if self._strict and name not in builtins.dynamic:
+            raise LinkException(
+                "CodeLinker: Unknown function {} is called".format(
+                    json.dumps(name, ensure_ascii=False)
+                )
+            )
+        return LinkedFunction(name, builtins, None)
+
+    def link(self):  # type: () -> CompileResult
+        """
+        link 链接字节码中所有的函数调用，
+        并返回一个新的 CompileResult。
+        原有的编译结果不会被修改
+
+        Raises:
+            LinkException:
+                如果处于严格模式且存在未知的函数，
+                则抛出相应的错误
+
+        Returns:
+            CompileResult: 链接所得的编译结果
+        """
+        byte_code = list(self._compiled.byte_code)
+        slots = {}  # type: dict[str, LinkedFunction]
+
+        pc = 0
+        while pc < len(byte_code):
+            if byte_code[pc] == BYTECODE_HANDLE_FUNC:
+                name = byte_code[pc + 2]  # type: str # type: ignore
+                if name not in slots:
+                    slots[name] = self._resolve(name)
+                byte_code[pc] = BYTECODE_HANDLE_LINKED_FUNC
+                byte_code[pc + 2] = slots[name]  # type: ignore
+            pc += instruction_length(byte_code, pc)
+
+        return CompileResult(
+            byte_code, self._compiled.check_point, self._compiled.var_mapping
+        )
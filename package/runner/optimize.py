@@ -0,0 +1,746 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
+from .compile import CompileResult
+from .define import (
+    BYTECODE_LOAD_CONST,
+    BYTECODE_LOAD_VALUE,
+    BYTECODE_STORE_VALUE,
+    BYTECODE_LOOP_JUMP,
+    BYTECODE_DIRECT_JUMP,
+    BYTECODE_FALSE_JUMP,
+    BYTECODE_TRUE_JUMP,
+    BYTECODE_HANDLE_COMPUTE,
+    BYTECODE_HANDLE_COMPARE,
+    BYTECODE_MOVE_VALUE,
+    BYTECODE_STORE_CONST,
+    BYTECODE_VALUE_CONST_COMPUTE,
+    BYTECODE_VALUE_VALUE_COMPUTE,
+    BYTECODE_VALUE_CONST_COMPUTE_STORE,
+    BYTECODE_VALUE_VALUE_COMPUTE_STORE,
+    BYTECODE_VALUE_CONST_COMPARE,
+    BYTECODE_VALUE_VALUE_COMPARE,
+    BYTECODE_COMPARE_FALSE_JUMP,
+    BYTECODE_FALSE_JUMP_OR_POP,
+    BYTECODE_TRUE_JUMP_OR_POP,
+    BYTECODE_INT_ADD,
+    BYTECODE_INT_TIMES,
+    BYTECODE_STR_CONCAT,
+    BYTECODE_INT_EQUAL,
+    BYTECODE_INT_GREATER_EQUAL,
+    BYTECODE_APPEND_VALUE,
+    BYTECODE_LOAD_BUFFER,
+    BYTECODE_FOR_PREPARE,
+    BYTECODE_FOR_RANGE,
+    BYTECODE_LOOP_CHECK,
+    BYTECODE_HANDLE_LOGIC_ANDOR,
+    BYTECODE_HANDLE_LOGIC_INNOT,
+    BYTECODE_HANDLE_CAST,
+    BYTECODE_HANDLE_FUNC,
+    BYTECODE_HANDLE_LINKED_FUNC,
+    BYTECODE_HANDLE_INTERACT,
+    BYTECODE_STORE_RETURN_VAL,
+    BYTECODE_PROGRAM_STOP_RUN,
+    BYTECODE_INTERNAL_PANIC,
+    LOOP_CHECK_TYPE_POP_STACK,
+    LOGIC_ANDOR_TYPE_AND,
+    LOGIC_INNOT_TYPE_IN,
+    INTERACT_TYPE_SCORE,
+    CheckPoint,
+    instruction_length,
+)
+
+try:
+    range = xrange  # type: ignore
+except Exception:
+    pass
+
+
+def jump_offsets(op):  # type: (int) -> tuple[int, ...]
+    """
+    jump_offsets 返回操作码为 op 的指令中，
+    所有跳转目标操作数相对于指令起始位置的偏移
+
+    Args:
+        op (int): 目标指令的操作码
+
+    Returns:
+        tuple[int, ...]: 跳转目标操作数的偏移
+    """
+    if op == BYTECODE_LOOP_JUMP:
+        return (2,)
+    if op in (
+        BYTECODE_DIRECT_JUMP,
+        BYTECODE_FALSE_JUMP,
+        BYTECODE_TRUE_JUMP,
+        BYTECODE_FALSE_JUMP_OR_POP,
+        BYTECODE_TRUE_JUMP_OR_POP,
+    ):
+        return (1,)
+    if op == BYTECODE_COMPARE_FALSE_JUMP:
+        return (2,)
+    if op == BYTECODE_FOR_RANGE:
+        return (3,)
+    return ()
+
+
+def falls_through(op):  # type: (int) -> bool
+    """
+    falls_through 检查操作码为 op 的指令执行完成后，
+    是否可能继续执行紧随其后的指令
+
+    Args:
+        op (int): 目标指令的操作码
+
+    Returns:
+        bool: 是否可能继续执行紧随其后的指令
+    """
+    return op not in (
+        BYTECODE_DIRECT_JUMP,
+        BYTECODE_PROGRAM_STOP_RUN,
+        BYTECODE_INTERNAL_PANIC,
+    )
+
+
+def stack_effect(byte_code, pc):  # type: (list[Any], int) -> tuple[int, int, int]
+    """
+    stack_effect 返回起始于 pc 处的指令对栈的影响
+
+    Args:
+        byte_code (list[int | bool | float | str]):
+            编译所得的字节码序列
+        pc (int):
+            目标指令的起始位置
+
+    Returns:
+        tuple[int, int, int]:
+            执行该指令所需的最小栈深度，
+            以及继续执行下一条指令和发生跳转时栈深度的变化
+    """
+    op = byte_code[pc]
+    if op in (BYTECODE_LOAD_CONST, BYTECODE_LOAD_VALUE, BYTECODE_LOAD_BUFFER):
+        return (0, 1, 1)
+    if op in (BYTECODE_STORE_VALUE, BYTECODE_STORE_RETURN_VAL):
+        return (1, -1, -1)
+    if op == BYTECODE_LOOP_JUMP:
+        return (2, 0, 0)
+    if op == BYTECODE_LOOP_CHECK:
+        if byte_code[pc + 1] == LOOP_CHECK_TYPE_POP_STACK:
+            return (2, -2, -2)
+        return (1, 0, 0)
+    if op in (BYTECODE_FALSE_JUMP, BYTECODE_TRUE_JUMP):
+        return (1, -1, -1)
+    if op in (
+        BYTECODE_HANDLE_COMPUTE,
+        BYTECODE_HANDLE_FUNC,
+        BYTECODE_HANDLE_LINKED_FUNC,
+    ):
+        return (byte_code[pc + 1], 1 - byte_code[pc + 1], 1 - byte_code[pc + 1])
+    if op == BYTECODE_APPEND_VALUE:
+        return (byte_code[pc + 2], -byte_code[pc + 2], -byte_code[pc + 2])
+    if op == BYTECODE_FOR_PREPARE:
+        return (1, -1, -1)
+    if op == BYTECODE_HANDLE_COMPARE:
+        return (2, -1, -1)
+    if op == BYTECODE_HANDLE_LOGIC_ANDOR:
+        return (2, 0, 0)
+    if op == BYTECODE_HANDLE_LOGIC_INNOT:
+        if byte_code[pc + 1] == LOGIC_INNOT_TYPE_IN:
+            return (2, -1, -1)
+        return (1, 0, 0)
+    if op == BYTECODE_HANDLE_INTERACT:
+        if byte_code[pc + 1] == INTERACT_TYPE_SCORE:
+            return (2, -1, -1)
+        return (1, 0, 0)
+    if op == BYTECODE_HANDLE_CAST:
+        return (1, 0, 0)
+    if op in (BYTECODE_FALSE_JUMP_OR_POP, BYTECODE_TRUE_JUMP_OR_POP):
+        return (1, -1, 0)
+    if op == BYTECODE_COMPARE_FALSE_JUMP:
+        return (2, -2, -2)
+    if BYTECODE_INT_ADD <= op <= BYTECODE_INT_GREATER_EQUAL:
+        if op == BYTECODE_STR_CONCAT:
+            return (byte_code[pc + 1], 1 - byte_code[pc + 1], 1 - byte_code[pc + 1])
+        return (2, -1, -1)
+    if BYTECODE_VALUE_CONST_COMPUTE <= op <= BYTECODE_VALUE_VALUE_COMPARE:
+        if op in (
+            BYTECODE_VALUE_CONST_COMPUTE_STORE,
+            BYTECODE_VALUE_VALUE_COMPUTE_STORE,
+        ):
+            return (0, 0, 0)
+        return (0, 1, 1)
+    return (0, 0, 0)
+
+
+def generic_form(words):  # type: (list[Any]) -> list[Any]
+    """
+    generic_form 返回与类型特化的指令等价的通用指令。
+    对于其他指令，则原样返回
+
+    Args:
+        words (list[int | bool | float | str]): 目标指令
+
+    Returns:
+        list[int | bool | float | str]: 等价的通用指令
+    """
+    op = words[0]
+    if BYTECODE_INT_ADD <= op <= BYTECODE_INT_TIMES:
+        return [BYTECODE_HANDLE_COMPUTE, 2, op - BYTECODE_INT_ADD]
+    if BYTECODE_INT_EQUAL <= op <= BYTECODE_INT_GREATER_EQUAL:
+        return [BYTECODE_HANDLE_COMPARE, op - BYTECODE_INT_EQUAL]
+    return words
+
+
+def stack_depths(compiled):  # type: (CompileResult) -> dict[int, int]
+    """
+    stack_depths 校验 compiled 的栈平衡，
+    并返回每条可达指令执行前的栈深度。
+
+    每条指令在所有可能的执行路径上都必须具有相同的栈深度，
+    栈不能被过度弹出，并且程序末尾的 PROGRAM_STOP_RUN
+    被执行时，栈必须为空
+
+    Args:
+        compiled (CompileResult):
+            待校验的编译结果
+
+    Raises:
+        Exception:
+            如果栈不平衡，则抛出相应的错误
+
+    Returns:
+        dict[int, int]: 从指令位置到其执行前栈深度的映射
+    """
+    byte_code = compiled.byte_code
+    depths = {}  # type: dict[int, int]
+    pending = [(0, 0)] if len(byte_code) > 0 else []
+
+    while len(pending) > 0:
+        pc, depth = pending.pop()
+        if pc in depths:
+            if depths[pc] != depth:
+                raise Exception(
+                    "stack_depths: Inconsistent stack depth at pc={} ({} != {})".format(
+                        pc, depths[pc], depth
+                    )
+                )
+            continue
+        if pc >= len(byte_code):
+            raise Exception("stack_depths: Running out of byte code at pc={}".format(pc))
+
+        op = byte_code[pc]  # type: int # type: ignore
+        required, fall_delta, jump_delta = stack_effect(byte_code, pc)
+        if depth < required:
+            raise Exception(
+                "stack_depths: Stack underflow at pc={} (depth={}, required={})".format(
+                    pc, depth, required
+                )
+            )
+        depths[pc] = depth
+
+        for offset in jump_offsets(op):
+            pending.append((byte_code[pc + offset], depth + jump_delta))  # type: ignore
+        if falls_through(op):
+            pending.append((pc + instruction_length(byte_code, pc), depth + fall_delta))
+
+    last = len(byte_code) - 1
+    if last in depths and depths[last] != 0:
+        raise Exception(
+            "stack_depths: Stack is not empty at the end of program (depth={})".format(
+                depths[last]
+            )
+        )
+    return depths
+
+
+class CodeOptimizer:
+    """
+    CodeOptimizer 对 CodeCompiler 的编译结果进行字节码层面的优化。
+
+    每种优化都返回一个新的 CompileResult，
+    原有的编译结果不会被修改。
+    优化后的字节码仍然可以被 CodeRunner 运行，
+    并且与优化前具有相同的运行结果和错误信息
+    """
+
+    _compiled = CompileResult([], [], None)  # type: ignore
+
+    def __init__(self, compiled):  # type: (CompileResult) -> None
+        """初始化并返回一个新的 CodeOptimizer
+
+        Args:
+            compiled (CompileResult):
+                CodeCompiler 的编译结果
+        """
+        self._compiled = compiled
+
+    def _starts(self):  # type: () -> list[int]
+        """_starts 返回字节码中所有指令的起始位置
+
+        Returns:
+            list[int]: 所有指令的起始位置
+        """
+        byte_code = self._compiled.byte_code
+        starts = []  # type: list[int]
+        pc = 0
+        while pc < len(byte_code):
+            starts.append(pc)
+            pc += instruction_length(byte_code, pc)
+        return starts
+
+    def _jump_targets(self, starts):  # type: (list[int]) -> set[int]
+        """_jump_targets 返回字节码中所有跳转指令的目标
+
+        Args:
+            starts (list[int]): 所有指令的起始位置
+
+        Returns:
+            set[int]: 所有的跳转目标
+        """
+        byte_code = self._compiled.byte_code
+        targets = set()  # type: set[int]
+        for pc in starts:
+            for offset in jump_offsets(byte_code[pc]):  # type: ignore
+                targets.add(byte_code[pc + offset])  # type: ignore
+        return targets
+
+    def _regions(self):  # type: () -> dict[int, int]
+        """
+        _regions 返回每个位置所属的检查点的索引。
+        不属于任何检查点的位置不会出现在结果中
+
+        Returns:
+            dict[int, int]: 从位置到检查点索引的映射
+        """
+        regions = {}  # type: dict[int, int]
+        for index, chk in enumerate(self._compiled.check_point):
+            for pc in range(chk.start_pc, chk.end_pc + 1):
+                regions[pc] = index
+        return regions
+
+    def _rebuild(self, groups):  # type: (list[tuple[list[Any], list[int]]]) -> CompileResult
+        """
+        _rebuild 由一系列指令组重新构造编译结果。
+
+        每个指令组由新的字节码以及它所替代的原有指令的起始位置组成，
+        新字节码中的跳转目标仍使用原有的位置，并会在此处被重定位。
+        新字节码为空的指令组表示其替代的指令已被删除，
+        跳转到这些指令的位置将被重定位到下一个指令组。
+
+        检查点的范围也会被相应地重定位，
+        范围为空的检查点将被删除
+
+        Args:
+            groups (list[tuple[list[Any], list[int]]]):
+                按顺序排列的所有指令组
+
+        Returns:
+            CompileResult: 重新构造所得的编译结果
+        """
+        byte_code = []  # type: list[Any]
+        mapping = {}  # type: dict[int, int]
+
+        for words, origins in groups:
+            for pc in origins:
+                mapping[pc] = len(byte_code)
+            byte_code.extend(words)
+        mapping[len(self._compiled.byte_code)] = len(byte_code)
+
+        pc = 0
+        while pc < len(byte_code):
+            for offset in jump_offsets(byte_code[pc]):
+                byte_code[pc + offset] = mapping[byte_code[pc + offset]]
+            pc += instruction_length(byte_code, pc)
+
+        check_point = []  # type: list[CheckPoint]
+        for chk in self._compiled.check_point:
+            start_pc = mapping[chk.start_pc]
+            end_pc = mapping[chk.end_pc + 1] - 1
+            if end_pc >= start_pc:
+                check_point.append(
+                    CheckPoint(chk.point_type, start_pc, end_pc, chk.payload)
+                )
+
+        return CompileResult(byte_code, check_point, self._compiled.var_mapping)
+
+    def _fuse(self, window):  # type: (list[list[Any]]) -> tuple[list[Any], int] | None
+        """
+        _fuse 尝试将 window 开头的若干条指令合并为一条超级指令
+
+        Args:
+            window (list[list[Any]]):
+                从当前位置开始的、可以被安全合并的指令
+
+        Returns:
+            tuple[list[Any], int] | None:
+                合并所得的超级指令及其替代的指令数量。
+                如果无法合并，则返回 None
+        """
+        # The specialised int operator could be fused as the generic one,
+        # which saves more dispatches than the specialisation does
+        window = [generic_form(i) for i in window]
+        ops = [i[0] for i in window]
+
+        if len(ops) >= 3 and ops[0] == BYTECODE_LOAD_VALUE:
+            first, second, third = window[0], window[1], window[2]
+            if (
+                ops[1] in (BYTECODE_LOAD_CONST, BYTECODE_LOAD_VALUE)
+                and ops[2] == BYTECODE_HANDLE_COMPUTE
+                and third[1] == 2
+            ):
+                with_const = ops[1] == BYTECODE_LOAD_CONST
+                if len(ops) >= 4 and ops[3] == BYTECODE_STORE_VALUE:
+                    op = (
+                        BYTECODE_VALUE_CONST_COMPUTE_STORE
+                        if with_const
+                        else BYTECODE_VALUE_VALUE_COMPUTE_STORE
+                    )
+                    return [op, first[1], second[1], third[2], window[3][1]], 4
+                op = (
+                    BYTECODE_VALUE_CONST_COMPUTE
+                    if with_const
+                    else BYTECODE_VALUE_VALUE_COMPUTE
+                )
+                return [op, first[1], second[1], third[2]], 3
+            if (
+                ops[1] in (BYTECODE_LOAD_CONST, BYTECODE_LOAD_VALUE)
+                and ops[2] == BYTECODE_HANDLE_COMPARE
+            ):
+                op = (
+                    BYTECODE_VALUE_CONST_COMPARE
+                    if ops[1] == BYTECODE_LOAD_CONST
+                    else BYTECODE_VALUE_VALUE_COMPARE
+                )
+                return [op, first[1], second[1], third[1]], 3
+
+        if len(ops) >= 2:
+            first, second = window[0], window[1]
+            if ops[0] == BYTECODE_HANDLE_COMPARE and ops[1] == BYTECODE_FALSE_JUMP:
+                return [BYTECODE_COMPARE_FALSE_JUMP, first[1], second[1]], 2
+            if ops[0] == BYTECODE_LOAD_VALUE and ops[1] == BYTECODE_STORE_VALUE:
+                return [BYTECODE_MOVE_VALUE, first[1], second[1]], 2
+            if ops[0] == BYTECODE_LOAD_CONST and ops[1] == BYTECODE_STORE_VALUE:
+                return [BYTECODE_STORE_CONST, first[1], second[1]], 2
+
+        return None
+
+    def superinstruction(self):  # type: () -> CompileResult
+        """
+        superinstruction 将常见的指令序列合并为超级指令，
+        从而减少运行时的指令分派次数以及栈操作。
+
+        例如，x = x + 1 将由 4 条指令合并为 1 条
+        VALUE_CONST_COMPUTE_STORE 指令。
+
+        只有位于同一检查点内的指令才会被合并，
+        并且除第一条指令外，被合并的指令都不能是跳转目标。
+        因此，运行时错误仍会被报告在原有的源代码行上
+
+        Returns:
+            CompileResult: 合并超级指令后的编译结果
+        """
+        byte_code = self._compiled.byte_code
+        starts = self._starts()
+        targets = self._jump_targets(starts)
+        regions = self._regions()
+        groups = []  # type: list[tuple[list[Any], list[int]]]
+
+        index = 0
+        while index < len(starts):
+            pc = starts[index]
+            window = [byte_code[pc : pc + instruction_length(byte_code, pc)]]
+            region = regions.get(pc, -1)
+            for i in starts[index + 1 : index + 4]:
+                if i in targets or regions.get(i, -1) != region:
+                    break
+                window.append(byte_code[i : i + instruction_length(byte_code, i)])
+
+            fused = self._fuse(window) if region >= 0 else None
+            if fused is None:
+                groups.append((window[0], [pc]))
+                index += 1
+            else:
+                groups.append((fused[0], starts[index : index + fused[1]]))
+                index += fused[1]
+
+        return self._rebuild(groups)
+
+    def _constant_jumps(self, starts, targets):  # type: (list[int], set[int]) -> dict[int, list[Any]]
+        """
+        _constant_jumps 找到所有条件为常量的条件跳转，
+        即 LOAD_CONST 紧随 FALSE_JUMP 或 TRUE_JUMP 的指令序列。
+
+        若跳转必然发生，它们将被替换为 DIRECT_JUMP；
+        否则它们将被删除
+
+        Args:
+            starts (list[int]): 所有指令的起始位置
+            targets (set[int]): 所有的跳转目标
+
+        Returns:
+            dict[int, list[Any]]:
+                从 LOAD_CONST 的位置到替换所得字节码的映射。
+                被替换的两条指令都将由该字节码代替
+        """
+        byte_code = self._compiled.byte_code
+        result = {}  # type: dict[int, list[Any]]
+
+        for index in range(len(starts) - 1):
+            pc, next_pc = starts[index], starts[index + 1]
+            if byte_code[pc] != BYTECODE_LOAD_CONST or next_pc in targets:
+                continue
+            if byte_code[next_pc] == BYTECODE_FALSE_JUMP:
+                jump = not byte_code[pc + 1]
+            elif byte_code[next_pc] == BYTECODE_TRUE_JUMP:
+                jump = bool(byte_code[pc + 1])
+            else:
+                continue
+            result[pc] = [BYTECODE_DIRECT_JUMP, byte_code[next_pc + 1]] if jump else []
+
+        return result
+
+    def dead_code(self):  # type: () -> CompileResult
+        """
+        dead_code 删除永远不会被执行的指令。
+
+        条件为常量的条件跳转将首先被消除，
+        因此 if False 的分支、常量真条件之后的 elif 分支，
+        以及位于 return、break 和 continue 之后的语句都将被删除。
+        此后，跳转到下一条指令的 DIRECT_JUMP 也将被删除。
+
+        跳转目标和检查点的范围将被相应地重定位，
+        而不再包含任何指令的检查点将被删除
+
+        Returns:
+            CompileResult: 删除死代码后的编译结果
+        """
+        byte_code = self._compiled.byte_code
+        starts = self._starts()
+        replaced = self._constant_jumps(starts, self._jump_targets(starts))
+        next_start = dict(zip(starts, starts[1:] + [len(byte_code)]))
+
+        # Find all reachable instructions
+        reachable = set()  # type: set[int]
+        pending = [0] if len(starts) > 0 else []
+        while len(pending) > 0:
+            pc = pending.pop()
+            if pc in reachable or pc >= len(byte_code):
+                continue
+            reachable.add(pc)
+            if pc in replaced:
+                words = replaced[pc]
+                if len(words) > 0:
+                    pending.append(words[1])  # type: ignore
+                else:
+                    pending.append(next_start[next_start[pc]])
+                continue
+            op = byte_code[pc]  # type: int # type: ignore
+            for offset in jump_offsets(op):
+                pending.append(byte_code[pc + offset])  # type: ignore
+            if falls_through(op):
+                pending.append(next_start[pc])
+
+        # Remove the jumps to the next instruction, from the end
+        # to the beginning, so the chained ones could be removed together
+        kept = [len(byte_code)]  # type: list[int]
+        removed = set()  # type: set[int]
+        for index in range(len(starts) - 1, -1, -1):
+            pc = starts[index]
+            if pc not in reachable or (index > 0 and starts[index - 1] in replaced):
+                continue
+            words = replaced.get(pc, byte_code[pc : next_start[pc]])
+            if len(words) == 0:
+                continue
+            if words[0] == BYTECODE_DIRECT_JUMP and words[1] > pc:  # type: ignore
+                target = min(i for i in kept if i >= words[1])  # type: ignore
+                if target == kept[-1]:
+                    removed.add(pc)
+                    continue
+            kept.append(pc)
+
+        groups = []  # type: list[tuple[list[Any], list[int]]]
+        index = 0
+        while index < len(starts):
+            pc = starts[index]
+            if pc in replaced:
+                words = replaced[pc] if pc in reachable and pc not in removed else []
+                groups.append((words, [pc, starts[index + 1]]))
+                index += 2
+                continue
+            if pc in reachable and pc not in removed:
+                groups.append((byte_code[pc : next_start[pc]], [pc]))
+            else:
+                groups.append(([], [pc]))
+            index += 1
+
+        return self._rebuild(groups)
+
+    def _collapse_logic(
+        self, starts, targets, depths
+    ):  # type: (list[int], set[int], dict[int, int]) -> dict[int, tuple[list[Any], list[int]]]
+        """
+        _collapse_logic 找到 ExpressionAnd 和 ExpressionOr 所生成的指令序列，
+        并将其中的 LOAD_CONST True (或 False) 删除，
+        同时将 HANDLE_LOGIC_ANDOR 与条件跳转合并为
+        FALSE_JUMP_OR_POP (或 TRUE_JUMP_OR_POP)。
+
+        若最后一组 HANDLE_LOGIC_ANDOR 与条件跳转
+        跳转到紧随其后的指令，则它们也将被删除
+
+        Args:
+            starts (list[int]): 所有指令的起始位置
+            targets (set[int]): 所有的跳转目标
+            depths (dict[int, int]): 每条可达指令执行前的栈深度
+
+        Returns:
+            dict[int, tuple[list[Any], list[int]]]:
+                从被替代的第一条指令的位置到相应指令组的映射
+        """
+        byte_code = self._compiled.byte_code
+        next_start = dict(zip(starts, starts[1:] + [len(byte_code)]))
+        chains = {}  # type: dict[tuple[int, int], list[int]]
+        result = {}  # type: dict[int, tuple[list[Any], list[int]]]
+
+        for pc in starts:
+            if byte_code[pc] != BYTECODE_HANDLE_LOGIC_ANDOR or pc not in depths:
+                continue
+            jump_pc = next_start[pc]
+            if byte_code[pc + 1] == LOGIC_ANDOR_TYPE_AND:
+                jump = BYTECODE_FALSE_JUMP
+            else:
+                jump = BYTECODE_TRUE_JUMP
+            if byte_code[jump_pc] == jump and jump_pc not in targets:
+                key = (byte_code[pc + 1], byte_code[jump_pc + 1])  # type: ignore
+                chains.setdefault(key, []).append(pc)
+
+        for (sub_type, target), pairs in chains.items():
+            # All the elements are computed on the same stack depth,
+            # and they are preceded by the initial value of the chain
+            depth = depths[pairs[0]] - 2
+            if any(depths[i] != depth + 2 for i in pairs):
+                continue
+            index = starts.index(pairs[0]) - 1
+            while index >= 0 and depths.get(starts[index], -1) > depth:
+                index -= 1
+            if index < 0 or depths.get(starts[index], -1) != depth:
+                continue
+            first = starts[index]
+            initial = sub_type == LOGIC_ANDOR_TYPE_AND
+            if byte_code[first] != BYTECODE_LOAD_CONST:
+                continue
+            if type(byte_code[first + 1]) != bool or byte_code[first + 1] != initial:
+                continue
+
+            if initial:
+                jump = BYTECODE_FALSE_JUMP_OR_POP
+            else:
+                jump = BYTECODE_TRUE_JUMP_OR_POP
+            result[first] = ([], [first])
+            for pc in pairs:
+                result[pc] = ([jump, target], [pc, next_start[pc]])
+            last = pairs[-1]
+            if next_start[next_start[last]] == target:
+                result[last] = ([], [last, next_start[last]])
+
+        return result
+
+    def _thread_jumps(self):  # type: () -> CompileResult
+        """
+        _thread_jumps 将跳转到 DIRECT_JUMP 的跳转指令
+        直接重定向到最终的跳转目标。
+
+        此外，若 FALSE_JUMP_OR_POP 或 TRUE_JUMP_OR_POP 跳转到另一条条件跳转，
+        则由于被跳转的值已知为真或假，它们也将被重定向。
+        例如，跳转到 FALSE_JUMP 的 FALSE_JUMP_OR_POP
+        将被替换为直接跳转到最终目标的 FALSE_JUMP
+
+        Returns:
+            CompileResult: 重定向跳转后的编译结果
+        """
+        byte_code = list(self._compiled.byte_code)
+        starts = self._starts()
+        next_start = dict(zip(starts, starts[1:] + [len(byte_code)]))
+        keep_value = (BYTECODE_FALSE_JUMP_OR_POP, BYTECODE_TRUE_JUMP_OR_POP)
+        pop_value = (BYTECODE_FALSE_JUMP, BYTECODE_TRUE_JUMP)
+        # The exit of FOR_RANGE is kept, so the loop is still structured
+        loop_exits = set(
+            byte_code[pc + 3] for pc in starts if byte_code[pc] == BYTECODE_FOR_RANGE
+        )
+
+        for pc in starts:
+            for offset in jump_offsets(byte_code[pc]):  # type: ignore
+                visited = set()  # type: set[int]
+                while byte_code[pc + offset] not in visited:
+                    target = byte_code[pc + offset]  # type: int # type: ignore
+                    visited.add(target)
+                    if target in loop_exits:
+                        break
+                    if byte_code[target] == BYTECODE_DIRECT_JUMP:
+                        byte_code[pc + offset] = byte_code[target + 1]
+                        continue
+                    if byte_code[pc] not in keep_value:
+                        break
+                    if byte_code[target] not in keep_value + pop_value:
+                        break
+                    # The value is kept when jumping, so we know whether
+                    # the target jumps, and whether it pops the value
+                    if_false = byte_code[pc] == BYTECODE_FALSE_JUMP_OR_POP
+                    target_if_false = byte_code[target] in (
+                        BYTECODE_FALSE_JUMP,
+                        BYTECODE_FALSE_JUMP_OR_POP,
+                    )
+                    if if_false != target_if_false:
+                        byte_code[pc] = pop_value[0 if if_false else 1]
+                        byte_code[pc + 1] = next_start[target]
+                        continue
+                    if byte_code[target] in pop_value:
+                        byte_code[pc] = pop_value[0 if if_false else 1]
+                    byte_code[pc + 1] = byte_code[target + 1]
+
+        return CompileResult(
+            byte_code, self._compiled.check_point, self._compiled.var_mapping
+        )
+
+    def peephole(self):  # type: () -> CompileResult
+        """
+        peephole 对字节码进行窥孔优化。
+
+        ExpressionAnd 和 ExpressionOr 所生成的指令序列将被化简，
+        跳转到跳转指令的跳转将被直接重定向到最终目标，
+        此后 dead_code 将删除不再可达的指令以及跳转到下一条指令的跳转。
+
+        优化前后的字节码都将通过 stack_depths 校验栈平衡
+
+        Raises:
+            Exception:
+                如果优化前或优化后的栈不平衡，
+                则抛出相应的错误
+
+        Returns:
+            CompileResult: 窥孔优化后的编译结果
+        """
+        byte_code = self._compiled.byte_code
+        depths = stack_depths(self._compiled)
+        starts = self._starts()
+        replaced = self._collapse_logic(starts, self._jump_targets(starts), depths)
+
+        groups = []  # type: list[tuple[list[Any], list[int]]]
+        index = 0
+        while index < len(starts):
+            pc = starts[index]
+            if pc in replaced:
+                groups.append(replaced[pc])
+                index += len(replaced[pc][1])
+            else:
+                length = instruction_length(byte_code, pc)
+                groups.append((byte_code[pc : pc + length], [pc]))
+                index += 1
+
+        result = CodeOptimizer(self._rebuild(groups))._thread_jumps()
+        result = CodeOptimizer(result).dead_code()
+        stack_depths(result)
+        return result
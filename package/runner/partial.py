@@ -0,0 +1,533 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Iterator
+
+from .define import CHECK_POINT_TYPE_CONDITION, CHECK_POINT_TYPE_FOR_LOOP
+from .fold import ConstantFolder
+from ..parser.steps import NO_STEPS, run_steps
+from ..parser.expression.define import (
+    ExpressionElement,
+    ELEMENT_ID_VAR,
+    ELEMENT_ID_INT,
+)
+from ..parser.expression.basic import (
+    ExpressionLiteral,
+    ExpressionReference,
+    ExpressionSelector,
+    ExpressionCommand,
+    ExpressionFunction,
+)
+from ..parser.expression.combine import ExpressionCombine
+from ..parser.define import (
+    ConditionCodeBlock,
+    ForLoopCodeBlock,
+    OpcodeBase,
+    OpcodeAssign,
+    OpcodeCondition,
+    OpcodeForLoop,
+    OpcodeContinue,
+    OpcodeBreak,
+    OpcodeExpression,
+    OpcodeReturn,
+)
+
+try:
+    range = xrange  # type: ignore
+except Exception:
+    pass
+
+# The most iterations of a for loop which could be unrolled
+UNROLL_TIMES_LIMIT = 16
+# The most statements which could be produced by unrolling a single for loop
+UNROLL_SIZE_LIMIT = 64
+
+
+class PartialEvaluator(ConstantFolder):
+    """
+    PartialEvaluator 针对一组值已知的变量，在 AST 语法树层面对代码进行部分求值。
+
+    在常量折叠的基础上，它沿着代码的执行顺序追踪每个变量是否持有已知的常量，
+    并将对这些变量的读取替换为相应的字面量。
+    此后，条件恒为假的条件代码块将被删除，
+    条件恒为真的条件代码块将成为唯一被执行的代码块，
+    循环次数为较小常量且不含 break 和 continue 的循环语句将被展开。
+
+    最后，值为常量且从未被读取的变量的赋值语句将被删除。
+
+    在运行时，部分求值所得的语法树与原有的语法树
+    对于相同的变量取值会给出相同的结果。
+    被内联或展开的语句原本所处的条件语句或循环语句由 contexts 给出，
+    以便编译器使它们的错误信息保持不变。
+
+    部分求值的结果是一个新的语法树，原有的语法树不会被修改
+    """
+
+    _known = {}  # type: dict[str, int | bool | float | str]
+    _env = {}  # type: dict[str, int | bool | float | str]
+    _contexts = {}  # type: dict[int, tuple[OpcodeBase, int, str]]
+
+    def __init__(
+        self,
+        code_block=[],  # type: list[OpcodeBase]
+        known_vars={},  # type: dict[str, int | bool | float | str]
+    ):  # type: (...) -> None
+        """初始化并返回一个新的 PartialEvaluator
+
+        Args:
+            code_block (list[OpcodeBase], optional):
+                CodeParser 的编译结果
+                默认值为空列表
+            known_vars (dict[str, int | bool | float | str], optional):
+                运行前就已经确定的变量及其取值。
+                无法被表示为字面量的值将被忽略。
+                默认值为空字典
+        """
+        ConstantFolder.__init__(self, code_block)
+        self._known = {}
+        for key, value in known_vars.items():
+            if self._literal(value) is not None:
+                self._known[key] = value
+        self._env = {}
+        self._contexts = {}
+
+    def _element_steps(
+        self, element, result
+    ):  # type: (ExpressionElement, list[ExpressionElement]) -> Iterator[Iterator[Any]]
+        """
+        _element_steps 返回折叠给出的表达式元素的子步骤。
+        对于持有已知常量的变量，其读取将被替换为相应的字面量
+
+        Args:
+            element (ExpressionElement): 待折叠的表达式元素
+            result (list[ExpressionElement]): 用于储存折叠结果的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 折叠该表达式元素的子步骤
+        """
+        if (
+            isinstance(element, ExpressionLiteral)
+            and element.element_id == ELEMENT_ID_VAR
+            and element.element_payload in self._env
+        ):
+            result.append(self._literal(self._env[element.element_payload]))  # type: ignore
+            return NO_STEPS
+        return ConstantFolder._element_steps(self, element, result)
+
+    def _sub_code_blocks(self, code_block):  # type: (OpcodeBase) -> list[OpcodeBase]
+        """_sub_code_blocks 返回直接位于给出的代码块中的所有代码块
+
+        Args:
+            code_block (OpcodeBase): 目标代码块
+
+        Returns:
+            list[OpcodeBase]: 直接位于该代码块中的代码块
+        """
+        if isinstance(code_block, OpcodeCondition):
+            return [j for i in code_block.opcode_payload for j in i.code_block]
+        if isinstance(code_block, OpcodeForLoop):
+            assert code_block.opcode_payload is not None
+            return list(code_block.opcode_payload.code_block)
+        return []
+
+    def _assigned_names(self, code_block, result):  # type: (OpcodeBase, set[str]) -> None
+        """_assigned_names 收集给出的代码块中所有被赋值的变量
+
+        Args:
+            code_block (OpcodeBase): 目标代码块
+            result (set[str]): 用于储存收集结果的集合
+        """
+        stack = [code_block]  # type: list[OpcodeBase]
+        while len(stack) > 0:
+            code_block = stack.pop()
+            if isinstance(code_block, OpcodeAssign):
+                result.add(code_block.opcode_payload[0])
+            elif isinstance(code_block, OpcodeForLoop):
+                assert code_block.opcode_payload is not None
+                result.add(code_block.opcode_payload.variable)
+            stack.extend(self._sub_code_blocks(code_block))
+
+    def _can_unroll(self, code_block):  # type: (OpcodeBase) -> bool
+        """
+        _can_unroll 检查给出的代码块是否不含 break 和 continue，
+        从而使包含它的循环语句可以被展开
+
+        Args:
+            code_block (OpcodeBase): 目标代码块
+
+        Returns:
+            bool: 是否不含 break 和 continue
+        """
+        stack = [code_block]  # type: list[OpcodeBase]
+        while len(stack) > 0:
+            code_block = stack.pop()
+            if isinstance(code_block, (OpcodeContinue, OpcodeBreak)):
+                return False
+            stack.extend(self._sub_code_blocks(code_block))
+        return True
+
+    def _size(self, code_block):  # type: (OpcodeBase) -> int
+        """_size 返回给出的代码块所包含的语句数
+
+        Args:
+            code_block (OpcodeBase): 目标代码块
+
+        Returns:
+            int: 代码块所包含的语句数
+        """
+        size = 0
+        stack = [code_block]  # type: list[OpcodeBase]
+        while len(stack) > 0:
+            size += 1
+            stack.extend(self._sub_code_blocks(stack.pop()))
+        return size
+
+    def _merge(self, envs):  # type: (list[dict[str, Any]]) -> dict[str, Any]
+        """
+        _merge 合并多条执行路径结束时的已知常量。
+        只有在所有路径上都持有相同常量的变量才是已知的
+
+        Args:
+            envs (list[dict[str, int | bool | float | str]]):
+                每条执行路径结束时的已知常量
+
+        Returns:
+            dict[str, int | bool | float | str]: 合并所得的已知常量
+        """
+        result = {}  # type: dict[str, Any]
+        for key, value in envs[0].items():
+            for env in envs[1:]:
+                if key not in env or type(env[key]) != type(value) or env[key] != value:
+                    break
+            else:
+                result[key] = value
+        return result
+
+    def _read_names(self, element, result):  # type: (ExpressionElement, set[str]) -> None
+        """_read_names 收集给出的表达式元素中所有被读取的变量
+
+        Args:
+            element (ExpressionElement): 目标表达式元素
+            result (set[str]): 用于储存收集结果的集合
+        """
+        stack = [element]  # type: list[ExpressionElement]
+        while len(stack) > 0:
+            element = stack.pop()
+            if isinstance(element, ExpressionLiteral):
+                if element.element_id == ELEMENT_ID_VAR:
+                    result.add(element.element_payload)  # type: ignore
+                elif isinstance(element.element_payload, ExpressionCombine):
+                    stack.append(element.element_payload)
+            elif isinstance(element, ExpressionFunction):
+                stack.extend(element.element_payload[1])
+            elif isinstance(element, ExpressionReference):
+                stack.append(element.element_payload[1])
+            elif isinstance(element, (ExpressionCommand, ExpressionSelector)):
+                stack.append(element.element_payload)  # type: ignore
+            else:
+                stack.extend(element.element_payload)  # type: ignore
+
+    def _collect_reads(self, code_block, result):  # type: (OpcodeBase, set[str]) -> None
+        """_collect_reads 收集给出的代码块中所有被读取的变量
+
+        Args:
+            code_block (OpcodeBase): 目标代码块
+            result (set[str]): 用于储存收集结果的集合
+        """
+        stack = [code_block]  # type: list[OpcodeBase]
+        while len(stack) > 0:
+            code_block = stack.pop()
+            if isinstance(code_block, OpcodeAssign):
+                self._read_names(code_block.opcode_payload[1], result)
+            elif isinstance(code_block, OpcodeCondition):
+                for i in code_block.opcode_payload:
+                    if i.condition is not None:
+                        self._read_names(i.condition, result)
+            elif isinstance(code_block, OpcodeForLoop):
+                assert code_block.opcode_payload is not None
+                self._read_names(code_block.opcode_payload.repeat_times, result)
+            elif isinstance(code_block, (OpcodeExpression, OpcodeReturn)):
+                self._read_names(code_block.opcode_payload, result)  # type: ignore
+            stack.extend(self._sub_code_blocks(code_block))
+
+    def _drop_steps(
+        self, code_blocks, read, result
+    ):  # type: (list[OpcodeBase], set[str], list[OpcodeBase]) -> Iterator[Iterator[Any]]
+        """
+        _drop_steps 删除给出的代码块中，
+        值为常量且从未被读取的变量的赋值语句。
+        由于这样的赋值语句既不会出错也没有副作用，删除它们不会改变程序的行为
+
+        Args:
+            code_blocks (list[OpcodeBase]): 待处理的代码块
+            read (set[str]): 整个程序中所有被读取的变量
+            result (list[OpcodeBase]): 用于储存处理所得的代码块的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 处理这些代码块的生成器
+        """
+        for i in code_blocks:
+            if isinstance(i, OpcodeAssign):
+                if i.opcode_payload[0] not in read and self._is_constant(
+                    self._fold_element(i.opcode_payload[1])
+                ):
+                    continue
+            elif isinstance(i, OpcodeCondition):
+                branches = []  # type: list[ConditionCodeBlock]
+                for j in i.opcode_payload:
+                    body = []  # type: list[OpcodeBase]
+                    yield self._drop_steps(j.code_block, read, body)
+                    branches.append(ConditionCodeBlock(j.condition, j.state_line, body))
+                i = OpcodeCondition(branches)
+            elif isinstance(i, OpcodeForLoop):
+                assert i.opcode_payload is not None
+                for_loop = i.opcode_payload
+                body = []
+                yield self._drop_steps(for_loop.code_block, read, body)
+                i = OpcodeForLoop(
+                    ForLoopCodeBlock(
+                        for_loop.variable,
+                        for_loop.repeat_times,
+                        for_loop.state_line,
+                        body,
+                    )
+                )
+            result.append(i)
+
+    def _code_blocks_steps(
+        self, code_blocks, result
+    ):  # type: (list[OpcodeBase], list[OpcodeBase]) -> Iterator[Iterator[Any]]
+        """
+        _code_blocks_steps 依次对给出的每个代码块进行部分求值。
+        位于 return、break 或 continue 之后的代码块将被删除
+
+        Args:
+            code_blocks (list[OpcodeBase]): 待处理的代码块
+            result (list[OpcodeBase]): 用于储存部分求值所得的代码块的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 对这些代码块进行部分求值的生成器
+        """
+        for i in code_blocks:
+            yield self._evaluate_steps(i, result)
+            if isinstance(i, (OpcodeReturn, OpcodeBreak, OpcodeContinue)):
+                break
+
+    def _inline(
+        self, code_blocks, point_type, state_line, result
+    ):  # type: (list[OpcodeBase], int, str, list[OpcodeBase]) -> None
+        """
+        _inline 将被内联的条件代码块或被展开的循环语句所得的代码块放入 result，
+        并记录它们原本所处的条件语句或循环语句。
+        已经被记录的代码块来自更内层的语句，因此不会被覆盖
+
+        Args:
+            code_blocks (list[OpcodeBase]): 被内联的代码块
+            point_type (int): 这些代码块原本所处的语句对应的检查点类型
+            state_line (str): 这些代码块原本所处的语句的源代码行
+            result (list[OpcodeBase]): 用于储存部分求值所得的代码块的列表
+        """
+        for i in code_blocks:
+            if id(i) not in self._contexts:
+                self._contexts[id(i)] = (i, point_type, state_line)
+        result.extend(code_blocks)
+
+    def _condition_steps(
+        self, code_block, result
+    ):  # type: (OpcodeCondition, list[OpcodeBase]) -> Iterator[Iterator[Any]]
+        """
+        _condition_steps 对给出的条件语句进行部分求值，
+        并删除永远不会被执行的条件代码块
+
+        Args:
+            code_block (OpcodeCondition): 待处理的条件语句
+            result (list[OpcodeBase]): 用于储存部分求值所得的代码块的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 对该条件语句进行部分求值的生成器
+        """
+        env = self._env
+        branches = []  # type: list[ConditionCodeBlock]
+        envs = []  # type: list[dict[str, Any]]
+        exhaustive = False
+
+        for i in code_block.opcode_payload:
+            condition = None  # type: ExpressionCombine | None
+            if i.condition is not None:
+                inner = self._fold_element(i.condition)
+                if not self._is_constant(inner):
+                    condition = self._combine(inner)
+                elif not inner.element_payload:
+                    continue
+            self._env = dict(env)
+            body = []  # type: list[OpcodeBase]
+            yield self._code_blocks_steps(i.code_block, body)
+            branches.append(ConditionCodeBlock(condition, i.state_line, body))
+            envs.append(self._env)
+            if condition is None:
+                exhaustive = True
+                break
+
+        if not exhaustive:
+            envs.append(env)
+        self._env = self._merge(envs)
+
+        if len(branches) == 0:
+            return
+        if branches[0].condition is None:
+            self._inline(
+                branches[0].code_block,
+                CHECK_POINT_TYPE_CONDITION,
+                branches[0].state_line,
+                result,
+            )
+            return
+        result.append(OpcodeCondition(branches))
+
+    def _for_loop_steps(
+        self, code_block, result
+    ):  # type: (OpcodeForLoop, list[OpcodeBase]) -> Iterator[Iterator[Any]]
+        """
+        _for_loop_steps 对给出的循环语句进行部分求值。
+        如果循环次数是较小的常量，则循环语句将被展开
+
+        Args:
+            code_block (OpcodeForLoop): 待处理的循环语句
+            result (list[OpcodeBase]): 用于储存部分求值所得的代码块的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 对该循环语句进行部分求值的生成器
+        """
+        assert code_block.opcode_payload is not None
+        for_loop = code_block.opcode_payload
+        repeat_times = self._fold_element(for_loop.repeat_times)
+
+        if (
+            self._is_constant(repeat_times)
+            and repeat_times.element_id == ELEMENT_ID_INT
+            and repeat_times.element_payload <= UNROLL_TIMES_LIMIT  # type: ignore
+            and repeat_times.element_payload  # type: ignore
+            * (1 + sum([self._size(i) for i in for_loop.code_block]))
+            <= UNROLL_SIZE_LIMIT
+            and all([self._can_unroll(i) for i in for_loop.code_block])
+        ):
+            unrolled = []  # type: list[OpcodeBase]
+            for index in range(repeat_times.element_payload):  # type: ignore
+                yield self._code_blocks_steps(
+                    [
+                        OpcodeAssign(
+                            (
+                                for_loop.variable,
+                                ExpressionCombine(
+                                    [ExpressionLiteral(ELEMENT_ID_INT, index)]
+                                ),
+                            ),
+                            for_loop.state_line,
+                        )
+                    ]
+                    + for_loop.code_block,
+                    unrolled,
+                )
+                # A return statement ends the whole program
+                if len(unrolled) > 0 and isinstance(unrolled[-1], OpcodeReturn):
+                    break
+            self._inline(
+                unrolled, CHECK_POINT_TYPE_FOR_LOOP, for_loop.state_line, result
+            )
+            return
+
+        # The variables assigned in the loop body are unknown at every iteration
+        assigned = set([for_loop.variable])
+        for i in for_loop.code_block:
+            self._assigned_names(i, assigned)
+        for name in assigned:
+            self._env.pop(name, None)
+
+        env = self._env
+        self._env = dict(env)
+        body = []  # type: list[OpcodeBase]
+        yield self._code_blocks_steps(for_loop.code_block, body)
+        result.append(
+            OpcodeForLoop(
+                ForLoopCodeBlock(
+                    for_loop.variable,
+                    self._combine(repeat_times),
+                    for_loop.state_line,
+                    body,
+                )
+            )
+        )
+        self._env = env
+
+    def _evaluate_steps(
+        self, code_block, result
+    ):  # type: (OpcodeBase, list[OpcodeBase]) -> Iterator[Iterator[Any]]
+        """
+        _evaluate_steps 返回对给出的代码块进行部分求值的子步骤。
+        一个代码块可能被展开为零个或多个代码块，
+        它们将被追加到 result 的末尾
+
+        Args:
+            code_block (OpcodeBase): 待处理的代码块
+            result (list[OpcodeBase]): 用于储存部分求值所得的代码块的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 对该代码块进行部分求值的子步骤
+        """
+        if isinstance(code_block, OpcodeAssign):
+            name = code_block.opcode_payload[0]
+            inner = self._fold_element(code_block.opcode_payload[1])
+            # Only remember values that can be written back as literals
+            if (
+                self._is_constant(inner)
+                and self._literal(inner.element_payload) is not None  # type: ignore
+            ):
+                self._env[name] = inner.element_payload  # type: ignore
+            else:
+                self._env.pop(name, None)
+            result.append(
+                OpcodeAssign((name, self._combine(inner)), code_block.origin_line)
+            )
+            return NO_STEPS
+        if isinstance(code_block, OpcodeCondition):
+            return self._condition_steps(code_block, result)
+        if isinstance(code_block, OpcodeForLoop):
+            return self._for_loop_steps(code_block, result)
+        result.append(self._fold_code_block(code_block))
+        return NO_STEPS
+
+    def evaluate(self):  # type: () -> list[OpcodeBase]
+        """
+        evaluate 针对已知的变量对 AST 语法树进行部分求值
+
+        Returns:
+            list[OpcodeBase]:
+                部分求值所得的新的语法树。
+                它可以被 CodeCompiler 等直接编译
+        """
+        self._env = dict(self._known)
+        self._contexts = {}
+        evaluated = []  # type: list[OpcodeBase]
+        run_steps(self._code_blocks_steps(self._ast, evaluated))
+
+        read = set()  # type: set[str]
+        for i in evaluated:
+            self._collect_reads(i, read)
+        self._env = {}
+        result = []  # type: list[OpcodeBase]
+        run_steps(self._drop_steps(evaluated, read, result))
+        return result
+
+    def contexts(self):  # type: () -> dict[int, tuple[OpcodeBase, int, str]]
+        """
+        contexts 返回最近一次 evaluate 中被内联或展开的语句，
+        以及它们原本所处的条件语句或循环语句
+
+        Returns:
+            dict[int, tuple[OpcodeBase, int, str]]:
+                从语句的 id 到该语句本身、
+                对应的检查点类型以及所处语句的源代码行的映射
+        """
+        return self._contexts
@@ -0,0 +1,745 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Iterator
+
+from .compile import CodeCompiler, ForLoopEnv
+from .define import (
+    REGISTER_MOVE,
+    REGISTER_ADD,
+    REGISTER_REMOVE,
+    REGISTER_TIMES,
+    REGISTER_DIVIDE,
+    REGISTER_EQUAL,
+    REGISTER_NOT_EQUAL,
+    REGISTER_LESS_THAN,
+    REGISTER_GREATER_THAN,
+    REGISTER_LESS_EQUAL,
+    REGISTER_GREATER_EQUAL,
+    REGISTER_NOT,
+    REGISTER_IN,
+    REGISTER_CAST,
+    REGISTER_FUNC,
+    REGISTER_COMMAND,
+    REGISTER_SCORE,
+    REGISTER_SELECTOR,
+    REGISTER_REF,
+    REGISTER_DIRECT_JUMP,
+    REGISTER_FALSE_JUMP,
+    REGISTER_TRUE_JUMP,
+    REGISTER_FOR_PREPARE,
+    REGISTER_FOR_LOOP,
+    REGISTER_STORE_RETURN_VAL,
+    REGISTER_PROGRAM_STOP_RUN,
+    REGISTER_INTERNAL_PANIC,
+    REGISTER_COMPUTE_INPLACE,
+    COMPUTE_TYPE_ADD,
+    COMPUTE_TYPE_REMOVE,
+    COMPUTE_TYPE_TIMES,
+    COMPUTE_TYPE_DIVIDE,
+    CAST_TYPE_INT,
+    CAST_TYPE_BOOL,
+    CAST_TYPE_FLOAT,
+    CAST_TYPE_STR,
+    REF_TYPE_INT,
+    REF_TYPE_BOOL,
+    REF_TYPE_FLOAT,
+    REF_TYPE_STR,
+    CHECK_POINT_TYPE_NORMAL,
+    CHECK_POINT_TYPE_CONDITION,
+    CHECK_POINT_TYPE_FOR_LOOP,
+    VariableMapping,
+    CheckPoint,
+)
+from ..parser.expression.define import (
+    ExpressionElement,
+    TYPE_ENUM_INT,
+    TYPE_ENUM_BOOL,
+    TYPE_ENUM_FLOAT,
+    TYPE_ENUM_STR,
+    ELEMENT_ID_VAR,
+    ELEMENT_ID_INT,
+    ELEMENT_ID_BOOL,
+    ELEMENT_ID_FLOAT,
+    ELEMENT_ID_STR,
+)
+from ..parser.expression.basic import (
+    ExpressionLiteral,
+    ExpressionReference,
+    ExpressionSelector,
+    ExpressionScore,
+    ExpressionCommand,
+    ExpressionFunction,
+)
+from ..parser.expression.compare import (
+    ExpressionLessThan,
+    ExpressionGreaterThan,
+    ExpressionLessEqual,
+    ExpressionGreaterEqual,
+    ExpressionEqual,
+    ExpressionNotEqual,
+    ExpressionAnd,
+    ExpressionOr,
+    ExpressionIn,
+    ExpressionInverse,
+)
+from ..parser.expression.compute import (
+    ExpressionAdd,
+    ExpressionRemove,
+    ExpressionTimes,
+    ExpressionDivide,
+)
+from ..parser.expression.combine import ExpressionCombine
+from ..parser.steps import run_steps
+from ..parser.define import (
+    OpcodeBase,
+    OpcodeAssign,
+    OpcodeCondition,
+    OpcodeForLoop,
+    OpcodeContinue,
+    OpcodeBreak,
+    OpcodeExpression,
+    OpcodeReturn,
+)
+
+REGISTER_KIND_VARIABLE = 0
+REGISTER_KIND_CONSTANT = 1
+REGISTER_KIND_TEMPORARY = 2
+
+COMPUTE_REGISTER_OPCODE = [
+    (ExpressionAdd, REGISTER_ADD, COMPUTE_TYPE_ADD),
+    (ExpressionRemove, REGISTER_REMOVE, COMPUTE_TYPE_REMOVE),
+    (ExpressionTimes, REGISTER_TIMES, COMPUTE_TYPE_TIMES),
+    (ExpressionDivide, REGISTER_DIVIDE, COMPUTE_TYPE_DIVIDE),
+]  # type: list[tuple[type, int, int]]
+
+COMPARE_REGISTER_OPCODE = [
+    (ExpressionEqual, REGISTER_EQUAL),
+    (ExpressionNotEqual, REGISTER_NOT_EQUAL),
+    (ExpressionLessThan, REGISTER_LESS_THAN),
+    (ExpressionGreaterThan, REGISTER_GREATER_THAN),
+    (ExpressionLessEqual, REGISTER_LESS_EQUAL),
+    (ExpressionGreaterEqual, REGISTER_GREATER_EQUAL),
+]  # type: list[tuple[type, int]]
+
+
+class RegisterCompileResult:
+    """
+    RegisterCompileResult 是 RegisterCompiler
+    将 AST 语法树处理为寄存器字节码的结果。
+
+    寄存器依次由变量、常量和临时值组成，
+    其中变量的寄存器索引与 var_mapping 中的整数索引相同
+    """
+
+    byte_code = []  # type: list[int | bool | float | str]
+    check_point = []  # type: list[CheckPoint]
+    var_mapping = VariableMapping()  # type: VariableMapping
+    constants = []  # type: list[int | bool | float | str]
+    registers_count = 0  # type: int
+
+    def __init__(
+        self,
+        byte_code,  # type: list[int | bool | float | str]
+        check_point,  # type: list[CheckPoint]
+        var_mapping,  # type: VariableMapping
+        constants,  # type: list[int | bool | float | str]
+        registers_count,  # type: int
+    ):  # type: (...) -> None
+        """
+        初始化并返回一个新的 RegisterCompileResult
+
+        Args:
+            byte_code (list[int | bool | float | str]):
+                编译器编译所得的寄存器字节码序列
+            check_point (list[CheckPoint]):
+                编译器编译过程中产生的检查点序列。
+                应确保该序列已经按源代码行的顺序排序
+            var_mapping (VariableMapping):
+                编译器编译过程中所用的变量映射表
+            constants (list[int | bool | float | str]):
+                常量寄存器的初始值
+            registers_count (int):
+                寄存器的总数
+        """
+        self.byte_code = byte_code
+        self.check_point = check_point
+        self.var_mapping = var_mapping
+        self.constants = constants
+        self.registers_count = registers_count
+
+    def __repr__(self):  # type: () -> str
+        """返回 RegisterCompileResult 的字符串表示
+
+        Returns:
+            str: 该 RegisterCompileResult 的字符串表示
+        """
+        return "RegisterCompileResult(byte_code={}, check_point={}, var_mapping={}, constants={}, registers_count={})".format(
+            self.byte_code,
+            self.check_point,
+            self.var_mapping,
+            self.constants,
+            self.registers_count,
+        )
+
+
+class RegisterCompiler(CodeCompiler):
+    """
+    RegisterCompiler 是将 AST 语法树编译为寄存器字节码的编译器。
+
+    与 CodeCompiler 不同，它生成的指令直接读写寄存器，
+    例如 a = b + c 只会被编译为一条 ADD 指令，
+    因而运行时不再需要操作栈。
+
+    为了保持错误信息与 CodeCompiler 一致，
+    变量只有在读取它的指令紧随其后时才会被直接作为操作数，
+    否则它会先被复制到临时寄存器中，
+    从而使得变量未被赋值的错误在原有的时机抛出
+    """
+
+    _consts = []  # type: list[int | bool | float | str]
+    _const_index = {}  # type: dict[tuple[type, str], int]
+    _temps_top = 0  # type: int
+    _temps_max = 0  # type: int
+
+    def __init__(self, code_block=[]):  # type: (list[OpcodeBase]) -> None
+        """初始化并返回一个新的寄存器编译器
+
+        Args:
+            code_block (list[OpcodeBase], optional):
+                CodeParser 的编译结果
+                默认值为空列表
+        """
+        CodeCompiler.__init__(self, code_block)
+        self._consts = []
+        self._const_index = {}
+        self._temps_top = 0
+        self._temps_max = 0
+
+    def _const_register(self, value):  # type: (int | bool | float | str) -> tuple[int, int]
+        """_const_register 返回常量 value 所在的寄存器
+
+        Args:
+            value (int | bool | float | str):
+                目标常量
+
+        Returns:
+            tuple[int, int]: 该常量所在的寄存器
+        """
+        key = (type(value), repr(value))
+        if key not in self._const_index:
+            self._const_index[key] = len(self._consts)
+            self._consts.append(value)
+        return (REGISTER_KIND_CONSTANT, self._const_index[key])
+
+    def _temp_register(self, count=1):  # type: (int) -> int
+        """
+        _temp_register 分配 count 个连续的临时寄存器，
+        并返回其中第一个临时寄存器的序号
+
+        Args:
+            count (int, optional):
+                要分配的临时寄存器的数量。
+                默认值为 1
+
+        Returns:
+            int: 第一个临时寄存器的序号
+        """
+        index = self._temps_top
+        self._temps_top += count
+        self._temps_max = max(self._temps_max, self._temps_top)
+        return index
+
+    def _unwrap(self, element):  # type: (ExpressionElement) -> ExpressionElement
+        """_unwrap 返回去除所有括号后的表达式元素
+
+        Args:
+            element (ExpressionElement): 目标表达式元素
+
+        Returns:
+            ExpressionElement: 去除括号后的表达式元素
+        """
+        while isinstance(element, ExpressionCombine):
+            element = element.element_payload[0]
+        return element
+
+    def _operands(
+        self, elements, direct_count
+    ):  # type: (list[ExpressionElement], int) -> list[tuple[int, int]]
+        """
+        _operands 依次求值 elements 中的每个表达式元素，
+        并返回保存它们求值结果的寄存器。
+
+        常量总是被直接使用。只有前 direct_count 个元素中的变量才可能被直接使用，
+        并且其后的所有元素都不需要生成任何指令
+
+        Args:
+            elements (list[ExpressionElement]):
+                待求值的表达式元素
+            direct_count (int):
+                紧随其后的指令所读取的元素数量
+
+        Returns:
+            list[tuple[int, int]]: 保存求值结果的寄存器
+        """
+        registers = []  # type: list[tuple[int, int]]
+        run_steps(self._operands_steps(elements, direct_count, registers))
+        return registers
+
+    def _operands_steps(
+        self, elements, direct_count, registers
+    ):  # type: (list[ExpressionElement], int, list[tuple[int, int]]) -> Iterator[Iterator[Any]]
+        """
+        _operands_steps 是 _operands 的生成器形式。
+        它产出求值各个表达式元素的子步骤，
+        并将保存求值结果的寄存器依次追加到 registers 的末尾
+
+        Args:
+            elements (list[ExpressionElement]):
+                待求值的表达式元素
+            direct_count (int):
+                紧随其后的指令所读取的元素数量
+            registers (list[tuple[int, int]]):
+                用于储存保存求值结果的寄存器的列表
+
+        Returns:
+            Iterator[Iterator[Any]]: 求值这些表达式元素的生成器
+        """
+        elements = [self._unwrap(i) for i in elements]
+        direct = [False] * len(elements)
+        emit_code = False
+
+        for index in range(len(elements) - 1, -1, -1):
+            element = elements[index]
+            if isinstance(element, ExpressionLiteral) and not isinstance(
+                element.element_payload, ExpressionCombine
+            ):
+                if element.element_id != ELEMENT_ID_VAR:
+                    direct[index] = True
+                    continue
+                if index < direct_count and not emit_code:
+                    direct[index] = True
+                    continue
+            emit_code = True
+
+        for index, element in enumerate(elements):
+            if not direct[index]:
+                register = (REGISTER_KIND_TEMPORARY, self._temp_register())
+                yield self._element_steps(element, register)
+                registers.append(register)
+            elif element.element_id == ELEMENT_ID_VAR:
+                varindex = self._map.index_by_name(element.element_payload)  # type: ignore
+                registers.append((REGISTER_KIND_VARIABLE, varindex))  # type: ignore
+            else:
+                registers.append(self._const_register(element.element_payload))  # type: ignore
+
+    def _handle_element(
+        self, element, target
+    ):  # type: (ExpressionElement, tuple[int, int]) -> None
+        """
+        _handle_element 将一个表达式元素编译为寄存器字节码。
+        可以保证这些字节码执行完成后，target 寄存器中是它的求值结果。
+
+        表达式元素通过 run_steps 以显式栈编译，
+        因此嵌套的深度不受 Python 递归深度的限制
+
+        Args:
+            element (ExpressionElement):
+                待处理的表达式元素
+            target (tuple[int, int]):
+                保存求值结果的寄存器
+        """
+        run_steps(self._element_steps(element, target))
+
+    def _element_steps(  # type: ignore
+        self, element, target
+    ):  # type: (ExpressionElement, tuple[int, int]) -> Iterator[Iterator[Any]]
+        """
+        _element_steps 是 _handle_element 的生成器形式。
+        它产出编译各个子元素的子步骤，
+        并在子元素的字节码之后生成该表达式元素自身的字节码
+
+        Args:
+            element (ExpressionElement):
+                待处理的表达式元素
+            target (tuple[int, int]):
+                保存求值结果的寄存器
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译该表达式元素的生成器
+        """
+        temps_top = self._temps_top
+        registers = []  # type: list[tuple[int, int]]
+        element = self._unwrap(element)
+
+        if isinstance(element, ExpressionLiteral):
+            if not isinstance(element.element_payload, ExpressionCombine):
+                yield self._operands_steps([element], 1, registers)
+                self._ans.append(REGISTER_MOVE)
+                self._ans.append(target)  # type: ignore
+                self._ans.extend(registers)  # type: ignore
+            else:
+                yield self._operands_steps([element.element_payload], 1, registers)
+                self._ans.append(REGISTER_CAST)
+                self._ans.append(target)  # type: ignore
+                self._ans.append(registers[0])  # type: ignore
+                if element.element_id == ELEMENT_ID_INT:
+                    self._ans.append(CAST_TYPE_INT)
+                elif element.element_id == ELEMENT_ID_BOOL:
+                    self._ans.append(CAST_TYPE_BOOL)
+                elif element.element_id == ELEMENT_ID_FLOAT:
+                    self._ans.append(CAST_TYPE_FLOAT)
+                elif element.element_id == ELEMENT_ID_STR:
+                    self._ans.append(CAST_TYPE_STR)
+
+        elif isinstance(
+            element,
+            (ExpressionAdd, ExpressionRemove, ExpressionTimes, ExpressionDivide),
+        ):
+            opcode, sub_type = [
+                (j, k) for i, j, k in COMPUTE_REGISTER_OPCODE if isinstance(element, i)
+            ][0]
+            yield self._operands_steps(element.element_payload, 2, registers)
+            if len(registers) == 1:
+                self._ans.extend([REGISTER_MOVE, target, registers[0]])  # type: ignore
+            elif len(registers) > 3:
+                # The stack-based virtual machine folds such chains in place,
+                # so the error messages read like "for -=" instead of "for -"
+                self._ans.extend(
+                    [REGISTER_COMPUTE_INPLACE, target, registers[0], registers[1], sub_type]  # type: ignore
+                )
+                for i in registers[2:]:
+                    self._ans.extend([REGISTER_COMPUTE_INPLACE, target, target, i, sub_type])  # type: ignore
+            else:
+                self._ans.extend([opcode, target, registers[0], registers[1]])  # type: ignore
+                for i in registers[2:]:
+                    self._ans.extend([opcode, target, target, i])  # type: ignore
+
+        elif isinstance(
+            element,
+            (
+                ExpressionEqual,
+                ExpressionNotEqual,
+                ExpressionLessThan,
+                ExpressionGreaterThan,
+                ExpressionLessEqual,
+                ExpressionGreaterEqual,
+            ),
+        ):
+            opcode = [j for i, j in COMPARE_REGISTER_OPCODE if isinstance(element, i)][0]
+            yield self._operands_steps(element.element_payload[:2], 2, registers)
+            self._ans.extend([opcode, target] + registers)  # type: ignore
+
+        elif isinstance(element, (ExpressionAnd, ExpressionOr)):
+            # The target may be read by the following logic,
+            # so the variable can only be written at the end
+            if target[0] == REGISTER_KIND_VARIABLE:
+                register = (REGISTER_KIND_TEMPORARY, self._temp_register())
+                yield self._element_steps(element, register)
+                self._ans.extend([REGISTER_MOVE, target, register])  # type: ignore
+                self._temps_top = temps_top
+                return
+            # Handle each logic
+            jump_end_indexes = []
+            jump = (
+                REGISTER_FALSE_JUMP
+                if isinstance(element, ExpressionAnd)
+                else REGISTER_TRUE_JUMP
+            )
+            for index, i in enumerate(element.element_payload):
+                yield self._element_steps(i, target)
+                if index < len(element.element_payload) - 1:
+                    self._ans.extend([jump, target, 0])  # type: ignore
+                    jump_end_indexes.append(len(self._ans) - 1)
+            # Handle jump end
+            end_index = len(self._ans)
+            for i in jump_end_indexes:
+                self._ans[i] = end_index
+
+        elif isinstance(element, ExpressionInverse):
+            yield self._operands_steps(element.element_payload[:1], 1, registers)
+            self._ans.extend([REGISTER_NOT, target] + registers)  # type: ignore
+        elif isinstance(element, ExpressionIn):
+            yield self._operands_steps(element.element_payload[:2], 2, registers)
+            self._ans.extend([REGISTER_IN, target] + registers)  # type: ignore
+
+        elif isinstance(element, ExpressionFunction):
+            args = element.element_payload[1]
+            first = self._temp_register(len(args))
+            for index, i in enumerate(args):
+                yield self._element_steps(i, (REGISTER_KIND_TEMPORARY, first + index))
+            self._ans.append(REGISTER_FUNC)
+            self._ans.append(target)  # type: ignore
+            self._ans.append((REGISTER_KIND_TEMPORARY, first) if len(args) > 0 else 0)  # type: ignore
+            self._ans.append(len(args))
+            self._ans.append(element.element_payload[0])
+        elif isinstance(element, ExpressionCommand):
+            assert element.element_payload is not None
+            yield self._operands_steps([element.element_payload], 1, registers)
+            self._ans.extend([REGISTER_COMMAND, target] + registers)  # type: ignore
+        elif isinstance(element, ExpressionSelector):
+            assert element.element_payload is not None
+            yield self._operands_steps([element.element_payload], 1, registers)
+            self._ans.extend([REGISTER_SELECTOR, target] + registers)  # type: ignore
+        elif isinstance(element, ExpressionScore):
+            yield self._operands_steps(element.element_payload[:2], 2, registers)
+            self._ans.extend([REGISTER_SCORE, target] + registers)  # type: ignore
+        elif isinstance(element, ExpressionReference):
+            yield self._operands_steps([element.element_payload[1]], 1, registers)
+            self._ans.extend([REGISTER_REF, target] + registers)  # type: ignore
+            if element.element_payload[0] == TYPE_ENUM_INT:
+                self._ans.append(REF_TYPE_INT)
+            elif element.element_payload[0] == TYPE_ENUM_BOOL:
+                self._ans.append(REF_TYPE_BOOL)
+            elif element.element_payload[0] == TYPE_ENUM_FLOAT:
+                self._ans.append(REF_TYPE_FLOAT)
+            elif element.element_payload[0] == TYPE_ENUM_STR:
+                self._ans.append(REF_TYPE_STR)
+
+        self._temps_top = temps_top
+
+    def _handle_branch_leaf(self, element, jump_if):  # type: (ExpressionElement, bool) -> int
+        """
+        _handle_branch_leaf 求值给出的表达式元素，
+        并在其真值与 jump_if 相同时跳转
+
+        Args:
+            element (ExpressionElement):
+                待处理的表达式元素
+            jump_if (bool):
+                发生跳转时表达式元素的真值
+
+        Returns:
+            int: 跳转目标在字节码中的位置，它需要由调用者回填
+        """
+        temps_top = self._temps_top
+        register = self._operands([element], 1)[0]
+        self._temps_top = temps_top
+        self._ans.append(REGISTER_TRUE_JUMP if jump_if else REGISTER_FALSE_JUMP)
+        self._ans.append(register)  # type: ignore
+        self._ans.append(0)
+        return len(self._ans) - 1
+
+    def _condition_steps(
+        self, code_block, for_loop_env
+    ):  # type: (OpcodeCondition, ForLoopEnv | None) -> Iterator[Iterator[Any]]
+        """
+        _condition_steps 将给出的条件语句编译为寄存器字节码。
+        它是一个生成器，产出编译各个条件代码块中语句的子步骤
+
+        Args:
+            code_block (OpcodeCondition):
+                要编译为字节码的条件语句
+            for_loop_env (ForLoopEnv | None):
+                该条件语句所在循环语句的上下文环境。
+                若它不位于循环体中，请设置为 None
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译该条件语句的生成器
+        """
+        # Jump end for all branches
+        jump_end_indexes = []
+
+        for i in code_block.opcode_payload:
+            # Handle else statement
+            if i.condition is None:
+                for j in i.code_block:
+                    start_pc = len(self._ans)
+                    yield self._code_block_steps(j, for_loop_env)
+                    self._add_check_point(
+                        j, CHECK_POINT_TYPE_CONDITION, i.state_line, start_pc
+                    )
+                break
+
+            # Handle condition and jump false
+            start_pc = len(self._ans)
+            false_jumps = []  # type: list[int]
+            yield self._branch_steps(i.condition, False, false_jumps)
+            self._chk.append(
+                CheckPoint(
+                    CHECK_POINT_TYPE_CONDITION,
+                    start_pc,
+                    len(self._ans) - 1,
+                    [i.state_line],
+                )
+            )
+
+            # Handle code block
+            for j in i.code_block:
+                start_pc = len(self._ans)
+                yield self._code_block_steps(j, for_loop_env)
+                self._add_check_point(
+                    j, CHECK_POINT_TYPE_CONDITION, i.state_line, start_pc
+                )
+
+            # Handle false jump and jump end
+            self._ans.append(REGISTER_DIRECT_JUMP)
+            self._ans.append(0)
+            jump_end_indexes.append(len(self._ans) - 1)
+            for index in false_jumps:
+                self._ans[index] = len(self._ans)
+
+        # Set the pc for all jump end
+        end_index = len(self._ans)
+        for index in jump_end_indexes:
+            self._ans[index] = end_index
+
+    def _for_loop_steps(
+        self, code_block
+    ):  # type: (OpcodeForLoop) -> Iterator[Iterator[Any]]
+        """
+        _for_loop_steps 将给出的循环语句编译为寄存器字节码。
+        循环的重复次数与计数器将被保存在两个临时寄存器中，
+        直到循环结束前它们都不会被释放
+
+        Args:
+            code_block (OpcodeForLoop):
+                要编译为字节码的循环语句
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译该循环语句的生成器
+        """
+        # Prepare
+        assert code_block.opcode_payload is not None
+        for_loop_env = ForLoopEnv()
+        for_loop = code_block.opcode_payload
+        varindex = self._map.index_by_name(for_loop.variable)
+        temps_top = self._temps_top
+        limit = (REGISTER_KIND_TEMPORARY, self._temp_register())
+        counter = (REGISTER_KIND_TEMPORARY, self._temp_register())
+
+        # Handle repeat times
+        start_pc = len(self._ans)
+        registers = []  # type: list[tuple[int, int]]
+        yield self._operands_steps([for_loop.repeat_times], 1, registers)
+        self._temps_top = counter[1] + 1
+        self._ans.extend([REGISTER_FOR_PREPARE, limit, counter, registers[0]])  # type: ignore
+        self._chk.append(
+            CheckPoint(
+                CHECK_POINT_TYPE_FOR_LOOP,
+                start_pc,
+                len(self._ans) - 1,
+                [for_loop.state_line],
+            )
+        )
+
+        # Handle continue loop or break loop
+        continue_pc = len(self._ans)
+        for_loop_env.continue_pc = continue_pc
+        self._ans.extend([REGISTER_FOR_LOOP, limit, counter, varindex, 0])  # type: ignore
+        for_loop_env.end_indexes.append(len(self._ans) - 1)
+
+        # Handle loop body
+        for i in for_loop.code_block:
+            start_pc = len(self._ans)
+            yield self._code_block_steps(i, for_loop_env)
+            self._add_check_point(
+                i, CHECK_POINT_TYPE_FOR_LOOP, for_loop.state_line, start_pc
+            )
+        self._ans.append(REGISTER_DIRECT_JUMP)
+        self._ans.append(continue_pc)
+
+        # Set the pc for all jump end and release the registers
+        end_index = len(self._ans)
+        for index in for_loop_env.end_indexes:
+            self._ans[index] = end_index
+        self._temps_top = temps_top
+
+    def _code_block_steps(
+        self, code_block, for_loop_env
+    ):  # type: (OpcodeBase, ForLoopEnv | None) -> Iterator[Iterator[Any]]
+        """
+        _code_block_steps 将给出的代码块编译为寄存器字节码。
+        它是一个生成器，由继承的 _handle_code_block 通过 run_steps 驱动
+
+        Args:
+            code_block (OpcodeBase):
+                待处理的代码块
+            for_loop_env (ForLoopEnv | None):
+                该代码块所在循环语句的上下文环境。
+                若它不位于循环体中，请设置为 None
+
+        Returns:
+            Iterator[Iterator[Any]]: 编译该代码块的生成器
+        """
+        temps_top = self._temps_top
+        registers = []  # type: list[tuple[int, int]]
+
+        if isinstance(code_block, OpcodeAssign):
+            varindex = self._map.index_by_name(code_block.opcode_payload[0])
+            yield self._element_steps(
+                code_block.opcode_payload[1], (REGISTER_KIND_VARIABLE, varindex)  # type: ignore
+            )
+        elif isinstance(code_block, OpcodeCondition):
+            yield self._condition_steps(code_block, for_loop_env)
+        elif isinstance(code_block, OpcodeForLoop):
+            yield self._for_loop_steps(code_block)
+        elif isinstance(code_block, OpcodeContinue):
+            if for_loop_env is None:
+                self._ans.append(REGISTER_INTERNAL_PANIC)
+                self._ans.append(
+                    "Continue statement only accepted under for loop code block"
+                )
+            else:
+                self._ans.append(REGISTER_DIRECT_JUMP)
+                self._ans.append(for_loop_env.continue_pc)
+        elif isinstance(code_block, OpcodeBreak):
+            if for_loop_env is None:
+                self._ans.append(REGISTER_INTERNAL_PANIC)
+                self._ans.append(
+                    "Break statement only accepted under for loop code block"
+                )
+            else:
+                self._ans.append(REGISTER_DIRECT_JUMP)
+                self._ans.append(0)
+                for_loop_env.end_indexes.append(len(self._ans) - 1)
+        elif isinstance(code_block, OpcodeExpression):
+            yield self._operands_steps([code_block.opcode_payload], 1, registers)
+            self._ans.extend([REGISTER_STORE_RETURN_VAL, registers[0]])  # type: ignore
+        elif isinstance(code_block, OpcodeReturn):
+            yield self._operands_steps([code_block.opcode_payload], 1, registers)
+            self._ans.extend([REGISTER_STORE_RETURN_VAL, registers[0]])  # type: ignore
+            self._ans.append(REGISTER_PROGRAM_STOP_RUN)
+
+        self._temps_top = temps_top
+
+    def compile(self):  # type: () -> RegisterCompileResult # type: ignore
+        """
+        compile 将 AST 语法树编译为寄存器字节码
+
+        Returns:
+            RegisterCompileResult: 编译所得结果
+        """
+        self._ans = []
+        self._chk = []
+        self._map = VariableMapping()
+        self._consts = []
+        self._const_index = {}
+        self._temps_top = 0
+        self._temps_max = 0
+
+        for i in self._ast:
+            start_pc = len(self._ans)
+            self._handle_code_block(i, None)
+            self._add_check_point(i, CHECK_POINT_TYPE_NORMAL, "", start_pc)
+        self._ans.append(REGISTER_PROGRAM_STOP_RUN)
+
+        # Registers are the variables, the constants and the temporaries in order
+        base = [
+            0,
+            self._map.variables_count(),
+            self._map.variables_count() + len(self._consts),
+        ]
+        byte_code = [
+            base[i[0]] + i[1] if isinstance(i, tuple) else i for i in self._ans
+        ]  # type: list[int | bool | float | str]
+
+        return RegisterCompileResult(
+            byte_code,
+            self._chk,
+            self._map,
+            self._consts,
+            base[2] + self._temps_max,
+        )
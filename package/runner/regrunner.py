@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+import json
+from .external import GameInteract, BuiltInFunction
+from .regcompile import RegisterCompileResult
+from .runner import (
+    EMPTY_VARIABLES,
+    EMPTY_GAME_INTERACT,
+    EMPTY_BUILTIN_FUNCTION,
+    InternalException,
+    fast_panic,
+    chk_by_pc,
+)
+from .define import VariableMapping
+
+EMPTY_REGISTER_COMPILE_RESULT = RegisterCompileResult(
+    [], [], VariableMapping(), [], 0
+)
+
+
+class RegisterRunner:
+    """
+    RegisterRunner 是该编程语言基于寄存器的解释器。
+    它用于运行由 RegisterCompiler 编译所得的寄存器字节码，
+    并与 CodeRunner 具有相同的运行结果和错误信息
+    """
+
+    _compiled = EMPTY_REGISTER_COMPILE_RESULT  # type: RegisterCompileResult
+    _registers = []  # type: list[int | bool | float | str | None]
+
+    def __init__(self, compiled):  # type: (RegisterCompileResult) -> None
+        """初始化并返回一个新的寄存器解释器
+
+        Args:
+            compiled (RegisterCompileResult):
+                RegisterCompiler 的编译结果
+        """
+        variables_count = compiled.var_mapping.variables_count()
+        self._compiled = compiled
+        self._registers = (
+            [None] * variables_count
+            + list(compiled.constants)
+            + [None]
+            * (compiled.registers_count - variables_count - len(compiled.constants))
+        )
+
+    def _unassigned(self, var_index):  # type: (int) -> None
+        """_unassigned 抛出变量未被赋值的错误
+
+        Args:
+            var_index (int):
+                未被赋值的变量的整数索引
+
+        Raises:
+            Exception:
+                变量未被赋值的错误
+        """
+        varname = self._compiled.var_mapping.name_by_index(var_index)
+        raise Exception(
+            "Variable {} used before assignment".format(
+                json.dumps(varname, ensure_ascii=False)
+            )
+        )
+
+    def running(
+        self,
+        require_return=True,  # type: bool
+        var_maps=EMPTY_VARIABLES,  # type: dict[str, int | bool | float | str]
+        interact=EMPTY_GAME_INTERACT,  # type: GameInteract
+        builtins=EMPTY_BUILTIN_FUNCTION,  # type: BuiltInFunction
+    ):  # type: (...) -> int | bool | float | str | None
+        """
+        running 启动了一个寄存器虚拟机，
+        并通过解释的方式运行代码。
+
+        您可以选择预先指定 var_maps 参数，
+        这意味着您将可以预先初始化一些变量。
+
+        给出的 var_maps 在返回前不应修改，
+        但在该函数返回后进行修改是被允许的
+
+        Args:
+            require_return (bool, optional):
+                是否检查这些代码是否返回值。
+                如果为真且没有返回值，则抛出异常。
+                默认值为 True
+            var_maps (dict[str, int | bool | float | str], optional):
+                运行代码前已经初始化的变量。
+                默认值为 EMPTY_VARIABLES
+            interact (GameInteract, optional):
+                用于与 Minecraft 进行交互的接口。
+                默认值为 EMPTY_GAME_INTERACT
+            builtins (BuiltInFunction, optional):
+                外部函数提供者为用户定义的内建函数。
+                默认值为 EMPTY_BUILTIN_FUNCTION
+
+        Returns:
+            int | bool | float | str | None:
+                运行代码时所得的返回值
+        """
+        pc = 0  # type: int
+        result = None  # type: int | bool | float | str | None
+
+        byte_code = self._compiled.byte_code  # type: list[int | bool | float | str]
+        registers = self._registers[:]  # type: list[int | bool | float | str | None]
+
+        for key, value in var_maps.items():
+            index = self._compiled.var_mapping.index_by_name(key, True)
+            if index is not None:
+                registers[index] = value
+
+        try:
+            while True:
+                op = byte_code[pc]
+
+                if op == 0:  # MOVE (0, DST_REG, SRC_REG)
+                    value = registers[byte_code[pc + 2]]  # type: ignore
+                    if value is None:
+                        self._unassigned(byte_code[pc + 2])  # type: ignore
+                    registers[byte_code[pc + 1]] = value  # type: ignore
+                    pc += 3
+                elif op < 13 and op != 11:  # Binary operations (op, DST_REG, REG, REG)
+                    temp1 = registers[byte_code[pc + 2]]  # type: ignore
+                    if temp1 is None:
+                        self._unassigned(byte_code[pc + 2])  # type: ignore
+                    temp2 = registers[byte_code[pc + 3]]  # type: ignore
+                    if temp2 is None:
+                        self._unassigned(byte_code[pc + 3])  # type: ignore
+                    if op == 1:  # ADD
+                        temp1 = temp1 + temp2  # type: ignore
+                    elif op == 2:  # REMOVE
+                        temp1 = temp1 - temp2  # type: ignore
+                    elif op == 3:  # TIMES
+                        temp1 = temp1 * temp2  # type: ignore
+                    elif op == 4:  # DIVIDE
+                        temp1 = temp1 / temp2  # type: ignore
+                    elif op == 5:  # EQUAL
+                        temp1 = temp2 == temp1
+                    elif op == 6:  # NOT_EQUAL
+                        temp1 = temp2 != temp1
+                    elif op == 7:  # LESS_THAN
+                        temp1 = temp2 > temp1  # type: ignore
+                    elif op == 8:  # GREATER_THAN
+                        temp1 = temp2 < temp1  # type: ignore
+                    elif op == 9:  # LESS_EQUAL
+                        temp1 = temp2 >= temp1  # type: ignore
+                    elif op == 10:  # GREATER_EQUAL
+                        temp1 = temp2 <= temp1  # type: ignore
+                    else:  # IN
+                        temp1 = temp1 in temp2  # type: ignore
+                    registers[byte_code[pc + 1]] = temp1  # type: ignore
+                    pc += 4
+                elif op == 23:  # FOR_LOOP (23, LIMIT_REG, COUNTER_REG, VAR_INDEX, JUMP_TO)
+                    counter = registers[byte_code[pc + 2]]  # type: ignore
+                    if counter < registers[byte_code[pc + 1]]:  # type: ignore
+                        registers[byte_code[pc + 3]] = counter  # type: ignore
+                        registers[byte_code[pc + 2]] = counter + 1  # type: ignore
+                        pc += 5
+                    else:
+                        pc = byte_code[pc + 4]  # type: ignore
+                elif op == 19:  # DIRECT_JUMP (19, JUMP_TO)
+                    pc = byte_code[pc + 1]  # type: ignore
+                elif op == 20 or op == 21:  # FALSE_JUMP / TRUE_JUMP (op, REG, JUMP_TO)
+                    value = registers[byte_code[pc + 1]]  # type: ignore
+                    if value is None:
+                        self._unassigned(byte_code[pc + 1])  # type: ignore
+                    if (not value) == (op == 20):
+                        pc = byte_code[pc + 2]  # type: ignore
+                    else:
+                        pc += 3
+                elif op == 11:  # NOT (11, DST_REG, REG)
+                    value = registers[byte_code[pc + 2]]  # type: ignore
+                    if value is None:
+                        self._unassigned(byte_code[pc + 2])  # type: ignore
+                    registers[byte_code[pc + 1]] = not value  # type: ignore
+                    pc += 3
+                elif op == 13:  # CAST (13, DST_REG, REG, (int, bool, float, str))
+                    value = registers[byte_code[pc + 2]]  # type: ignore
+                    if value is None:
+                        self._unassigned(byte_code[pc + 2])  # type: ignore
+                    sub_type = byte_code[pc + 3]
+                    if sub_type == 0:  # int
+                        value = int(value)
+                    elif sub_type == 1:  # bool
+                        value = bool(value)
+                    elif sub_type == 2:  # float
+                        value = float(value)
+                    elif sub_type == 3:  # str
+                        value = str(value)
+                    registers[byte_code[pc + 1]] = value  # type: ignore
+                    pc += 4
+                elif op == 14:  # FUNC (14, DST_REG, FIRST_REG, ARGS_LEN, FUNC_NAME)
+                    # Calling the target function
+                    first = byte_code[pc + 2]
+                    args = registers[first : first + byte_code[pc + 3]]  # type: ignore
+                    val = builtins.get_func(byte_code[pc + 4])(*args)  # type: ignore
+                    # Do type check for the return value
+                    if isinstance(val, (int, bool, float, str)):
+                        registers[byte_code[pc + 1]] = val  # type: ignore
+                        pc += 5
+                        continue
+                    try:
+                        if isinstance(val, unicode):  # type: ignore
+                            registers[byte_code[pc + 1]] = str(val)  # type: ignore
+                            pc += 5
+                            continue
+                    except Exception:
+                        pass
+                    # Raise error if type check failed
+                    raise Exception(
+                        "The data type of return value from func {} must be int/bool/float/str, but got {}".format(
+                            byte_code[pc + 4], val
+                        )
+                    )
+                elif op == 15:  # COMMAND (15, DST_REG, REG)
+                    command = registers[byte_code[pc + 2]]  # type: ignore
+                    if command is None:
+                        self._unassigned(byte_code[pc + 2])  # type: ignore
+                    if not isinstance(command, str):
+                        raise Exception(
+                            'The argument for "command" must be str; value={}'.format(
+                                command
+                            )
+                        )
+                    registers[byte_code[pc + 1]] = interact.command_func()(command)  # type: ignore
+                    pc += 3
+                elif op == 16:  # SCORE (16, DST_REG, REG, REG)
+                    target = registers[byte_code[pc + 2]]  # type: ignore
+                    if target is None:
+                        self._unassigned(byte_code[pc + 2])  # type: ignore
+                    scoreboard = registers[byte_code[pc + 3]]  # type: ignore
+                    if scoreboard is None:
+                        self._unassigned(byte_code[pc + 3])  # type: ignore
+                    if not isinstance(target, str):
+                        raise Exception(
+                            'The target argument for "score" must be str; target={}'.format(
+                                target
+                            )
+                        )
+                    if not isinstance(scoreboard, str):
+                        raise Exception(
+                            'The scoreboard argument for "score" must be str; scoreboard={}'.format(
+                                scoreboard
+                            )
+                        )
+                    registers[byte_code[pc + 1]] = interact.score_func()(target, scoreboard)  # type: ignore
+                    pc += 4
+                elif op == 17:  # SELECTOR (17, DST_REG, REG)
+                    value = registers[byte_code[pc + 2]]  # type: ignore
+                    if value is None:
+                        self._unassigned(byte_code[pc + 2])  # type: ignore
+                    if not isinstance(value, str):
+                        raise Exception(
+                            'The argument for "selector" must be str; value={}'.format(
+                                value
+                            )
+                        )
+                    registers[byte_code[pc + 1]] = interact.selector_func()(value)  # type: ignore
+                    pc += 3
+                elif op == 18:  # REF (18, DST_REG, REG, REF_TYPE)
+                    # Get index and value
+                    index = registers[byte_code[pc + 2]]  # type: ignore
+                    if index is None:
+                        self._unassigned(byte_code[pc + 2])  # type: ignore
+                    if isinstance(index, bool) or not isinstance(index, int):
+                        raise Exception(
+                            'The index for "ref" statement must be int; index={}'.format(
+                                index
+                            )
+                        )
+                    value = interact.ref_func()(index)
+                    # Do assertion for value type
+                    ref_type = byte_code[pc + 3]
+                    if ref_type == 0:  # int
+                        if isinstance(value, bool) or not isinstance(value, int):
+                            raise Exception(
+                                "Assertion failed: Expect an int but got {}".format(
+                                    value
+                                )
+                            )
+                    elif ref_type == 1:  # bool
+                        if not isinstance(value, bool):
+                            raise Exception(
+                                "Assertion failed: Expect a bool but got {}".format(
+                                    value
+                                )
+                            )
+                    elif ref_type == 2:  # float
+                        if not isinstance(value, float):
+                            raise Exception(
+                                "Assertion failed: Expect a float but got {}".format(
+                                    value
+                                )
+                            )
+                    elif ref_type == 3:  # str
+                        if not isinstance(value, str):
+                            raise Exception(
+                                "Assertion failed: Expect a str but got {}".format(
+                                    value
+                                )
+                            )
+                    # Store value and update pc
+                    registers[byte_code[pc + 1]] = value  # type: ignore
+                    pc += 4
+                elif op == 22:  # FOR_PREPARE (22, LIMIT_REG, COUNTER_REG, REG)
+                    value = registers[byte_code[pc + 3]]  # type: ignore
+                    if value is None:
+                        self._unassigned(byte_code[pc + 3])  # type: ignore
+                    if isinstance(value, bool) or not isinstance(value, int):
+                        raise Exception("The repeat times of for loop must be int")
+                    registers[byte_code[pc + 1]] = value  # type: ignore
+                    registers[byte_code[pc + 2]] = 0  # type: ignore
+                    pc += 4
+                elif op == 24:  # STORE_RETURN_VAL (24, REG)
+                    result = registers[byte_code[pc + 1]]  # type: ignore
+                    if result is None:
+                        self._unassigned(byte_code[pc + 1])  # type: ignore
+                    pc += 2
+                elif op == 25:  # PROGRAM_STOP_RUN (25)
+                    break
+                elif op == 26:  # INTERNAL_PANIC (26, ERROR)
+                    raise Exception(byte_code[pc + 1])
+                elif op == 27:  # COMPUTE_INPLACE (27, DST_REG, REG, REG, (+, -, *, /))
+                    temp1 = registers[byte_code[pc + 2]]  # type: ignore
+                    if temp1 is None:
+                        self._unassigned(byte_code[pc + 2])  # type: ignore
+                    temp2 = registers[byte_code[pc + 3]]  # type: ignore
+                    if temp2 is None:
+                        self._unassigned(byte_code[pc + 3])  # type: ignore
+                    sub_type = byte_code[pc + 4]
+                    if sub_type == 0:  # +
+                        temp1 += temp2  # type: ignore
+                    elif sub_type == 1:  # -
+                        temp1 -= temp2  # type: ignore
+                    elif sub_type == 2:  # *
+                        temp1 *= temp2  # type: ignore
+                    else:  # /
+                        temp1 /= temp2  # type: ignore
+                    registers[byte_code[pc + 1]] = temp1  # type: ignore
+                    pc += 5
+        except Exception as e:
+            if isinstance(e, InternalException):
+                raise e
+            else:
+                fast_panic(chk_by_pc(self._compiled, pc), str(e))  # type: ignore
+                raise Exception("unreachable")
+
+        if require_return and result is None:
+            raise Exception("Runtime Error: No return value after running the code")
+        return result
@@ -1,16 +1,29 @@
 # -*- coding: utf-8 -*-
 from __future__ import division
 
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Callable
+
+import sys
 import json
 import bisect
 from .compile import CompileResult
 from .external import GameInteract, BuiltInFunction
+from .table import build_handlers, CTX_RESULT
+from .transpile import CodeTranspiler, TranspileResult, TranspileException
+from .verify import CodeVerifier, VerifyException
 from .define import (
     CHECK_POINT_TYPE_NORMAL,
     CHECK_POINT_TYPE_CONDITION,
     CHECK_POINT_TYPE_FOR_LOOP,
+    RUNNER_ENGINE_SWITCH,
+    RUNNER_ENGINE_TABLE,
+    RUNNER_ENGINE_TRANSPILE,
+    BYTECODE_HANDLE_FUNC,
     VariableMapping,
     CheckPoint,
+    instruction_length,
 )
 
 try:
@@ -20,6 +33,7 @@ except Exception:
 
 EMPTY_COMPILE_RESULT = CompileResult([], [], VariableMapping())
 EMPTY_VARIABLES = {}
+EMPTY_VAR_NAMES = []  # type: list[str]
 EMPTY_GAME_INTERACT = GameInteract()
 EMPTY_BUILTIN_FUNCTION = BuiltInFunction()
 
@@ -33,6 +47,98 @@ class InternalException(Exception):
     pass
 
 
+def fast_panic(chk, err):  # type: (CheckPoint, str) -> None
+    """
+    fast_panic 以 chk 所指示的源代码行抛出运行时错误。
+    所有执行引擎都通过它来格式化运行时错误
+
+    Args:
+        chk (CheckPoint):
+            出错位置对应的检查点
+        err (str):
+            需要抛出的错误信息
+
+    Raises:
+        InternalException:
+            err 所指示的错误
+    """
+    if chk.point_type == CHECK_POINT_TYPE_NORMAL:
+        raise InternalException(
+            "Runtime Error.\n\n- Error -\n  {}\n\n- Code -\n  {}".format(
+                err, chk.payload[0]
+            )
+        )
+    elif chk.point_type == CHECK_POINT_TYPE_CONDITION:
+        prefix = "Runtime Error in Condition.\n\n- Error -\n  {}\n\n- Condition -\n  {}".format(
+            err, chk.payload[0]
+        )
+        if len(chk.payload) > 1:
+            prefix += "\n\n- Code -\n  {}".format(chk.payload[1])
+        raise InternalException(prefix)
+    elif chk.point_type == CHECK_POINT_TYPE_FOR_LOOP:
+        prefix = "Runtime Error in For Loop.\n\n- Error -\n  {}\n\n- For Loop -\n  {}".format(
+            err, chk.payload[0]
+        )
+        if len(chk.payload) > 1:
+            prefix += "\n\n- Code -\n  {}".format(chk.payload[1])
+        raise InternalException(prefix)
+    else:
+        raise Exception("unreachable")
+
+
+def chk_by_pc(compiled, pc):  # type: (CompileResult, int) -> CheckPoint
+    """
+    chk_by_pc 通过给出的程序的计数器，
+    在 compiled 的检查点中查找它对应的原始代码行（的检查点）。
+    所有执行引擎都通过它来定位出错的源代码行
+
+    Args:
+        compiled (CompileResult):
+            编译所得的结果。
+            它也可以是其他具有相同检查点约定的编译结果
+        pc (int):
+            给出的程序计数器
+
+    Returns:
+        CheckPoint:
+            该程序计数器对应的检查点
+    """
+    all_start_pc = [cp.start_pc for cp in compiled.check_point]
+    index = bisect.bisect_right(all_start_pc, pc) - 1
+
+    if index >= 0:
+        chk = compiled.check_point[index]
+        if pc <= chk.end_pc:
+            return chk
+
+    err = "Unresolved program counter; pc={}, self._compiled={}".format(
+        pc, compiled
+    )
+    return CheckPoint(CHECK_POINT_TYPE_NORMAL, 0, 0, [err])
+
+
+def bind_interact(interact):  # type: (GameInteract) -> list[Callable]
+    """
+    bind_interact 一次性解析 interact 所提供的全部交互函数，
+    从而使执行引擎不必在每次交互时重新解析它们
+
+    Args:
+        interact (GameInteract):
+            用于与 Minecraft 进行交互的接口
+
+    Returns:
+        list[Callable]:
+            按 INTERACT_TYPE_COMMAND、INTERACT_TYPE_SCORE、
+            INTERACT_TYPE_SELECTOR 以及 INTERACT_TYPE_REF 索引的交互函数
+    """
+    return [
+        interact.command_func(),
+        interact.score_func(),
+        interact.selector_func(),
+        interact.ref_func(),
+    ]
+
+
 class CodeRunner:
     """
     CodeRunner 是该编程语言的解释器。
@@ -41,16 +147,77 @@ class CodeRunner:
 
     _compiled = EMPTY_COMPILE_RESULT  # type: CompileResult
     _vars_len = 0  # type: int
+    _engine = RUNNER_ENGINE_SWITCH  # type: int
+    _handlers = []  # type: list[Callable[[list, list, list], int] | None]
+    _transpiled = None  # type: TranspileResult | None
+    _inputs = None  # type: list[int] | None
+    _unchecked_handlers = []  # type: list[Callable[[list, list, list], int] | None]
+    _unchecked_transpiled = None  # type: TranspileResult | None
 
-    def __init__(self, compiled):  # type: (CompileResult) -> None
+    def __init__(
+        self, compiled, engine=RUNNER_ENGINE_SWITCH, verify=False
+    ):  # type: (CompileResult, int, bool) -> None
         """初始化并返回一个新的解释器
 
         Args:
             compiled (CompileResult):
                 CodeCompiler 的编译结果
+            engine (int, optional):
+                运行字节码时所使用的执行引擎。只可能为下列之一。
+                    - RUNNER_ENGINE_SWITCH: 逐个比较操作码以进行分派
+                    - RUNNER_ENGINE_TABLE: 通过预先构造的处理函数表进行分派
+                    - RUNNER_ENGINE_TRANSPILE: 将字节码转译为 Python 函数后运行。
+                      如果字节码无法被转译，则回退到 RUNNER_ENGINE_SWITCH
+                默认值为 RUNNER_ENGINE_SWITCH
+            verify (bool, optional):
+                是否在加载时使用 CodeVerifier 校验字节码。
+                对于通过校验的字节码，如果运行前已经初始化了
+                所有可能在赋值前被读取的变量，
+                则 RUNNER_ENGINE_TABLE 和 RUNNER_ENGINE_TRANSPILE
+                将使用不检查变量是否已被赋值的快速模式运行。
+                否则，仍然使用带有检查的常规模式运行，
+                因此错误信息与不校验时完全相同。
+                RUNNER_ENGINE_SWITCH 的检查内联于分派过程之中，
+                因而不受该选项的影响。
+                默认值为 False
+
+        Raises:
+            Exception:
+                如果给出的执行引擎未知，
+                则抛出相应的错误
         """
         self._compiled = compiled
         self._vars_len = compiled.var_mapping.variables_count()
+        self._engine = engine
+        self._handlers = []
+        self._transpiled = None
+        self._inputs = None
+        self._unchecked_handlers = []
+        self._unchecked_transpiled = None
+
+        if verify and engine in (RUNNER_ENGINE_TABLE, RUNNER_ENGINE_TRANSPILE):
+            try:
+                self._inputs = sorted(CodeVerifier(compiled).verify())
+            except VerifyException:
+                pass
+
+        # The checked form is unused if the fast mode needs no input
+        if engine == RUNNER_ENGINE_TABLE:
+            if self._inputs is not None:
+                self._unchecked_handlers = build_handlers(compiled, True)
+            if self._inputs != []:
+                self._handlers = build_handlers(compiled)
+        elif engine == RUNNER_ENGINE_TRANSPILE:
+            try:
+                if self._inputs is not None:
+                    self._unchecked_transpiled = CodeTranspiler(compiled, True).transpile()
+                if self._inputs != []:
+                    self._transpiled = CodeTranspiler(compiled).transpile()
+            except TranspileException:
+                self._inputs = None
+                self._engine = RUNNER_ENGINE_SWITCH
+        elif engine != RUNNER_ENGINE_SWITCH:
+            raise Exception("CodeRunner/__init__: Unknown engine {}".format(engine))
 
     def _chk_by_pc(self, pc):  # type: (int) -> CheckPoint
         """
@@ -65,18 +232,7 @@ class CodeRunner:
             CheckPoint:
                 该程序计数器对应的检查点
         """
-        all_start_pc = [cp.start_pc for cp in self._compiled.check_point]
-        index = bisect.bisect_right(all_start_pc, pc) - 1
-
-        if index >= 0:
-            chk = self._compiled.check_point[index]
-            if pc <= chk.end_pc:
-                return chk
-
-        err = "Unresolved program counter; pc={}, self._compiled={}".format(
-            pc, self._compiled
-        )
-        return CheckPoint(CHECK_POINT_TYPE_NORMAL, 0, 0, [err])
+        return chk_by_pc(self._compiled, pc)
 
     def _fast_panic(self, chk, err):  # type: (CheckPoint, str) -> None
         """_fast_panic 抛出运行时错误
@@ -91,28 +247,57 @@ class CodeRunner:
             InternalException:
                 err 所指示的错误
         """
-        if chk.point_type == CHECK_POINT_TYPE_NORMAL:
-            raise InternalException(
-                "Runtime Error.\n\n- Error -\n  {}\n\n- Code -\n  {}".format(
-                    err, chk.payload[0]
-                )
-            )
-        elif chk.point_type == CHECK_POINT_TYPE_CONDITION:
-            prefix = "Runtime Error in Condition.\n\n- Error -\n  {}\n\n- Condition -\n  {}".format(
-                err, chk.payload[0]
-            )
-            if len(chk.payload) > 1:
-                prefix += "\n\n- Code -\n  {}".format(chk.payload[1])
-            raise InternalException(prefix)
-        elif chk.point_type == CHECK_POINT_TYPE_FOR_LOOP:
-            prefix = "Runtime Error in For Loop.\n\n- Error -\n  {}\n\n- For Loop -\n  {}".format(
-                err, chk.payload[0]
+        fast_panic(chk, err)
+
+    def _unassigned(self, var_index):  # type: (int) -> None
+        """_unassigned 抛出变量未被赋值的错误
+
+        Args:
+            var_index (int):
+                未被赋值的变量的整数索引
+
+        Raises:
+            Exception:
+                变量未被赋值的错误
+        """
+        varname = self._compiled.var_mapping.name_by_index(var_index)
+        raise Exception(
+            "Variable {} used before assignment".format(
+                json.dumps(varname, ensure_ascii=False)
             )
-            if len(chk.payload) > 1:
-                prefix += "\n\n- Code -\n  {}".format(chk.payload[1])
-            raise InternalException(prefix)
-        else:
-            raise Exception("unreachable")
+        )
+
+    def _compare(
+        self, sub_type, temp1, temp2
+    ):  # type: (int, int | bool | float | str, int | bool | float | str) -> bool
+        """
+        _compare 计算 temp1 与 temp2 的比较结果。
+        与 HANDLE_COMPARE 相同，它以 temp2 为左操作数进行比较，
+        从而使得比较结果和错误信息保持一致
+
+        Args:
+            sub_type (int):
+                比较运算的类型
+            temp1 (int | bool | float | str):
+                比较运算的左操作数 (先入栈的值)
+            temp2 (int | bool | float | str):
+                比较运算的右操作数 (后入栈的值)
+
+        Returns:
+            bool: 比较结果
+        """
+        if sub_type == 0:  # ==
+            return temp2 == temp1
+        elif sub_type == 1:  # !=
+            return temp2 != temp1
+        elif sub_type == 2:  # <
+            return temp2 > temp1  # type: ignore
+        elif sub_type == 3:  # >
+            return temp2 < temp1  # type: ignore
+        elif sub_type == 4:  # <=
+            return temp2 >= temp1  # type: ignore
+        else:  # >=
+            return temp2 <= temp1  # type: ignore
 
     def running(
         self,
@@ -150,14 +335,6 @@ class CodeRunner:
             int | bool | float | str | None:
                 运行代码时所得的返回值
         """
-        pc = 0  # type: int
-        stack = []  # type: list[int | bool | float | str]
-        result = None  # type: int | bool | float | str | None
-
-        _push = stack.append
-        _pop = stack.pop
-
-        byte_code = self._compiled.byte_code  # type: list[int | bool | float | str]
         variables = [
             None
         ] * self._vars_len  # type: list[int | bool | float | str | None]
@@ -167,14 +344,159 @@ class CodeRunner:
             if index is not None:
                 variables[index] = value
 
+        return self._execute(
+            require_return, variables, bind_interact(interact), builtins
+        )
+
+    def prepare(
+        self,
+        builtins=EMPTY_BUILTIN_FUNCTION,  # type: BuiltInFunction
+        interact=EMPTY_GAME_INTERACT,  # type: GameInteract
+        var_names=EMPTY_VAR_NAMES,  # type: list[str]
+        require_return=True,  # type: bool
+    ):  # type: (...) -> PreparedRun
+        """
+        prepare 为反复运行同一段代码预先完成准备工作，
+        并返回一个可以被反复调用的 PreparedRun。
+
+        var_names 中的每个变量所对应的变量槽位、
+        interact 所提供的交互函数，
+        以及代码所调用的静态内建函数都只在此处被解析一次。
+
+        调用所返回的 PreparedRun 时，
+        按 var_names 的顺序以位置参数给出这些变量的值，
+        其效果与以相应的 var_maps 调用 running 相同
+
+        Args:
+            builtins (BuiltInFunction, optional):
+                外部函数提供者为用户定义的内建函数。
+                默认值为 EMPTY_BUILTIN_FUNCTION
+            interact (GameInteract, optional):
+                用于与 Minecraft 进行交互的接口。
+                默认值为 EMPTY_GAME_INTERACT
+            var_names (list[str], optional):
+                每次运行前需要初始化的变量的名称。
+                默认值为 EMPTY_VAR_NAMES
+            require_return (bool, optional):
+                是否检查这些代码是否返回值。
+                如果为真且没有返回值，则抛出异常。
+                默认值为 True
+
+        Returns:
+            PreparedRun: 可以被反复调用的运行对象
+        """
+        byte_code = self._compiled.byte_code
+        func_names = set()  # type: set[str]
+        pc = 0
+        while pc < len(byte_code):
+            if byte_code[pc] == BYTECODE_HANDLE_FUNC:
+                func_names.add(byte_code[pc + 2])  # type: ignore
+            pc += instruction_length(byte_code, pc)
+
+        slots = []  # type: list[tuple[int, int]]
+        for position in range(len(var_names)):
+            index = self._compiled.var_mapping.index_by_name(var_names[position], True)
+            if index is not None:
+                slots.append((position, index))
+
+        return PreparedRun(
+            self,
+            require_return,
+            len(var_names),
+            slots,
+            bind_interact(interact),
+            _PreparedBuiltIns(builtins, func_names),
+        )
+
+    def _execute(
+        self,
+        require_return,  # type: bool
+        variables,  # type: list[int | bool | float | str | None]
+        interact_funcs,  # type: list[Callable]
+        builtins,  # type: BuiltInFunction
+    ):  # type: (...) -> int | bool | float | str | None
+        """
+        _execute 以初始化时所指定的执行引擎运行代码。
+        running 和 PreparedRun 都通过它运行代码
+
+        Args:
+            require_return (bool):
+                是否检查这些代码是否返回值。
+                如果为真且没有返回值，则抛出异常
+            variables (list[int | bool | float | str | None]):
+                已经完成初始化的变量列表
+            interact_funcs (list[Callable]):
+                由 bind_interact 解析所得的交互函数
+            builtins (BuiltInFunction):
+                外部函数提供者为用户定义的内建函数
+
+        Returns:
+            int | bool | float | str | None:
+                运行代码时所得的返回值
+        """
+        if self._engine == RUNNER_ENGINE_SWITCH:
+            return self._running_switch(
+                require_return, variables, interact_funcs, builtins
+            )
+
+        unchecked = self._inputs is not None
+        if unchecked:
+            for index in self._inputs:  # type: ignore
+                if variables[index] is None:
+                    unchecked = False
+                    break
+        if self._engine == RUNNER_ENGINE_TABLE:
+            return self._running_table(
+                require_return, variables, interact_funcs, builtins, unchecked
+            )
+        return self._running_transpile(
+            require_return, variables, interact_funcs, builtins, unchecked
+        )
+
+    def _running_switch(
+        self,
+        require_return,  # type: bool
+        variables,  # type: list[int | bool | float | str | None]
+        interact_funcs,  # type: list[Callable]
+        builtins,  # type: BuiltInFunction
+    ):  # type: (...) -> int | bool | float | str | None
+        """
+        _running_switch 通过逐个比较操作码进行分派的方式运行代码。
+        它是 RUNNER_ENGINE_SWITCH 执行引擎的实现
+
+        Args:
+            require_return (bool):
+                是否检查这些代码是否返回值。
+                如果为真且没有返回值，则抛出异常
+            variables (list[int | bool | float | str | None]):
+                已经完成初始化的变量列表
+            interact_funcs (list[Callable]):
+                由 bind_interact 解析所得的交互函数
+            builtins (BuiltInFunction):
+                外部函数提供者为用户定义的内建函数
+
+        Returns:
+            int | bool | float | str | None:
+                运行代码时所得的返回值
+        """
+        pc = 0  # type: int
+        stack = []  # type: list[int | bool | float | str]
+        result = None  # type: int | bool | float | str | None
+
+        _push = stack.append
+        _pop = stack.pop
+
+        byte_code = self._compiled.byte_code  # type: list[int | bool | float | str]
+
         try:
             while True:
                 op = byte_code[pc]
 
-                if op == 0:  # LOAD_CONST (0, CONST)
-                    _push(byte_code[pc + 1])
-                    pc += 2
-                elif op == 1:  # LOAD_VALUE (1, VAR_INDEX)
+                # Opcodes are tested roughly in the order of how often they run.
+                # The opcodes of the optional passes share one branch right after
+                # the loads and stores, so each of them costs about as many
+                # comparisons as the base opcodes it replaces
+                if op == 1:  # LOAD_VALUE (1, VAR_INDEX)
                     value = variables[byte_code[pc + 1]]  # type: ignore
                     if value is not None:
                         _push(value)
@@ -186,9 +508,185 @@ class CodeRunner:
                                 json.dumps(varname, ensure_ascii=False)
                             )
                         )
+                elif op == 0:  # LOAD_CONST (0, CONST)
+                    _push(byte_code[pc + 1])
+                    pc += 2
                 elif op == 2:  # STORE_VALUE (2, VAR_INDEX)
                     variables[byte_code[pc + 1]] = _pop()  # type: ignore
                     pc += 2
+                elif op > 17:  # Opcodes produced by the optional compiler and optimizer passes
+                    if op == 42:  # FOR_RANGE (42, ITER_INDEX, VAR_INDEX, JUMP_TO)
+                        for variables[byte_code[pc + 2]] in variables[byte_code[pc + 1]]:  # type: ignore
+                            pc += 4
+                            break
+                        else:
+                            pc = byte_code[pc + 3]  # type: ignore
+                    elif op < 29:  # Superinstructions
+                        if op < 24:  # MOVE_VALUE, STORE_CONST and VALUE_(CONST|VALUE)_COMPUTE(_STORE)
+                            if op < 20:
+                                if op == 18:  # MOVE_VALUE (18, SRC_INDEX, DST_INDEX)
+                                    value = variables[byte_code[pc + 1]]  # type: ignore
+                                    if value is None:
+                                        self._unassigned(byte_code[pc + 1])  # type: ignore
+                                    variables[byte_code[pc + 2]] = value  # type: ignore
+                                else:  # STORE_CONST (19, CONST, DST_INDEX)
+                                    variables[byte_code[pc + 2]] = byte_code[pc + 1]  # type: ignore
+                                pc += 3
+                                continue
+                            temp1 = variables[byte_code[pc + 1]]  # type: ignore
+                            if temp1 is None:
+                                self._unassigned(byte_code[pc + 1])  # type: ignore
+                            if op == 20 or op == 22:
+                                temp2 = byte_code[pc + 2]
+                            else:
+                                temp2 = variables[byte_code[pc + 2]]  # type: ignore
+                                if temp2 is None:
+                                    self._unassigned(byte_code[pc + 2])  # type: ignore
+                            sub_type = byte_code[pc + 3]
+                            if sub_type == 0:  # +
+                                temp1 = temp1 + temp2  # type: ignore
+                            elif sub_type == 1:  # -
+                                temp1 = temp1 - temp2  # type: ignore
+                            elif sub_type == 2:  # *
+                                temp1 = temp1 * temp2  # type: ignore
+                            else:  # /
+                                temp1 = temp1 / temp2  # type: ignore
+                            if op < 22:
+                                _push(temp1)  # type: ignore
+                                pc += 4
+                            else:
+                                variables[byte_code[pc + 4]] = temp1  # type: ignore
+                                pc += 5
+                        elif op < 26:  # VALUE_(CONST|VALUE)_COMPARE
+                            temp1 = variables[byte_code[pc + 1]]  # type: ignore
+                            if temp1 is None:
+                                self._unassigned(byte_code[pc + 1])  # type: ignore
+                            if op == 24:
+                                temp2 = byte_code[pc + 2]
+                            else:
+                                temp2 = variables[byte_code[pc + 2]]  # type: ignore
+                                if temp2 is None:
+                                    self._unassigned(byte_code[pc + 2])  # type: ignore
+                            _push(self._compare(byte_code[pc + 3], temp1, temp2))  # type: ignore
+                            pc += 4
+                        elif op == 26:  # COMPARE_FALSE_JUMP (26, (==, !=, <, >, <=, >=), JUMP_TO)
+                            temp2 = _pop()
+                            temp1 = _pop()
+                            if self._compare(byte_code[pc + 1], temp1, temp2):  # type: ignore
+                                pc += 3
+                            else:
+                                pc = byte_code[pc + 2]  # type: ignore
+                        elif op == 27:  # FALSE_JUMP_OR_POP (27, JUMP_TO)
+                            if not stack[-1]:
+                                pc = byte_code[pc + 1]  # type: ignore
+                            else:
+                                _pop()
+                                pc += 2
+                        else:  # TRUE_JUMP_OR_POP (28, JUMP_TO)
+                            if stack[-1]:
+                                pc = byte_code[pc + 1]  # type: ignore
+                            else:
+                                _pop()
+                                pc += 2
+                    elif op < 39:  # Type specialised opcodes
+                        if op == 29:  # INT_ADD (29)
+                            temp = _pop()
+                            _push(_pop() + temp)  # type: ignore
+                            pc += 1
+                        elif op == 32:  # STR_CONCAT (32, POP_LEN)
+                            pop_len = byte_code[pc + 1]
+                            if pop_len == 2:
+                                temp = _pop()
+                                _push(_pop() + temp)  # type: ignore
+                            elif pop_len == 3:
+                                temp1 = _pop()
+                                temp2 = _pop()
+                                _push(_pop() + temp2 + temp1)  # type: ignore
+                            else:
+                                temp = "".join(stack[-pop_len:])  # type: ignore
+                                del stack[-pop_len:]  # type: ignore
+                                _push(temp)
+                            pc += 2
+                        else:
+                            temp = _pop()
+                            if op < 32:
+                                if op == 30:  # INT_REMOVE (30)
+                                    _push(_pop() - temp)  # type: ignore
+                                else:  # INT_TIMES (31)
+                                    _push(_pop() * temp)  # type: ignore
+                            elif op < 36:
+                                if op == 33:  # INT_EQUAL (33)
+                                    _push(_pop() == temp)
+                                elif op == 34:  # INT_NOT_EQUAL (34)
+                                    _push(_pop() != temp)
+                                else:  # INT_LESS_THAN (35)
+                                    _push(_pop() < temp)  # type: ignore
+                            elif op == 36:  # INT_GREATER_THAN (36)
+                                _push(_pop() > temp)  # type: ignore
+                            elif op == 37:  # INT_LESS_EQUAL (37)
+                                _push(_pop() <= temp)  # type: ignore
+                            else:  # INT_GREATER_EQUAL (38)
+                                _push(_pop() >= temp)  # type: ignore
+                            pc += 1
+                    elif op == 43:  # HANDLE_LINKED_FUNC (43, POP_LEN, FUNC_SLOT)
+                        slot = byte_code[pc + 2]
+                        func = slot.func  # type: ignore
+                        if func is None:
+                            func = slot.lookup()  # type: ignore
+                        pop_len = byte_code[pc + 1]
+                        if pop_len > 0:  # type: ignore
+                            args = stack[-pop_len:]  # type: ignore
+                            del stack[-pop_len:]  # type: ignore
+                            val = func(*args)
+                        else:
+                            val = func()
+                        if slot.trusted or isinstance(val, (int, bool, float, str)):  # type: ignore
+                            _push(val)
+                        else:
+                            _push(slot.convert(val))  # type: ignore
+                        pc += 3
+                    elif op == 41:  # FOR_PREPARE (41, ITER_INDEX)
+                        temp = _pop()
+                        if isinstance(temp, bool) or not isinstance(temp, int):
+                            raise Exception("The repeat times of for loop must be int")
+                        variables[byte_code[pc + 1]] = iter(range(temp))  # type: ignore
+                        pc += 2
+                    else:  # String accumulation opcodes
+                        value = variables[byte_code[pc + 1]]  # type: ignore
+                        if op == 39:  # APPEND_VALUE (39, VAR_INDEX, POP_LEN)
+                            pop_len = byte_code[pc + 2]
+                            args = stack[-pop_len:]  # type: ignore
+                            del stack[-pop_len:]  # type: ignore
+                            for i in args:
+                                if i.__class__ is not str:
+                                    break
+                            else:
+                                if value.__class__ is list:
+                                    value.extend(args)  # type: ignore
+                                    pc += 3
+                                    continue
+                                if value.__class__ is str:
+                                    variables[byte_code[pc + 1]] = [value] + args  # type: ignore
+                                    pc += 3
+                                    continue
+                            # Fall back to the generic concatenation,
+                            # which raises the same error as HANDLE_COMPUTE
+                            if value is None:
+                                self._unassigned(byte_code[pc + 1])  # type: ignore
+                            if value.__class__ is list:
+                                value = "".join(value)  # type: ignore
+                            for i in args:
+                                value = value + i  # type: ignore
+                            variables[byte_code[pc + 1]] = value  # type: ignore
+                            pc += 3
+                        else:  # LOAD_BUFFER (40, VAR_INDEX)
+                            if value.__class__ is list:
+                                value = "".join(value)  # type: ignore
+                                variables[byte_code[pc + 1]] = value  # type: ignore
+                            elif value is None:
+                                self._unassigned(byte_code[pc + 1])  # type: ignore
+                            _push(value)  # type: ignore
+                            pc += 2
                 elif op == 3:  # LOOP_JUMP (3, VAR_INDEX, JUMP_TO)
                     if stack[-1] < stack[-2]:  # type: ignore
                         variables[byte_code[pc + 1]] = stack[-1]  # type: ignore
@@ -196,28 +694,6 @@ class CodeRunner:
                         pc += 3
                     else:
                         pc = byte_code[pc + 2]  # type: ignore
-                elif op == 4:  # LOOP_CHECK (4, CHECK_TYPE)
-                    check_type = byte_code[pc + 1]
-                    if check_type == 0:  # DATA_TYPE
-                        temp = stack[-1]
-                        if isinstance(temp, bool) or not isinstance(temp, int):
-                            raise Exception("The repeat times of for loop must be int")
-                    elif check_type == 1:  # POP_STACK
-                        _pop()
-                        _pop()
-                    pc += 2
-                elif op == 5:  # DIRECT_JUMP (5, JUMP_TO)
-                    pc = byte_code[pc + 1]  # type: ignore
-                elif op == 6:  # FALSE_JUMP (6, JUMP_TO)
-                    if not _pop():
-                        pc = byte_code[pc + 1]  # type: ignore
-                    else:
-                        pc += 2
-                elif op == 7:  # TRUE_JUMP (7, JUMP_TO)
-                    if _pop():
-                        pc = byte_code[pc + 1]  # type: ignore
-                    else:
-                        pc += 2
                 elif op == 8:  # HANDLE_COMPUTE (8, POP_LEN, (+, -, *, /))
                     pop_len = byte_code[pc + 1]
                     sub_type = byte_code[pc + 2]
@@ -278,6 +754,13 @@ class CodeRunner:
                             del stack[-pop_len:]  # type: ignore
                             _push(temp)
                     pc += 3
+                elif op == 5:  # DIRECT_JUMP (5, JUMP_TO)
+                    pc = byte_code[pc + 1]  # type: ignore
+                elif op == 6:  # FALSE_JUMP (6, JUMP_TO)
+                    if not _pop():
+                        pc = byte_code[pc + 1]  # type: ignore
+                    else:
+                        pc += 2
                 elif op == 9:  # HANDLE_COMPARE (9, (==, !=, <, >, <=, >=))
                     sub_type = byte_code[pc + 1]
                     if sub_type == 0:  # ==
@@ -293,6 +776,11 @@ class CodeRunner:
                     elif sub_type == 5:  # >=
                         _push(_pop() <= _pop())  # type: ignore
                     pc += 2
+                elif op == 7:  # TRUE_JUMP (7, JUMP_TO)
+                    if _pop():
+                        pc = byte_code[pc + 1]  # type: ignore
+                    else:
+                        pc += 2
                 elif (
                     op == 10
                 ):  # HANDLE_LOGIC_ANDOR (10, (and, or)); NOTE: Copy the compare result
@@ -310,6 +798,16 @@ class CodeRunner:
                         _push(temp3)
                         _push(temp3)
                     pc += 2
+                elif op == 4:  # LOOP_CHECK (4, CHECK_TYPE)
+                    check_type = byte_code[pc + 1]
+                    if check_type == 0:  # DATA_TYPE
+                        temp = stack[-1]
+                        if isinstance(temp, bool) or not isinstance(temp, int):
+                            raise Exception("The repeat times of for loop must be int")
+                    elif check_type == 1:  # POP_STACK
+                        _pop()
+                        _pop()
+                    pc += 2
                 elif op == 11:  # HANDLE_LOGIC_INNOT (11, (not, in))
                     sub_type = byte_code[pc + 1]
                     if sub_type == 0:  # not
@@ -368,7 +866,7 @@ class CodeRunner:
                                     command
                                 )
                             )
-                        _push(interact.command_func()(command))
+                        _push(interact_funcs[0](command))
                         pc += 2
                     elif sub_type == 1:  # score
                         scoreboard = _pop()
@@ -385,7 +883,7 @@ class CodeRunner:
                                     scoreboard
                                 )
                             )
-                        _push(interact.score_func()(target, scoreboard))
+                        _push(interact_funcs[1](target, scoreboard))
                         pc += 2
                     elif sub_type == 2:  # selector
                         value = _pop()
@@ -395,7 +893,7 @@ class CodeRunner:
                                     value
                                 )
                             )
-                        _push(interact.selector_func()(value))
+                        _push(interact_funcs[2](value))
                         pc += 2
                     elif sub_type == 3:  # ref
                         # Get index and value
@@ -406,7 +904,7 @@ class CodeRunner:
                                     index
                                 )
                             )
-                        value = interact.ref_func()(index)
+                        value = interact_funcs[3](index)
                         # Do assertion for value type
                         ref_type = byte_code[pc + 2]
                         if ref_type == 0:  # int
@@ -457,3 +955,239 @@ class CodeRunner:
         if require_return and result is None:
             raise Exception("Runtime Error: No return value after running the code")
         return result
+
+    def _running_table(
+        self,
+        require_return,  # type: bool
+        variables,  # type: list[int | bool | float | str | None]
+        interact_funcs,  # type: list[Callable]
+        builtins,  # type: BuiltInFunction
+        unchecked,  # type: bool
+    ):  # type: (...) -> int | bool | float | str | None
+        """
+        _running_table 通过处理函数表运行代码。
+        它是 RUNNER_ENGINE_TABLE 执行引擎的实现，
+        并与 running 具有相同的语义和错误报告
+
+        Args:
+            require_return (bool):
+                是否检查这些代码是否返回值。
+                如果为真且没有返回值，则抛出异常
+            variables (list[int | bool | float | str | None]):
+                已经完成初始化的变量列表
+            interact_funcs (list[Callable]):
+                由 bind_interact 解析所得的交互函数
+            builtins (BuiltInFunction):
+                外部函数提供者为用户定义的内建函数
+            unchecked (bool):
+                是否使用不检查变量是否已被赋值的处理函数表
+
+        Returns:
+            int | bool | float | str | None:
+                运行代码时所得的返回值
+        """
+        pc = 0  # type: int
+        stack = []  # type: list[int | bool | float | str]
+        ctx = [interact_funcs, builtins, None]  # type: list
+        handlers = self._unchecked_handlers if unchecked else self._handlers
+
+        try:
+            while pc >= 0:
+                pc = handlers[pc](stack, variables, ctx)  # type: ignore
+        except Exception as e:
+            if isinstance(e, InternalException):
+                raise e
+            else:
+                self._fast_panic(self._chk_by_pc(pc), str(e))
+                raise Exception("unreachable")
+
+        result = ctx[CTX_RESULT]
+        if require_return and result is None:
+            raise Exception("Runtime Error: No return value after running the code")
+        return result
+
+    def _running_transpile(
+        self,
+        require_return,  # type: bool
+        variables,  # type: list[int | bool | float | str | None]
+        interact_funcs,  # type: list[Callable]
+        builtins,  # type: BuiltInFunction
+        unchecked,  # type: bool
+    ):  # type: (...) -> int | bool | float | str | None
+        """
+        _running_transpile 通过转译所得的 Python 函数运行代码。
+        它是 RUNNER_ENGINE_TRANSPILE 执行引擎的实现，
+        出错时通过调用栈找到对应的程序计数器，
+        从而与 running 具有相同的错误报告
+
+        Args:
+            require_return (bool):
+                是否检查这些代码是否返回值。
+                如果为真且没有返回值，则抛出异常
+            variables (list[int | bool | float | str | None]):
+                已经完成初始化的变量列表
+            interact_funcs (list[Callable]):
+                由 bind_interact 解析所得的交互函数
+            builtins (BuiltInFunction):
+                外部函数提供者为用户定义的内建函数
+            unchecked (bool):
+                是否使用不检查变量是否已被赋值的转译结果
+
+        Returns:
+            int | bool | float | str | None:
+                运行代码时所得的返回值
+        """
+        if unchecked:
+            transpiled = self._unchecked_transpiled  # type: TranspileResult # type: ignore
+        else:
+            transpiled = self._transpiled  # type: ignore
+
+        try:
+            result = transpiled.function(variables, interact_funcs, builtins)  # type: ignore
+        except Exception as e:
+            if isinstance(e, InternalException):
+                raise e
+            else:
+                pc = transpiled.pc_by_traceback(sys.exc_info()[2])
+                self._fast_panic(self._chk_by_pc(pc), str(e))
+                raise Exception("unreachable")
+
+        if require_return and result is None:
+            raise Exception("Runtime Error: No return value after running the code")
+        return result
+
+
+class _PreparedBuiltIns:
+    """
+    _PreparedBuiltIns 是预先解析了部分内建函数的外部函数提供者。
+
+    类型转换函数和静态内建函数在构造时就被解析，
+    而其他函数 (包括动态内建函数和未知的函数)
+    仍然在每次调用时交由原有的 BuiltInFunction 解析，
+    因此它们的行为和错误信息保持不变
+    """
+
+    _builtins = EMPTY_BUILTIN_FUNCTION  # type: BuiltInFunction
+    _funcs = {}  # type: dict[str, Callable[..., int | bool | float | str]]
+
+    def __init__(
+        self, builtins, func_names
+    ):  # type: (BuiltInFunction, set[str]) -> None
+        """初始化并返回一个新的 _PreparedBuiltIns
+
+        Args:
+            builtins (BuiltInFunction):
+                外部函数提供者为用户定义的内建函数
+            func_names (set[str]):
+                代码所调用的全部函数的名称
+        """
+        self._builtins = builtins
+        self._funcs = {}
+        for name in func_names:
+            if name in ("int", "bool", "float", "str") or name in builtins.static:
+                self._funcs[name] = builtins.get_func(name)
+
+    def get_func(
+        self, func_name
+    ):  # type: (str) -> Callable[..., int | bool | float | str]
+        """get_func 根据函数名获取对应的内建函数
+
+        Args:
+            func_name (str):
+                欲获取的函数的名字
+
+        Raises:
+            Exception:
+                如果目标函数不存在，则抛出错误
+
+        Returns:
+            Callable[..., int | bool | float | str]:
+                func_name 对应的内建函数
+        """
+        func = self._funcs.get(func_name)
+        if func is None:
+            return self._builtins.get_func(func_name)
+        return func
+
+
+class PreparedRun:
+    """
+    PreparedRun 是由 CodeRunner.prepare 返回的运行对象。
+    它以位置参数接收变量的值，并运行代码
+    """
+
+    _runner = None  # type: CodeRunner | None
+    _require_return = True  # type: bool
+    _inputs_len = 0  # type: int
+    _slots = []  # type: list[tuple[int, int]]
+    _interact_funcs = []  # type: list[Callable]
+    _builtins = None  # type: _PreparedBuiltIns | None
+
+    def __init__(
+        self,
+        runner,  # type: CodeRunner
+        require_return,  # type: bool
+        inputs_len,  # type: int
+        slots,  # type: list[tuple[int, int]]
+        interact_funcs,  # type: list[Callable]
+        builtins,  # type: _PreparedBuiltIns
+    ):  # type: (...) -> None
+        """初始化并返回一个新的 PreparedRun
+
+        Args:
+            runner (CodeRunner):
+                用于运行代码的解释器
+            require_return (bool):
+                是否检查这些代码是否返回值
+            inputs_len (int):
+                每次运行时应给出的位置参数的数量
+            slots (list[tuple[int, int]]):
+                位置参数的索引与其对应的变量槽位。
+                不被代码使用的变量不在其中
+            interact_funcs (list[Callable]):
+                由 bind_interact 解析所得的交互函数
+            builtins (_PreparedBuiltIns):
+                预先解析了部分内建函数的外部函数提供者
+        """
+        self._runner = runner
+        self._require_return = require_return
+        self._inputs_len = inputs_len
+        self._slots = slots
+        self._interact_funcs = interact_funcs
+        self._builtins = builtins
+
+    def __call__(self, *values):  # type: (...) -> int | bool | float | str | None
+        """
+        __call__ 以给出的变量值运行代码。
+        values 的顺序与调用 CodeRunner.prepare 时给出的 var_names 相同
+
+        Args:
+            values (int | bool | float | str):
+                运行代码前已经初始化的变量的值
+
+        Raises:
+            Exception:
+                如果给出的值的数量与 var_names 不符，
+                则抛出相应的错误
+
+        Returns:
+            int | bool | float | str | None:
+                运行代码时所得的返回值
+        """
+        if len(values) != self._inputs_len:
+            raise Exception(
+                "PreparedRun/__call__: Expect {} values but got {}".format(
+                    self._inputs_len, len(values)
+                )
+            )
+
+        runner = self._runner  # type: CodeRunner # type: ignore
+        variables = [
+            None
+        ] * runner._vars_len  # type: list[int | bool | float | str | None]
+        for position, index in self._slots:
+            variables[index] = values[position]
+
+        return runner._execute(
+            self._require_return, variables, self._interact_funcs, self._builtins  # type: ignore
+        )
@@ -0,0 +1,1496 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+import json
+import operator
+from .compile import CompileResult
+from .define import (
+    LOOP_CHECK_TYPE_DATA_TYPE,
+    COMPUTE_TYPE_ADD,
+    COMPUTE_TYPE_REMOVE,
+    COMPUTE_TYPE_TIMES,
+    COMPARE_TYPE_EQUAL,
+    COMPARE_TYPE_NOT_EQUAL,
+    COMPARE_TYPE_LESS_THAN,
+    COMPARE_TYPE_GREATER_THAN,
+    COMPARE_TYPE_LESS_EQUAL,
+    LOGIC_ANDOR_TYPE_AND,
+    LOGIC_INNOT_TYPE_NOT,
+    CAST_TYPE_INT,
+    CAST_TYPE_BOOL,
+    CAST_TYPE_FLOAT,
+    INTERACT_TYPE_COMMAND,
+    INTERACT_TYPE_SCORE,
+    INTERACT_TYPE_SELECTOR,
+    INTERACT_TYPE_REF,
+    REF_TYPE_INT,
+    REF_TYPE_BOOL,
+    REF_TYPE_FLOAT,
+    BYTECODE_LOAD_VALUE,
+    BYTECODE_MOVE_VALUE,
+    BYTECODE_VALUE_CONST_COMPUTE,
+    BYTECODE_VALUE_VALUE_COMPUTE,
+    BYTECODE_VALUE_CONST_COMPUTE_STORE,
+    BYTECODE_VALUE_VALUE_COMPUTE_STORE,
+    BYTECODE_VALUE_CONST_COMPARE,
+    BYTECODE_VALUE_VALUE_COMPARE,
+    BYTECODE_FALSE_JUMP_OR_POP,
+    BYTECODE_INT_ADD,
+    BYTECODE_INT_EQUAL,
+    BYTECODE_LOAD_BUFFER,
+    VariableMapping,
+    instruction_length,
+)
+
+try:
+    range = xrange  # type: ignore
+except Exception:
+    pass
+
+CTX_INTERACT = 0
+CTX_BUILTINS = 1
+CTX_RESULT = 2
+
+COMPUTE_OPERATORS = [
+    operator.add,
+    operator.sub,
+    operator.mul,
+    operator.truediv,
+]  # type: list[Callable[[Any, Any], Any]]
+
+# The right operand (the later pushed one) is always the left side of
+# the Python comparison, which is the same as HANDLE_COMPARE does
+COMPARE_OPERATORS = [
+    operator.eq,
+    operator.ne,
+    operator.gt,
+    operator.lt,
+    operator.ge,
+    operator.le,
+]  # type: list[Callable[[Any, Any], bool]]
+
+
+def _make_load_const(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_load_const 构造 LOAD_CONST 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    const = byte_code[pc + 1]
+    next_pc = pc + 2
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        stack.append(const)
+        return next_pc
+
+    return handler
+
+
+def _make_load_value(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_load_value 构造 LOAD_VALUE 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    var_index = byte_code[pc + 1]  # type: int # type: ignore
+    next_pc = pc + 2
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        value = variables[var_index]
+        if value is None:
+            raise Exception(
+                "Variable {} used before assignment".format(
+                    json.dumps(var_mapping.name_by_index(var_index), ensure_ascii=False)
+                )
+            )
+        stack.append(value)
+        return next_pc
+
+    return handler
+
+
+def _make_store_value(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_store_value 构造 STORE_VALUE 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    var_index = byte_code[pc + 1]  # type: int # type: ignore
+    next_pc = pc + 2
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        variables[var_index] = stack.pop()
+        return next_pc
+
+    return handler
+
+
+def _make_loop_jump(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_loop_jump 构造 LOOP_JUMP 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    var_index = byte_code[pc + 1]  # type: int # type: ignore
+    jump_to = byte_code[pc + 2]  # type: int # type: ignore
+    next_pc = pc + 3
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        counter = stack[-1]
+        if counter < stack[-2]:
+            variables[var_index] = counter
+            stack[-1] = counter + 1
+            return next_pc
+        return jump_to
+
+    return handler
+
+
+def _make_loop_check(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_loop_check 构造 LOOP_CHECK 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    next_pc = pc + 2
+
+    if byte_code[pc + 1] == LOOP_CHECK_TYPE_DATA_TYPE:
+
+        def check(stack, variables, ctx):  # type: (list, list, list) -> int
+            temp = stack[-1]
+            if isinstance(temp, bool) or not isinstance(temp, int):
+                raise Exception("The repeat times of for loop must be int")
+            return next_pc
+
+        return check
+
+    def pop(stack, variables, ctx):  # type: (list, list, list) -> int
+        del stack[-2:]
+        return next_pc
+
+    return pop
+
+
+def _make_direct_jump(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_direct_jump 构造 DIRECT_JUMP 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    jump_to = byte_code[pc + 1]  # type: int # type: ignore
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        return jump_to
+
+    return handler
+
+
+def _make_false_jump(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_false_jump 构造 FALSE_JUMP 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    jump_to = byte_code[pc + 1]  # type: int # type: ignore
+    next_pc = pc + 2
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        if not stack.pop():
+            return jump_to
+        return next_pc
+
+    return handler
+
+
+def _make_true_jump(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_true_jump 构造 TRUE_JUMP 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    jump_to = byte_code[pc + 1]  # type: int # type: ignore
+    next_pc = pc + 2
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        if stack.pop():
+            return jump_to
+        return next_pc
+
+    return handler
+
+
+def _make_handle_compute(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_handle_compute 构造 HANDLE_COMPUTE 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    pop_len = byte_code[pc + 1]  # type: int # type: ignore
+    sub_type = byte_code[pc + 2]
+    next_pc = pc + 3
+
+    if pop_len < 2:
+
+        def noop(stack, variables, ctx):  # type: (list, list, list) -> int
+            return next_pc
+
+        return noop
+
+    if pop_len == 2:
+        if sub_type == COMPUTE_TYPE_ADD:
+
+            def add(stack, variables, ctx):  # type: (list, list, list) -> int
+                temp = stack.pop()
+                stack[-1] = stack[-1] + temp
+                return next_pc
+
+            return add
+        if sub_type == COMPUTE_TYPE_REMOVE:
+
+            def remove(stack, variables, ctx):  # type: (list, list, list) -> int
+                temp = stack.pop()
+                stack[-1] = stack[-1] - temp
+                return next_pc
+
+            return remove
+        if sub_type == COMPUTE_TYPE_TIMES:
+
+            def times(stack, variables, ctx):  # type: (list, list, list) -> int
+                temp = stack.pop()
+                stack[-1] = stack[-1] * temp
+                return next_pc
+
+            return times
+
+        def divide(stack, variables, ctx):  # type: (list, list, list) -> int
+            temp = stack.pop()
+            stack[-1] = stack[-1] / temp
+            return next_pc
+
+        return divide
+
+    # Same expressions as the switch engine, so that
+    # errors such as type mismatches read the same
+    if pop_len == 3:
+        if sub_type == COMPUTE_TYPE_ADD:
+
+            def add3(stack, variables, ctx):  # type: (list, list, list) -> int
+                temp1 = stack.pop()
+                temp2 = stack.pop()
+                stack[-1] = stack[-1] + temp2 + temp1
+                return next_pc
+
+            return add3
+        if sub_type == COMPUTE_TYPE_REMOVE:
+
+            def remove3(stack, variables, ctx):  # type: (list, list, list) -> int
+                temp1 = stack.pop()
+                temp2 = stack.pop()
+                stack[-1] = stack[-1] - temp2 - temp1
+                return next_pc
+
+            return remove3
+        if sub_type == COMPUTE_TYPE_TIMES:
+
+            def times3(stack, variables, ctx):  # type: (list, list, list) -> int
+                temp1 = stack.pop()
+                temp2 = stack.pop()
+                stack[-1] = stack[-1] * temp2 * temp1
+                return next_pc
+
+            return times3
+
+        def divide3(stack, variables, ctx):  # type: (list, list, list) -> int
+            temp1 = stack.pop()
+            temp2 = stack.pop()
+            stack[-1] = stack[-1] / temp2 / temp1
+            return next_pc
+
+        return divide3
+
+    # The switch engine folds longer chains in place,
+    # hence the augmented assignments here
+    def compute(stack, variables, ctx):  # type: (list, list, list) -> int
+        temp = stack[-pop_len]
+        if sub_type == COMPUTE_TYPE_ADD:
+            for i in range(1 - pop_len, 0):
+                temp += stack[i]
+        elif sub_type == COMPUTE_TYPE_REMOVE:
+            for i in range(1 - pop_len, 0):
+                temp -= stack[i]
+        elif sub_type == COMPUTE_TYPE_TIMES:
+            for i in range(1 - pop_len, 0):
+                temp *= stack[i]
+        else:
+            for i in range(1 - pop_len, 0):
+                temp /= stack[i]
+        del stack[-pop_len:]
+        stack.append(temp)
+        return next_pc
+
+    return compute
+
+
+def _make_handle_compare(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_handle_compare 构造 HANDLE_COMPARE 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    sub_type = byte_code[pc + 1]
+    next_pc = pc + 2
+
+    if sub_type == COMPARE_TYPE_EQUAL:
+
+        def equal(stack, variables, ctx):  # type: (list, list, list) -> int
+            temp = stack.pop()
+            stack[-1] = temp == stack[-1]
+            return next_pc
+
+        return equal
+    if sub_type == COMPARE_TYPE_NOT_EQUAL:
+
+        def not_equal(stack, variables, ctx):  # type: (list, list, list) -> int
+            temp = stack.pop()
+            stack[-1] = temp != stack[-1]
+            return next_pc
+
+        return not_equal
+    if sub_type == COMPARE_TYPE_LESS_THAN:
+
+        def less_than(stack, variables, ctx):  # type: (list, list, list) -> int
+            temp = stack.pop()
+            stack[-1] = temp > stack[-1]
+            return next_pc
+
+        return less_than
+    if sub_type == COMPARE_TYPE_GREATER_THAN:
+
+        def greater_than(stack, variables, ctx):  # type: (list, list, list) -> int
+            temp = stack.pop()
+            stack[-1] = temp < stack[-1]
+            return next_pc
+
+        return greater_than
+    if sub_type == COMPARE_TYPE_LESS_EQUAL:
+
+        def less_equal(stack, variables, ctx):  # type: (list, list, list) -> int
+            temp = stack.pop()
+            stack[-1] = temp >= stack[-1]
+            return next_pc
+
+        return less_equal
+
+    def greater_equal(stack, variables, ctx):  # type: (list, list, list) -> int
+        temp = stack.pop()
+        stack[-1] = temp <= stack[-1]
+        return next_pc
+
+    return greater_equal
+
+
+def _make_handle_logic_andor(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_handle_logic_andor 构造 HANDLE_LOGIC_ANDOR 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    next_pc = pc + 2
+
+    if byte_code[pc + 1] == LOGIC_ANDOR_TYPE_AND:
+
+        def logic_and(stack, variables, ctx):  # type: (list, list, list) -> int
+            temp = stack.pop()
+            temp = stack[-1] and temp
+            stack[-1] = temp
+            stack.append(temp)
+            return next_pc
+
+        return logic_and
+
+    def logic_or(stack, variables, ctx):  # type: (list, list, list) -> int
+        temp = stack.pop()
+        temp = stack[-1] or temp
+        stack[-1] = temp
+        stack.append(temp)
+        return next_pc
+
+    return logic_or
+
+
+def _make_handle_logic_innot(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_handle_logic_innot 构造 HANDLE_LOGIC_INNOT 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    next_pc = pc + 2
+
+    if byte_code[pc + 1] == LOGIC_INNOT_TYPE_NOT:
+
+        def logic_not(stack, variables, ctx):  # type: (list, list, list) -> int
+            stack[-1] = not stack[-1]
+            return next_pc
+
+        return logic_not
+
+    def logic_in(stack, variables, ctx):  # type: (list, list, list) -> int
+        temp = stack.pop()
+        stack[-1] = stack[-1] in temp
+        return next_pc
+
+    return logic_in
+
+
+def _make_handle_cast(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_handle_cast 构造 HANDLE_CAST 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    sub_type = byte_code[pc + 1]
+    next_pc = pc + 2
+
+    if sub_type == CAST_TYPE_INT:
+        cast = int  # type: Callable[[Any], Any]
+    elif sub_type == CAST_TYPE_BOOL:
+        cast = bool
+    elif sub_type == CAST_TYPE_FLOAT:
+        cast = float
+    else:
+        cast = str
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        stack[-1] = cast(stack[-1])
+        return next_pc
+
+    return handler
+
+
+def _make_handle_func(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_handle_func 构造 HANDLE_FUNC 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    pop_len = byte_code[pc + 1]  # type: int # type: ignore
+    func_name = byte_code[pc + 2]  # type: str # type: ignore
+    next_pc = pc + 3
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        # Calling the target function
+        if pop_len > 0:
+            args = stack[-pop_len:]
+            del stack[-pop_len:]
+            val = ctx[CTX_BUILTINS].get_func(func_name)(*args)
+        else:
+            val = ctx[CTX_BUILTINS].get_func(func_name)()
+        # Do type check for the return value
+        if isinstance(val, (int, bool, float, str)):
+            stack.append(val)
+            return next_pc
+        try:
+            if isinstance(val, unicode):  # type: ignore
+                stack.append(str(val))
+                return next_pc
+        except Exception:
+            pass
+        # Raise error if type check failed
+        raise Exception(
+            "The data type of return value from func {} must be int/bool/float/str, but got {}".format(
+                func_name, val
+            )
+        )
+
+    return handler
+
+
+def _make_handle_interact(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_handle_interact 构造 HANDLE_INTERACT 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    sub_type = byte_code[pc + 1]
+
+    if sub_type == INTERACT_TYPE_COMMAND:
+
+        def command(stack, variables, ctx):  # type: (list, list, list) -> int
+            value = stack[-1]
+            if not isinstance(value, str):
+                raise Exception(
+                    'The argument for "command" must be str; value={}'.format(value)
+                )
+            stack[-1] = ctx[CTX_INTERACT][INTERACT_TYPE_COMMAND](value)
+            return pc + 2
+
+        return command
+
+    if sub_type == INTERACT_TYPE_SCORE:
+
+        def score(stack, variables, ctx):  # type: (list, list, list) -> int
+            scoreboard = stack.pop()
+            target = stack[-1]
+            if not isinstance(target, str):
+                raise Exception(
+                    'The target argument for "score" must be str; target={}'.format(
+                        target
+                    )
+                )
+            if not isinstance(scoreboard, str):
+                raise Exception(
+                    'The scoreboard argument for "score" must be str; scoreboard={}'.format(
+                        scoreboard
+                    )
+                )
+            stack[-1] = ctx[CTX_INTERACT][INTERACT_TYPE_SCORE](target, scoreboard)
+            return pc + 2
+
+        return score
+
+    if sub_type == INTERACT_TYPE_SELECTOR:
+
+        def selector(stack, variables, ctx):  # type: (list, list, list) -> int
+            value = stack[-1]
+            if not isinstance(value, str):
+                raise Exception(
+                    'The argument for "selector" must be str; value={}'.format(value)
+                )
+            stack[-1] = ctx[CTX_INTERACT][INTERACT_TYPE_SELECTOR](value)
+            return pc + 2
+
+        return selector
+
+    ref_type = byte_code[pc + 2]
+
+    def ref(stack, variables, ctx):  # type: (list, list, list) -> int
+        # Get index and value
+        index = stack[-1]
+        if isinstance(index, bool) or not isinstance(index, int):
+            raise Exception(
+                'The index for "ref" statement must be int; index={}'.format(index)
+            )
+        value = ctx[CTX_INTERACT][INTERACT_TYPE_REF](index)
+        # Do assertion for value type
+        if ref_type == REF_TYPE_INT:
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise Exception(
+                    "Assertion failed: Expect an int but got {}".format(value)
+                )
+        elif ref_type == REF_TYPE_BOOL:
+            if not isinstance(value, bool):
+                raise Exception(
+                    "Assertion failed: Expect a bool but got {}".format(value)
+                )
+        elif ref_type == REF_TYPE_FLOAT:
+            if not isinstance(value, float):
+                raise Exception(
+                    "Assertion failed: Expect a float but got {}".format(value)
+                )
+        else:
+            if not isinstance(value, str):
+                raise Exception(
+                    "Assertion failed: Expect a str but got {}".format(value)
+                )
+        # Update stack and pc
+        stack[-1] = value
+        return pc + 3
+
+    return ref
+
+
+def _make_store_return_val(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_store_return_val 构造 STORE_RETURN_VAL 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    next_pc = pc + 1
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        ctx[CTX_RESULT] = stack.pop()
+        return next_pc
+
+    return handler
+
+
+def _make_program_stop_run(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_program_stop_run 构造 PROGRAM_STOP_RUN 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        return -1
+
+    return handler
+
+
+def _make_internal_panic(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_internal_panic 构造 INTERNAL_PANIC 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    err = byte_code[pc + 1]
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        raise Exception(err)
+
+    return handler
+
+
+def _unassigned(var_mapping, var_index):  # type: (VariableMapping, int) -> None
+    """_unassigned 抛出变量未被赋值的错误
+
+    Args:
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+        var_index (int): 未被赋值的变量的整数索引
+    """
+    raise Exception(
+        "Variable {} used before assignment".format(
+            json.dumps(var_mapping.name_by_index(var_index), ensure_ascii=False)
+        )
+    )
+
+
+def _make_move_value(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_move_value 构造 MOVE_VALUE 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    src = byte_code[pc + 1]  # type: int # type: ignore
+    dst = byte_code[pc + 2]  # type: int # type: ignore
+    next_pc = pc + 3
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        value = variables[src]
+        if value is None:
+            _unassigned(var_mapping, src)
+        variables[dst] = value
+        return next_pc
+
+    return handler
+
+
+def _make_store_const(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_store_const 构造 STORE_CONST 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    const = byte_code[pc + 1]
+    dst = byte_code[pc + 2]  # type: int # type: ignore
+    next_pc = pc + 3
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        variables[dst] = const
+        return next_pc
+
+    return handler
+
+
+def _make_value_compute(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """
+    _make_value_compute 构造 VALUE_CONST_COMPUTE、VALUE_VALUE_COMPUTE、
+    VALUE_CONST_COMPUTE_STORE 以及 VALUE_VALUE_COMPUTE_STORE 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    op = byte_code[pc]
+    src = byte_code[pc + 1]  # type: int # type: ignore
+    operand = byte_code[pc + 2]
+    compute = COMPUTE_OPERATORS[byte_code[pc + 3]]  # type: ignore
+    with_const = op in (BYTECODE_VALUE_CONST_COMPUTE, BYTECODE_VALUE_CONST_COMPUTE_STORE)
+
+    if op in (BYTECODE_VALUE_CONST_COMPUTE, BYTECODE_VALUE_VALUE_COMPUTE):
+        next_pc = pc + 4
+        if with_const:
+
+            def push_const(stack, variables, ctx):  # type: (list, list, list) -> int
+                value = variables[src]
+                if value is None:
+                    _unassigned(var_mapping, src)
+                stack.append(compute(value, operand))
+                return next_pc
+
+            return push_const
+
+        def push_value(stack, variables, ctx):  # type: (list, list, list) -> int
+            value = variables[src]
+            if value is None:
+                _unassigned(var_mapping, src)
+            other = variables[operand]
+            if other is None:
+                _unassigned(var_mapping, operand)  # type: ignore
+            stack.append(compute(value, other))
+            return next_pc
+
+        return push_value
+
+    dst = byte_code[pc + 4]  # type: int # type: ignore
+    next_pc = pc + 5
+    if with_const:
+
+        def store_const(stack, variables, ctx):  # type: (list, list, list) -> int
+            value = variables[src]
+            if value is None:
+                _unassigned(var_mapping, src)
+            variables[dst] = compute(value, operand)
+            return next_pc
+
+        return store_const
+
+    def store_value(stack, variables, ctx):  # type: (list, list, list) -> int
+        value = variables[src]
+        if value is None:
+            _unassigned(var_mapping, src)
+        other = variables[operand]
+        if other is None:
+            _unassigned(var_mapping, operand)  # type: ignore
+        variables[dst] = compute(value, other)
+        return next_pc
+
+    return store_value
+
+
+def _make_value_compare(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """
+    _make_value_compare 构造 VALUE_CONST_COMPARE
+    以及 VALUE_VALUE_COMPARE 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    src = byte_code[pc + 1]  # type: int # type: ignore
+    operand = byte_code[pc + 2]
+    compare = COMPARE_OPERATORS[byte_code[pc + 3]]  # type: ignore
+    next_pc = pc + 4
+
+    if byte_code[pc] == BYTECODE_VALUE_CONST_COMPARE:
+
+        def with_const(stack, variables, ctx):  # type: (list, list, list) -> int
+            value = variables[src]
+            if value is None:
+                _unassigned(var_mapping, src)
+            stack.append(compare(operand, value))
+            return next_pc
+
+        return with_const
+
+    def with_value(stack, variables, ctx):  # type: (list, list, list) -> int
+        value = variables[src]
+        if value is None:
+            _unassigned(var_mapping, src)
+        other = variables[operand]
+        if other is None:
+            _unassigned(var_mapping, operand)  # type: ignore
+        stack.append(compare(other, value))
+        return next_pc
+
+    return with_value
+
+
+def _make_compare_false_jump(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_compare_false_jump 构造 COMPARE_FALSE_JUMP 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    compare = COMPARE_OPERATORS[byte_code[pc + 1]]  # type: ignore
+    jump_to = byte_code[pc + 2]  # type: int # type: ignore
+    next_pc = pc + 3
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        temp = stack.pop()
+        if compare(temp, stack.pop()):
+            return next_pc
+        return jump_to
+
+    return handler
+
+
+def _make_jump_or_pop(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """
+    _make_jump_or_pop 构造 FALSE_JUMP_OR_POP
+    以及 TRUE_JUMP_OR_POP 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    jump_to = byte_code[pc + 1]  # type: int # type: ignore
+    next_pc = pc + 2
+
+    if byte_code[pc] == BYTECODE_FALSE_JUMP_OR_POP:
+
+        def false_jump(stack, variables, ctx):  # type: (list, list, list) -> int
+            if not stack[-1]:
+                return jump_to
+            stack.pop()
+            return next_pc
+
+        return false_jump
+
+    def true_jump(stack, variables, ctx):  # type: (list, list, list) -> int
+        if stack[-1]:
+            return jump_to
+        stack.pop()
+        return next_pc
+
+    return true_jump
+
+
+# The int operators in the order of INT_ADD ... INT_TIMES and
+# INT_EQUAL ... INT_GREATER_EQUAL, whose operands are in the natural order
+INT_COMPUTE_OPERATORS = [
+    operator.add,
+    operator.sub,
+    operator.mul,
+]  # type: list[Callable[[Any, Any], Any]]
+
+INT_COMPARE_OPERATORS = [
+    operator.eq,
+    operator.ne,
+    operator.lt,
+    operator.gt,
+    operator.le,
+    operator.ge,
+]  # type: list[Callable[[Any, Any], bool]]
+
+
+def _make_int_operator(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """
+    _make_int_operator 构造 INT_ADD、INT_REMOVE、INT_TIMES
+    以及 INT_EQUAL 至 INT_GREATER_EQUAL 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    op = byte_code[pc]  # type: int # type: ignore
+    if op < BYTECODE_INT_EQUAL:
+        function = INT_COMPUTE_OPERATORS[op - BYTECODE_INT_ADD]
+    else:
+        function = INT_COMPARE_OPERATORS[op - BYTECODE_INT_EQUAL]
+    next_pc = pc + 1
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        temp = stack.pop()
+        stack[-1] = function(stack[-1], temp)
+        return next_pc
+
+    return handler
+
+
+def _make_str_concat(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_str_concat 构造 STR_CONCAT 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    pop_len = byte_code[pc + 1]  # type: int # type: ignore
+    next_pc = pc + 2
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        temp = "".join(stack[-pop_len:])
+        del stack[-pop_len:]
+        stack.append(temp)
+        return next_pc
+
+    return handler
+
+
+def _make_append_value(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_append_value 构造 APPEND_VALUE 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    var_index = byte_code[pc + 1]  # type: int # type: ignore
+    pop_len = byte_code[pc + 2]  # type: int # type: ignore
+    next_pc = pc + 3
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        args = stack[-pop_len:]
+        del stack[-pop_len:]
+        value = variables[var_index]
+        for i in args:
+            if i.__class__ is not str:
+                break
+        else:
+            if value.__class__ is list:
+                value.extend(args)
+                return next_pc
+            if value.__class__ is str:
+                variables[var_index] = [value] + args
+                return next_pc
+        # Fall back to the generic concatenation,
+        # which raises the same error as HANDLE_COMPUTE
+        if value is None:
+            _unassigned(var_mapping, var_index)
+        if value.__class__ is list:
+            value = "".join(value)
+        for i in args:
+            value = value + i
+        variables[var_index] = value
+        return next_pc
+
+    return handler
+
+
+def _make_load_buffer(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_load_buffer 构造 LOAD_BUFFER 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    var_index = byte_code[pc + 1]  # type: int # type: ignore
+    next_pc = pc + 2
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        value = variables[var_index]
+        if value.__class__ is list:
+            value = "".join(value)
+            variables[var_index] = value
+        elif value is None:
+            _unassigned(var_mapping, var_index)
+        stack.append(value)
+        return next_pc
+
+    return handler
+
+
+def _make_for_prepare(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_for_prepare 构造 FOR_PREPARE 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    iter_index = byte_code[pc + 1]  # type: int # type: ignore
+    next_pc = pc + 2
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        temp = stack.pop()
+        if isinstance(temp, bool) or not isinstance(temp, int):
+            raise Exception("The repeat times of for loop must be int")
+        variables[iter_index] = iter(range(temp))
+        return next_pc
+
+    return handler
+
+
+def _make_for_range(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_for_range 构造 FOR_RANGE 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    iter_index = byte_code[pc + 1]  # type: int # type: ignore
+    var_index = byte_code[pc + 2]  # type: int # type: ignore
+    jump_to = byte_code[pc + 3]  # type: int # type: ignore
+    next_pc = pc + 4
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        value = next(variables[iter_index], None)
+        if value is None:
+            return jump_to
+        variables[var_index] = value
+        return next_pc
+
+    return handler
+
+
+def _make_handle_linked_func(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """_make_handle_linked_func 构造 HANDLE_LINKED_FUNC 指令的处理函数
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    pop_len = byte_code[pc + 1]  # type: int # type: ignore
+    slot = byte_code[pc + 2]  # type: Any
+    next_pc = pc + 3
+
+    if slot.trusted:
+        func = slot.func  # type: Callable[..., Any]
+
+        def trusted(stack, variables, ctx):  # type: (list, list, list) -> int
+            if pop_len > 0:
+                args = stack[-pop_len:]
+                del stack[-pop_len:]
+                stack.append(func(*args))
+            else:
+                stack.append(func())
+            return next_pc
+
+        return trusted
+
+    if slot.func is not None:
+        func = slot.func
+
+        def static(stack, variables, ctx):  # type: (list, list, list) -> int
+            if pop_len > 0:
+                args = stack[-pop_len:]
+                del stack[-pop_len:]
+                val = func(*args)
+            else:
+                val = func()
+            if isinstance(val, (int, bool, float, str)):
+                stack.append(val)
+            else:
+                stack.append(slot.convert(val))
+            return next_pc
+
+        return static
+
+    def dynamic(stack, variables, ctx):  # type: (list, list, list) -> int
+        if pop_len > 0:
+            args = stack[-pop_len:]
+            del stack[-pop_len:]
+            val = slot.lookup()(*args)
+        else:
+            val = slot.lookup()()
+        if isinstance(val, (int, bool, float, str)):
+            stack.append(val)
+        else:
+            stack.append(slot.convert(val))
+        return next_pc
+
+    return dynamic
+
+
+def _make_load_value_unchecked(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """
+    _make_load_value_unchecked 构造 LOAD_VALUE 指令的处理函数。
+    它不检查变量是否已被赋值，因此只能用于通过 CodeVerifier 校验的字节码
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    var_index = byte_code[pc + 1]  # type: int # type: ignore
+    next_pc = pc + 2
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        stack.append(variables[var_index])
+        return next_pc
+
+    return handler
+
+
+def _make_move_value_unchecked(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """
+    _make_move_value_unchecked 构造 MOVE_VALUE 指令的处理函数。
+    它不检查变量是否已被赋值，因此只能用于通过 CodeVerifier 校验的字节码
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    src = byte_code[pc + 1]  # type: int # type: ignore
+    dst = byte_code[pc + 2]  # type: int # type: ignore
+    next_pc = pc + 3
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        variables[dst] = variables[src]
+        return next_pc
+
+    return handler
+
+
+def _make_value_compute_unchecked(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """
+    _make_value_compute_unchecked 构造 VALUE_CONST_COMPUTE、VALUE_VALUE_COMPUTE、
+    VALUE_CONST_COMPUTE_STORE 以及 VALUE_VALUE_COMPUTE_STORE 指令的处理函数。
+    它不检查变量是否已被赋值，因此只能用于通过 CodeVerifier 校验的字节码
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    op = byte_code[pc]
+    src = byte_code[pc + 1]  # type: int # type: ignore
+    operand = byte_code[pc + 2]
+    compute = COMPUTE_OPERATORS[byte_code[pc + 3]]  # type: ignore
+    with_const = op in (BYTECODE_VALUE_CONST_COMPUTE, BYTECODE_VALUE_CONST_COMPUTE_STORE)
+
+    if op in (BYTECODE_VALUE_CONST_COMPUTE, BYTECODE_VALUE_VALUE_COMPUTE):
+        next_pc = pc + 4
+        if with_const:
+
+            def push_const(stack, variables, ctx):  # type: (list, list, list) -> int
+                stack.append(compute(variables[src], operand))
+                return next_pc
+
+            return push_const
+
+        def push_value(stack, variables, ctx):  # type: (list, list, list) -> int
+            stack.append(compute(variables[src], variables[operand]))  # type: ignore
+            return next_pc
+
+        return push_value
+
+    dst = byte_code[pc + 4]  # type: int # type: ignore
+    next_pc = pc + 5
+    if with_const:
+
+        def store_const(stack, variables, ctx):  # type: (list, list, list) -> int
+            variables[dst] = compute(variables[src], operand)
+            return next_pc
+
+        return store_const
+
+    def store_value(stack, variables, ctx):  # type: (list, list, list) -> int
+        variables[dst] = compute(variables[src], variables[operand])  # type: ignore
+        return next_pc
+
+    return store_value
+
+
+def _make_value_compare_unchecked(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """
+    _make_value_compare_unchecked 构造 VALUE_CONST_COMPARE
+    以及 VALUE_VALUE_COMPARE 指令的处理函数。
+    它不检查变量是否已被赋值，因此只能用于通过 CodeVerifier 校验的字节码
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    src = byte_code[pc + 1]  # type: int # type: ignore
+    operand = byte_code[pc + 2]
+    compare = COMPARE_OPERATORS[byte_code[pc + 3]]  # type: ignore
+    next_pc = pc + 4
+
+    if byte_code[pc] == BYTECODE_VALUE_CONST_COMPARE:
+
+        def with_const(stack, variables, ctx):  # type: (list, list, list) -> int
+            stack.append(compare(operand, variables[src]))
+            return next_pc
+
+        return with_const
+
+    def with_value(stack, variables, ctx):  # type: (list, list, list) -> int
+        stack.append(compare(variables[operand], variables[src]))  # type: ignore
+        return next_pc
+
+    return with_value
+
+
+def _make_load_buffer_unchecked(byte_code, pc, var_mapping):  # type: (list, int, VariableMapping) -> Callable
+    """
+    _make_load_buffer_unchecked 构造 LOAD_BUFFER 指令的处理函数。
+    它不检查变量是否已被赋值，因此只能用于通过 CodeVerifier 校验的字节码
+
+    Args:
+        byte_code (list[int | bool | float | str]): 编译所得的字节码序列
+        pc (int): 该指令的起始位置
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+
+    Returns:
+        Callable[[list, list, list], int]: 该指令的处理函数
+    """
+    var_index = byte_code[pc + 1]  # type: int # type: ignore
+    next_pc = pc + 2
+
+    def handler(stack, variables, ctx):  # type: (list, list, list) -> int
+        value = variables[var_index]
+        if value.__class__ is list:
+            value = "".join(value)
+            variables[var_index] = value
+        stack.append(value)
+        return next_pc
+
+    return handler
+
+
+HANDLER_FACTORIES = [
+    _make_load_const,  # BYTECODE_LOAD_CONST
+    _make_load_value,  # BYTECODE_LOAD_VALUE
+    _make_store_value,  # BYTECODE_STORE_VALUE
+    _make_loop_jump,  # BYTECODE_LOOP_JUMP
+    _make_loop_check,  # BYTECODE_LOOP_CHECK
+    _make_direct_jump,  # BYTECODE_DIRECT_JUMP
+    _make_false_jump,  # BYTECODE_FALSE_JUMP
+    _make_true_jump,  # BYTECODE_TRUE_JUMP
+    _make_handle_compute,  # BYTECODE_HANDLE_COMPUTE
+    _make_handle_compare,  # BYTECODE_HANDLE_COMPARE
+    _make_handle_logic_andor,  # BYTECODE_HANDLE_LOGIC_ANDOR
+    _make_handle_logic_innot,  # BYTECODE_HANDLE_LOGIC_INNOT
+    _make_handle_cast,  # BYTECODE_HANDLE_CAST
+    _make_handle_func,  # BYTECODE_HANDLE_FUNC
+    _make_handle_interact,  # BYTECODE_HANDLE_INTERACT
+    _make_store_return_val,  # BYTECODE_STORE_RETURN_VAL
+    _make_program_stop_run,  # BYTECODE_PROGRAM_STOP_RUN
+    _make_internal_panic,  # BYTECODE_INTERNAL_PANIC
+    _make_move_value,  # BYTECODE_MOVE_VALUE
+    _make_store_const,  # BYTECODE_STORE_CONST
+    _make_value_compute,  # BYTECODE_VALUE_CONST_COMPUTE
+    _make_value_compute,  # BYTECODE_VALUE_VALUE_COMPUTE
+    _make_value_compute,  # BYTECODE_VALUE_CONST_COMPUTE_STORE
+    _make_value_compute,  # BYTECODE_VALUE_VALUE_COMPUTE_STORE
+    _make_value_compare,  # BYTECODE_VALUE_CONST_COMPARE
+    _make_value_compare,  # BYTECODE_VALUE_VALUE_COMPARE
+    _make_compare_false_jump,  # BYTECODE_COMPARE_FALSE_JUMP
+    _make_jump_or_pop,  # BYTECODE_FALSE_JUMP_OR_POP
+    _make_jump_or_pop,  # BYTECODE_TRUE_JUMP_OR_POP
+    _make_int_operator,  # BYTECODE_INT_ADD
+    _make_int_operator,  # BYTECODE_INT_REMOVE
+    _make_int_operator,  # BYTECODE_INT_TIMES
+    _make_str_concat,  # BYTECODE_STR_CONCAT
+    _make_int_operator,  # BYTECODE_INT_EQUAL
+    _make_int_operator,  # BYTECODE_INT_NOT_EQUAL
+    _make_int_operator,  # BYTECODE_INT_LESS_THAN
+    _make_int_operator,  # BYTECODE_INT_GREATER_THAN
+    _make_int_operator,  # BYTECODE_INT_LESS_EQUAL
+    _make_int_operator,  # BYTECODE_INT_GREATER_EQUAL
+    _make_append_value,  # BYTECODE_APPEND_VALUE
+    _make_load_buffer,  # BYTECODE_LOAD_BUFFER
+    _make_for_prepare,  # BYTECODE_FOR_PREPARE
+    _make_for_range,  # BYTECODE_FOR_RANGE
+    _make_handle_linked_func,  # BYTECODE_HANDLE_LINKED_FUNC
+]  # type: list[Callable[[list, int, VariableMapping], Callable[[list, list, list], int]]]
+
+
+# The handlers which skip the use-before-assignment checks,
+# keyed by the opcodes whose handlers perform such checks
+UNCHECKED_FACTORIES = {
+    BYTECODE_LOAD_VALUE: _make_load_value_unchecked,
+    BYTECODE_MOVE_VALUE: _make_move_value_unchecked,
+    BYTECODE_VALUE_CONST_COMPUTE: _make_value_compute_unchecked,
+    BYTECODE_VALUE_VALUE_COMPUTE: _make_value_compute_unchecked,
+    BYTECODE_VALUE_CONST_COMPUTE_STORE: _make_value_compute_unchecked,
+    BYTECODE_VALUE_VALUE_COMPUTE_STORE: _make_value_compute_unchecked,
+    BYTECODE_VALUE_CONST_COMPARE: _make_value_compare_unchecked,
+    BYTECODE_VALUE_VALUE_COMPARE: _make_value_compare_unchecked,
+    BYTECODE_LOAD_BUFFER: _make_load_buffer_unchecked,
+}  # type: dict[int, Callable[[list, int, VariableMapping], Callable[[list, list, list], int]]]
+
+
+def build_handlers(
+    compiled, unchecked=False
+):  # type: (CompileResult, bool) -> list[Callable[[list, list, list], int] | None]
+    """
+    build_handlers 将编译结果中的每条指令预处理为对应的处理函数。
+
+    处理函数由 HANDLER_FACTORIES 按操作码构造，
+    并且指令的操作数已经被预先绑定到了处理函数中。
+
+    返回的列表与字节码序列等长，并按程序计数器进行索引。
+    只有指令的起始位置具有处理函数，操作数所在的位置均为 None。
+
+    每个处理函数都具有 handler(stack, variables, ctx) -> next_pc 的形式，
+    其中 ctx 依次保存了由 bind_interact 解析所得的交互函数列表、
+    BuiltInFunction 以及返回值。
+    处理函数返回 -1 表示程序应当停止运行
+
+    Args:
+        compiled (CompileResult):
+            CodeCompiler 的编译结果
+        unchecked (bool, optional):
+            是否使用 UNCHECKED_FACTORIES 中不检查变量是否已被赋值的处理函数。
+            只有通过 CodeVerifier 校验，
+            并且所需的变量都已被初始化时，才能使用这些处理函数。
+            默认值为 False
+
+    Raises:
+        Exception:
+            如果字节码中存在未知的操作码，
+            则抛出相应的错误
+
+    Returns:
+        list[Callable[[list, list, list], int] | None]:
+            按程序计数器索引的处理函数列表
+    """
+    byte_code = compiled.byte_code
+    handlers = [None] * len(byte_code)  # type: list[Callable[[list, list, list], int] | None]
+
+    pc = 0
+    while pc < len(byte_code):
+        op = byte_code[pc]
+        if isinstance(op, bool) or not isinstance(op, int) or not 0 <= op < len(HANDLER_FACTORIES):
+            raise Exception(
+                "build_handlers: Unknown opcode {} at pc={}".format(op, pc)
+            )
+        if unchecked and op in UNCHECKED_FACTORIES:
+            handlers[pc] = UNCHECKED_FACTORIES[op](byte_code, pc, compiled.var_mapping)
+        else:
+            handlers[pc] = HANDLER_FACTORIES[op](byte_code, pc, compiled.var_mapping)
+        pc += instruction_length(byte_code, pc)
+
+    return handlers
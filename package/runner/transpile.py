@@ -0,0 +1,1426 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from types import TracebackType
+    from typing import Any, Callable
+    from .external import BuiltInFunction
+
+import json
+from .compile import CompileResult
+from .define import (
+    BYTECODE_LOAD_CONST,
+    BYTECODE_LOAD_VALUE,
+    BYTECODE_STORE_VALUE,
+    BYTECODE_LOOP_JUMP,
+    BYTECODE_LOOP_CHECK,
+    BYTECODE_DIRECT_JUMP,
+    BYTECODE_FALSE_JUMP,
+    BYTECODE_TRUE_JUMP,
+    BYTECODE_HANDLE_COMPUTE,
+    BYTECODE_HANDLE_COMPARE,
+    BYTECODE_HANDLE_LOGIC_ANDOR,
+    BYTECODE_HANDLE_LOGIC_INNOT,
+    BYTECODE_HANDLE_CAST,
+    BYTECODE_HANDLE_FUNC,
+    BYTECODE_HANDLE_LINKED_FUNC,
+    BYTECODE_HANDLE_INTERACT,
+    BYTECODE_STORE_RETURN_VAL,
+    BYTECODE_PROGRAM_STOP_RUN,
+    BYTECODE_INTERNAL_PANIC,
+    BYTECODE_INT_ADD,
+    BYTECODE_INT_REMOVE,
+    BYTECODE_INT_TIMES,
+    BYTECODE_STR_CONCAT,
+    BYTECODE_APPEND_VALUE,
+    BYTECODE_LOAD_BUFFER,
+    BYTECODE_FOR_PREPARE,
+    BYTECODE_FOR_RANGE,
+    BYTECODE_INT_EQUAL,
+    BYTECODE_INT_GREATER_EQUAL,
+    BYTECODE_LENGTH,
+    LOOP_CHECK_TYPE_DATA_TYPE,
+    LOOP_CHECK_TYPE_POP_STACK,
+    COMPUTE_TYPE_ADD,
+    COMPUTE_TYPE_REMOVE,
+    COMPUTE_TYPE_TIMES,
+    COMPARE_TYPE_EQUAL,
+    COMPARE_TYPE_NOT_EQUAL,
+    COMPARE_TYPE_LESS_THAN,
+    COMPARE_TYPE_GREATER_THAN,
+    COMPARE_TYPE_LESS_EQUAL,
+    LOGIC_ANDOR_TYPE_AND,
+    LOGIC_ANDOR_TYPE_OR,
+    LOGIC_INNOT_TYPE_NOT,
+    CAST_TYPE_INT,
+    CAST_TYPE_BOOL,
+    CAST_TYPE_FLOAT,
+    INTERACT_TYPE_COMMAND,
+    INTERACT_TYPE_SCORE,
+    INTERACT_TYPE_SELECTOR,
+    INTERACT_TYPE_REF,
+    REF_TYPE_INT,
+    REF_TYPE_BOOL,
+    REF_TYPE_FLOAT,
+    VariableMapping,
+    instruction_length,
+)
+
+try:
+    range = xrange  # type: ignore
+except Exception:
+    pass
+
+TRANSPILE_FUNC_NAME = "transpiled"
+TRANSPILE_FILE_COUNTER = [0]
+# CPython refuses to compile source indented by 100 levels or more,
+# so more deeply nested code is left to the virtual machine
+TRANSPILE_MAX_INDENT = 90
+# The parser of Python 2 overflows its stack on expressions nested
+# by about 100 levels (fewer inside deeply indented blocks), and it
+# prints "s_push: parser stack overflow" to stderr when it does,
+# so such expressions are left to the virtual machine as well
+TRANSPILE_MAX_NESTING = 70
+
+
+class TranspileException(Exception):
+    """
+    TranspileException 指示给出的字节码无法被转译为 Python 代码。
+    遇到该异常时，调用者应当回退到虚拟机以运行这些字节码
+    """
+
+    pass
+
+
+def _call_func(builtins, func_name, *args):  # type: (BuiltInFunction, str, Any) -> Any
+    """
+    _call_func 调用名为 func_name 的内建函数，
+    并对其返回值进行类型检查。
+
+    参数先于函数本身被求值，
+    这与虚拟机中的求值顺序一致
+
+    Args:
+        builtins (BuiltInFunction): 外部函数提供者为用户定义的内建函数
+        func_name (str): 欲调用的函数的名字
+        *args (int | bool | float | str): 调用该函数时所使用的参数
+
+    Returns:
+        int | bool | float | str: 该函数的返回值
+    """
+    val = builtins.get_func(func_name)(*args)
+    if isinstance(val, (int, bool, float, str)):
+        return val
+    try:
+        if isinstance(val, unicode):  # type: ignore
+            return str(val)
+    except Exception:
+        pass
+    raise Exception(
+        "The data type of return value from func {} must be int/bool/float/str, but got {}".format(
+            func_name, val
+        )
+    )
+
+
+def _call_linked(slot, *args):  # type: (Any, Any) -> Any
+    """
+    _call_linked 调用链接时已经解析的内建函数，
+    并对其返回值进行类型检查
+
+    Args:
+        slot (LinkedFunction): HANDLE_LINKED_FUNC 指令的 FUNC_SLOT 操作数
+        *args (int | bool | float | str): 调用该函数时所使用的参数
+
+    Returns:
+        int | bool | float | str: 该函数的返回值
+    """
+    func = slot.func
+    if func is None:
+        func = slot.lookup()
+    val = func(*args)
+    if isinstance(val, (int, bool, float, str)):
+        return val
+    return slot.convert(val)
+
+
+def _interact_command(command_func, command):  # type: (Callable[[str], int], Any) -> int
+    """_interact_command 执行 command 语句
+
+    Args:
+        command_func (Callable[[str], int]): 已解析的 GameInteract.command_func()
+        command (int | bool | float | str): 欲执行的命令
+
+    Returns:
+        int: 命令的执行结果
+    """
+    if not isinstance(command, str):
+        raise Exception(
+            'The argument for "command" must be str; value={}'.format(command)
+        )
+    return command_func(command)
+
+
+def _interact_score(score_func, target, scoreboard):  # type: (Callable[[str, str], int], Any, Any) -> int
+    """_interact_score 执行 score 语句
+
+    Args:
+        score_func (Callable[[str, str], int]): 已解析的 GameInteract.score_func()
+        target (int | bool | float | str): 欲查询的目标
+        scoreboard (int | bool | float | str): 欲查询的计分板
+
+    Returns:
+        int: target 在 scoreboard 上的分数
+    """
+    if not isinstance(target, str):
+        raise Exception(
+            'The target argument for "score" must be str; target={}'.format(target)
+        )
+    if not isinstance(scoreboard, str):
+        raise Exception(
+            'The scoreboard argument for "score" must be str; scoreboard={}'.format(
+                scoreboard
+            )
+        )
+    return score_func(target, scoreboard)
+
+
+def _interact_selector(selector_func, value):  # type: (Callable[[str], str], Any) -> str
+    """_interact_selector 执行 selector 语句
+
+    Args:
+        selector_func (Callable[[str], str]): 已解析的 GameInteract.selector_func()
+        value (int | bool | float | str): 欲解析的目标选择器
+
+    Returns:
+        str: 目标选择器的解析结果
+    """
+    if not isinstance(value, str):
+        raise Exception(
+            'The argument for "selector" must be str; value={}'.format(value)
+        )
+    return selector_func(value)
+
+
+def _interact_ref(ref_func, index, ref_type):  # type: (Callable[[int], Any], Any, int) -> Any
+    """_interact_ref 执行 ref 语句，并断言所得值的类型
+
+    Args:
+        ref_func (Callable[[int], Any]): 已解析的 GameInteract.ref_func()
+        index (int | bool | float | str): 欲引用的值的索引
+        ref_type (int): 所引用的值应具有的类型
+
+    Returns:
+        int | bool | float | str: 所引用的值
+    """
+    if isinstance(index, bool) or not isinstance(index, int):
+        raise Exception(
+            'The index for "ref" statement must be int; index={}'.format(index)
+        )
+    value = ref_func(index)
+    if ref_type == REF_TYPE_INT:
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise Exception("Assertion failed: Expect an int but got {}".format(value))
+    elif ref_type == REF_TYPE_BOOL:
+        if not isinstance(value, bool):
+            raise Exception("Assertion failed: Expect a bool but got {}".format(value))
+    elif ref_type == REF_TYPE_FLOAT:
+        if not isinstance(value, float):
+            raise Exception("Assertion failed: Expect a float but got {}".format(value))
+    else:
+        if not isinstance(value, str):
+            raise Exception("Assertion failed: Expect a str but got {}".format(value))
+    return value
+
+
+def _join_logic(
+    logic, left, left_logic, right, right_logic
+):  # type: (int, str, int, str, int) -> str
+    """
+    _join_logic 以 and/or 连接两个 Python 表达式。
+
+    若某一侧本身就是由该函数以相同运算连接而成的表达式，
+    则将其展开，从而使得 a and b and c 不会被嵌套为 ((a and b) and c)。
+    这避免了长的 and/or 链超出 CPython 的括号嵌套上限
+
+    Args:
+        logic (int): 连接所用的运算类型 (and, or)
+        left (str): 左侧的表达式
+        left_logic (int): 左侧表达式的运算类型。若它不是 and/or 表达式，则为 -1
+        right (str): 右侧的表达式
+        right_logic (int): 右侧表达式的运算类型。若它不是 and/or 表达式，则为 -1
+
+    Returns:
+        str: 连接所得的表达式
+    """
+    if left_logic == logic:
+        left = left[1:-1]
+    if right_logic == logic:
+        right = right[1:-1]
+    if logic == LOGIC_ANDOR_TYPE_AND:
+        return "({} and {})".format(left, right)
+    return "({} or {})".format(left, right)
+
+
+def _compute(sub_type, *args):  # type: (int, Any) -> Any
+    """
+    _compute 以虚拟机的方式计算 HANDLE_COMPUTE 指令。
+
+    所有的操作数都已在调用前被求值，
+    这与虚拟机先将操作数全部入栈再进行计算的顺序一致
+
+    Args:
+        sub_type (int): 运算的类型
+        *args (int | bool | float | str): 参与运算的所有操作数 (至少三个)
+
+    Returns:
+        int | bool | float | str: 运算结果
+    """
+    if len(args) == 3:
+        if sub_type == COMPUTE_TYPE_ADD:
+            return args[0] + args[1] + args[2]
+        if sub_type == COMPUTE_TYPE_REMOVE:
+            return args[0] - args[1] - args[2]
+        if sub_type == COMPUTE_TYPE_TIMES:
+            return args[0] * args[1] * args[2]
+        return args[0] / args[1] / args[2]
+    # The virtual machine folds longer chains in place
+    temp = args[0]
+    if sub_type == COMPUTE_TYPE_ADD:
+        for i in args[1:]:
+            temp += i
+    elif sub_type == COMPUTE_TYPE_REMOVE:
+        for i in args[1:]:
+            temp -= i
+    elif sub_type == COMPUTE_TYPE_TIMES:
+        for i in args[1:]:
+            temp *= i
+    else:
+        for i in args[1:]:
+            temp /= i
+    return temp
+
+
+def _compare_less_than(a, b):  # type: (Any, Any) -> bool
+    """_compare_less_than 以虚拟机的方式计算 a < b"""
+    return b > a
+
+
+def _compare_greater_than(a, b):  # type: (Any, Any) -> bool
+    """_compare_greater_than 以虚拟机的方式计算 a > b"""
+    return b < a
+
+
+def _compare_less_equal(a, b):  # type: (Any, Any) -> bool
+    """_compare_less_equal 以虚拟机的方式计算 a <= b"""
+    return b >= a
+
+
+def _compare_greater_equal(a, b):  # type: (Any, Any) -> bool
+    """_compare_greater_equal 以虚拟机的方式计算 a >= b"""
+    return b <= a
+
+
+def _unassigned(var_mapping, index):  # type: (VariableMapping, int) -> Any
+    """_unassigned 抛出变量未被赋值的错误
+
+    Args:
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+        index (int): 未被赋值的变量的索引
+    """
+    raise Exception(
+        "Variable {} used before assignment".format(
+            json.dumps(var_mapping.name_by_index(index), ensure_ascii=False)
+        )
+    )
+
+
+def _append_value(var_mapping, index, value, args):  # type: (VariableMapping, int, Any, list) -> Any
+    """
+    _append_value 以虚拟机的方式将 args 追加到变量的值 value 之后，
+    并返回该变量的新值
+
+    Args:
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+        index (int): 该变量的索引
+        value (Any): 该变量当前的值，它可能是 str 的列表缓冲区
+        args (list): 被追加的所有操作数
+
+    Returns:
+        Any: 该变量的新值
+    """
+    for i in args:
+        if i.__class__ is not str:
+            break
+    else:
+        if value.__class__ is list:
+            value.extend(args)
+            return value
+        if value.__class__ is str:
+            return [value] + args
+    if value is None:
+        _unassigned(var_mapping, index)
+    if value.__class__ is list:
+        value = "".join(value)
+    for i in args:
+        value = value + i
+    return value
+
+
+def _load_buffer(var_mapping, index, value):  # type: (VariableMapping, int, Any) -> Any
+    """
+    _load_buffer 以虚拟机的方式读取变量的值 value。
+    若它是 str 的列表缓冲区，则返回合并所得的 str
+
+    Args:
+        var_mapping (VariableMapping): 编译过程中所用的变量映射表
+        index (int): 该变量的索引
+        value (Any): 该变量当前的值
+
+    Returns:
+        int | bool | float | str: 该变量的值
+    """
+    if value.__class__ is list:
+        return "".join(value)
+    if value is None:
+        _unassigned(var_mapping, index)
+    return value
+
+
+TRANSPILE_GLOBALS = {
+    "range": range,
+    "_call_func": _call_func,
+    "_call_linked": _call_linked,
+    "_interact_command": _interact_command,
+    "_interact_score": _interact_score,
+    "_interact_selector": _interact_selector,
+    "_interact_ref": _interact_ref,
+    "_compute": _compute,
+    "_compare_less_than": _compare_less_than,
+    "_compare_greater_than": _compare_greater_than,
+    "_compare_less_equal": _compare_less_equal,
+    "_compare_greater_equal": _compare_greater_equal,
+    "_unassigned": _unassigned,
+    "_append_value": _append_value,
+    "_load_buffer": _load_buffer,
+}  # type: dict[str, Any]
+
+
+class TranspileResult:
+    """
+    TranspileResult 是转译器将字节码处理为 Python 函数的结果
+    """
+
+    source = ""  # type: str
+    filename = ""  # type: str
+    function = None  # type: Callable[[list, list, BuiltInFunction], Any] | None
+    line_pc = []  # type: list[int]
+
+    def __init__(
+        self,
+        source,  # type: str
+        filename,  # type: str
+        function,  # type: Callable[[list, list, BuiltInFunction], Any]
+        line_pc,  # type: list[int]
+    ):  # type: (...) -> None
+        """初始化并返回一个新的 TranspileResult
+
+        Args:
+            source (str):
+                转译所得的 Python 源代码
+            filename (str):
+                编译该源代码时所使用的文件名
+            function (Callable[[list, list, BuiltInFunction], Any]):
+                由该源代码得到的函数。
+                它接受变量列表、由 bind_interact 解析所得的交互函数列表
+                和内建函数，并返回代码的返回值
+            line_pc (list[int]):
+                源代码的每一行 (从 1 开始) 所对应的程序计数器。
+                不对应任何字节码的行被记为 -1
+        """
+        self.source = source
+        self.filename = filename
+        self.function = function
+        self.line_pc = line_pc
+
+    def __repr__(self):  # type: () -> str
+        """返回 TranspileResult 的字符串表示
+
+        Returns:
+            str: 该 TranspileResult 的字符串表示
+        """
+        return "TranspileResult(filename={}, source={})".format(
+            json.dumps(self.filename), json.dumps(self.source)
+        )
+
+    def pc_by_traceback(self, tb):  # type: (TracebackType | None) -> int
+        """
+        pc_by_traceback 通过异常的调用栈，
+        找到出错的源代码行所对应的程序计数器
+
+        Args:
+            tb (TracebackType | None):
+                异常的调用栈
+
+        Returns:
+            int:
+                出错位置对应的程序计数器。
+                如果无法找到，则返回 -1
+        """
+        lineno = -1
+        while tb is not None:
+            if tb.tb_frame.f_code.co_filename == self.filename:
+                lineno = tb.tb_lineno
+            tb = tb.tb_next
+        if lineno < 0 or lineno >= len(self.line_pc):
+            return -1
+        return self.line_pc[lineno]
+
+
+def _nesting(line):  # type: (str) -> int
+    """_nesting 返回一行 Python 源代码中括号的最大嵌套深度
+
+    Args:
+        line (str): 目标源代码。其中的字符串字面量不会被计入
+
+    Returns:
+        int: 括号的最大嵌套深度
+    """
+    depth = deepest = 0
+    quote = ""
+    escaped = False
+    for char in line:
+        if quote:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = ""
+        elif char == "'" or char == '"':
+            quote = char
+        elif char in "([{":
+            depth += 1
+            deepest = max(deepest, depth)
+        elif char in ")]}":
+            depth -= 1
+    return deepest
+
+
+class _StackEntry:
+    """
+    _StackEntry 是转译时符号栈上的元素，
+    它持有一个尚未被求值的 Python 表达式
+    """
+
+    source = ""  # type: str
+    atom = False  # type: bool
+    chain = -1  # type: int
+    chain_type = -1  # type: int
+    duplicate = False  # type: bool
+    logic = -1  # type: int
+
+    def __init__(self, source, atom=False, logic=-1):  # type: (str, bool, int) -> None
+        """初始化并返回一个新的 _StackEntry
+
+        Args:
+            source (str):
+                该元素对应的 Python 表达式
+            atom (bool, optional):
+                该表达式是否不会产生任何副作用且不会抛出异常。
+                默认值为 False
+            logic (int, optional):
+                若该表达式是由 _join_logic 连接而成的 and/or 表达式，
+                则为其运算类型，否则为 -1。
+                默认值为 -1
+        """
+        self.source = source
+        self.atom = atom
+        self.chain = -1
+        self.chain_type = -1
+        self.duplicate = False
+        self.logic = logic
+
+
+class CodeTranspiler:
+    """
+    CodeTranspiler 将编译所得的字节码转译为 Python 源代码，
+    然后将其编译为原生的 Python 函数。
+
+    转译器从字节码中恢复出结构化的控制流，
+    这意味着循环会被转译为 for 语句，
+    而条件语句会被转译为 if/elif/else 语句。
+
+    转译器只接受 CodeCompiler 所产生的字节码形态。
+    对于其无法识别的字节码，将抛出 TranspileException
+    """
+
+    _compiled = CompileResult([], [], None)  # type: ignore
+    _starts = set()  # type: set[int]
+    _lines = []  # type: list[str]
+    _line_pc = []  # type: list[int]
+    _consts = []  # type: list[Any]
+    _loops = 0  # type: int
+    _pending = 0  # type: int
+    _unchecked = False  # type: bool
+
+    def __init__(self, compiled, unchecked=False):  # type: (CompileResult, bool) -> None
+        """初始化并返回一个新的转译器
+
+        Args:
+            compiled (CompileResult):
+                CodeCompiler 的编译结果
+            unchecked (bool, optional):
+                是否认为所有变量在被读取时都已被赋值，
+                从而不再检查变量是否在赋值前被读取。
+                只有通过 CodeVerifier 校验，
+                并且所需的变量都已被初始化时，才能运行这样转译所得的函数。
+                默认值为 False
+        """
+        self._compiled = compiled
+        self._unchecked = unchecked
+        self._starts = set()
+        self._lines = []
+        self._line_pc = []
+        self._consts = []
+        self._loops = 0
+        self._pending = 0
+
+    def _emit(self, indent, line, pc):  # type: (int, str, int) -> None
+        """_emit 输出一行 Python 源代码
+
+        Args:
+            indent (int): 该行的缩进层级
+            line (str): 该行的内容
+            pc (int): 该行对应的程序计数器
+
+        Raises:
+            TranspileException: 如果该行的表达式嵌套过深
+        """
+        if (
+            line.count("(") + line.count("[") + line.count("{") > TRANSPILE_MAX_NESTING
+            and _nesting(line) > TRANSPILE_MAX_NESTING
+        ):
+            self._fail(pc, "Too deeply nested expression")
+        self._lines.append("    " * indent + line)
+        self._line_pc.append(pc)
+
+    def _const(self, value):  # type: (Any) -> _StackEntry
+        """_const 返回常量 value 对应的符号栈元素
+
+        Args:
+            value (int | bool | float | str): 目标常量
+
+        Returns:
+            _StackEntry: 该常量对应的符号栈元素
+        """
+        if isinstance(value, bool):
+            return _StackEntry(repr(value), True)
+        if isinstance(value, (int, str)) or (
+            isinstance(value, float)
+            and value - value == 0
+            and float(repr(value)) == value
+        ):
+            if isinstance(value, (int, float)) and value < 0:
+                return _StackEntry("({})".format(repr(value)), True)
+            return _StackEntry(repr(value), True)
+        self._consts.append(value)
+        return _StackEntry("_const_{}".format(len(self._consts) - 1), True)
+
+    def _fail(self, pc, reason):  # type: (int, str) -> None
+        """_fail 抛出无法转译的错误
+
+        Args:
+            pc (int): 出错位置的程序计数器
+            reason (str): 无法转译的原因
+
+        Raises:
+            TranspileException: 总是抛出该错误
+        """
+        raise TranspileException(
+            "CodeTranspiler: {} (pc={})".format(reason, pc)
+        )
+
+    def _pop(self, stack, pc):  # type: (list[_StackEntry], int) -> _StackEntry
+        """_pop 从符号栈弹出一个已完成求值的元素
+
+        Args:
+            stack (list[_StackEntry]): 符号栈
+            pc (int): 当前的程序计数器
+
+        Returns:
+            _StackEntry: 被弹出的元素
+        """
+        if len(stack) == 0:
+            self._fail(pc, "Stack underflow")
+        entry = stack.pop()
+        if entry.chain >= 0 or entry.duplicate:
+            self._fail(pc, "Unexpected use of and/or chain")
+        return entry
+
+    def _expression(
+        self,
+        pc,  # type: int
+        end,  # type: int
+        stack,  # type: list[_StackEntry]
+        assigned,  # type: set[int]
+        reads,  # type: set[int]
+    ):  # type: (...) -> int
+        """
+        _expression 从 pc 开始，将表达式相关的字节码转译到符号栈上，
+        直到遇见不属于表达式的字节码为止
+
+        Args:
+            pc (int):
+                起始位置的程序计数器
+            end (int):
+                当前代码块的结束位置
+            stack (list[_StackEntry]):
+                符号栈
+            assigned (set[int]):
+                在此处一定已被赋值的变量
+            reads (set[int]):
+                被无条件读取的变量。
+                该表达式求值成功后，它们也一定已被赋值
+
+        Returns:
+            int: 第一个不属于表达式的字节码的位置
+        """
+        byte_code = self._compiled.byte_code
+
+        while pc < end:
+            if self._pending > 0:
+                for i in range(len(stack)):
+                    if stack[i].chain == pc:
+                        if i != len(stack) - 1:
+                            self._fail(pc, "Unbalanced and/or chain")
+                        stack[i].chain = -1
+                        self._pending -= 1
+            if pc not in self._starts:
+                self._fail(pc, "Jump into the middle of instruction")
+
+            op = byte_code[pc]
+
+            if op == BYTECODE_LOAD_CONST:
+                stack.append(self._const(byte_code[pc + 1]))
+            elif op == BYTECODE_LOAD_VALUE:
+                index = byte_code[pc + 1]  # type: int # type: ignore
+                if index in assigned:
+                    stack.append(_StackEntry("v{}".format(index), True))
+                else:
+                    stack.append(
+                        _StackEntry(
+                            "(v{0} if v{0} is not None else _unassigned(_var_mapping, {0}))".format(
+                                index
+                            )
+                        )
+                    )
+                    if self._pending == 0:
+                        reads.add(index)
+            elif op == BYTECODE_LOAD_BUFFER:
+                index = byte_code[pc + 1]  # type: int # type: ignore
+                stack.append(
+                    _StackEntry("_load_buffer(_var_mapping, {0}, v{0})".format(index))
+                )
+                if self._pending == 0:
+                    reads.add(index)
+            elif op == BYTECODE_HANDLE_COMPUTE:
+                pop_len = byte_code[pc + 1]  # type: int # type: ignore
+                sub_type = byte_code[pc + 2]
+                if pop_len > 1:
+                    args = [self._pop(stack, pc) for _ in range(pop_len)][::-1]
+                if pop_len > 3 or (pop_len == 3 and not args[2].atom):
+                    # The virtual machine evaluates all the operands
+                    # before computing, so a later operand with side effects
+                    # must still run if an earlier operation fails.
+                    # Longer chains are folded in place by it, which
+                    # _compute reproduces together with the error messages
+                    source = "_compute({})".format(
+                        ", ".join([repr(sub_type)] + [i.source for i in args])
+                    )
+                    stack.append(_StackEntry(source))
+                elif pop_len > 1:
+                    if sub_type == COMPUTE_TYPE_ADD:
+                        symbol = " + "
+                    elif sub_type == COMPUTE_TYPE_REMOVE:
+                        symbol = " - "
+                    elif sub_type == COMPUTE_TYPE_TIMES:
+                        symbol = " * "
+                    else:
+                        symbol = " / "
+                    source = "({})".format(symbol.join([i.source for i in args]))
+                    stack.append(_StackEntry(source))
+            elif op == BYTECODE_HANDLE_COMPARE:
+                right = self._pop(stack, pc)
+                left = self._pop(stack, pc)
+                sub_type = byte_code[pc + 1]
+                if sub_type == COMPARE_TYPE_EQUAL:
+                    source = "({} == {})".format(left.source, right.source)
+                elif sub_type == COMPARE_TYPE_NOT_EQUAL:
+                    source = "({} != {})".format(left.source, right.source)
+                else:
+                    # The virtual machine evaluates (right op' left),
+                    # so we keep this to get the same result and error message
+                    if sub_type == COMPARE_TYPE_LESS_THAN:
+                        symbol, helper = " > ", "_compare_less_than"
+                    elif sub_type == COMPARE_TYPE_GREATER_THAN:
+                        symbol, helper = " < ", "_compare_greater_than"
+                    elif sub_type == COMPARE_TYPE_LESS_EQUAL:
+                        symbol, helper = " >= ", "_compare_less_equal"
+                    else:
+                        symbol, helper = " <= ", "_compare_greater_equal"
+                    if left.atom or right.atom:
+                        source = "({}{}{})".format(right.source, symbol, left.source)
+                    else:
+                        source = "{}({}, {})".format(helper, left.source, right.source)
+                stack.append(_StackEntry(source))
+            elif BYTECODE_INT_ADD <= op <= BYTECODE_INT_TIMES:
+                right = self._pop(stack, pc)
+                left = self._pop(stack, pc)
+                symbol = [" + ", " - ", " * "][op - BYTECODE_INT_ADD]
+                stack.append(_StackEntry("({}{}{})".format(left.source, symbol, right.source)))
+            elif op == BYTECODE_STR_CONCAT:
+                pop_len = byte_code[pc + 1]  # type: int # type: ignore
+                args = [self._pop(stack, pc) for _ in range(pop_len)][::-1]
+                source = "({})".format(" + ".join([i.source for i in args]))
+                stack.append(_StackEntry(source))
+            elif BYTECODE_INT_EQUAL <= op <= BYTECODE_INT_GREATER_EQUAL:
+                right = self._pop(stack, pc)
+                left = self._pop(stack, pc)
+                symbol = [" == ", " != ", " < ", " > ", " <= ", " >= "][op - BYTECODE_INT_EQUAL]
+                stack.append(_StackEntry("({}{}{})".format(left.source, symbol, right.source)))
+            elif op == BYTECODE_HANDLE_LOGIC_ANDOR:
+                right = self._pop(stack, pc)
+                if len(stack) == 0 or stack[-1].duplicate:
+                    self._fail(pc, "Invalid and/or operand")
+                left = stack.pop()
+                sub_type = byte_code[pc + 1]
+                if left.chain >= 0 and left.chain_type != sub_type:
+                    self._fail(pc, "Mixed and/or chain")
+                if left.chain < 0 and left.source == (
+                    "True" if sub_type == LOGIC_ANDOR_TYPE_AND else "False"
+                ):
+                    source, logic = right.source, right.logic
+                else:
+                    source = _join_logic(
+                        sub_type, left.source, left.logic, right.source, right.logic  # type: ignore
+                    )
+                    logic = sub_type  # type: int # type: ignore
+                result = _StackEntry(source, False, logic)
+                result.chain = left.chain
+                result.chain_type = sub_type  # type: ignore
+                duplicate = _StackEntry(source, False, logic)
+                duplicate.duplicate = True
+                duplicate.chain_type = sub_type  # type: ignore
+                stack.append(result)
+                stack.append(duplicate)
+            elif op == BYTECODE_FALSE_JUMP or op == BYTECODE_TRUE_JUMP:
+                if len(stack) == 0 or not stack[-1].duplicate:
+                    return pc
+                duplicate = stack.pop()
+                if (op == BYTECODE_FALSE_JUMP) != (
+                    duplicate.chain_type == LOGIC_ANDOR_TYPE_AND
+                ):
+                    self._fail(pc, "Mismatched and/or jump")
+                jump_to = byte_code[pc + 1]  # type: int # type: ignore
+                if jump_to <= pc or jump_to > end:
+                    self._fail(pc, "Invalid and/or jump")
+                if stack[-1].chain < 0:
+                    stack[-1].chain = jump_to
+                    self._pending += 1
+                elif stack[-1].chain != jump_to:
+                    self._fail(pc, "Mismatched and/or jump")
+            elif op == BYTECODE_HANDLE_LOGIC_INNOT:
+                if byte_code[pc + 1] == LOGIC_INNOT_TYPE_NOT:
+                    source = "(not {})".format(self._pop(stack, pc).source)
+                else:
+                    right = self._pop(stack, pc)
+                    left = self._pop(stack, pc)
+                    source = "({} in {})".format(left.source, right.source)
+                stack.append(_StackEntry(source))
+            elif op == BYTECODE_HANDLE_CAST:
+                sub_type = byte_code[pc + 1]
+                if sub_type == CAST_TYPE_INT:
+                    name = "int"
+                elif sub_type == CAST_TYPE_BOOL:
+                    name = "bool"
+                elif sub_type == CAST_TYPE_FLOAT:
+                    name = "float"
+                else:
+                    name = "str"
+                source = "{}({})".format(name, self._pop(stack, pc).source)
+                stack.append(_StackEntry(source))
+            elif op == BYTECODE_HANDLE_FUNC:
+                pop_len = byte_code[pc + 1]  # type: int # type: ignore
+                args = [self._pop(stack, pc) for _ in range(pop_len)][::-1]
+                source = "_call_func({})".format(
+                    ", ".join(
+                        ["_builtins", repr(byte_code[pc + 2])]
+                        + [i.source for i in args]
+                    )
+                )
+                stack.append(_StackEntry(source))
+            elif op == BYTECODE_HANDLE_LINKED_FUNC:
+                pop_len = byte_code[pc + 1]  # type: int # type: ignore
+                args = [self._pop(stack, pc) for _ in range(pop_len)][::-1]
+                slot = byte_code[pc + 2]  # type: Any
+                if slot.trusted:
+                    source = "{}({})".format(
+                        self._const(slot.func).source,
+                        ", ".join([i.source for i in args]),
+                    )
+                else:
+                    source = "_call_linked({})".format(
+                        ", ".join(
+                            [self._const(slot).source] + [i.source for i in args]
+                        )
+                    )
+                stack.append(_StackEntry(source))
+            elif op == BYTECODE_HANDLE_INTERACT:
+                sub_type = byte_code[pc + 1]
+                if sub_type == INTERACT_TYPE_COMMAND:
+                    source = "_interact_command(_interact[{}], {})".format(
+                        INTERACT_TYPE_COMMAND, self._pop(stack, pc).source
+                    )
+                elif sub_type == INTERACT_TYPE_SCORE:
+                    scoreboard = self._pop(stack, pc)
+                    target = self._pop(stack, pc)
+                    source = "_interact_score(_interact[{}], {}, {})".format(
+                        INTERACT_TYPE_SCORE, target.source, scoreboard.source
+                    )
+                elif sub_type == INTERACT_TYPE_SELECTOR:
+                    source = "_interact_selector(_interact[{}], {})".format(
+                        INTERACT_TYPE_SELECTOR, self._pop(stack, pc).source
+                    )
+                else:
+                    source = "_interact_ref(_interact[{}], {}, {})".format(
+                        INTERACT_TYPE_REF, self._pop(stack, pc).source, repr(byte_code[pc + 2])
+                    )
+                stack.append(_StackEntry(source))
+            else:
+                return pc
+
+            pc += instruction_length(byte_code, pc)
+
+        return pc
+
+    def _statement_end(self, stack, pc):  # type: (list[_StackEntry], int) -> None
+        """_statement_end 检查一个语句结束时符号栈的状态
+
+        Args:
+            stack (list[_StackEntry]): 符号栈
+            pc (int): 当前的程序计数器
+        """
+        if self._pending > 0:
+            self._fail(pc, "Unfinished and/or chain")
+        for i in stack:
+            if i.duplicate:
+                self._fail(pc, "Unfinished and/or chain")
+
+    def _block(
+        self,
+        start,  # type: int
+        end,  # type: int
+        indent,  # type: int
+        loop,  # type: tuple[int, int] | None
+        assigned,  # type: set[int]
+    ):  # type: (...) -> set[int] | None
+        """_block 将 [start, end) 范围内的字节码转译为 Python 语句
+
+        Args:
+            start (int):
+                代码块的起始位置
+            end (int):
+                代码块的结束位置
+            indent (int):
+                该代码块的缩进层级
+            loop (tuple[int, int] | None):
+                该代码块所在循环的 continue 位置和 break 位置。
+                若它不位于循环体中，请设置为 None
+            assigned (set[int]):
+                进入代码块时一定已被赋值的变量
+
+        Returns:
+            set[int] | None:
+                离开代码块时一定已被赋值的变量。
+                如果该代码块不会正常结束 (例如以 return 结尾)，则返回 None
+        """
+        if indent > TRANSPILE_MAX_INDENT:
+            self._fail(start, "Too deeply nested code block")
+
+        byte_code = self._compiled.byte_code
+        reachable = True
+        pc = start
+        first_line = len(self._lines)
+
+        while pc < end:
+            stack = []  # type: list[_StackEntry]
+            reads = set()  # type: set[int]
+            pc = self._expression(pc, end, stack, assigned, reads)
+            self._statement_end(stack, pc)
+            if pc >= end:
+                if len(stack) > 0:
+                    self._fail(pc, "Unfinished expression")
+                break
+
+            op = byte_code[pc]
+            if op == BYTECODE_STORE_VALUE and len(stack) == 1:
+                index = byte_code[pc + 1]  # type: int # type: ignore
+                self._emit(indent, "v{} = {}".format(index, stack[0].source), pc)
+                assigned = assigned | reads
+                assigned.add(index)
+                pc += 2
+            elif op == BYTECODE_APPEND_VALUE and len(stack) == byte_code[pc + 2]:
+                index = byte_code[pc + 1]  # type: int # type: ignore
+                self._emit(
+                    indent,
+                    "v{0} = _append_value(_var_mapping, {0}, v{0}, [{1}])".format(
+                        index, ", ".join(i.source for i in stack)
+                    ),
+                    pc,
+                )
+                assigned = assigned | reads
+                assigned.add(index)
+                pc += 3
+            elif op == BYTECODE_STORE_RETURN_VAL and len(stack) == 1:
+                self._emit(indent, "_result = {}".format(stack[0].source), pc)
+                assigned = assigned | reads
+                pc += 1
+            elif op == BYTECODE_PROGRAM_STOP_RUN and len(stack) == 0:
+                # The compiler always ends the program with PROGRAM_STOP_RUN,
+                # which is dead code if the last statement already returns
+                if reachable:
+                    self._emit(indent, "return _result", pc)
+                reachable = False
+                pc += 1
+            elif op == BYTECODE_INTERNAL_PANIC and len(stack) == 0:
+                self._emit(
+                    indent, "raise Exception({})".format(repr(byte_code[pc + 1])), pc
+                )
+                reachable = False
+                pc += 2
+            elif op == BYTECODE_DIRECT_JUMP and len(stack) == 0:
+                jump_to = byte_code[pc + 1]
+                if loop is not None and jump_to == loop[0]:
+                    self._emit(indent, "continue", pc)
+                elif loop is not None and jump_to == loop[1]:
+                    self._emit(indent, "break", pc)
+                else:
+                    self._fail(pc, "Unstructured jump")
+                reachable = False
+                pc += 2
+            elif (
+                op == BYTECODE_LOOP_CHECK
+                and byte_code[pc + 1] == LOOP_CHECK_TYPE_DATA_TYPE
+                and len(stack) == 1
+            ):
+                assigned = assigned | reads
+                if (
+                    byte_code[pc + 2] != BYTECODE_LOAD_CONST
+                    or isinstance(byte_code[pc + 3], bool)
+                    or byte_code[pc + 3] != 0
+                    or byte_code[pc + 4] != BYTECODE_LOOP_JUMP
+                ):
+                    self._fail(pc, "Unexpected for loop header")
+                pc = self._for_loop(pc + 4, end, stack[0], indent, assigned, True)
+            elif op == BYTECODE_FOR_PREPARE and len(stack) == 1:
+                assigned = assigned | reads
+                if (
+                    byte_code[pc + 2] != BYTECODE_FOR_RANGE
+                    or byte_code[pc + 3] != byte_code[pc + 1]
+                ):
+                    self._fail(pc, "Unexpected for loop header")
+                pc = self._for_loop(pc + 2, end, stack[0], indent, assigned, True)
+            elif (
+                op == BYTECODE_LOOP_JUMP
+                and len(stack) == 2
+                and stack[1].source == "0"
+                and pc - 2 in self._starts
+                and byte_code[pc - 2] == BYTECODE_LOAD_CONST
+            ):
+                # The repeat times is proven to be int, so there is no LOOP_CHECK
+                assigned = assigned | reads
+                pc = self._for_loop(pc, end, stack[0], indent, assigned, False)
+            elif (
+                op == BYTECODE_FALSE_JUMP or op == BYTECODE_TRUE_JUMP
+            ) and len(stack) == 1:
+                assigned = assigned | reads
+                pc, result = self._condition(pc, end, stack[0], indent, loop, assigned)
+                if result is None:
+                    reachable = False
+                else:
+                    assigned = result
+            else:
+                self._fail(pc, "Unexpected instruction")
+
+        if len(self._lines) == first_line:
+            self._emit(indent, "pass", -1)
+        return assigned if reachable else None
+
+    def _for_loop(
+        self,
+        continue_pc,  # type: int
+        end,  # type: int
+        repeat,  # type: _StackEntry
+        indent,  # type: int
+        assigned,  # type: set[int]
+        checked,  # type: bool
+    ):  # type: (...) -> int
+        """_for_loop 将一个循环语句转译为 Python 的 for 语句
+
+        Args:
+            continue_pc (int): 循环跳转 (LOOP_JUMP 或 FOR_RANGE) 的位置
+            end (int): 当前代码块的结束位置
+            repeat (_StackEntry): 循环次数对应的符号栈元素
+            indent (int): 该循环语句的缩进层级
+            assigned (set[int]): 进入循环语句时一定已被赋值的变量
+            checked (bool): 循环次数是否需要进行类型检查
+
+        Returns:
+            int: 该循环语句之后的第一个字节码的位置
+        """
+        byte_code = self._compiled.byte_code
+        # The LOAD_CONST before LOOP_JUMP (or the FOR_PREPARE before FOR_RANGE)
+        # is the last one of the loop header
+        pc = continue_pc - 2
+
+        if byte_code[continue_pc] == BYTECODE_FOR_RANGE:
+            # There is nothing to pop when the loop ends
+            index = byte_code[continue_pc + 2]  # type: int # type: ignore
+            break_pc = byte_code[continue_pc + 3]  # type: int # type: ignore
+            body_pc, end_pc = continue_pc + 4, break_pc
+        else:
+            index = byte_code[continue_pc + 1]  # type: int # type: ignore
+            break_pc = byte_code[continue_pc + 2]  # type: int # type: ignore
+            body_pc, end_pc = continue_pc + 3, break_pc + 2
+            if (
+                break_pc + 2 > end
+                or break_pc not in self._starts
+                or byte_code[break_pc] != BYTECODE_LOOP_CHECK
+                or byte_code[break_pc + 1] != LOOP_CHECK_TYPE_POP_STACK
+            ):
+                self._fail(pc, "Unexpected for loop body")
+        if (
+            break_pc <= continue_pc
+            or break_pc > end
+            or break_pc - 2 not in self._starts
+            or byte_code[break_pc - 2] != BYTECODE_DIRECT_JUMP
+            or byte_code[break_pc - 1] != continue_pc
+        ):
+            self._fail(pc, "Unexpected for loop body")
+
+        repeat_times = "_repeat_{}".format(self._loops)
+        self._loops += 1
+
+        self._emit(indent, "{} = {}".format(repeat_times, repeat.source), pc)
+        if checked:
+            self._emit(
+                indent,
+                "if isinstance({0}, bool) or not isinstance({0}, int):".format(
+                    repeat_times
+                ),
+                pc,
+            )
+            self._emit(
+                indent + 1,
+                "raise Exception('The repeat times of for loop must be int')",
+                pc,
+            )
+        self._emit(
+            indent, "for v{} in range({}):".format(index, repeat_times), continue_pc
+        )
+        self._block(
+            body_pc,
+            break_pc - 2,
+            indent + 1,
+            (continue_pc, break_pc),
+            assigned | set([index]),
+        )
+
+        return end_pc
+
+    def _condition(
+        self,
+        pc,  # type: int
+        end,  # type: int
+        condition,  # type: _StackEntry
+        indent,  # type: int
+        loop,  # type: tuple[int, int] | None
+        assigned,  # type: set[int]
+    ):  # type: (...) -> tuple[int, set[int] | None]
+        """_condition 将一个条件语句转译为 Python 的 if/elif/else 语句
+
+        Args:
+            pc (int): 第一个条件的第一个条件跳转的位置
+            end (int): 当前代码块的结束位置
+            condition (_StackEntry): 第一个条件的第一个条件跳转所对应的符号栈元素
+            indent (int): 该条件语句的缩进层级
+            loop (tuple[int, int] | None): 该条件语句所在循环的 continue 位置和 break 位置
+            assigned (set[int]): 进入条件语句时一定已被赋值的变量
+
+        Returns:
+            tuple[int, set[int] | None]:
+                该条件语句之后的第一个字节码的位置，
+                以及离开条件语句时一定已被赋值的变量
+        """
+        byte_code = self._compiled.byte_code
+
+        source, body_pc, false_jump = self._branch(pc, end, condition, assigned)
+        end_pc = byte_code[false_jump - 1]  # type: int # type: ignore
+        if end_pc < false_jump or end_pc > end:
+            self._fail(pc, "Unexpected condition end")
+
+        self._emit(indent, "if {}:".format(source), pc)
+        results = [
+            self._block(body_pc, false_jump - 2, indent + 1, loop, assigned)
+        ]  # type: list[set[int] | None]
+
+        has_else = False
+        pos = false_jump
+        while pos < end_pc:
+            stack = []  # type: list[_StackEntry]
+            reads = set()  # type: set[int]
+            try:
+                cond_pc = self._expression(pos, end_pc, stack, assigned, reads)
+                self._statement_end(stack, cond_pc)
+                is_elif = (
+                    cond_pc < end_pc
+                    and byte_code[cond_pc] in (BYTECODE_FALSE_JUMP, BYTECODE_TRUE_JUMP)
+                    and len(stack) == 1
+                )
+                if is_elif:
+                    source, body_pc, next_jump = self._branch(
+                        cond_pc, end_pc, stack[0], assigned | reads
+                    )
+                    is_elif = byte_code[next_jump - 1] == end_pc
+            except TranspileException:
+                self._pending = 0
+                is_elif = False
+
+            if not is_elif:
+                self._emit(indent, "else:", -1)
+                results.append(self._block(pos, end_pc, indent + 1, loop, assigned))
+                has_else = True
+                break
+
+            self._emit(indent, "elif {}:".format(source), cond_pc)
+            results.append(
+                self._block(
+                    body_pc, next_jump - 2, indent + 1, loop, assigned | reads
+                )
+            )
+            pos = next_jump
+
+        if not has_else:
+            results.append(assigned)
+
+        reachable = [i for i in results if i is not None]
+        if len(reachable) == 0:
+            return end_pc, None
+        result = reachable[0]
+        for i in reachable[1:]:
+            result = result & i
+        return end_pc, result | assigned
+
+    def _reduce_branch(self, nodes, node):  # type: (list[list], list) -> list[list]
+        """
+        _reduce_branch 将节点 node 追加到 nodes 之后，
+        然后将末尾相邻的条件跳转合并为 and/or 表达式，
+        直到无法继续合并为止。
+
+        每个节点形如 [起始位置, Python 表达式, 为真时的去向, 为假时的去向, and/or 类型]。
+        只有当后一个节点仅能从前一个节点到达时，它们才可以被合并。
+        条件跳转总是向后跳转，因此追加的节点不会改变 nodes 中已有节点能否合并，
+        这意味着每次只需要检查末尾的两个节点
+
+        Args:
+            nodes (list[list]): 按字节码顺序排列，且已经无法继续合并的节点
+            node (list): 追加的节点
+
+        Returns:
+            list[list]: 合并后的节点
+        """
+        nodes = nodes + [node]
+        while len(nodes) > 1:
+            x, y = nodes[-2], nodes[-1]
+            refs = 0
+            for i in nodes:
+                refs += (i[2] == y[0]) + (i[3] == y[0])
+            if refs != 1:
+                break
+            if x[2] == y[0] and x[3] == y[3]:
+                source = _join_logic(LOGIC_ANDOR_TYPE_AND, x[1], x[4], y[1], y[4])
+                node = [x[0], source, y[2], y[3], LOGIC_ANDOR_TYPE_AND]
+            elif x[2] == y[0] and x[3] == y[2]:
+                source = _join_logic(
+                    LOGIC_ANDOR_TYPE_AND, x[1], x[4], "(not {})".format(y[1]), -1
+                )
+                node = [x[0], source, y[3], y[2], LOGIC_ANDOR_TYPE_AND]
+            elif x[3] == y[0] and x[2] == y[2]:
+                source = _join_logic(LOGIC_ANDOR_TYPE_OR, x[1], x[4], y[1], y[4])
+                node = [x[0], source, y[2], y[3], LOGIC_ANDOR_TYPE_OR]
+            elif x[3] == y[0] and x[2] == y[3]:
+                source = _join_logic(
+                    LOGIC_ANDOR_TYPE_OR, x[1], x[4], "(not {})".format(y[1]), -1
+                )
+                node = [x[0], source, y[3], y[2], LOGIC_ANDOR_TYPE_OR]
+            else:
+                break
+            nodes[-2:] = [node]
+        return nodes
+
+    def _branch(
+        self,
+        pc,  # type: int
+        end,  # type: int
+        first,  # type: _StackEntry
+        assigned,  # type: set[int]
+    ):  # type: (...) -> tuple[str, int, int]
+        """
+        _branch 将 CodeCompiler 以跳转形式编译的条件恢复为一个 Python 表达式。
+        条件由若干个 FALSE_JUMP/TRUE_JUMP 组成，
+        它们或跳转到该条件的另一部分，或跳转到分支的末尾，
+        或跳转到分支的代码块。分支的末尾总是一个 DIRECT_JUMP
+
+        Args:
+            pc (int): 第一个条件跳转的位置
+            end (int): 当前代码块的结束位置
+            first (_StackEntry): 第一个条件跳转所对应的符号栈元素
+            assigned (set[int]): 进入条件时一定已被赋值的变量
+
+        Returns:
+            tuple[str, int, int]:
+                条件对应的 Python 表达式，
+                分支代码块的起始位置，
+                以及条件为假时的跳转目标
+        """
+        byte_code = self._compiled.byte_code
+        nodes = []  # type: list[list]
+        result = None  # type: tuple[str, int, int] | None
+        start, source, logic, jump_pc = -1, first.source, first.logic, pc
+        false_target = -1
+
+        while True:
+            jump_to = byte_code[jump_pc + 1]  # type: int # type: ignore
+            if jump_to <= jump_pc + 2 or jump_to > end:
+                break
+            # Any other part of the condition starts right after a conditional jump,
+            # so only the target for a false condition follows a DIRECT_JUMP.
+            # Meeting another such target means we are in the code block already
+            if jump_to - 2 in self._starts and byte_code[jump_to - 2] == BYTECODE_DIRECT_JUMP:
+                if false_target >= 0 and false_target != jump_to:
+                    break
+                false_target = jump_to
+            next_pc = jump_pc + 2
+            if byte_code[jump_pc] == BYTECODE_FALSE_JUMP:
+                nodes = self._reduce_branch(nodes, [start, source, next_pc, jump_to, logic])
+            else:
+                nodes = self._reduce_branch(nodes, [start, source, jump_to, next_pc, logic])
+
+            # Check whether the condition could end here
+            if len(nodes) == 1:
+                if nodes[0][2] == next_pc:
+                    condition, false_jump = nodes[0][1], nodes[0][3]
+                else:
+                    condition = "(not {})".format(nodes[0][1])
+                    false_jump = nodes[0][2]
+                if (
+                    next_pc in (nodes[0][2], nodes[0][3])
+                    and false_jump > next_pc
+                    and false_jump - 2 in self._starts
+                    and byte_code[false_jump - 2] == BYTECODE_DIRECT_JUMP
+                ):
+                    result = (condition, next_pc, false_jump)
+
+            # The code block of the branch never jumps to the end of the branch
+            # or the condition, so the longest condition that could end is taken
+            stack = []  # type: list[_StackEntry]
+            try:
+                jump_pc = self._expression(next_pc, end, stack, assigned, set())
+                self._statement_end(stack, jump_pc)
+                is_branch = (
+                    jump_pc < end
+                    and byte_code[jump_pc] in (BYTECODE_FALSE_JUMP, BYTECODE_TRUE_JUMP)
+                    and len(stack) == 1
+                )
+            except TranspileException:
+                self._pending = 0
+                is_branch = False
+            if not is_branch:
+                break
+            start, source, logic = next_pc, stack[0].source, stack[0].logic
+
+        if result is None:
+            self._fail(pc, "Unexpected condition branch")
+        return result  # type: ignore
+
+    def transpile(self):  # type: () -> TranspileResult
+        """
+        transpile 将字节码转译为 Python 源代码，
+        并将其编译为 Python 函数
+
+        Raises:
+            TranspileException:
+                如果字节码无法被转译，
+                则抛出相应的错误
+
+        Returns:
+            TranspileResult: 转译所得结果
+        """
+        byte_code = self._compiled.byte_code
+        self._starts = set()
+        self._lines = ["from __future__ import division"]
+        self._line_pc = [-1, -1]
+        self._consts = []
+        self._loops = 0
+        self._pending = 0
+
+        pc = 0
+        while pc < len(byte_code):
+            op = byte_code[pc]
+            if (
+                isinstance(op, bool)
+                or not isinstance(op, int)
+                or op < 0
+                or op >= len(BYTECODE_LENGTH)
+            ):
+                self._fail(pc, "Unknown opcode")
+            self._starts.add(pc)
+            pc += instruction_length(byte_code, pc)
+        if pc != len(byte_code):
+            self._fail(pc, "Truncated instruction")
+
+        vars_len = self._compiled.var_mapping.variables_count()
+        self._emit(
+            0, "def {}(_variables, _interact, _builtins):".format(TRANSPILE_FUNC_NAME), -1
+        )
+        if vars_len > 0:
+            self._emit(
+                1,
+                "{}, = _variables".format(", ".join(["v{}".format(i) for i in range(vars_len)])),
+                -1,
+            )
+        self._emit(1, "_result = None", -1)
+        assigned = set(range(vars_len)) if self._unchecked else set()  # type: set[int]
+        if self._block(0, len(byte_code), 1, None, assigned) is not None:
+            self._emit(1, "return _result", -1)
+
+        TRANSPILE_FILE_COUNTER[0] += 1
+        filename = "<transpiled-{}>".format(TRANSPILE_FILE_COUNTER[0])
+        source = "\n".join(self._lines) + "\n"
+
+        namespace = dict(TRANSPILE_GLOBALS)
+        namespace["_var_mapping"] = self._compiled.var_mapping
+        for i in range(len(self._consts)):
+            namespace["_const_{}".format(i)] = self._consts[i]
+        try:
+            exec(compile(source, filename, "exec"), namespace)
+        except Exception as e:
+            raise TranspileException(
+                "CodeTranspiler: Failed to compile the generated source ({})".format(e)
+            )
+
+        return TranspileResult(
+            source, filename, namespace[TRANSPILE_FUNC_NAME], self._line_pc
+        )
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
+from .compile import CompileResult
+from .optimize import jump_offsets, falls_through, stack_depths
+from .define import (
+    BYTECODE_LENGTH,
+    BYTECODE_LOAD_VALUE,
+    BYTECODE_STORE_VALUE,
+    BYTECODE_LOOP_JUMP,
+    BYTECODE_MOVE_VALUE,
+    BYTECODE_STORE_CONST,
+    BYTECODE_VALUE_CONST_COMPUTE,
+    BYTECODE_VALUE_VALUE_COMPUTE,
+    BYTECODE_VALUE_CONST_COMPUTE_STORE,
+    BYTECODE_VALUE_VALUE_COMPUTE_STORE,
+    BYTECODE_VALUE_CONST_COMPARE,
+    BYTECODE_VALUE_VALUE_COMPARE,
+    BYTECODE_APPEND_VALUE,
+    BYTECODE_LOAD_BUFFER,
+    BYTECODE_FOR_PREPARE,
+    BYTECODE_FOR_RANGE,
+    instruction_length,
+)
+
+try:
+    range = xrange  # type: ignore
+except Exception:
+    pass
+
+
+def _reads(byte_code, pc):  # type: (list[Any], int) -> tuple[int, ...]
+    """
+    _reads 返回起始于 pc 处的指令所读取的变量。
+    这些变量在被读取时必须已经被赋值
+
+    Args:
+        byte_code (list[int | bool | float | str]):
+            编译所得的字节码序列
+        pc (int):
+            目标指令的起始位置
+
+    Returns:
+        tuple[int, ...]: 按读取顺序排列的变量索引
+    """
+    op = byte_code[pc]
+    if op in (
+        BYTECODE_LOAD_VALUE,
+        BYTECODE_MOVE_VALUE,
+        BYTECODE_VALUE_CONST_COMPUTE,
+        BYTECODE_VALUE_CONST_COMPUTE_STORE,
+        BYTECODE_VALUE_CONST_COMPARE,
+        BYTECODE_APPEND_VALUE,
+        BYTECODE_LOAD_BUFFER,
+        BYTECODE_FOR_RANGE,
+    ):
+        return (byte_code[pc + 1],)  # type: ignore
+    if op in (
+        BYTECODE_VALUE_VALUE_COMPUTE,
+        BYTECODE_VALUE_VALUE_COMPUTE_STORE,
+        BYTECODE_VALUE_VALUE_COMPARE,
+    ):
+        return (byte_code[pc + 1], byte_code[pc + 2])  # type: ignore
+    return ()
+
+
+def _writes(byte_code, pc):  # type: (list[Any], int) -> tuple[int, ...]
+    """
+    _writes 返回起始于 pc 处的指令所赋值的变量。
+    只有继续执行紧随其后的指令时，这些变量才被赋值，
+    而跳转 (例如循环的退出) 不会为任何变量赋值
+
+    Args:
+        byte_code (list[int | bool | float | str]):
+            编译所得的字节码序列
+        pc (int):
+            目标指令的起始位置
+
+    Returns:
+        tuple[int, ...]: 被赋值的变量索引
+    """
+    op = byte_code[pc]
+    if op in (
+        BYTECODE_STORE_VALUE,
+        BYTECODE_LOOP_JUMP,
+        BYTECODE_APPEND_VALUE,
+        BYTECODE_FOR_PREPARE,
+    ):
+        return (byte_code[pc + 1],)  # type: ignore
+    if op in (BYTECODE_MOVE_VALUE, BYTECODE_STORE_CONST, BYTECODE_FOR_RANGE):
+        return (byte_code[pc + 2],)  # type: ignore
+    if op in (BYTECODE_VALUE_CONST_COMPUTE_STORE, BYTECODE_VALUE_VALUE_COMPUTE_STORE):
+        return (byte_code[pc + 4],)  # type: ignore
+    return ()
+
+
+class VerifyException(Exception):
+    """
+    VerifyException 指示字节码未能通过校验。
+    未通过校验的字节码仍然可以被带有运行时检查的执行引擎运行
+    """
+
+    pass
+
+
+class CodeVerifier:
+    """
+    CodeVerifier 在加载时校验编译所得的字节码。
+
+    它证明字节码的每条指令都是完整的，
+    所有跳转目标都是指令的起始位置，
+    栈在所有执行路径上都是平衡的。
+
+    另外，它通过数据流分析找出可能在赋值前被读取的变量。
+    如果这些变量都已经在运行前被初始化，
+    那么任何变量都不可能在赋值前被读取，
+    执行引擎也就可以省去每条指令上的检查
+    """
+
+    _compiled = CompileResult([], [], None)  # type: ignore
+
+    def __init__(self, compiled):  # type: (CompileResult) -> None
+        """初始化并返回一个新的 CodeVerifier
+
+        Args:
+            compiled (CompileResult):
+                CodeCompiler 的编译结果
+        """
+        self._compiled = compiled
+
+    def _fail(self, pc, reason):  # type: (int, str) -> None
+        """_fail 抛出校验失败的错误
+
+        Args:
+            pc (int): 校验失败的位置
+            reason (str): 校验失败的原因
+
+        Raises:
+            VerifyException: 校验失败的错误
+        """
+        raise VerifyException("CodeVerifier: {} at pc={}".format(reason, pc))
+
+    def _structure(self):  # type: () -> None
+        """
+        _structure 校验每条指令的操作码、长度、变量索引以及跳转目标
+
+        Raises:
+            VerifyException:
+                如果字节码的结构不合法，
+                则抛出相应的错误
+        """
+        byte_code = self._compiled.byte_code
+        vars_len = self._compiled.var_mapping.variables_count()
+        starts = set()  # type: set[int]
+
+        if len(byte_code) == 0:
+            self._fail(0, "Empty byte code")
+
+        pc = 0
+        while pc < len(byte_code):
+            op = byte_code[pc]
+            if (
+                isinstance(op, bool)
+                or not isinstance(op, int)
+                or op < 0
+                or op >= len(BYTECODE_LENGTH)
+            ):
+                self._fail(pc, "Unknown opcode")
+            starts.add(pc)
+            pc += instruction_length(byte_code, pc)
+        if pc != len(byte_code):
+            self._fail(pc, "Truncated instruction")
+
+        for pc in starts:
+            op = byte_code[pc]  # type: int # type: ignore
+            for index in _reads(byte_code, pc) + _writes(byte_code, pc):
+                if (
+                    isinstance(index, bool)
+                    or not isinstance(index, int)
+                    or not 0 <= index < vars_len
+                ):
+                    self._fail(pc, "Invalid variable index {}".format(index))
+            for offset in jump_offsets(op):
+                if byte_code[pc + offset] not in starts:
+                    self._fail(pc, "Invalid jump target {}".format(byte_code[pc + offset]))
+
+    def _inputs(self):  # type: () -> set[int]
+        """
+        _inputs 对字节码进行确定赋值分析，
+        并找出在某些执行路径上可能于赋值前被读取的变量
+
+        Returns:
+            set[int]: 可能在赋值前被读取的变量
+        """
+        byte_code = self._compiled.byte_code
+        states = {0: frozenset()}  # type: dict[int, frozenset[int]]
+        pending = [0]
+        inputs = set()  # type: set[int]
+
+        while len(pending) > 0:
+            pc = pending.pop()
+            op = byte_code[pc]  # type: int # type: ignore
+            assigned = states[pc]
+
+            reads = _reads(byte_code, pc)
+            for index in reads:
+                if index not in assigned:
+                    inputs.add(index)
+            # A read which succeeds proves the variable has been assigned
+            assigned = assigned.union(reads)
+
+            successors = [
+                (byte_code[pc + offset], assigned) for offset in jump_offsets(op)
+            ]  # type: list[tuple[Any, frozenset[int]]]
+            if falls_through(op):
+                successors.append(
+                    (
+                        pc + instruction_length(byte_code, pc),
+                        assigned.union(_writes(byte_code, pc)),
+                    )
+                )
+
+            for next_pc, state in successors:
+                if next_pc in states:
+                    state = states[next_pc] & state
+                    if state == states[next_pc]:
+                        continue
+                states[next_pc] = state
+                pending.append(next_pc)
+
+        return inputs
+
+    def verify(self):  # type: () -> set[int]
+        """
+        verify 校验字节码，
+        并返回运行前必须被初始化的变量。
+
+        如果这些变量在运行前都已经被初始化为非 None 的值，
+        那么执行引擎可以不再检查变量是否在赋值前被读取
+
+        Raises:
+            VerifyException:
+                如果字节码未能通过校验，
+                则抛出相应的错误
+
+        Returns:
+            set[int]: 可能在赋值前被读取的变量
+        """
+        self._structure()
+        try:
+            stack_depths(self._compiled)
+        except Exception as e:
+            raise VerifyException("CodeVerifier: {}".format(e))
+        return self._inputs()
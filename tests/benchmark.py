@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+benchmark 比较各个编译选项在 switch 与 table 执行引擎下的运行耗时，
+以及每次运行所分派的指令数。
+
+运行 python -m tests.benchmark 即可打印结果。
+此外还会打印解析 5000 层括号，以及编译并运行 1000 层条件语句的耗时。
+耗时是交替运行各个配置后所得的单次运行的最小耗时，单位为微秒
+"""
+
+from __future__ import division, print_function
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+import sys
+import timeit
+import package
+from package.runner.define import RUNNER_ENGINE_SWITCH, RUNNER_ENGINE_TABLE
+from .corpus import all_programs, make_env, nested_conditions
+from .test_nesting import nested_parentheses
+
+# The test cases in README.md, and two longer loops
+CASES = [
+    ("c1", "1"),
+    ("c2", "1+1"),
+    ("c3", "total=0\nfor i, 100:\n    total=total+i\nrof\nreturn total"),
+    (
+        "c4",
+        "r=15\na=0\nb=1\ntotal=0\n\nfor _, r*2:\n    temp = a\n    a = b\n"
+        "    b = temp + b\n    total = total + a\nrof\n\nreturn total",
+    ),
+    (
+        "c5",
+        "repeat = 6\nstar = -1\nresult = ''\n\nfor _, repeat:\n"
+        "    star = star + 2\n    line = 'say ' + '*'*star\n"
+        "    result = result + line + '\\n'\nrof\n\nfor _, repeat-1:\n"
+        "    star = star - 2\n    line = 'say ' + '*'*star\n"
+        "    result = result + line + '\\n'\nrof\n\nreturn result",
+    ),
+    ("loop", "t = 0\nfor i, 1000:\n    t = t + i * 2 - 1\nrof\nreturn t"),
+    (
+        "branch",
+        "t = 0\nfor i, 1000:\n    if i > 500 and i < 900:\n        t = t + 1\n"
+        "    elif i == 3 or i == 7:\n        t = t + 2\n    fi\nrof\nreturn t",
+    ),
+]
+
+# The compiler flags of each configuration,
+# and whether to run peephole and superinstruction after compiling
+CONFIGS = [
+    ("default", {}, False),
+    ("specialize", {"specialize": True}, False),
+    ("range_loop", {"range_loop": True}, False),
+    ("fused", {}, True),
+    (
+        "all",
+        {"specialize": True, "hoist": True, "accumulate": True, "range_loop": True},
+        True,
+    ),
+]  # type: list[tuple[str, dict[str, bool], bool]]
+
+ENGINES = [("switch", RUNNER_ENGINE_SWITCH), ("table", RUNNER_ENGINE_TABLE)]
+
+
+def compile_with(code, flags, fuse):  # type: (str, Any, bool) -> package.CompileResult
+    """compile_with 以给出的编译选项编译源代码，并按需合并超级指令"""
+    parser = package.CodeParser(code).parse()
+    compiled = package.CodeCompiler(parser.code_block, **flags).compile()
+    if fuse:
+        compiled = package.CodeOptimizer(compiled).peephole()
+        compiled = package.CodeOptimizer(compiled).superinstruction()
+    return compiled
+
+
+def make_run(compiled, engine):  # type: (package.CompileResult, int) -> Callable
+    """make_run 返回以给出的执行引擎运行 compiled 一次的函数"""
+    builtins, interact, _ = make_env()
+    runner = package.CodeRunner(compiled, engine)
+
+    def run():  # type: () -> Any
+        try:
+            return runner.running(interact=interact, builtins=builtins)
+        except Exception:
+            return None
+
+    return run
+
+
+def dispatches(compiled):  # type: (package.CompileResult) -> int
+    """dispatches 返回运行 compiled 一次所分派的指令数"""
+    runner = package.CodeRunner(compiled, RUNNER_ENGINE_TABLE)
+    count = [0]
+
+    def counted(handler):  # type: (Callable) -> Callable
+        def handle(*args):  # type: (Any) -> Any
+            count[0] += 1
+            return handler(*args)
+
+        return handle
+
+    runner._handlers = [counted(i) if i is not None else None for i in runner._handlers]
+    builtins, interact, _ = make_env()
+    try:
+        runner.running(interact=interact, builtins=builtins)
+    except Exception:
+        pass
+    return count[0]
+
+
+def best_of(funcs, repeat, number):  # type: (list[Callable], int, int) -> list[float]
+    """
+    best_of 交替运行 funcs 中的每个函数，
+    并返回它们各自单次运行的最小耗时 (微秒)
+    """
+    best = [float("inf")] * len(funcs)
+    for _ in range(repeat):
+        for i, func in enumerate(funcs):
+            cost = timeit.timeit(func, number=number) / number * 1e6
+            best[i] = min(best[i], cost)
+    return best
+
+
+def print_row(cells):  # type: (list[Any]) -> None
+    print(" | ".join("{:>10}".format(i) for i in cells))
+    sys.stdout.flush()
+
+
+def bench_cases(repeat):  # type: (int) -> None
+    """bench_cases 打印每个用例在各个编译选项与执行引擎下的耗时与分派次数"""
+    print_row(["case", "engine"] + [name for name, _, _ in CONFIGS])
+    for case, code in CASES + [("corpus", None)]:
+        codes = [code] if code is not None else all_programs()
+        compiled = []  # type: list[list[package.CompileResult]]
+        for _, flags, fuse in CONFIGS:
+            compiled.append([])
+            for i in codes:
+                try:
+                    compiled[-1].append(compile_with(i, flags, fuse))
+                except Exception:
+                    pass
+        counts = [sum(dispatches(i) for i in results) for results in compiled]
+        print_row([case, "dispatches"] + counts)
+        for engine_name, engine in ENGINES:
+            funcs = []
+            for results in compiled:
+                runs = [make_run(i, engine) for i in results]
+                funcs.append(lambda runs=runs: [run() for run in runs])
+            cost = best_of(funcs, repeat, 20 if code is not None else 1)
+            print_row([case, engine_name] + ["{:.1f}".format(i) for i in cost])
+
+
+def bench_nesting(repeat):  # type: (int) -> None
+    """bench_nesting 打印解析与运行深度嵌套的程序的耗时"""
+    parentheses = nested_parentheses(5000)
+    conditions = nested_conditions(1000)
+
+    def parse():  # type: () -> Any
+        return package.CodeParser(parentheses).parse()
+
+    def compile_conditions():  # type: () -> Any
+        return compile_with(conditions, {}, False)
+
+    compiled = compile_conditions()
+    funcs = [parse, compile_conditions]
+    funcs += [make_run(compiled, engine) for _, engine in ENGINES]
+    cost = best_of(funcs, repeat, 1)
+    print_row(["nesting", "parse", "compile"] + [name for name, _ in ENGINES])
+    print_row(["nesting"] + ["{:.1f}".format(i) for i in cost])
+
+
+if __name__ == "__main__":
+    bench_cases(30)
+    bench_nesting(10)
@@ -0,0 +1,466 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+import io
+import os
+import re
+import random
+import package
+import optional
+from package.runner.define import RUNNER_ENGINE_TABLE, RUNNER_ENGINE_TRANSPILE
+
+DOCS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "docs"
+)
+CODE_BLOCK = re.compile(r"```(\w*)\n(.*?)```", re.S)
+
+# Programs which are not in the documents, mostly
+# for errors, side effects and the corners of control flow
+EXTRA_PROGRAMS = [
+    "a = 1\nb = a + 2\nreturn b*3",
+    "return 1 and 2",
+    "return 0 and 2",
+    "return 1 or 2",
+    "return 0 or ''",
+    "return '' or 0 or 3 or 4",
+    "x = 5\nreturn x > 3 and x < 10 and 'ok'",
+    "x = 5\nreturn not x > 3",
+    "return 'a' in 'abc'",
+    "return 'z' in 'abc' or 'q'",
+    "return 1/0",
+    "return 'a' + 1",
+    "return 'a' < 1",
+    "return 1 < 'a'",
+    "return y",
+    "x = y + z\nreturn x",
+    "return {func, unknown(1, 2)}",
+    "return {func, unknown(y)}",
+    "return {func, echo(1, 'a', 2.5)}",
+    "return {func, bad()}",
+    "return {func, boom()}",
+    "return {command, 'say hi'}",
+    "return {command, 1}",
+    "return {score, '@s', 'obj'}",
+    "return {score, 1, 'obj'}",
+    "return {score, '@s', 2}",
+    "return {selector, '@p'}",
+    "return {selector, 3}",
+    "return {ref, int, 0}",
+    "return {ref, str, 1}",
+    "return {ref, bool, 2}",
+    "return {ref, float, 3}",
+    "return {ref, int, 1}",
+    "return {ref, int, 'x'}",
+    "return {ref, int, True}",
+    "t = 0\nfor i, 10:\n    if i == 3:\n        continue\n    fi\n    if i == 7:\n        break\n    fi\n    t = t + i\nrof\nreturn t",
+    "t = 0\nfor i, 4:\n    for j, 3:\n        if j == 1:\n            continue\n        elif i == 2:\n            break\n        else:\n            t = t + i*10 + j\n        fi\n    rof\nrof\nreturn t",
+    "for i, 'a':\n    x = 1\nrof\nreturn 1",
+    "for i, 2.5:\n    x = 1\nrof\nreturn 1",
+    "for i, True:\n    x = 1\nrof\nreturn 1",
+    "for i, -3:\n    x = 1\nrof\nreturn i",
+    "for i, 3:\n    i = 100\nrof\nreturn i",
+    "for i, 5:\n    if i == 2:\n        return i*100\n    fi\nrof\nreturn -1",
+    "continue",
+    "break",
+    "if 1:\n    break\nfi\nreturn 2",
+    "x = 3\nif x > 5:\n    r = 'a'\nelif x > 2:\n    r = 'b'\nelse:\n    r = 'c'\nfi\nreturn r",
+    "x = 1\nif x > 5:\n    r = 'a'\nelif x > 2:\n    r = 'b'\nelse:\n    r = 'c'\nfi\nreturn r",
+    "x = 9\nif x > 5:\n    r = 'a'\nelif x > 2:\n    r = 'b'\nelse:\n    r = 'c'\nfi\nreturn r",
+    "if False:\n    return 1\nfi\nreturn 2",
+    "if True:\n    return 1\nelse:\n    return 3\nfi\nreturn 2",
+    "x = 1\nif x:\n    if x > 0:\n        y = 1\n    else:\n        y = 2\n    fi\nelse:\n    y = 3\nfi\nreturn y",
+    "x = 0\nif x:\n    y = 1\nfi\nreturn y",
+    "return int(3.7) + int('4') + float(2) + int(True)",
+    "return str(1) + str(2.5) + str(True)",
+    "return bool('') or bool(0) or bool('a')",
+    "return int('a')",
+    "return '0'*(5-2)",
+    "return 2*6-1",
+    "return -5 + 3",
+    "return 10 - -3",
+    "return 2 - 3 - 4 - 5",
+    "return 100/2/5/2",
+    "return 1+2+3+4+5",
+    "return 1*2*3*4*5",
+    "return 1 == 1.0",
+    "return 1 != 2",
+    "return 3 >= 3 and 2 <= 1",
+    "return (1 + 2) * (3 + 4)",
+    "a = 1\nb = 2\nreturn a < b == True",
+    "x = 'abc'\nreturn not 'b' in x",
+    "return not 0",
+    "return True + True",
+    "1\n2\n3",
+    "x = 1",
+    "r=15\na=0\nb=1\ntotal=0\nfor _, r*2:\n    temp = a\n    a = b\n    b = temp + b\n    total = total + a\nrof\nreturn total",
+    "total=0\nfor i, 100:\n    total=total+i\nrof\nreturn total",
+    "repeat = 6\nstar = -1\nresult = ''\nfor _, repeat:\n    star = star + 2\n    line = 'say ' + '*'*star\n    result = result + line + '\\n'\nrof\nfor _, repeat-1:\n    star = star - 2\n    line = 'say ' + '*'*star\n    result = result + line + '\\n'\nrof\nreturn result",
+    "s = ''\nfor i, 5:\n    s = s + str(i)\n    if i == 2:\n        x = s\n    fi\nrof\nreturn s + '|' + x",
+    "s = ''\nfor i, 5:\n    s = s + str(i) + ','\nrof\nreturn s",
+    "s = 0\nfor i, 5:\n    s = s + 'a'\nrof\nreturn s",
+    "s = 'x'\nfor i, 3:\n    s = 'p' + s\nrof\nreturn s",
+    "n = 0\nfor i, {score, '@s', 'obj'}:\n    n = n + {func, echo(i)}\nrof\nreturn n",
+    "x = 1 and y\nreturn x",
+    "x = 0 and y\nreturn x",
+    "return {func, echo(y, {func, boom()})}",
+    "return y < {func, boom()}",
+    "return {func, boom()} < y",
+    "a = 2\nreturn a < 'x'",
+    "a = 'x'\nb = 3\nreturn b > a",
+    "return 'x' in 3",
+    "a=1\nif a == 1 and {func, boom()}:\n    return 1\nfi\nreturn 2",
+    "a=0\nif a == 1 and {func, boom()}:\n    return 1\nfi\nreturn 2",
+    "a=1\nif a == 1 or {func, boom()}:\n    return 1\nfi\nreturn 2",
+    "for i, 3:\n    if i == 1:\n        x = i\n    fi\nrof\nreturn x",
+    "for i, 3:\n    x = x + 1\nrof\nreturn x",
+    "x = 0\nfor i, 3:\n    for j, i:\n        x = x + j\n        if x > 2:\n            continue\n        fi\n        x = x * 2\n    rof\nrof\nreturn x",
+    "a = 3\nb = 4\nc = a*a + b*b\nif c == 25 and not a > b or a == 0:\n    return 'yes'\nfi\nreturn 'no'",
+    "x = 5\ny = x*2 - (x - 1)/2\nreturn y",
+    "return 1 / 3",
+    "return 7 - 2*3 + 8/4",
+    "a = 1\na = a + 1\na = a * 3\nreturn a - 1",
+    "return {func, math.format(3.14159, 2)}",
+    "return {func, strings.upper('abc')}",
+    "x = 1\nif x == 1:\n    return 'a'\nfi",
+    "x = 2\nif x == 1:\n    return 'a'\nfi",
+    "for i, 3:\n    continue\n    x = 1\nrof\nreturn 5",
+    "for i, 3:\n    break\n    x = 1\nrof\nreturn 5",
+    "return 5\nx = 1\nreturn 6",
+    "if 1 > 2:\n    x = 1\nelif 2 > 1:\n    x = 2\nelif 3 > 1:\n    x = 3\nelse:\n    x = 4\nfi\nreturn x",
+    "x = 1\nwhile = 2",
+    "return int(2 * 3.5) + int(-2.5)",
+    "return 1 + 2 * {func, echo(3)}",
+    "p = 'pre'\nr = ''\nfor i, 4:\n    r = r + 'say ' + p + str(i)\nrof\nreturn r",
+    "lim = 10\nt = 0\nfor i, lim:\n    k = lim * 2\n    t = t + k + i\nrof\nreturn t",
+    "t = 0\nfor i, 3:\n    v = {score, '@s', 'obj'}\n    t = t + v\nrof\nreturn t",
+    "a = 1\nb = 2.5\nc = 'x'\nd = True\nreturn str(a + b) + c + str(d)",
+    "x = 0\nfor i, 3:\n    x = x + 1\nrof\nfor i, 2:\n    x = x * 2\nrof\nreturn x + i",
+    "m = 0\nfor i, 20:\n    if i > 3 and i < 8 or i == 15:\n        m = m + i\n    fi\nrof\nreturn m",
+    "m = ''\nfor i, 5:\n    m = m + str(i)\n    m = m + '-'\nrof\nreturn m",
+    "m = ''\nfor i, 5:\n    m = m + str(i)\n    if len_x:\n        m = 'x'\n    fi\nrof\nreturn m",
+    "m = ''\nfor i, 3:\n    m = m + str(i)\n    n = m\nrof\nreturn n + m",
+    "m = ''\nfor i, 3:\n    m = m + str(i)\nrof\nm = m + '!'\nreturn m",
+    "m = ''\nfor i, 3:\n    m = m + i\nrof\nreturn m",
+    "m = ''\nfor i, 3:\n    m = m + 'a' + m\nrof\nreturn m",
+    "m = ''\nfor i, 3:\n    m = m + {func, echo('q')}\nrof\nreturn m",
+    "m = ''\nfor i, 3:\n    m = m + 'a'\n    if m == 'aa':\n        break\n    fi\nrof\nreturn m",
+    "m = ''\nfor i, 3:\n    m = m + 'a'\n    if 'aa' in m:\n        return m\n    fi\nrof\nreturn m",
+    "m = ''\nfor i, 3:\n    m = m + 'a'\n    x = {func, echo(m)}\nrof\nreturn x",
+    "r = 1\nfor i, 3:\n    r = r + 1\nrof\nreturn r",
+    "m = 'a'\nfor i, 3:\n    for j, 2:\n        m = m + str(j)\n    rof\n    m = m + ';'\nrof\nreturn m",
+    "return not 1 == 1",
+    "return 1 == 1 == 1",
+]
+
+VAR_MAPS = [
+    {},
+    {"y": 10, "z": 0.5},
+    {"len_x": True, "y": "s"},
+]  # type: list[dict[str, int | bool | float | str]]
+
+
+def doc_programs():  # type: () -> list[str]
+    """doc_programs 返回文档中的所有代码示例
+
+    Returns:
+        list[str]: 文档中所有语言为 python 或未标明语言的代码块
+    """
+    result = []  # type: list[str]
+    for name in sorted(os.listdir(DOCS_DIR)):
+        if not name.endswith(".md"):
+            continue
+        with io.open(os.path.join(DOCS_DIR, name), encoding="utf-8") as file:
+            content = file.read()
+        for match in CODE_BLOCK.finditer(content):
+            if match.group(1) in ("", "python"):
+                result.append(match.group(2))
+    return result
+
+
+def all_programs():  # type: () -> list[str]
+    """all_programs 返回差分测试所使用的全部程序
+
+    Returns:
+        list[str]: 文档中的代码示例以及 EXTRA_PROGRAMS
+    """
+    return doc_programs() + EXTRA_PROGRAMS
+
+
+def compute_chains(count):  # type: (int) -> list[str]
+    """compute_chains 随机生成操作数带有副作用的连续运算"""
+    rnd = random.Random(2)
+    operands = [
+        "1",
+        "2.5",
+        "0",
+        "'s'",
+        "True",
+        "y",
+        "{command, 'say'}",
+        "{score, '@s', 'obj'}",
+        "{selector, '@p'}",
+        "{func, echo(3)}",
+    ]
+    result = []
+    for _ in range(count):
+        symbol = " {} ".format(rnd.choice("+-*/"))
+        chain = [rnd.choice(operands) for _ in range(rnd.randint(2, 6))]
+        result.append("return " + symbol.join(chain))
+    return result
+
+
+def nested_conditions(depth):  # type: (int) -> str
+    """nested_conditions 返回嵌套深度为 depth 的条件语句"""
+    lines = ["x = 1"]
+    for i in range(depth):
+        lines.append("    " * i + "if x > {} or x == 1:".format(-i))
+    lines.append("    " * depth + "r = 5")
+    for i in range(depth - 1, -1, -1):
+        lines.append("    " * i + "fi")
+    lines.append("return r")
+    return "\n".join(lines)
+
+
+def make_env():  # type: () -> tuple[package.BuiltInFunction, package.GameInteract, list]
+    """
+    make_env 构造一组新的内建函数和游戏交互接口。
+    它们的每次调用都会被记录到返回的日志中，
+    因而可以用于比较副作用的次数和顺序
+
+    Returns:
+        tuple[BuiltInFunction, GameInteract, list]:
+            内建函数、游戏交互接口以及调用日志
+    """
+    log = []  # type: list[tuple]
+
+    def echo(*args):  # type: (Any) -> Any
+        log.append(("echo",) + args)
+        return args[0] if args else 0
+
+    def bad():  # type: () -> Any
+        return [1]
+
+    def boom():  # type: () -> Any
+        raise Exception("boom!")
+
+    def selector(value):  # type: (str) -> str
+        log.append(("selector", value))
+        return "Steve"
+
+    def score(target, scoreboard):  # type: (str, str) -> int
+        log.append(("score", target, scoreboard))
+        return 7
+
+    def command(value):  # type: (str) -> int
+        log.append(("command", value))
+        return 1
+
+    def ref(index):  # type: (int) -> Any
+        log.append(("ref", index))
+        if 0 <= index < 4:
+            return [5, "str", True, 1.5][index]
+        return 0
+
+    static = {
+        "echo": echo,
+        "bad": bad,
+        "boom": boom,
+        "print": lambda value: 0,
+    }  # type: dict[str, Callable[..., Any]]
+    manager = optional.BaseManager()
+    optional.Math(manager).build_func(static)
+    optional.Strings(manager).build_func(static)
+
+    builtins = package.BuiltInFunction(static=static)
+    interact = package.GameInteract(
+        selector=selector, score=score, command=command, ref=ref
+    )
+    return builtins, interact, log
+
+
+def outcome(
+    make_runner, code, var_maps
+):  # type: (Callable[[str], Any], str, dict) -> tuple
+    """
+    outcome 使用 make_runner 构造代码 code 的运行器，
+    然后运行它，并返回可以直接比较的运行结果
+
+    Args:
+        make_runner (Callable[[str], Any]):
+            接受源代码并返回运行器的函数
+        code (str):
+            欲运行的源代码
+        var_maps (dict[str, int | bool | float | str]):
+            运行前已经初始化的变量
+
+    Returns:
+        tuple: 返回值或错误信息，以及副作用的日志
+    """
+    builtins, interact, log = make_env()
+    try:
+        runner = make_runner(code)
+    except Exception as e:
+        return ("compile-error", str(e))
+    try:
+        result = runner.running(
+            require_return=False,
+            var_maps=var_maps,
+            interact=interact,
+            builtins=builtins,
+        )
+    except Exception as e:
+        return ("error", str(e), log)
+    return ("ok", repr(result), type(result).__name__, log)
+
+
+def switch_runner(code):  # type: (str) -> package.CodeRunner
+    """switch_runner 返回以默认方式编译并使用 switch 引擎的运行器
+
+    Args:
+        code (str): 源代码
+
+    Returns:
+        CodeRunner: 作为差分测试基准的运行器
+    """
+    return package.CodeRunner(compile_code(code))
+
+
+def compile_code(code):  # type: (str) -> package.CompileResult
+    """compile_code 以默认方式将源代码编译为字节码"""
+    return package.CodeCompiler(package.CodeParser(code).parse().code_block).compile()
+
+
+def table_runner(code):  # type: (str) -> package.CodeRunner
+    return package.CodeRunner(compile_code(code), RUNNER_ENGINE_TABLE)
+
+
+def verified_table_runner(code):  # type: (str) -> package.CodeRunner
+    return package.CodeRunner(compile_code(code), RUNNER_ENGINE_TABLE, verify=True)
+
+
+def transpile_runner(code):  # type: (str) -> package.CodeRunner
+    return package.CodeRunner(compile_code(code), RUNNER_ENGINE_TRANSPILE)
+
+
+def verified_transpile_runner(code):  # type: (str) -> package.CodeRunner
+    return package.CodeRunner(compile_code(code), RUNNER_ENGINE_TRANSPILE, verify=True)
+
+
+def closure_runner(code):  # type: (str) -> package.ClosureRunner
+    return package.ClosureRunner(package.CodeParser(code).parse().code_block)
+
+
+def register_runner(code):  # type: (str) -> package.RegisterRunner
+    parser = package.CodeParser(code).parse()
+    return package.RegisterRunner(package.RegisterCompiler(parser.code_block).compile())
+
+
+def cached_runner(code):  # type: (str) -> package.CachedRunner
+    return package.CachedRunner(compile_code(code))
+
+
+# All the engines which must behave exactly like the switch engine
+ENGINES = [
+    ("table", table_runner),
+    ("verified table", verified_table_runner),
+    ("transpile", transpile_runner),
+    ("verified transpile", verified_transpile_runner),
+    ("closure", closure_runner),
+    ("register", register_runner),
+    ("cached", cached_runner),
+]  # type: list[tuple[str, Callable[[str], Any]]]
+
+
+class DifferentialMixin:
+    """
+    DifferentialMixin 为 unittest.TestCase 提供差分测试的断言。
+    它将给定的运行器与 switch 引擎的运行结果逐一比较
+    """
+
+    def assertSameAsSwitch(
+        self, make_runner, programs=None, var_maps=VAR_MAPS
+    ):  # type: (Callable[[str], Any], list[str] | None, list[dict]) -> None
+        """
+        assertSameAsSwitch 断言 make_runner 构造的运行器
+        在每个程序和每组初始变量上的返回值、错误信息和副作用
+        都与 switch 引擎完全相同
+
+        Args:
+            make_runner (Callable[[str], Any]):
+                接受源代码并返回运行器的函数
+            programs (list[str] | None, optional):
+                参与比较的程序。
+                默认值为 None，代表使用 all_programs()
+            var_maps (list[dict], optional):
+                参与比较的初始变量。
+                默认值为 VAR_MAPS
+        """
+        if programs is None:
+            programs = all_programs()
+        mismatches = []
+        for code in programs:
+            for i in var_maps:
+                expected = outcome(switch_runner, code, i)
+                got = outcome(make_runner, code, i)
+                if got != expected:
+                    mismatches.append((code, i, expected, got))
+        self.assertEqual(  # type: ignore
+            mismatches[:3], [], "{} mismatch(es)".format(len(mismatches))
+        )
+
+
+class EngineMatrixMixin(DifferentialMixin):
+    """
+    EngineMatrixMixin 对 ENGINES 中的每个执行引擎
+    运行同一组差分测试。
+    各个引擎特有的行为在它们各自的测试文件中测试
+    """
+
+    def test_corpus(self):
+        for _, make_runner in ENGINES:
+            self.assertSameAsSwitch(make_runner)
+
+    def test_compute_chains(self):
+        for _, make_runner in ENGINES:
+            self.assertSameAsSwitch(make_runner, compute_chains(600))
+
+    def test_inplace_error_message(self):
+        for code, symbol in (
+            ("return 1 - 1 - 's' - {func, echo(3)}", "-="),
+            ("return 1 + 'a' + 2 + 3", "+="),
+            ("return 2 / 3 / 4 / 's'", "/="),
+            ("return 1 - 's' - 2", "-"),
+        ):
+            expected = outcome(switch_runner, code, {})
+            self.assertIn("for {}:".format(symbol), expected[1], code)  # type: ignore
+            for name, make_runner in ENGINES:
+                got = outcome(make_runner, code, {})
+                self.assertEqual(got, expected, "{}: {}".format(name, code))  # type: ignore
+
+    def test_operand_order(self):
+        for code in (
+            "x = 1 - 's' - {command, 'give @s diamond'}",
+            "return {func, echo(1)} + {func, echo(2)} * {func, echo(3)}",
+            "return {func, echo(1)} < {func, echo('a')}",
+            "return {func, echo('a')} >= {func, echo(1)}",
+            "return {score, '@s', 'obj'} in {func, echo(3)}",
+            "return {func, echo(y, {func, boom()})}",
+        ):
+            expected = outcome(switch_runner, code, {"y": 1})
+            if "command" in code:
+                # The operands have run before the computation fails
+                self.assertEqual(expected[2], [("command", "give @s diamond")])  # type: ignore
+            for name, make_runner in ENGINES:
+                got = outcome(make_runner, code, {"y": 1})
+                self.assertEqual(got, expected, "{}: {}".format(name, code))  # type: ignore
+
+    def test_reuse(self):
+        code = "t = 0\nfor i, n:\n    t = t + i\nrof\nreturn t"
+        for name, make_runner in ENGINES:
+            runner = make_runner(code)
+            self.assertEqual(runner.running(var_maps={"n": 10}), 45, name)  # type: ignore
+            self.assertEqual(runner.running(var_maps={"n": 4}), 6, name)  # type: ignore
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+import math
+import unittest
+import package
+import optional
+from .corpus import compile_code, make_env
+
+
+class CachedRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.refs = []
+
+        def ref(index):  # type: (int) -> object
+            self.refs.append(index)
+            if index == 9:
+                raise Exception("no such ref")
+            return [-0.0, 0.0, 1, 2][index % 4]
+
+        self.interact = package.GameInteract(ref=ref)
+        self.builtins = package.BuiltInFunction(
+            static={"sign": lambda x: math.copysign(1.0, x)}, pure=["sign"]
+        )
+
+    def runner(self, code):  # type: (str) -> package.CachedRunner
+        return package.CachedRunner(compile_code(code), builtins=self.builtins)
+
+    def test_purity(self):
+        self.assertTrue(self.runner("return {func, sign(x)}").purity().pure)
+        self.assertEqual(self.runner("return x + y").purity().inputs, ["x", "y"])
+        for code in (
+            "return {command, 'say'}",
+            "return {func, echo(1)}",
+            "x = 1\nreturn {ref, int, x}",
+        ):
+            self.assertFalse(self.runner(code).purity().pure, code)
+
+    def test_signed_zero(self):
+        runner = self.runner("return {func, sign(x)}")
+        self.assertEqual(runner.running(var_maps={"x": 0.0}), 1.0)
+        self.assertEqual(runner.running(var_maps={"x": -0.0}), -1.0)
+        self.assertEqual(runner.running(var_maps={"x": 0}), 1.0)
+        self.assertEqual(runner.running(var_maps={"x": -0.0}), -1.0)
+        self.assertEqual(runner.cache_info()[:3], (1, 3, 3))
+
+        runner = self.runner("return {func, sign({ref, float, 0})}")
+        self.assertEqual(runner.running(interact=self.interact), -1.0)
+        positive = package.GameInteract(ref=lambda index: 0.0)
+        self.assertEqual(runner.running(interact=positive), 1.0)
+        self.assertEqual(runner.running(interact=self.interact), -1.0)
+        self.assertEqual(runner.cache_info()[:2], (1, 2))
+
+    def test_equal_values_of_other_types(self):
+        runner = self.runner("return x")
+        for value in (1, 1.0, True, 1, 1.0, True):
+            result = runner.running(var_maps={"x": value})
+            self.assertIs(type(result), type(value))
+        self.assertEqual(runner.cache_info()[:3], (3, 3, 3))
+
+    def test_ref_called_once(self):
+        runner = self.runner("return {ref, int, 2} + {ref, int, 3} + {ref, int, 2}")
+        self.assertEqual(runner.running(interact=self.interact), 4)
+        self.assertEqual(self.refs, [2, 3])
+        self.assertEqual(runner.running(interact=self.interact), 4)
+        self.assertEqual(self.refs, [2, 3, 2, 3])
+        self.assertEqual(runner.cache_info()[:2], (1, 1))
+
+        del self.refs[:]
+        runner = self.runner("return {ref, int, 2} + {ref, int, 9}")
+        with self.assertRaises(Exception):
+            runner.running(interact=self.interact)
+        self.assertEqual(self.refs, [2, 9])
+        self.assertEqual(runner.cache_info()[:3], (0, 0, 0))
+
+    def test_builtins(self):
+        runner = self.runner("return {func, sign(x)}")
+        self.assertEqual(runner.running(var_maps={"x": 1.0}), 1.0)
+        other = package.BuiltInFunction(static={"sign": lambda x: 7.0})
+        self.assertEqual(runner.running(var_maps={"x": 1.0}, builtins=other), 7.0)
+        self.assertEqual(runner.running(var_maps={"x": 2.0}, builtins=other), 7.0)
+        self.assertEqual(
+            runner.running(var_maps={"x": 1.0}, builtins=self.builtins), 1.0
+        )
+        self.assertEqual(runner.cache_info()[:3], (1, 1, 1))
+
+    def test_use_cache(self):
+        runner = self.runner("return x")
+        runner.running(var_maps={"x": 1}, use_cache=False)
+        runner.running(var_maps={"x": 1}, use_cache=False)
+        self.assertEqual(runner.cache_info(), (0, 0, 0, 0))
+
+    def test_max_memory(self):
+        runner = package.CachedRunner(compile_code("return x"), max_memory=400)
+        for i in range(100):
+            runner.running(var_maps={"x": i})
+        _, misses, length, memory = runner.cache_info()
+        self.assertEqual(misses, 100)
+        self.assertTrue(0 < length < 100)
+        self.assertTrue(memory <= 400)
+
+    def test_errors_are_not_cached(self):
+        runner = self.runner("return 1 / x")
+        for _ in range(2):
+            with self.assertRaises(Exception):
+                runner.running(var_maps={"x": 0})
+        self.assertEqual(runner.cache_info()[:3], (0, 2, 0))
+
+    def test_unmarked_func(self):
+        manager = optional.BaseManager()
+        calls = []
+
+        def alloc(value):  # type: (int) -> int
+            calls.append(value)
+            if value > 0:
+                manager.ref([value])
+            return value
+
+        builtins = package.BuiltInFunction(
+            static={"alloc": alloc},
+            pure=["alloc"],
+            allocations=manager.allocations,
+        )
+        runner = package.CachedRunner(
+            compile_code("return {func, alloc(x)}"), builtins=builtins
+        )
+        self.assertEqual(runner.running(var_maps={"x": 0}), 0)
+        self.assertEqual(runner.running(var_maps={"x": 0}), 0)
+        self.assertEqual(runner.running(var_maps={"x": 1}), 1)
+        self.assertFalse(runner.purity().pure)
+        self.assertEqual(runner.cache_info(), (0, 0, 0, 0))
+        self.assertEqual(runner.running(var_maps={"x": 0}), 0)
+        self.assertEqual(calls, [0, 1, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+import unittest
+import package
+from package.runner.define import (
+    BYTECODE_INT_ADD,
+    BYTECODE_INT_GREATER_EQUAL,
+    BYTECODE_STR_CONCAT,
+    BYTECODE_APPEND_VALUE,
+    BYTECODE_LOAD_BUFFER,
+    BYTECODE_FOR_PREPARE,
+    BYTECODE_FOR_RANGE,
+    BYTECODE_LOOP_JUMP,
+    instruction_length,
+)
+from .corpus import DifferentialMixin, compute_chains, outcome, switch_runner
+
+
+def compile_code(code, **flags):  # type: (str, Any) -> package.CompileResult
+    parser = package.CodeParser(code).parse()
+    return package.CodeCompiler(parser.code_block, **flags).compile()
+
+
+def flag_runner(**flags):  # type: (Any) -> Callable[[str], package.CodeRunner]
+    """flag_runner 返回以给出的编译选项编译代码的运行器构造函数"""
+
+    def make_runner(code):  # type: (str) -> package.CodeRunner
+        return package.CodeRunner(compile_code(code, **flags))
+
+    return make_runner
+
+
+def specialised(ops):  # type: (list[int]) -> bool
+    """specialised 检查 ops 中是否有 int 特化的操作码"""
+    return any(BYTECODE_INT_ADD <= i <= BYTECODE_INT_GREATER_EQUAL for i in ops)
+
+
+def ops_of(compiled):  # type: (package.CompileResult) -> list[int]
+    """ops_of 返回 compiled 中所有指令的操作码"""
+    byte_code = compiled.byte_code
+    ops = []
+    pc = 0
+    while pc < len(byte_code):
+        ops.append(byte_code[pc])
+        pc += instruction_length(byte_code, pc)
+    return ops
+
+
+SPECIALIZE_PROGRAMS = [
+    "t = 0\nfor i, 10:\n    t = t + i * 2 - 1\nrof\nreturn t",
+    "s = 'a'\nfor i, 3:\n    s = s + 'b' + s\nrof\nreturn s",
+    "a = 1\nb = True\nreturn a + b",
+    "a = 3\nb = 4\nreturn a < b and a >= 3 and a != b and b <= 4 and b > a",
+    "a = 1\nif y:\n    a = 'x'\nfi\nreturn a + 1",
+    "a = 2\nb = 3\nreturn a / b",
+    "n = 3\nfor i, n:\n    n = 'x'\nrof\nreturn n",
+]
+
+
+class SpecializeTest(DifferentialMixin, unittest.TestCase):
+    def test_corpus(self):
+        self.assertSameAsSwitch(flag_runner(specialize=True))
+
+    def test_programs(self):
+        self.assertSameAsSwitch(flag_runner(specialize=True), SPECIALIZE_PROGRAMS)
+
+    def test_compute_chains(self):
+        self.assertSameAsSwitch(flag_runner(specialize=True), compute_chains(300))
+
+    def test_specialised_opcodes(self):
+        ops = ops_of(compile_code(SPECIALIZE_PROGRAMS[0], specialize=True))
+        self.assertTrue(specialised(ops))
+        ops = ops_of(compile_code(SPECIALIZE_PROGRAMS[1], specialize=True))
+        self.assertIn(BYTECODE_STR_CONCAT, ops)
+
+    def test_unknown_types_stay_generic(self):
+        ops = ops_of(compile_code(SPECIALIZE_PROGRAMS[4], specialize=True))
+        self.assertFalse(specialised(ops))
+        code = SPECIALIZE_PROGRAMS[4]
+        self.assertEqual(
+            outcome(flag_runner(specialize=True), code, {"y": True}),
+            outcome(switch_runner, code, {"y": True}),
+        )
+
+
+HOIST_PROGRAMS = [
+    "lim = 10\nt = 0\nfor i, lim:\n    k = lim * 2\n    t = t + k + i\nrof\nreturn t",
+    "t = 0\nfor i, 0:\n    t = y + 1\nrof\nreturn t",
+    "t = 0\nfor i, 3:\n    t = t + 1 / (y - 10)\nrof\nreturn t",
+    "a = 'x'\nt = ''\nfor i, 3:\n    t = t + a * 2\n    a = 'y'\nrof\nreturn t",
+    "t = 0\nfor i, 3:\n    for j, 2:\n        t = t + i * 10 + {func, math.format(1.5, 1)}\n    rof\nrof\nreturn t",
+    "t = ''\nfor i, 3:\n    t = t + {func, strings.upper('ab')} + {func, echo('c')}\nrof\nreturn t",
+    "t = 0\nfor i, 3:\n    t = t + {score, '@s', 'obj'}\nrof\nreturn t",
+    "t = 0\nfor i, 3:\n    if i == 1:\n        break\n    fi\n    t = t + y * 2\nrof\nreturn t",
+    "t = 0\nfor i, 3:\n    t = t + {func, math.pi()}\nrof\nreturn t",
+    "t = 0\nfor i, 0:\n    t = {func, math.format('x', 1)} + {func, strings.upper(1)}\nrof\nreturn t",
+]
+
+
+class HoistTest(DifferentialMixin, unittest.TestCase):
+    def test_corpus(self):
+        self.assertSameAsSwitch(flag_runner(hoist=True))
+
+    def test_programs(self):
+        self.assertSameAsSwitch(flag_runner(hoist=True), HOIST_PROGRAMS)
+
+    def test_total_funcs(self):
+        self.assertSameAsSwitch(
+            flag_runner(hoist=True, total_funcs=["math.pi"]),
+            HOIST_PROGRAMS,
+        )
+
+    def test_raising_pure_func(self):
+        def boom():  # type: () -> int
+            raise Exception("boom")
+
+        # Memoisable, but not total, so the call must not run before the loop
+        builtins = package.BuiltInFunction(static={"boom": boom}, pure=["boom"])
+        code = "t = 0\nfor i, n:\n    t = t + {func, boom()}\nrof\nreturn t"
+        runner = package.CodeRunner(compile_code(code, hoist=True))
+        self.assertEqual(runner.running(var_maps={"n": 0}, builtins=builtins), 0)
+        with self.assertRaises(Exception):
+            runner.running(var_maps={"n": 1}, builtins=builtins)
+
+    def test_hoisted(self):
+        calls = []
+
+        def twice(value):  # type: (int) -> int
+            calls.append(value)
+            return value * 2
+
+        builtins = package.BuiltInFunction(static={"twice": twice})
+        code = "t = 0\nfor i, 5:\n    t = t + {func, twice(3)} + i\nrof\nreturn t"
+        for flags, count in (
+            ({}, 5),
+            ({"hoist": True}, 5),
+            ({"hoist": True, "total_funcs": ["twice"]}, 1),
+        ):
+            del calls[:]
+            runner = package.CodeRunner(compile_code(code, **flags))
+            self.assertEqual(runner.running(builtins=builtins), 40, flags)
+            self.assertEqual(len(calls), count, flags)
+
+    def test_pure_score(self):
+        calls = []
+
+        def score(target, scoreboard):  # type: (str, str) -> int
+            calls.append((target, scoreboard))
+            return 7
+
+        interact = package.GameInteract(score=score)
+        code = "t = 0\nfor i, 4:\n    t = t + {score, '@s', 'obj'}\nrof\nreturn t"
+        for flags, count in (
+            ({"hoist": True}, 4),
+            ({"hoist": True, "pure_score": True}, 1),
+        ):
+            del calls[:]
+            runner = package.CodeRunner(compile_code(code, **flags))
+            self.assertEqual(runner.running(interact=interact), 28, flags)
+            self.assertEqual(len(calls), count, flags)
+
+
+class AccumulateTest(DifferentialMixin, unittest.TestCase):
+    def test_corpus(self):
+        self.assertSameAsSwitch(flag_runner(accumulate=True))
+
+    def test_with_specialize(self):
+        self.assertSameAsSwitch(flag_runner(accumulate=True, specialize=True))
+
+    def test_buffered(self):
+        code = "m = ''\nfor i, 5:\n    m = m + str(i) + ','\nrof\nreturn m"
+        ops = ops_of(compile_code(code, accumulate=True))
+        self.assertIn(BYTECODE_APPEND_VALUE, ops)
+        self.assertIn(BYTECODE_LOAD_BUFFER, ops)
+        runner = flag_runner(accumulate=True)(code)
+        self.assertEqual(runner.running(), "0,1,2,3,4,")
+
+    def test_long_string(self):
+        code = "m = ''\nfor i, 20000:\n    m = m + 'ab'\nrof\nreturn m"
+        self.assertEqual(flag_runner(accumulate=True)(code).running(), "ab" * 20000)
+
+
+class RangeLoopTest(DifferentialMixin, unittest.TestCase):
+    def test_corpus(self):
+        self.assertSameAsSwitch(flag_runner(range_loop=True))
+
+    def test_all_flags(self):
+        self.assertSameAsSwitch(
+            flag_runner(
+                specialize=True,
+                hoist=True,
+                accumulate=True,
+                range_loop=True,
+            )
+        )
+
+    def test_counted_loop(self):
+        code = "t = 0\nfor i, n:\n    t = t + i\nrof\nreturn t + i"
+        ops = ops_of(compile_code(code, range_loop=True))
+        self.assertIn(BYTECODE_FOR_PREPARE, ops)
+        self.assertIn(BYTECODE_FOR_RANGE, ops)
+        self.assertNotIn(BYTECODE_LOOP_JUMP, ops)
+        for n in (0, 1, 5, -2, "a", 2.5, True):
+            self.assertEqual(
+                outcome(flag_runner(range_loop=True), code, {"n": n}),
+                outcome(switch_runner, code, {"n": n}),
+                n,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+import unittest
+from .corpus import EngineMatrixMixin
+
+
+class EngineMatrixTest(EngineMatrixMixin, unittest.TestCase):
+    pass
+
+
+if __name__ == "__main__":
+    unittest.main()
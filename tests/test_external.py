@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+import math
+import unittest
+import package
+from package.runner.external import cache_key
+
+
+def run(code, builtins):  # type: (str, package.BuiltInFunction) -> object
+    parser = package.CodeParser(code).parse()
+    compiled = package.CodeCompiler(parser.code_block).compile()
+    return package.CodeRunner(compiled).running(builtins=builtins)
+
+
+class MemoizeTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        def sign(value):  # type: (float) -> float
+            self.calls.append(value)
+            return math.copysign(1.0, value)
+
+        def kind(value):  # type: (object) -> str
+            self.calls.append(value)
+            return type(value).__name__
+
+        self.builtins = package.BuiltInFunction(
+            static={"sign": sign, "kind": kind}, pure=["sign", "kind"]
+        )
+
+    def test_signed_zero(self):
+        code = "z = 0.0\nreturn {func, sign(z)} * 10 + {func, sign(z * (0 - 1))}"
+        self.assertEqual(run(code, self.builtins), 9.0)
+        self.assertEqual(run(code, self.builtins), 9.0)
+        self.assertEqual(self.builtins.cache_info(), (2, 2, 2))
+
+        sign = self.builtins.get_func("sign")
+        self.assertEqual(sign(-0.0), -1.0)
+        self.assertEqual(sign(0), 1.0)
+        self.assertEqual(sign(False), 1.0)
+        self.assertEqual(len(self.calls), 4)
+
+    def test_equal_values_of_other_types(self):
+        kind = self.builtins.get_func("kind")
+        self.assertEqual([kind(1), kind(1.0), kind(True)], ["int", "float", "bool"])
+        self.assertEqual([kind(1), kind(1.0), kind(True)], ["int", "float", "bool"])
+        self.assertEqual(self.builtins.cache_info(), (3, 3, 3))
+
+    def test_cache_key(self):
+        self.assertNotEqual(cache_key((0.0, 1)), cache_key((-0.0, 1)))
+        self.assertNotEqual(cache_key((0.0,)), cache_key((0,)))
+        self.assertNotEqual(cache_key((1, "a")), cache_key((True, "a")))
+        self.assertEqual(cache_key((-0.0, "a")), cache_key((-0.0, "a")))
+        self.assertEqual(cache_key((1.5, 2))[0], (1.5, 2))
+
+    def test_not_pure(self):
+        self.builtins.pure.discard("sign")
+        sign = self.builtins.get_func("sign")
+        sign(1.0)
+        sign(1.0)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.builtins.cache_info(), (0, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+import unittest
+import package
+from package.parser.define import OpcodeReturn
+from package.parser.expression.basic import ExpressionLiteral
+from .corpus import DifferentialMixin, compute_chains, outcome, switch_runner
+
+
+def fold(code):  # type: (str) -> list
+    return package.ConstantFolder(package.CodeParser(code).parse().code_block).fold()
+
+
+def folded_runner(code):  # type: (str) -> package.CodeRunner
+    return package.CodeRunner(package.CodeCompiler(fold(code)).compile())
+
+
+class FoldDifferentialTest(DifferentialMixin, unittest.TestCase):
+    def test_corpus(self):
+        self.assertSameAsSwitch(folded_runner)
+
+    def test_compute_chains(self):
+        self.assertSameAsSwitch(folded_runner, compute_chains(600))
+
+    def test_inplace_error_message(self):
+        for code, symbol in (
+            ("return 1 - 1 - 's' - {func, echo(3)}", "-="),
+            ("return 1 - 1 - 1 - 's'", "-="),
+            ("return 1 + 2 + 3 + 'a' + y", "+="),
+            ("return 1 - 1 - 's'", "-"),
+        ):
+            got = outcome(folded_runner, code, {"y": 1})
+            self.assertEqual(got, outcome(switch_runner, code, {"y": 1}), code)
+            self.assertIn("for {}:".format(symbol), got[1], code)
+
+    def test_folded(self):
+        for code, value in (
+            ("return 2*6-1", 11),
+            ("return '0'*(5-2)", "000"),
+            ("return 1 + 2 + 3 + 4 + 5", 15),
+            ("return int(3.7) + int('4')", 7),
+        ):
+            code_block = fold(code)
+            self.assertIsInstance(code_block[0], OpcodeReturn)
+            literal = code_block[0].opcode_payload.element_payload[0]  # type: ignore
+            self.assertIsInstance(literal, ExpressionLiteral, code)
+            self.assertEqual(literal.element_payload, value, code)
+
+    def test_long_chain_keeps_four_operands(self):
+        code_block = fold("return 1 + 2 + 3 + 4 + y")
+        chain = code_block[0].opcode_payload.element_payload[0]  # type: ignore
+        self.assertEqual(
+            [i.element_payload for i in chain.element_payload[:3]], [3, 3, 4]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+import unittest
+import package
+from package.runner.link import LinkException, LinkedFunction
+from package.runner.define import (
+    BYTECODE_HANDLE_FUNC,
+    BYTECODE_HANDLE_LINKED_FUNC,
+    RUNNER_ENGINE_SWITCH,
+    RUNNER_ENGINE_TABLE,
+    RUNNER_ENGINE_TRANSPILE,
+    instruction_length,
+)
+from .corpus import VAR_MAPS, all_programs, make_env
+
+ENGINES = [RUNNER_ENGINE_SWITCH, RUNNER_ENGINE_TABLE, RUNNER_ENGINE_TRANSPILE]
+
+
+def compile_code(code):  # type: (str) -> package.CompileResult
+    return package.CodeCompiler(package.CodeParser(code).parse().code_block).compile()
+
+
+def result_of(function):  # type: (Callable[[], Any]) -> tuple
+    try:
+        return ("ok", repr(function()))
+    except Exception as e:
+        return ("error", str(e))
+
+
+def ops_of(compiled):  # type: (package.CompileResult) -> list[int]
+    """ops_of 返回 compiled 中所有指令的操作码"""
+    byte_code = compiled.byte_code
+    ops = []
+    pc = 0
+    while pc < len(byte_code):
+        ops.append(byte_code[pc])
+        pc += instruction_length(byte_code, pc)
+    return ops
+
+
+def run(compiled, builtins, engine=RUNNER_ENGINE_SWITCH):
+    # type: (package.CompileResult, package.BuiltInFunction, int) -> Any
+    return package.CodeRunner(compiled, engine).running(builtins=builtins)
+
+
+class LinkTest(unittest.TestCase):
+    def test_corpus(self):
+        mismatches = []
+        for code in all_programs():
+            try:
+                compiled = compile_code(code)
+            except Exception:
+                continue
+            for engine in ENGINES:
+                for var_maps in VAR_MAPS:
+                    builtins, interact, log = make_env()
+                    runner = package.CodeRunner(
+                        package.CodeLinker(compiled, builtins).link(), engine
+                    )
+                    got = result_of(
+                        lambda: runner.running(False, var_maps, interact)
+                    ) + (list(log),)
+                    builtins, interact, log = make_env()
+                    runner = package.CodeRunner(compiled, engine)
+                    expected = result_of(
+                        lambda: runner.running(False, var_maps, interact, builtins)
+                    ) + (list(log),)
+                    if got != expected:
+                        mismatches.append((code, engine, var_maps, expected, got))
+        self.assertEqual(mismatches[:3], [], "{} mismatch(es)".format(len(mismatches)))
+
+    def test_rewritten(self):
+        compiled = compile_code("return {func, f(1)} + {func, f(2)} + {func, g()}")
+        linked = package.CodeLinker(compiled, package.BuiltInFunction()).link()
+        self.assertEqual(ops_of(compiled).count(BYTECODE_HANDLE_FUNC), 3)
+        self.assertEqual(ops_of(linked).count(BYTECODE_HANDLE_LINKED_FUNC), 3)
+        self.assertNotIn(BYTECODE_HANDLE_FUNC, ops_of(linked))
+        slots = [i for i in linked.byte_code if isinstance(i, LinkedFunction)]
+        self.assertEqual([i.name for i in slots], ["f", "f", "g"])
+        self.assertIs(slots[0], slots[1])
+
+    def test_dynamic_lookup(self):
+        builtins = package.BuiltInFunction(
+            static={"s": lambda: 1}, dynamic={"d": lambda: 10}
+        )
+        compiled = compile_code("return {func, s()} + {func, d()}")
+        linked = package.CodeLinker(compiled, builtins).link()
+        for engine in ENGINES:
+            builtins.dynamic["d"] = lambda: 10
+            builtins.static["s"] = lambda: 1
+            self.assertEqual(run(linked, builtins, engine), 11)
+            # Static functions are resolved at link time,
+            # while dynamic ones are looked up on every call
+            builtins.dynamic["d"] = lambda: 20
+            builtins.static["s"] = lambda: 2
+            self.assertEqual(run(linked, builtins, engine), 21)
+            self.assertEqual(run(compiled, builtins, engine), 22)
+
+    def test_runtime_builtins_ignored(self):
+        compiled = compile_code("return {func, f()}")
+        linked = package.CodeLinker(
+            compiled, package.BuiltInFunction(static={"f": lambda: 1})
+        ).link()
+        other = package.BuiltInFunction(static={"f": lambda: 2})
+        self.assertEqual(run(linked, other), 1)
+
+    def test_unknown_function(self):
+        compiled = compile_code(
+            "x = 1\nif x == 2:\n    return {func, nope()}\nfi\nreturn x"
+        )
+        builtins = package.BuiltInFunction()
+        linked = package.CodeLinker(compiled, builtins).link()
+        self.assertEqual(run(linked, builtins), 1)
+        with self.assertRaises(LinkException):
+            package.CodeLinker(compiled, builtins, strict=True).link()
+
+        compiled = compile_code("return {func, nope()}")
+        linked = package.CodeLinker(compiled, builtins).link()
+        self.assertEqual(
+            result_of(lambda: run(linked, builtins)),
+            result_of(lambda: run(compiled, builtins)),
+        )
+        builtins.dynamic["nope"] = lambda: 3
+        self.assertEqual(run(linked, builtins), 3)
+        package.CodeLinker(compiled, builtins, strict=True).link()
+
+
+class ContractTest(unittest.TestCase):
+    def setUp(self):
+        self.builtins = package.BuiltInFunction(
+            static={"n": lambda: 5, "l": lambda: [1], "u": lambda: u"x"}
+        )
+
+    def slot(self, linked):  # type: (package.CompileResult) -> LinkedFunction
+        return [i for i in linked.byte_code if isinstance(i, LinkedFunction)][0]
+
+    def test_trusted(self):
+        compiled = compile_code("return {func, n()} + 1")
+        linked = package.CodeLinker(compiled, self.builtins).link()
+        self.assertFalse(self.slot(linked).trusted)
+        self.builtins.declare("n", int)
+        linked = package.CodeLinker(compiled, self.builtins).link()
+        self.assertTrue(self.slot(linked).trusted)
+        for engine in ENGINES:
+            self.assertEqual(run(linked, self.builtins, engine), 6)
+
+    def test_untrusted_checks(self):
+        compiled = compile_code("return {func, l()}")
+        linked = package.CodeLinker(compiled, self.builtins).link()
+        for engine in ENGINES:
+            got = result_of(lambda: run(linked, self.builtins, engine))
+            expected = result_of(lambda: run(compiled, self.builtins, engine))
+            self.assertEqual(got, expected)
+            self.assertIn("must be int/bool/float/str", got[1])
+        compiled = compile_code("return {func, u()}")
+        linked = package.CodeLinker(compiled, self.builtins).link()
+        self.assertEqual(run(linked, self.builtins), "x")
+
+    def test_debug(self):
+        self.builtins.declare("l", (int, str))
+        self.builtins.declare("n", int)
+        compiled = compile_code("return {func, n()} + {func, l()}")
+        linked = package.CodeLinker(compiled, self.builtins, debug=True).link()
+        slots = [i for i in linked.byte_code if isinstance(i, LinkedFunction)]
+        self.assertFalse(any(i.trusted for i in slots))
+        for engine in ENGINES:
+            with self.assertRaises(Exception) as context:
+                run(linked, self.builtins, engine)
+            self.assertIn(
+                "The return value from func l violates its declared type int/str",
+                str(context.exception),
+            )
+
+    def test_declare(self):
+        with self.assertRaises(Exception):
+            self.builtins.declare("n", ())
+        with self.assertRaises(Exception):
+            self.builtins.declare("n", list)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+import unittest
+import package
+from .corpus import (
+    DifferentialMixin,
+    cached_runner,
+    closure_runner,
+    nested_conditions,
+    register_runner,
+    table_runner,
+    transpile_runner,
+    verified_table_runner,
+    verified_transpile_runner,
+)
+from .test_compile import compile_code, flag_runner
+from .test_fold import folded_runner
+from .test_optimize import dead_code_runner, peephole_runner
+from .test_partial import partial_runner
+
+VAR_MAPS = [{"y": 2}]
+
+
+def nested_parentheses(depth, inner="1"):  # type: (int, str) -> str
+    """nested_parentheses 返回被 depth 层括号包围的表达式 inner"""
+    return "x = {}{}{}\nreturn x".format("(" * depth, inner, ")" * depth)
+
+
+def nested_operations(depth, inner="1"):  # type: (int, str) -> str
+    """nested_operations 返回嵌套深度为 depth 的右结合减法"""
+    return "x = {}{}{}\nreturn x".format("(y - " * depth, inner, ")" * depth)
+
+
+def nested_loops(depth, inner="t = t + 1"):  # type: (int, str) -> str
+    """nested_loops 返回嵌套深度为 depth 的循环语句"""
+    lines = ["t = 0"]
+    for i in range(depth):
+        lines.append("    " * i + "for i{}, 1:".format(i))
+    lines.append("    " * depth + inner)
+    for i in range(depth - 1, -1, -1):
+        lines.append("    " * i + "rof")
+    lines.append("return t")
+    return "\n".join(lines)
+
+
+def deep_programs():  # type: () -> list[str]
+    """deep_programs 返回嵌套深度远超 Python 递归深度限制的程序"""
+    return [
+        nested_parentheses(5000),
+        nested_parentheses(5000, "1 - 's'"),
+        nested_operations(1000),
+        nested_operations(1000, "'s'"),
+        nested_conditions(1000),
+        nested_conditions(1000).replace("r = 5", "r = 1 - 's'"),
+        nested_loops(1000),
+        nested_loops(1000, "x = t - 's'"),
+    ]
+
+
+def superinstruction_runner(code):  # type: (str) -> package.CodeRunner
+    return package.CodeRunner(
+        package.CodeOptimizer(compile_code(code)).superinstruction()
+    )
+
+
+def specialised_runner(code):  # type: (str) -> package.CodeRunner
+    return partial_runner({})(code)
+
+
+FLAGS = [
+    {"specialize": True},
+    {"hoist": True},
+    {"accumulate": True},
+    {"range_loop": True},
+]
+
+
+class NestingDifferentialTest(DifferentialMixin, unittest.TestCase):
+    programs = []  # type: list[str]
+
+    @classmethod
+    def setUpClass(cls):  # type: () -> None
+        cls.programs = deep_programs()
+
+    def assertDeepSame(self, make_runner):  # type: (Callable[[str], Any]) -> None
+        self.assertSameAsSwitch(make_runner, self.programs, VAR_MAPS)
+
+    def test_table(self):
+        self.assertDeepSame(table_runner)
+
+    def test_table_verified(self):
+        self.assertDeepSame(verified_table_runner)
+
+    def test_transpile(self):
+        self.assertDeepSame(transpile_runner)
+
+    def test_transpile_verified(self):
+        self.assertDeepSame(verified_transpile_runner)
+
+    def test_closure(self):
+        self.assertDeepSame(closure_runner)
+
+    def test_register(self):
+        self.assertDeepSame(register_runner)
+
+    def test_cached(self):
+        self.assertDeepSame(cached_runner)
+
+    def test_flags(self):
+        for flags in FLAGS:
+            self.assertDeepSame(flag_runner(**flags))
+
+    def test_specialised(self):
+        self.assertDeepSame(specialised_runner)
+
+    def test_folded(self):
+        self.assertDeepSame(folded_runner)
+
+    def test_optimized(self):
+        for make_runner in (
+            superinstruction_runner,
+            dead_code_runner,
+            peephole_runner,
+        ):
+            self.assertDeepSame(make_runner)
+
+
+class NestingTest(unittest.TestCase):
+    def test_infer(self):
+        for code in deep_programs():
+            parser = package.CodeParser(code).parse()
+            package.TypeInferrer(parser.code_block).infer()
+
+    def test_closure_fallback(self):
+        shallow = closure_runner(nested_conditions(10))
+        self.assertIsNone(shallow._fallback)
+        self.assertEqual(shallow.running(), 5)
+        deep = closure_runner(nested_conditions(1000))
+        self.assertIsNotNone(deep._fallback)
+        self.assertEqual(deep.running(), 5)
+        # Parentheses do not nest the closures
+        self.assertIsNone(closure_runner(nested_parentheses(5000))._fallback)
+
+
+if __name__ == "__main__":
+    unittest.main()
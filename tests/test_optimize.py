@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+import unittest
+import package
+from package.runner.define import (
+    BYTECODE_LOAD_CONST,
+    BYTECODE_STORE_VALUE,
+    BYTECODE_DIRECT_JUMP,
+    BYTECODE_FALSE_JUMP,
+    BYTECODE_HANDLE_LOGIC_ANDOR,
+    BYTECODE_STORE_RETURN_VAL,
+    BYTECODE_PROGRAM_STOP_RUN,
+    BYTECODE_FALSE_JUMP_OR_POP,
+    BYTECODE_TRUE_JUMP_OR_POP,
+    VariableMapping,
+    instruction_length,
+)
+from package.runner.compile import CompileResult
+from package.runner.optimize import jump_offsets, stack_depths
+from .corpus import DifferentialMixin, all_programs, outcome, switch_runner
+
+
+def compile_code(code):  # type: (str) -> CompileResult
+    return package.CodeCompiler(package.CodeParser(code).parse().code_block).compile()
+
+
+def dead_code_runner(code):  # type: (str) -> package.CodeRunner
+    return package.CodeRunner(package.CodeOptimizer(compile_code(code)).dead_code())
+
+
+def peephole_runner(code):  # type: (str) -> package.CodeRunner
+    return package.CodeRunner(package.CodeOptimizer(compile_code(code)).peephole())
+
+
+def starts_of(compiled):  # type: (CompileResult) -> list[int]
+    """starts_of 返回 compiled 中所有指令的起始位置"""
+    byte_code = compiled.byte_code
+    starts = []
+    pc = 0
+    while pc < len(byte_code):
+        starts.append(pc)
+        pc += instruction_length(byte_code, pc)
+    return starts
+
+
+class OptimizeTestMixin:
+    def assertWellFormed(self, compiled):  # type: (CompileResult) -> None
+        """
+        assertWellFormed 断言 compiled 的所有跳转目标
+        以及检查点的范围都位于指令的边界上
+        """
+        byte_code = compiled.byte_code
+        starts = starts_of(compiled)
+        bounds = set(starts + [len(byte_code)])
+        for pc in starts:
+            for offset in jump_offsets(byte_code[pc]):  # type: ignore
+                self.assertIn(byte_code[pc + offset], bounds)  # type: ignore
+        for chk in compiled.check_point:
+            self.assertIn(chk.start_pc, bounds)  # type: ignore
+            self.assertIn(chk.end_pc + 1, bounds)  # type: ignore
+            self.assertTrue(chk.start_pc <= chk.end_pc)  # type: ignore
+
+
+class DeadCodeTest(OptimizeTestMixin, DifferentialMixin, unittest.TestCase):
+    def test_corpus(self):
+        self.assertSameAsSwitch(dead_code_runner)
+
+    def test_well_formed(self):
+        for code in all_programs():
+            try:
+                compiled = compile_code(code)
+            except Exception:
+                continue
+            self.assertWellFormed(package.CodeOptimizer(compiled).dead_code())
+
+    def test_removed(self):
+        for code in (
+            "if False:\n    x = {command, 'a'}\nfi\nreturn 2",
+            "return 2\nx = {command, 'a'}",
+            "for i, 3:\n    continue\n    x = {command, 'a'}\nrof\nreturn 2",
+            "if True:\n    return 2\nelif y:\n    x = {command, 'a'}\nfi",
+        ):
+            before = compile_code(code)
+            after = package.CodeOptimizer(before).dead_code()
+            self.assertTrue(len(after.byte_code) < len(before.byte_code), code)
+            self.assertNotIn("a", after.byte_code, code)
+
+    def test_no_jump_to_next(self):
+        compiled = package.CodeOptimizer(
+            compile_code("x = 1\nif x:\n    y = 1\nelse:\n    y = 2\nfi\nreturn y")
+        ).dead_code()
+        byte_code = compiled.byte_code
+        starts = starts_of(compiled)
+        for pc, next_pc in zip(starts, starts[1:]):
+            if byte_code[pc] == BYTECODE_DIRECT_JUMP:
+                self.assertNotEqual(byte_code[pc + 1], next_pc)
+
+    def test_check_points_remapped(self):
+        for code in (
+            "if False:\n    x = 1\nfi\nreturn 1/0",
+            "x = 1\nif False:\n    x = 2\nelif x + 's':\n    x = 3\nfi\nreturn x",
+            "for i, 2:\n    break\n    x = 1\nrof\nfor j, 'a':\n    x = 1\nrof",
+        ):
+            got = outcome(dead_code_runner, code, {})
+            self.assertEqual(got, outcome(switch_runner, code, {}), code)
+            self.assertEqual(got[0], "error", code)
+
+
+class PeepholeTest(OptimizeTestMixin, DifferentialMixin, unittest.TestCase):
+    def test_corpus(self):
+        self.assertSameAsSwitch(peephole_runner)
+
+    def test_well_formed(self):
+        for code in all_programs():
+            try:
+                compiled = compile_code(code)
+            except Exception:
+                continue
+            self.assertWellFormed(package.CodeOptimizer(compiled).peephole())
+
+    def test_collapse_logic(self):
+        for code, jump in (
+            ("x = 5\nreturn x > 3 and x < 10 and 'ok'", BYTECODE_FALSE_JUMP_OR_POP),
+            ("return '' or 0 or y or 4", BYTECODE_TRUE_JUMP_OR_POP),
+        ):
+            before = compile_code(code)
+            after = package.CodeOptimizer(before).peephole()
+            ops = [before.byte_code[pc] for pc in starts_of(before)]
+            self.assertIn(BYTECODE_HANDLE_LOGIC_ANDOR, ops, code)
+            ops = [after.byte_code[pc] for pc in starts_of(after)]
+            self.assertNotIn(BYTECODE_HANDLE_LOGIC_ANDOR, ops, code)
+            self.assertIn(jump, ops, code)
+
+    def test_jump_threading(self):
+        code = (
+            "x = 1\nif x > 0:\n    if x > 1:\n        y = 1\n    else:\n"
+            "        y = 2\n    fi\nelse:\n    y = 3\nfi\nreturn y"
+        )
+        compiled = package.CodeOptimizer(compile_code(code)).peephole()
+        byte_code = compiled.byte_code
+        for pc in starts_of(compiled):
+            for offset in jump_offsets(byte_code[pc]):  # type: ignore
+                target = byte_code[pc + offset]  # type: int # type: ignore
+                self.assertNotEqual(byte_code[target], BYTECODE_DIRECT_JUMP)
+        self.assertEqual(peephole_runner(code).running(), 2)
+
+    def test_and_in_condition(self):
+        code = "a=1\nif a == 1 and {func, boom()}:\n    return 1\nfi\nreturn 2"
+        self.assertEqual(
+            outcome(peephole_runner, code, {}), outcome(switch_runner, code, {})
+        )
+
+
+class StackDepthsTest(unittest.TestCase):
+    def compiled(self, byte_code):  # type: (list) -> CompileResult
+        return CompileResult(byte_code, [], VariableMapping())
+
+    def test_balanced(self):
+        for code in all_programs():
+            try:
+                compiled = compile_code(code)
+            except Exception:
+                continue
+            depths = stack_depths(compiled)
+            self.assertEqual(depths[0], 0)
+
+    def test_rejected(self):
+        cases = [
+            (
+                [BYTECODE_LOAD_CONST, 1, BYTECODE_PROGRAM_STOP_RUN],
+                "Stack is not empty at the end of program",
+            ),
+            (
+                [BYTECODE_STORE_RETURN_VAL, BYTECODE_PROGRAM_STOP_RUN],
+                "Stack underflow at pc=0",
+            ),
+            (
+                [BYTECODE_LOAD_CONST, 1, BYTECODE_STORE_VALUE, 0],
+                "Running out of byte code at pc=4",
+            ),
+            (
+                [
+                    BYTECODE_LOAD_CONST,
+                    True,
+                    BYTECODE_FALSE_JUMP,
+                    6,
+                    BYTECODE_LOAD_CONST,
+                    1,
+                    BYTECODE_PROGRAM_STOP_RUN,
+                ],
+                "Inconsistent stack depth at pc=6",
+            ),
+        ]
+        for byte_code, message in cases:
+            with self.assertRaises(Exception) as context:
+                stack_depths(self.compiled(byte_code))
+            self.assertIn(message, str(context.exception))
+            with self.assertRaises(Exception):
+                package.CodeOptimizer(self.compiled(byte_code)).peephole()
+
+
+if __name__ == "__main__":
+    unittest.main()
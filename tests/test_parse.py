@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+import unittest
+import package
+from package.parser.define import (
+    OpcodeBase,
+    OpcodeAssign,
+    OpcodeCondition,
+    OpcodeForLoop,
+    OpcodeExpression,
+    OpcodeReturn,
+)
+from package.parser.expression.define import (
+    ExpressionElement,
+    ELEMENT_ID_TO_NAME,
+    ELEMENT_ID_VAR,
+    ELEMENT_ID_EXPR,
+    ELEMENT_ID_FUNC,
+    ELEMENT_ID_AND,
+    ELEMENT_ID_OR,
+    ELEMENT_ID_IN,
+    ELEMENT_ID_INVERSE,
+)
+
+# The parse trees produced by the original parser, in which
+# a chain of the same operator is kept as a single element
+EXPRESSION_TREES = [
+    ("1 + 2 * 3 - 4", "(+ 1 (- (* 2 3) 4))"),
+    ("a - b - c", "(- a b c)"),
+    ("a / b / c", "(/ a b c)"),
+    ("a - b + c", "(+ (- a b) c)"),
+    ("a + b - c", "(+ a (- b c))"),
+    ("a * b / c", "(* a (/ b c))"),
+    ("a / b * c", "(* (/ a b) c)"),
+    ("a - b * c - d", "(- a (* b c) d)"),
+    ("(a - b) - c", "(- (- a b) c)"),
+    ("a - (b - c)", "(- a (- b c))"),
+    ("a + b * c + d * e", "(+ a (* b c) (* d e))"),
+    ("-a * b", "(- 0 (* a b))"),
+    ("- a - b", "(- 0 a b)"),
+    ("-(a + b)", "(- 0 (+ a b))"),
+    ("a < b == c", "(== (< a b) c)"),
+    ("a == b != c", "(!= (== a b) c)"),
+    ("a + 1 >= b * 2", "(>= (+ a 1) (* b 2))"),
+    ("a <= b > c", "(<= a (> b c))"),
+    ("not a and b", "(and (not a) b)"),
+    ("not (a and b)", "(not (and a b))"),
+    ("a or b and c", "(or a (and b c))"),
+    ("a and b or c and d", "(or (and a b) (and c d))"),
+    ("a or b or c", "(or a b c)"),
+    ("a and b and c", "(and a b c)"),
+    ("not a == b", "(not (== a b))"),
+    ("a + b in c", "(in (+ a b) c)"),
+    ("'x' in s and not t", "(and (in 'x' s) (not t))"),
+    ("int(a) + float(b) * str(c)", "(+ (int a) (* (float b) (str c)))"),
+    ("bool(a or b)", "(bool (or a b))"),
+    ("{func, g(1, a + b)} * 2", "(* ({func} g 1 (+ a b)) 2)"),
+    ("{func, g()}", "({func} g)"),
+    ("{score, '@s', 'o'} - 1", "(- ({score} '@s' 'o') 1)"),
+    ("{command, 'say ' + a}", "({command} (+ 'say ' a))"),
+    ("{selector, '@p'}", "({selector} '@p')"),
+    ("1.5 / 2", "(/ 1.5 2)"),
+    ("'a' + 'b' + 'c'", "(+ 'a' 'b' 'c')"),
+    ("((a))", "a"),
+    ("a == true", "(== a true)"),
+]
+
+STATEMENT_TREES = [
+    (
+        "x = 1\ny = x + 2",
+        [("=", "x", "1"), ("=", "y", "(+ x 2)")],
+    ),
+    (
+        "x = 1 | y = 2",
+        [("=", "x", "1"), ("=", "y", "2")],
+    ),
+    (
+        "a == b",
+        [("expr", "(== a b)")],
+    ),
+    (
+        "x",
+        [("expr", "x")],
+    ),
+    (
+        "{func, g()}",
+        [("expr", "({func} g)")],
+    ),
+    (
+        "{command, 'say'} + 1",
+        [("expr", "(+ ({command} 'say') 1)")],
+    ),
+    (
+        "return a or b",
+        [("return", "(or a b)")],
+    ),
+    (
+        "true = 1",
+        [("=", "true", "1")],
+    ),
+    (
+        "break",
+        [("break",)],
+    ),
+    (
+        "if a:\n    b = 1\nelif c:\n    b = 2\nelse:\n    b = 3\nfi",
+        [
+            (
+                "if",
+                [
+                    ("a", [("=", "b", "1")]),
+                    ("c", [("=", "b", "2")]),
+                    (None, [("=", "b", "3")]),
+                ],
+            )
+        ],
+    ),
+    (
+        "for i, n + 1:\n    if i:\n        continue\n    fi\n    break\nrof",
+        [("for", "i", "(+ n 1)", [("if", [("i", [("continue",)])]), ("break",)])],
+    ),
+    (
+        "if a:\nelse:\nfi",
+        [("if", [("a", []), (None, [])])],
+    ),
+    (
+        "\n\nx = 1\n\n",
+        [("=", "x", "1")],
+    ),
+]
+
+# The errors reported by the original parser, which
+# tried to parse every line as an expression first
+STATEMENT_ERRORS = [
+    (
+        "int = 1",
+        'Syntax Error.\n\n- Error -\n  parse: Syntax error; expected="(", token=Token(id=1, name="=", ori_start_ptr=4, ori_end_ptr=5)\n\n- Code -\n  >>int =<< 1',
+    ),
+    (
+        "x = y = 1",
+        'Syntax Error.\n\n- Error -\n  try_parse_equal: Syntax error; expected="=", sub=Token(id=0, name="word", payload="1", ori_start_ptr=8, ori_end_ptr=9)\n\n- Code -\n  x = >>y = 1<<',
+    ),
+    (
+        "= 1",
+        'Syntax Error.\n\n- Error -\n  try_parse_equal: Syntax error; expected="=", sub=Token(id=0, name="word", payload="1", ori_start_ptr=2, ori_end_ptr=3)\n\n- Code -\n  >>= 1<<',
+    ),
+    (
+        "if x\nfi",
+        "Syntax Error.\n\n- Error -\n  parse_to_elements: Syntax error: Incomplete expression in the end of a line\n\n- Code -\n  if >>x\n  <<fi",
+    ),
+    (
+        "if x:\n",
+        'Syntax Error.\n\n- Error -\n  If statement not closed with "fi"\n\n- Code -\n  if x:\n  >>\n  <<',
+    ),
+    (
+        "for i 3:\nrof",
+        'Syntax Error.\n\n- Error -\n  For loop should use "," before the expression\n\n- Code -\n  for i >>3<<:\n  rof',
+    ),
+    (
+        "for i, 3:\n",
+        'Syntax Error.\n\n- Error -\n  For loop not closed with "rof"\n\n- Code -\n  for i, 3:\n  >>\n  <<',
+    ),
+    (
+        "fi",
+        'Syntax Error.\n\n- Error -\n  parse_to_elements: Syntax error: "fi" cannot be used in expression\n\n- Code -\n  >>fi<<',
+    ),
+    (
+        "else:",
+        'Syntax Error.\n\n- Error -\n  parse_to_elements: Syntax error: "else" cannot be used in expression\n\n- Code -\n  >>else<<:',
+    ),
+    (
+        "return return",
+        'Syntax Error.\n\n- Error -\n  parse_to_elements: Syntax error: "return" cannot be used in expression\n\n- Code -\n  return >>return<<',
+    ),
+    (
+        "x 1",
+        'Syntax Error.\n\n- Error -\n  Assign statement should use "=" after variable name\n\n- Code -\n  x >>1<<',
+    ),
+    (
+        "if = 1",
+        'Syntax Error.\n\n- Error -\n  try_parse_equal: Syntax error; expected="=", sub=Token(id=0, name="word", payload="1", ori_start_ptr=5, ori_end_ptr=6)\n\n- Code -\n  if >>= 1<<',
+    ),
+    (
+        "x = (1",
+        "Syntax Error.\n\n- Error -\n  parse_to_elements: Syntax error: Incomplete expression in the end of a line\n\n- Code -\n  x = >>(1<<",
+    ),
+    (
+        "elif a:",
+        'Syntax Error.\n\n- Error -\n  parse_to_elements: Syntax error: "elif" cannot be used in expression\n\n- Code -\n  >>elif<< a:',
+    ),
+    (
+        "if a:\n    x = 1 +\nfi",
+        "Syntax Error.\n\n- Error -\n  must_read: Unexpected EOF\n\n- Code -\n  if a:\n      x = >>1 +\n  <<fi",
+    ),
+    (
+        "for i, 3:\n    rof = 1\nrof",
+        'Syntax Error.\n\n- Error -\n  You must write statements line by line or use "|" to represent a new line\n\n- Code -\n  for i, 3:\n      >>rof =<< 1\n  rof',
+    ),
+]
+
+
+def error_of(code):  # type: (str) -> str
+    try:
+        package.CodeParser(code).parse()
+    except Exception as e:
+        return str(e).split("\n")[3].strip()
+    return ""
+
+
+SHORT_NAMES = {
+    ELEMENT_ID_AND: "and",
+    ELEMENT_ID_OR: "or",
+    ELEMENT_ID_IN: "in",
+    ELEMENT_ID_INVERSE: "not",
+}
+
+
+def tree_of(element):  # type: (ExpressionElement) -> str
+    """tree_of 以 S 表达式的形式返回表达式元素 element 的语法树"""
+    payload = element.element_payload
+    if element.element_id == ELEMENT_ID_VAR:
+        return payload
+    if element.element_id == ELEMENT_ID_EXPR:
+        if len(payload) == 1:
+            return tree_of(payload[0])
+        return "[{}]".format(" ".join(tree_of(i) for i in payload))
+    name = SHORT_NAMES.get(element.element_id, ELEMENT_ID_TO_NAME[element.element_id])
+    name = name.replace("(...)", "").replace(", ...}", "}")
+    if element.element_id == ELEMENT_ID_FUNC:
+        payload = [payload[0]] + [tree_of(i) for i in payload[1]]
+        return "({} {})".format(name, " ".join(payload))
+    if isinstance(payload, ExpressionElement):
+        return "({} {})".format(name, tree_of(payload))
+    if isinstance(payload, list):
+        return "({} {})".format(name, " ".join(tree_of(i) for i in payload))
+    return repr(payload)
+
+
+def statements_of(code_block):  # type: (list[OpcodeBase]) -> list[tuple]
+    """statements_of 以嵌套元组的形式返回代码块 code_block 的语法树"""
+    result = []  # type: list[tuple]
+    for i in code_block:
+        if isinstance(i, OpcodeAssign):
+            result.append(("=", i.opcode_payload[0], tree_of(i.opcode_payload[1])))
+        elif isinstance(i, OpcodeExpression):
+            result.append(("expr", tree_of(i.opcode_payload)))
+        elif isinstance(i, OpcodeReturn):
+            result.append(("return", tree_of(i.opcode_payload)))
+        elif isinstance(i, OpcodeCondition):
+            branches = []
+            for j in i.opcode_payload:
+                condition = None if j.condition is None else tree_of(j.condition)
+                branches.append((condition, statements_of(j.code_block)))
+            result.append(("if", branches))
+        elif isinstance(i, OpcodeForLoop):
+            for_loop = i.opcode_payload
+            result.append(
+                (
+                    "for",
+                    for_loop.variable,
+                    tree_of(for_loop.repeat_times),
+                    statements_of(for_loop.code_block),
+                )
+            )
+        else:
+            result.append((i.origin_line,))
+    return result
+
+
+class SyntaxErrorTest(unittest.TestCase):
+    def test_messages(self):
+        compact = (
+            "parse: Syntax error: Invalid expression (failed to compact the expression)"
+        )
+        cases = [
+            ("x = 1 +", "must_read: Unexpected EOF"),
+            ("x = a b", compact),
+            ("return", compact),
+            (
+                "x = 10 - -3",
+                'compact_operator: Syntax error; unexpected=ExpressionElement(id=8, name="-")',
+            ),
+            (
+                "x = * 2",
+                'compact_operator: Syntax error; unexpected=ExpressionElement(id=9, name="*")',
+            ),
+            (
+                "x = not or",
+                'compact_operator: Syntax error; unexpected=ExpressionElement(id=22, name="... or ...")',
+            ),
+        ]
+        for code, message in cases:
+            self.assertEqual(error_of(code), message, code)
+
+    def test_unary(self):
+        for code, result in (
+            ("return -2 * 3 + 1", -5),
+            ("return not 1 > 2 and -1 < 0", True),
+            ("return 2 - 3 - 4 * 2 / 4", -3),
+            ("return 'a' + 'b' in 'cab'", True),
+        ):
+            parser = package.CodeParser(code).parse()
+            runner = package.CodeRunner(
+                package.CodeCompiler(parser.code_block).compile()
+            )
+            self.assertEqual(runner.running(), result, code)
+
+
+class ParseTreeTest(unittest.TestCase):
+    def test_precedence_and_associativity(self):
+        for code, expected in EXPRESSION_TREES:
+            parser = package.CodeParser("x = " + code).parse()
+            assign = parser.code_block[0]
+            self.assertEqual(tree_of(assign.opcode_payload[1]), expected, code)
+
+    def test_statements(self):
+        for code, expected in STATEMENT_TREES:
+            parser = package.CodeParser(code).parse()
+            self.assertEqual(statements_of(parser.code_block), expected, code)
+
+    def test_statement_errors(self):
+        for code, expected in STATEMENT_ERRORS:
+            with self.assertRaises(Exception) as context:
+                package.CodeParser(code).parse()
+            self.assertEqual(str(context.exception), expected, code)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+import unittest
+import package
+from .corpus import (
+    VAR_MAPS,
+    DifferentialMixin,
+    compute_chains,
+    outcome,
+    switch_runner,
+)
+
+CONTEXT_PROGRAMS = [
+    "if 1:\n    break\nfi\nreturn 2",
+    "if y:\n    a = 1\nelif 1:\n    a = 1 - 's'\nfi",
+    "if 0:\n    a = 1\nelse:\n    a = 1 - 's'\nfi",
+    "s = 0\nfor i, 5:\n    s = s + 'a'\nrof\nreturn s",
+    "for i, 3:\n    if 1:\n        x = i + 'a'\n    fi\nrof",
+    "if 1:\n    for i, 2:\n        x = i - 's'\n    rof\nfi",
+    "for i, 2:\n    if y:\n        x = 1 / 0\n    fi\nrof",
+    "for i, 2:\n    for j, 2:\n        x = i / j\n    rof\nrof",
+]
+
+FLAGS = [
+    {},
+    {"specialize": True},
+    {"hoist": True},
+    {"accumulate": True},
+    {"range_loop": True},
+]
+
+
+def partial_runner(
+    known_vars, **flags
+):  # type: (dict, Any) -> Callable[[str], package.CodeRunner]
+    """partial_runner 返回针对 known_vars 特化代码的运行器构造函数"""
+
+    def make_runner(code):  # type: (str) -> package.CodeRunner
+        parser = package.CodeParser(code).parse()
+        compiler = package.CodeCompiler(parser.code_block, **flags)
+        return package.CodeRunner(compiler.specialize(known_vars))
+
+    return make_runner
+
+
+class PartialDifferentialTest(DifferentialMixin, unittest.TestCase):
+    def assertSpecialisedSame(
+        self, programs=None, **flags
+    ):  # type: (list[str] | None, Any) -> None
+        for i in VAR_MAPS:
+            self.assertSameAsSwitch(partial_runner(i, **flags), programs, [i])
+
+    def test_corpus(self):
+        self.assertSpecialisedSame()
+
+    def test_corpus_with_flags(self):
+        for flags in FLAGS[1:]:
+            self.assertSpecialisedSame(None, **flags)
+
+    def test_compute_chains(self):
+        self.assertSpecialisedSame(compute_chains(300))
+
+    def test_context(self):
+        for flags in FLAGS:
+            self.assertSpecialisedSame(CONTEXT_PROGRAMS, **flags)
+
+
+class PartialContextTest(unittest.TestCase):
+    def test_condition_context(self):
+        code = "if 1:\n    a = 1 - 's'\nfi"
+        result = outcome(partial_runner({}), code, {})
+        self.assertEqual(result[0], "error")
+        self.assertIn("Runtime Error in Condition", result[1])
+        self.assertIn("- Condition -\n  if 1:", result[1])
+        self.assertEqual(result, outcome(switch_runner, code, {}))
+
+    def test_for_loop_context(self):
+        code = "for i, 3:\n    a = i - 's'\nrof"
+        compiler = package.CodeCompiler(package.CodeParser(code).parse().code_block)
+        # The loop is unrolled, but its context is kept
+        self.assertNotEqual(
+            compiler.specialize({}).byte_code, compiler.compile().byte_code
+        )
+        result = outcome(partial_runner({}), code, {})
+        self.assertIn("Runtime Error in For Loop", result[1])
+        self.assertIn("- For Loop -\n  for i, 3:", result[1])
+        self.assertEqual(result, outcome(switch_runner, code, {}))
+
+    def test_innermost_context(self):
+        code = "for i, 2:\n    if 1:\n        a = i - 's'\n    fi\nrof"
+        result = outcome(partial_runner({}), code, {})
+        self.assertIn("- Condition -\n  if 1:", result[1])
+        self.assertEqual(result, outcome(switch_runner, code, {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+import unittest
+import package
+from package.runner.define import (
+    RUNNER_ENGINE_SWITCH,
+    RUNNER_ENGINE_TABLE,
+    RUNNER_ENGINE_TRANSPILE,
+)
+from .corpus import VAR_MAPS, all_programs, make_env
+
+ENGINES = [RUNNER_ENGINE_SWITCH, RUNNER_ENGINE_TABLE, RUNNER_ENGINE_TRANSPILE]
+
+
+def compile_code(code):  # type: (str) -> package.CompileResult
+    return package.CodeCompiler(package.CodeParser(code).parse().code_block).compile()
+
+
+def result_of(function):  # type: (Callable[[], Any]) -> tuple
+    try:
+        return ("ok", repr(function()))
+    except Exception as e:
+        return ("error", str(e))
+
+
+class PreparedRunTest(unittest.TestCase):
+    def test_corpus(self):
+        mismatches = []
+        for code in all_programs():
+            try:
+                compiled = compile_code(code)
+            except Exception:
+                continue
+            for engine in ENGINES:
+                runner = package.CodeRunner(compiled, engine, verify=True)
+                for var_maps in VAR_MAPS:
+                    names = sorted(var_maps)
+                    builtins, interact, log = make_env()
+                    prepared = runner.prepare(builtins, interact, names, False)
+                    got = result_of(lambda: prepared(*[var_maps[i] for i in names]))
+                    got += (list(log),)
+                    builtins, interact, log = make_env()
+                    expected = result_of(
+                        lambda: runner.running(False, var_maps, interact, builtins)
+                    )
+                    expected += (list(log),)
+                    if got != expected:
+                        mismatches.append((code, engine, var_maps, expected, got))
+        self.assertEqual(mismatches[:3], [], "{} mismatch(es)".format(len(mismatches)))
+
+    def test_positional_inputs(self):
+        runner = package.CodeRunner(compile_code("return a * 10 + b"))
+        prepared = runner.prepare(var_names=["b", "unused", "a"])
+        self.assertEqual(prepared(1, "x", 2), 21)
+        self.assertEqual(prepared(3, None, 4), 43)
+        with self.assertRaises(Exception) as context:
+            prepared(1, 2)
+        self.assertIn("Expect 3 values but got 2", str(context.exception))
+
+    def test_inputs_are_not_kept(self):
+        for engine in ENGINES:
+            compiled = compile_code("if a:\n    x = 1\nfi\nreturn x")
+            runner = package.CodeRunner(compiled, engine)
+            prepared = runner.prepare(var_names=["a", "x"])
+            self.assertEqual(prepared(True, None), 1)
+            self.assertEqual(prepared(False, 7), 7)
+            with self.assertRaises(Exception):
+                prepared(False, None)
+
+    def test_require_return(self):
+        runner = package.CodeRunner(compile_code("x = 1"))
+        self.assertIsNone(runner.prepare(require_return=False)())
+        with self.assertRaises(Exception):
+            runner.prepare()()
+
+    def test_dynamic_lookup(self):
+        builtins = package.BuiltInFunction(
+            static={"s": lambda: 1}, dynamic={"d": lambda: 10}
+        )
+        runner = package.CodeRunner(compile_code("return {func, s()} + {func, d()}"))
+        prepared = runner.prepare(builtins)
+        self.assertEqual(prepared(), 11)
+        # Dynamic functions are looked up on every call,
+        # while static ones are resolved by prepare
+        builtins.dynamic["d"] = lambda: 20
+        builtins.static["s"] = lambda: 2
+        self.assertEqual(prepared(), 21)
+        self.assertEqual(runner.prepare(builtins)(), 22)
+        del builtins.dynamic["d"]
+        with self.assertRaises(Exception):
+            prepared()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+import unittest
+import package
+from .corpus import outcome, switch_runner, verified_table_runner
+
+
+class TableRunnerTest(unittest.TestCase):
+    def test_fast_mode(self):
+        runner = verified_table_runner(
+            "t = 0\nfor i, 10:\n    t = t + i\nrof\nreturn t"
+        )
+        self.assertEqual(runner._inputs, [])
+        self.assertEqual(runner._handlers, [])
+        self.assertEqual(runner.running(), 45)
+
+    def test_fast_mode_needs_inputs(self):
+        runner = verified_table_runner("return y + 1")
+        self.assertEqual(len(runner._inputs), 1)  # type: ignore
+        self.assertEqual(runner.running(var_maps={"y": 2}), 3)
+        code = "return y + 1"
+        self.assertEqual(
+            outcome(verified_table_runner, code, {}),
+            outcome(switch_runner, code, {}),
+        )
+
+    def test_unknown_engine(self):
+        compiled = package.CodeCompiler(
+            package.CodeParser("return 1").parse().code_block
+        ).compile()
+        with self.assertRaises(Exception):
+            package.CodeRunner(compiled, 99)
+
+
+if __name__ == "__main__":
+    unittest.main()
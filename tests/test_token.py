@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+import unittest
+from package.parser.reader.string_reader import StringReader
+from package.parser.token.buffer import TokenBuffer
+from package.parser.token.sentence import Sentence, SentenceReader
+from package.parser.token.token import (
+    Token,
+    TOKEN_ID_EOF,
+    TOKEN_ID_WORD,
+    TOKEN_ID_ASSIGN,
+    TOKEN_ID_LEFT_ANGLE_BRACKET,
+    TOKEN_ID_RIGHT_ANGLE_BRACKET,
+    TOKEN_ID_LEFT_BARRIER,
+    TOKEN_ID_RIGHT_BARRIER,
+    TOKEN_ID_COLON,
+    TOKEN_ID_PLUS,
+    TOKEN_ID_MINUS,
+    TOKEN_ID_ASTERISK,
+    TOKEN_ID_SLASH,
+    TOKEN_ID_SINGLE_QUOTE,
+    TOKEN_ID_LEFT_BRACKET,
+    TOKEN_ID_RIGHT_BRACKET,
+    TOKEN_ID_COMMA,
+    TOKEN_ID_EXCLAMATION,
+    TOKEN_ID_SEPSEPARATE,
+    TOKEN_ID_KEY_WORD_INT,
+    TOKEN_ID_KEY_WORD_SCORE,
+    TOKEN_ID_KEY_WORD_FUNC,
+    TOKEN_ID_KEY_WORD_RETURN,
+    TOKEN_ID_KEY_WORD_IF,
+    TOKEN_ID_KEY_WORD_FI,
+    TOKEN_ID_KEY_WORD_FOR,
+    TOKEN_ID_KEY_WORD_CONTINUE,
+    TOKEN_ID_KEY_WORD_ROF,
+    TOKEN_ID_KEY_WORD_OR,
+    TOKEN_ID_KEY_WORD_NOT,
+    TOKEN_ID_KEY_WORD_IN,
+)
+
+WORD = TOKEN_ID_WORD
+QUOTE = TOKEN_ID_SINGLE_QUOTE
+
+# The token streams produced by the original character-at-a-time tokenizer
+TOKEN_STREAMS = [
+    (
+        "x = 1 + 2.5",
+        [
+            (WORD, "x", 0, 1),
+            (TOKEN_ID_ASSIGN, "", 2, 3),
+            (WORD, "1", 4, 5),
+            (TOKEN_ID_PLUS, "", 6, 7),
+            (WORD, "2.5", 8, 11),
+        ],
+    ),
+    (
+        "  a=b*(c-d)/e\n",
+        [
+            (WORD, "a", 2, 3),
+            (TOKEN_ID_ASSIGN, "", 3, 4),
+            (WORD, "b", 4, 5),
+            (TOKEN_ID_ASTERISK, "", 5, 6),
+            (TOKEN_ID_LEFT_BRACKET, "", 6, 7),
+            (WORD, "c", 7, 8),
+            (TOKEN_ID_MINUS, "", 8, 9),
+            (WORD, "d", 9, 10),
+            (TOKEN_ID_RIGHT_BRACKET, "", 10, 11),
+            (TOKEN_ID_SLASH, "", 11, 12),
+            (WORD, "e", 12, 13),
+            (TOKEN_ID_SEPSEPARATE, "", 13, 14),
+        ],
+    ),
+    (
+        "s = 'a\\'b\\n' + 'c'",
+        [
+            (WORD, "s", 0, 1),
+            (TOKEN_ID_ASSIGN, "", 2, 3),
+            (QUOTE, "a'b\n", 4, 12),
+            (TOKEN_ID_PLUS, "", 13, 14),
+            (QUOTE, "c", 15, 18),
+        ],
+    ),
+    (
+        "if not x in 'ab':\n\treturn {func, f(1, y)}\nfi",
+        [
+            (TOKEN_ID_KEY_WORD_IF, "", 0, 2),
+            (TOKEN_ID_KEY_WORD_NOT, "", 3, 6),
+            (WORD, "x", 7, 8),
+            (TOKEN_ID_KEY_WORD_IN, "", 9, 11),
+            (QUOTE, "ab", 12, 16),
+            (TOKEN_ID_COLON, "", 16, 17),
+            (TOKEN_ID_SEPSEPARATE, "", 17, 18),
+            (TOKEN_ID_KEY_WORD_RETURN, "", 19, 25),
+            (TOKEN_ID_LEFT_BARRIER, "", 26, 27),
+            (TOKEN_ID_KEY_WORD_FUNC, "", 27, 31),
+            (TOKEN_ID_COMMA, "", 31, 32),
+            (WORD, "f", 33, 34),
+            (TOKEN_ID_LEFT_BRACKET, "", 34, 35),
+            (WORD, "1", 35, 36),
+            (TOKEN_ID_COMMA, "", 36, 37),
+            (WORD, "y", 38, 39),
+            (TOKEN_ID_RIGHT_BRACKET, "", 39, 40),
+            (TOKEN_ID_RIGHT_BARRIER, "", 40, 41),
+            (TOKEN_ID_SEPSEPARATE, "", 41, 42),
+            (TOKEN_ID_KEY_WORD_FI, "", 42, 44),
+        ],
+    ),
+    (
+        "for i, 3:|continue|rof",
+        [
+            (TOKEN_ID_KEY_WORD_FOR, "", 0, 3),
+            (WORD, "i", 4, 5),
+            (TOKEN_ID_COMMA, "", 5, 6),
+            (WORD, "3", 7, 8),
+            (TOKEN_ID_COLON, "", 8, 9),
+            (TOKEN_ID_SEPSEPARATE, "", 9, 10),
+            (TOKEN_ID_KEY_WORD_CONTINUE, "", 10, 18),
+            (TOKEN_ID_SEPSEPARATE, "", 18, 19),
+            (TOKEN_ID_KEY_WORD_ROF, "", 19, 22),
+        ],
+    ),
+    (
+        "v = <score, '@s', 'obj'> == true or false",
+        [
+            (WORD, "v", 0, 1),
+            (TOKEN_ID_ASSIGN, "", 2, 3),
+            (TOKEN_ID_LEFT_ANGLE_BRACKET, "", 4, 5),
+            (TOKEN_ID_KEY_WORD_SCORE, "", 5, 10),
+            (TOKEN_ID_COMMA, "", 10, 11),
+            (QUOTE, "@s", 12, 16),
+            (TOKEN_ID_COMMA, "", 16, 17),
+            (QUOTE, "obj", 18, 23),
+            (TOKEN_ID_RIGHT_ANGLE_BRACKET, "", 23, 24),
+            (TOKEN_ID_ASSIGN, "", 25, 26),
+            (TOKEN_ID_ASSIGN, "", 26, 27),
+            (WORD, "true", 28, 32),
+            (TOKEN_ID_KEY_WORD_OR, "", 33, 35),
+            (WORD, "false", 36, 41),
+        ],
+    ),
+    (
+        "x = int('3') != 4 >= 5 <= 6",
+        [
+            (WORD, "x", 0, 1),
+            (TOKEN_ID_ASSIGN, "", 2, 3),
+            (TOKEN_ID_KEY_WORD_INT, "", 4, 7),
+            (TOKEN_ID_LEFT_BRACKET, "", 7, 8),
+            (QUOTE, "3", 8, 11),
+            (TOKEN_ID_RIGHT_BRACKET, "", 11, 12),
+            (TOKEN_ID_EXCLAMATION, "", 13, 14),
+            (TOKEN_ID_ASSIGN, "", 14, 15),
+            (WORD, "4", 16, 17),
+            (TOKEN_ID_RIGHT_ANGLE_BRACKET, "", 18, 19),
+            (TOKEN_ID_ASSIGN, "", 19, 20),
+            (WORD, "5", 21, 22),
+            (TOKEN_ID_LEFT_ANGLE_BRACKET, "", 23, 24),
+            (TOKEN_ID_ASSIGN, "", 24, 25),
+            (WORD, "6", 26, 27),
+        ],
+    ),
+    (
+        u"'中文' + 变量",
+        [
+            (QUOTE, u"中文", 0, 4),
+            (TOKEN_ID_PLUS, "", 5, 6),
+            (WORD, u"变量", 7, 9),
+        ],
+    ),
+]
+
+
+def tokenize(code):  # type: (str) -> tuple[Sentence, tuple]
+    """tokenize 对 code 进行分词，并返回分词器与 parse_all 的返回值"""
+    sentence = Sentence(StringReader(code))
+    return sentence, sentence.parse_all()
+
+
+def stream_of(sentence):  # type: (Sentence) -> list[tuple[int, str, int, int]]
+    """stream_of 以元组的形式返回 sentence 的分词结果"""
+    result = []
+    for i in range(len(sentence.tokens)):
+        token = sentence.tokens[i]
+        result.append(
+            (
+                token.token_id,
+                token.token_payload,
+                token.ori_start_ptr,
+                token.ori_end_ptr,
+            )
+        )
+    return result
+
+
+class SentenceTest(unittest.TestCase):
+    def test_token_streams(self):
+        for code, expected in TOKEN_STREAMS:
+            sentence, (_, end, err) = tokenize(code)
+            self.assertIsNone(err, code)
+            self.assertEqual(end, len(code), code)
+            self.assertEqual(stream_of(sentence), expected, code)
+
+    def test_parse_next(self):
+        for code, expected in TOKEN_STREAMS:
+            sentence = Sentence(StringReader(code))
+            count = 0
+            while sentence.parse_next():
+                count += 1
+            self.assertEqual(count, len(expected), code)
+            self.assertEqual(stream_of(sentence), expected, code)
+
+    def test_unterminated_string(self):
+        sentence, (start, end, err) = tokenize("x = 'ab")
+        self.assertEqual((start, end), (3, 7))
+        self.assertEqual(str(err), "parse_string: Unexpected EOF")
+        self.assertEqual(
+            stream_of(sentence), [(WORD, "x", 0, 1), (TOKEN_ID_ASSIGN, "", 2, 3)]
+        )
+        with self.assertRaises(Exception):
+            Sentence(StringReader("'ab")).parse_next()
+
+    def test_blank(self):
+        for code in ("", "   ", "\t \t"):
+            sentence, (_, end, err) = tokenize(code)
+            self.assertIsNone(err)
+            self.assertEqual(end, len(code))
+            self.assertEqual(stream_of(sentence), [])
+
+
+class TokenBufferTest(unittest.TestCase):
+    def test_columns(self):
+        buffer = TokenBuffer()
+        buffer.append(WORD, "x", 0, 1)
+        buffer.append(TOKEN_ID_ASSIGN, "", 2, 3)
+        buffer.append(QUOTE, "ab", 4, 8)
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(
+            [buffer.token_id(i) for i in range(3)], [WORD, TOKEN_ID_ASSIGN, QUOTE]
+        )
+        self.assertEqual([buffer.payload(i) for i in range(3)], ["x", "", "ab"])
+        self.assertEqual([buffer.start(i) for i in range(3)], [0, 2, 4])
+        self.assertEqual([buffer.end(i) for i in range(3)], [1, 3, 8])
+
+    def test_view(self):
+        buffer = TokenBuffer()
+        buffer.append(QUOTE, "ab", 4, 8)
+        token = buffer[0]
+        self.assertIsInstance(token, Token)
+        self.assertEqual(
+            repr(token),
+            'Token(id=11, name="\'", payload="ab", ori_start_ptr=4, ori_end_ptr=8)',
+        )
+        # A view is a copy, so changing it leaves the buffer alone
+        token.token_payload = "cd"
+        self.assertEqual(buffer.payload(0), "ab")
+        self.assertEqual(buffer[-1].token_payload, "ab")
+        with self.assertRaises(IndexError):
+            buffer[1]
+
+    def test_interned_payloads(self):
+        buffer = TokenBuffer()
+        for i in range(100):
+            buffer.append(WORD, "x", i, i + 1)
+            buffer.append(TOKEN_ID_PLUS, "", i, i + 1)
+            buffer.append(QUOTE, "x", i, i + 1)
+        self.assertEqual(repr(buffer), "TokenBuffer(tokens=300, strings=2)")
+        self.assertEqual(buffer.payload(299), "x")
+
+    def test_from_tokens(self):
+        sentence, _ = tokenize(TOKEN_STREAMS[3][0])
+        tokens = [sentence.tokens[i] for i in range(len(sentence.tokens))]
+        buffer = TokenBuffer(tokens)
+        self.assertEqual(len(buffer), len(tokens))
+        for i in range(len(tokens)):
+            self.assertEqual(repr(buffer[i]), repr(tokens[i]))
+
+
+class SentenceReaderTest(unittest.TestCase):
+    def reader_of(self, code):  # type: (str) -> SentenceReader
+        sentence, _ = tokenize(code)
+        return SentenceReader(sentence.tokens)
+
+    def test_cursor(self):
+        reader = self.reader_of("x = 'ab'")
+        self.assertEqual(reader.peek_id(), WORD)
+        self.assertEqual(reader.peek_id(2), QUOTE)
+        self.assertEqual(reader.peek_id(3), TOKEN_ID_EOF)
+        self.assertEqual(reader.peek_id(-1), TOKEN_ID_EOF)
+        self.assertEqual(reader.read_id(), WORD)
+        self.assertEqual(reader.payload(), "x")
+        self.assertEqual(reader.must_read_id(), TOKEN_ID_ASSIGN)
+        self.assertEqual(reader.peek_id(), QUOTE)
+        self.assertEqual(reader.payload(0), "ab")
+        self.assertEqual(reader.token(0).ori_end_ptr, 8)
+        self.assertEqual(reader.read_id(), QUOTE)
+        self.assertEqual(reader.token().token_payload, "ab")
+        self.assertEqual(reader.pointer(), 3)
+        # Reading past the end neither moves the pointer nor fails
+        self.assertEqual(reader.read_id(), TOKEN_ID_EOF)
+        self.assertEqual(reader.pointer(), 3)
+        with self.assertRaises(Exception) as context:
+            reader.must_read_id()
+        self.assertEqual(str(context.exception), "must_read: Unexpected EOF")
+
+    def test_read_and_unread(self):
+        reader = self.reader_of("return 1")
+        token = reader.must_read()
+        self.assertEqual(token.token_id, TOKEN_ID_KEY_WORD_RETURN)
+        self.assertIs(reader.unread(), reader)
+        self.assertEqual(reader.read().token_id, TOKEN_ID_KEY_WORD_RETURN)  # type: ignore
+        self.assertEqual(reader.read().token_payload, "1")  # type: ignore
+        self.assertIsNone(reader.read())
+        with self.assertRaises(Exception):
+            reader.must_read()
+        reader.set_pointer(0)
+        with self.assertRaises(Exception):
+            reader.unread()
+
+    def test_from_tokens(self):
+        reader = SentenceReader([Token(WORD, "y", 0, 1), Token(TOKEN_ID_PLUS)])
+        self.assertIsInstance(reader.contents(), TokenBuffer)
+        self.assertEqual(reader.read_id(), WORD)
+        self.assertEqual(reader.payload(), "y")
+        self.assertEqual(reader.read_id(), TOKEN_ID_PLUS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+import unittest
+import package
+from package.runner.define import RUNNER_ENGINE_SWITCH, RUNNER_ENGINE_TRANSPILE
+from package.runner.transpile import CodeTranspiler
+from .corpus import make_env, nested_conditions, switch_runner, transpile_runner
+
+
+class TranspileRunnerTest(unittest.TestCase):
+    def test_is_transpiled(self):
+        runner = transpile_runner("t = 0\nfor i, 10:\n    t = t + i\nrof\nreturn t")
+        self.assertEqual(runner._engine, RUNNER_ENGINE_TRANSPILE)
+        builtins, interact, _ = make_env()
+        self.assertEqual(runner.running(interact=interact, builtins=builtins), 45)
+
+    def test_single_trailing_return(self):
+        for code, count in (
+            ("x = 1\nreturn x", 1),
+            ("x = 1", 1),
+            ("if y:\n    return 1\nfi\nreturn 2", 2),
+            ("for i, 3:\n    return i\nrof", 2),
+        ):
+            compiled = package.CodeCompiler(
+                package.CodeParser(code).parse().code_block
+            ).compile()
+            source = CodeTranspiler(compiled).transpile().source
+            self.assertEqual(source.count("return _result"), count, code)
+
+    def test_nested_conditions(self):
+        runner = transpile_runner(nested_conditions(80))
+        self.assertEqual(runner._engine, RUNNER_ENGINE_TRANSPILE)
+        self.assertEqual(runner.running(), 5)
+
+    def test_too_deeply_nested_conditions(self):
+        runner = transpile_runner(nested_conditions(1000))
+        self.assertEqual(runner._engine, RUNNER_ENGINE_SWITCH)
+        self.assertEqual(runner.running(), 5)
+
+    def test_nested_operations(self):
+        for depth, engine in (
+            (60, RUNNER_ENGINE_TRANSPILE),
+            (150, RUNNER_ENGINE_SWITCH),
+        ):
+            code = "y = 2\nreturn {}1{}".format("(y - " * depth, ")" * depth)
+            runner = transpile_runner(code)
+            self.assertEqual(runner._engine, engine)
+            self.assertEqual(runner.running(), switch_runner(code).running())
+        # Parentheses in string literals do not count
+        code = "return '{}\\'\"'".format("(" * 150)
+        runner = transpile_runner(code)
+        self.assertEqual(runner._engine, RUNNER_ENGINE_TRANSPILE)
+        self.assertEqual(runner.running(), "(" * 150 + "'\"")
+
+    def test_long_logic_chains(self):
+        for symbol in (" and ", " or "):
+            terms = ["x == {}".format(i) for i in range(200)]
+            for code in (
+                "x = 1\nif {}:\n    return 1\nfi\nreturn 0".format(symbol.join(terms)),
+                "x = 1\nreturn {}".format(symbol.join(terms)),
+            ):
+                runner = transpile_runner(code)
+                self.assertEqual(runner._engine, RUNNER_ENGINE_TRANSPILE)
+                self.assertEqual(runner.running(), switch_runner(code).running())
+
+    def test_fallback(self):
+        compiled = package.CodeCompiler(
+            package.CodeParser("return 1").parse().code_block
+        ).compile()
+        compiled.byte_code.append(compiled.byte_code[0])
+        runner = package.CodeRunner(compiled, RUNNER_ENGINE_TRANSPILE)
+        self.assertEqual(runner._engine, RUNNER_ENGINE_SWITCH)
+        self.assertEqual(runner.running(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
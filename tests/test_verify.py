@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+import unittest
+import package
+from package.runner.compile import CompileResult
+from package.runner.verify import VerifyException
+from package.runner.define import (
+    BYTECODE_LOAD_CONST,
+    BYTECODE_LOAD_VALUE,
+    BYTECODE_DIRECT_JUMP,
+    BYTECODE_STORE_RETURN_VAL,
+    BYTECODE_PROGRAM_STOP_RUN,
+    RUNNER_ENGINE_TABLE,
+    RUNNER_ENGINE_TRANSPILE,
+)
+from .corpus import all_programs, outcome, switch_runner
+
+
+def compile_code(code):  # type: (str) -> CompileResult
+    return package.CodeCompiler(package.CodeParser(code).parse().code_block).compile()
+
+
+class VerifierTest(unittest.TestCase):
+    def test_corpus(self):
+        for code in all_programs():
+            try:
+                compiled = compile_code(code)
+            except Exception:
+                continue
+            package.CodeVerifier(compiled).verify()
+
+    def test_inputs(self):
+        for code, names in (
+            ("return 1", []),
+            ("x = y + 1\nreturn x", ["y"]),
+            ("if y:\n    x = 1\nfi\nreturn x", ["x", "y"]),
+            ("if y:\n    x = 1\nelse:\n    x = 2\nfi\nreturn x", ["y"]),
+            ("for i, 3:\n    x = i\nrof\nreturn x + i", ["i", "x"]),
+            ("x = y\nreturn y + x", ["y"]),
+        ):
+            compiled = compile_code(code)
+            inputs = package.CodeVerifier(compiled).verify()
+            self.assertEqual(
+                sorted([compiled.var_mapping.name_by_index(i) for i in inputs]),
+                names,
+                code,
+            )
+
+    def test_rejected(self):
+        compiled = compile_code("x = 1\nreturn x")
+        stop = [BYTECODE_STORE_RETURN_VAL, BYTECODE_PROGRAM_STOP_RUN]
+        for byte_code, message in (
+            ([], "Empty byte code"),
+            ([99, BYTECODE_PROGRAM_STOP_RUN], "Unknown opcode at pc=0"),
+            ([True, BYTECODE_PROGRAM_STOP_RUN], "Unknown opcode at pc=0"),
+            ([BYTECODE_PROGRAM_STOP_RUN, BYTECODE_LOAD_CONST], "Truncated instruction"),
+            ([BYTECODE_LOAD_VALUE, 5] + stop, "Invalid variable index 5 at pc=0"),
+            (
+                [BYTECODE_DIRECT_JUMP, 1, BYTECODE_PROGRAM_STOP_RUN],
+                "Invalid jump target 1",
+            ),
+            ([BYTECODE_LOAD_CONST, 1, BYTECODE_PROGRAM_STOP_RUN], "Stack is not empty"),
+            (stop, "Stack underflow"),
+        ):
+            bad = CompileResult(byte_code, [], compiled.var_mapping)
+            with self.assertRaises(VerifyException) as context:
+                package.CodeVerifier(bad).verify()
+            self.assertIn(message, str(context.exception))
+
+
+class VerifiedRunTest(unittest.TestCase):
+    def test_fallback(self):
+        compiled = compile_code("x = y + 1\nreturn x")
+        compiled.byte_code.extend([BYTECODE_DIRECT_JUMP, 1])
+        for engine in (RUNNER_ENGINE_TABLE, RUNNER_ENGINE_TRANSPILE):
+            runner = package.CodeRunner(compiled, engine, verify=True)
+            self.assertIsNone(runner._inputs)
+            self.assertEqual(runner.running(var_maps={"y": 1}), 2)
+            with self.assertRaises(Exception) as context:
+                runner.running()
+            self.assertIn('Variable "y" used before assignment', str(context.exception))
+
+    def test_fast_mode_errors(self):
+        code = "if y:\n    x = 1\nfi\nreturn x"
+        for engine in (RUNNER_ENGINE_TABLE, RUNNER_ENGINE_TRANSPILE):
+
+            def make_runner(code):  # type: (str) -> package.CodeRunner
+                return package.CodeRunner(compile_code(code), engine, verify=True)
+
+            for var_maps in ({}, {"y": 0}, {"y": 1}, {"y": 0, "x": 5}):
+                self.assertEqual(
+                    outcome(make_runner, code, var_maps),
+                    outcome(switch_runner, code, var_maps),
+                    (engine, var_maps),
+                )
+
+    def test_switch_ignores_verify(self):
+        runner = package.CodeRunner(compile_code("return y"), verify=True)
+        self.assertIsNone(runner._inputs)
+        self.assertEqual(runner.running(var_maps={"y": 3}), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()